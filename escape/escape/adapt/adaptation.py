@@ -19,11 +19,12 @@ import pprint
 import time
 import urlparse
 import weakref
+from multiprocessing.pool import ThreadPool
 
 from escape.adapt import log as log
 from escape.adapt.adapters import UnifyRESTAdapter
 from escape.adapt.managers import UnifyDomainManager, BaseResultEvent
-from escape.adapt.virtualization import DomainVirtualizer
+from escape.adapt.virtualization import DomainVirtualizer, DoVDelta
 from escape.nffg_lib.nffg import NFFG, NFFGToolBox
 from escape.util.com_logger import MessageDumper
 from escape.util.config import CONFIG
@@ -31,7 +32,8 @@ from escape.util.config import ConfigurationError
 from escape.util.conversion import NFFGConverter
 from escape.util.domain import DomainChangedEvent, AbstractDomainManager, \
   AbstractRemoteDomainManager
-from escape.util.misc import notify_remote_visualizer, VERBOSE
+from escape.util.misc import notify_remote_visualizer, VERBOSE, \
+  schedule_as_coop_task
 from escape.util.stat import stats
 from escape.util.virtualizer_helper import get_nfs_from_info, \
   strip_info_by_nfs, get_bb_nf_from_path
@@ -55,7 +57,8 @@ class InstallationFinishedEvent(BaseResultEvent):
     self.id = id
     self.result = result
     stats.add_measurement_end_entry(type=stats.TYPE_DEPLOY,
-                                    info=log.name)
+                                    info=log.name,
+                                    request_id=id)
 
   @classmethod
   def get_result_from_status (cls, deploy_status):
@@ -654,99 +657,12 @@ class ControllerAdapter(object):
     log.info("Notify initiated domains: %s" %
              [d for d in self.domains.initiated])
     # Perform domain installations
-    for domain, part in slices:
-      stats.add_measurement_start_entry(type=stats.TYPE_DEPLOY_DOMAIN,
-                                        info=domain)
-      log.debug("Search DomainManager for domain: %s" % domain)
-      # Get Domain Manager
-      domain_mgr = self.domains.get_component_by_domain(domain_name=domain)
-      if domain_mgr is None:
-        log.warning("No DomainManager has been initialized for domain: %s! "
-                    "Skip install domain part..." % domain)
-        deploy_status.set_domain_failed(domain=domain)
-        continue
-      log.log(VERBOSE, "Splitted domain: %s part:\n%s" % (domain, part.dump()))
-      # Check if need to reset domain before install
-      if CONFIG.reset_domains_before_install():
-        log.debug("Reset %s domain before deploying mapped NFFG..." %
-                  domain_mgr.domain_name)
-        domain_mgr.reset_domain()
-      log.info("Delegate splitted part: %s to %s" % (part, domain_mgr))
-      # Invoke DomainAdapter's install
-      domain_install_result = domain_mgr.install_nffg(part)
-      # Update the DoV based on the mapping result covering some corner case
-      if domain_install_result is None:
-        log.error("Installation of %s in %s was unsuccessful!" % (part, domain))
-        log.debug("Update installed part with collective result: %s" %
-                  NFFG.STATUS_FAIL)
-        deploy_status.set_domain_failed(domain=domain)
-        log.debug("Installation status: %s" % deploy_status)
-        if CONFIG.rollback_on_failure():
-          # Stop deploying remained nffg_parts and initiate delayed rollback
-          log.info("Rollback mode is enabled! Skip installation process...")
-          break
-        # Update failed status info of mapped elements in NFFG part for DoV
-        # update
-        if self.DoVManager.status_updates:
-          NFFGToolBox.update_status_info(nffg=part, status=NFFG.STATUS_FAIL,
-                                         log=log)
-        else:
-          log.warning("Skip DoV update with domain: %s! Cause: "
-                      "Domain installation was unsuccessful!" % domain)
-          continue
-      if domain_install_result == 0:
-        log.info("Installation of %s in %s was skipped!" % (part, domain))
-        deploy_status.set_domain_ok(domain=domain)
-        log.debug("Installation status: %s" % deploy_status)
-        continue
-      log.info("Installation of %s in %s was successful!" % (part, domain))
-      if self.DoVManager.status_updates:
-        log.debug("Update installed part with collective result: %s" %
-                  NFFG.STATUS_DEPLOY)
-        # Update successful status info of mapped elements in NFFG part for
-        # DoV update
-        NFFGToolBox.update_status_info(nffg=part, status=NFFG.STATUS_DEPLOY,
-                                       log=log)
-      # If the domain manager does not poll the domain update here
-      # else polling takes care of domain updating
-      if isinstance(domain_mgr,
-                    AbstractRemoteDomainManager) and domain_mgr.polling:
-        log.info("Skip explicit DoV update for domain: %s. "
-                 "Cause: polling enabled!" % domain)
-        if isinstance(domain_mgr,
-                      UnifyDomainManager) and domain_mgr.callback_manager:
-          log.debug("Callback is enabled for domain: %s!" % domain)
-        else:
-          log.debug("Consider deploy into a polled domain OK...")
-          deploy_status.set_domain_ok(domain=domain)
-          log.debug("Installation status: %s" % deploy_status)
-          continue
-
-      if isinstance(domain_mgr,
-                    UnifyDomainManager) and domain_mgr.callback_manager:
-        log.info("Skip explicit DoV update for domain: %s. "
-                 "Cause: callback registered!" % domain)
-        deploy_status.set_domain_waiting(domain=domain)
-        log.debug("Installation status: %s" % deploy_status)
-        continue
-
-      if domain_mgr.IS_INTERNAL_MANAGER:
-        self.__perform_internal_mgr_update(mapped_nffg=mapped_nffg,
-                                           domain=domain)
-        # In case of Local manager skip the rest of the update
-        continue
-
-      if CONFIG.one_step_update():
-        log.debug("One-step-update is enabled. Skip explicit domain update!")
-      else:
-        # Explicit domain update
-        self.DoVManager.update_domain(domain=domain, nffg=part)
-      # self.status_mgr.get_status(mapped_nffg.id).set_domain_ok(domain)
-      deploy_status.set_domain_ok(domain=domain)
-      log.debug("Installation status: %s" % deploy_status)
-      if CONFIG.domain_deploy_delay():
-        log.warning("Delay next deploy with %ss" % CONFIG.domain_deploy_delay())
-        time.sleep(CONFIG.domain_deploy_delay())
+    if CONFIG.domain_deploy_workers() > 1:
+      self.__deploy_concurrently(mapped_nffg=mapped_nffg, slices=slices,
+                                 deploy_status=deploy_status)
+    else:
+      self.__deploy_sequentially(mapped_nffg=mapped_nffg, slices=slices,
+                                 deploy_status=deploy_status)
     # END of domain deploy loop
     log.info("NF-FG installation is finished by %s" % self.__class__.__name__)
     log.debug("Overall installation status: %s" % deploy_status)
@@ -759,6 +675,7 @@ class ControllerAdapter(object):
     elif deploy_status.still_pending:
       log.warning("Installation process is still pending! "
                   "Waiting for results...")
+      self.__subscribe_deploy_callbacks(deploy_status=deploy_status)
     elif deploy_status.failed:
       log.error("%s installation was not successful!" % mapped_nffg)
       # No pending install part here
@@ -769,6 +686,355 @@ class ControllerAdapter(object):
       log.info("All installation processes have been finished!")
     return deploy_status
 
+  def __get_deploy_domain_mgr (self, domain, deploy_status):
+    """
+    Return with the DomainManager related to the given domain.
+
+    :param domain: domain name
+    :type domain: str
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: domain manager or None if it is not initialized
+    :rtype: :any:`AbstractDomainManager`
+    """
+    log.debug("Search DomainManager for domain: %s" % domain)
+    # Get Domain Manager
+    domain_mgr = self.domains.get_component_by_domain(domain_name=domain)
+    if domain_mgr is None:
+      log.warning("No DomainManager has been initialized for domain: %s! "
+                  "Skip install domain part..." % domain)
+      deploy_status.set_domain_failed(domain=domain)
+    return domain_mgr
+
+  @staticmethod
+  def _install_domain_part (domain, part, domain_mgr, request_id):
+    """
+    Delegate the given domain part to the DomainManager and measure the
+    install time of the domain.
+
+    Can be called from a deploy worker thread so every exception is caught
+    and the failure is signalled with a None result. The deploy status must
+    be updated by the caller thread.
+
+    :param domain: domain name
+    :type domain: str
+    :param part: domain related part of the mapped NFFG
+    :type part: :class:`NFFG`
+    :param domain_mgr: domain manager
+    :type domain_mgr: :any:`AbstractDomainManager`
+    :param request_id: id of the deployed service request
+    :type request_id: str or int
+    :return: result of the domain installation
+    :rtype: bool or int or None
+    """
+    stats.add_measurement_start_entry(type=stats.TYPE_DEPLOY_DOMAIN,
+                                      info=domain, request_id=request_id)
+    result = None
+    try:
+      log.log(VERBOSE, "Splitted domain: %s part:\n%s" % (domain, part.dump()))
+      # Check if need to reset domain before install
+      if CONFIG.reset_domains_before_install():
+        log.debug("Reset %s domain before deploying mapped NFFG..." %
+                  domain_mgr.domain_name)
+        domain_mgr.reset_domain()
+      log.info("Delegate splitted part: %s to %s" % (part, domain_mgr))
+      # Invoke DomainAdapter's install
+      result = domain_mgr.install_nffg(part)
+    except Exception:
+      log.exception("Got exception during the installation of %s in %s!" %
+                    (part, domain))
+    # Deploy of domains with callback or pending flowrules is finished by the
+    # callback or the flowrule confirmation
+    finished_later = result is not None and (
+      isinstance(domain_mgr, UnifyDomainManager) and
+      domain_mgr.callback_manager or
+      domain_mgr.is_deploy_pending(request_id=request_id))
+    if not finished_later:
+      status = DomainRequestStatus.FAILED if result is None else \
+        DomainRequestStatus.OK
+      stats.add_measurement_end_entry(type=stats.TYPE_DEPLOY_DOMAIN,
+                                      info="%s-->%s" % (domain, status),
+                                      request_id=request_id)
+    return result
+
+  def __deploy_sequentially (self, mapped_nffg, slices, deploy_status):
+    """
+    Install the domain parts one after another.
+
+    :param mapped_nffg: mapped NFFG
+    :type mapped_nffg: :class:`NFFG`
+    :param slices: list of (domain name, domain part) pairs
+    :type slices: list
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: None
+    """
+    for domain, part in slices:
+      domain_mgr = self.__get_deploy_domain_mgr(domain=domain,
+                                                deploy_status=deploy_status)
+      if domain_mgr is None:
+        continue
+      result = self._install_domain_part(domain=domain, part=part,
+                                         domain_mgr=domain_mgr,
+                                         request_id=deploy_status.id)
+      if not self.__process_domain_install_result(mapped_nffg=mapped_nffg,
+                                                  domain=domain,
+                                                  part=part,
+                                                  domain_mgr=domain_mgr,
+                                                  result=result,
+                                                  deploy_status=deploy_status,
+                                                  delay=True):
+        break
+
+  def __deploy_concurrently (self, mapped_nffg, slices, deploy_status):
+    """
+    Install the domain parts of remote domains concurrently using a bounded
+    pool of deploy workers.
+
+    Parts of local domains are installed in the caller thread meanwhile. The
+    results are processed in the order of the slices in the caller thread so
+    the DoV and the deploy status are updated the same way as in the
+    sequential deploy.
+
+    :param mapped_nffg: mapped NFFG
+    :type mapped_nffg: :class:`NFFG`
+    :param slices: list of (domain name, domain part) pairs
+    :type slices: list
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: None
+    """
+    deploys = []
+    for domain, part in slices:
+      domain_mgr = self.__get_deploy_domain_mgr(domain=domain,
+                                                deploy_status=deploy_status)
+      if domain_mgr is not None:
+        deploys.append((domain, part, domain_mgr))
+    remote_cnt = len([d for d in deploys
+                      if isinstance(d[2], AbstractRemoteDomainManager)])
+    if CONFIG.domain_deploy_delay():
+      log.warning("Domain deploy delay is ignored in concurrent deploy mode!")
+    pool = None
+    if remote_cnt:
+      workers = min(CONFIG.domain_deploy_workers(), remote_cnt)
+      log.debug("Deploy %s remote domain part(s) with %s worker(s)..."
+                % (remote_cnt, workers))
+      pool = ThreadPool(processes=workers)
+    try:
+      results = []
+      # Fan out remote domain parts
+      for domain, part, domain_mgr in deploys:
+        if isinstance(domain_mgr, AbstractRemoteDomainManager):
+          results.append(pool.apply_async(
+            self._install_domain_part,
+            kwds=dict(domain=domain, part=part, domain_mgr=domain_mgr,
+                      request_id=deploy_status.id)))
+        else:
+          results.append(None)
+      # Install local domain parts in the meantime
+      for i, (domain, part, domain_mgr) in enumerate(deploys):
+        if results[i] is None:
+          results[i] = self._install_domain_part(domain=domain, part=part,
+                                                 domain_mgr=domain_mgr,
+                                                 request_id=deploy_status.id)
+      # Join the results in the original order
+      aborted = False
+      for (domain, part, domain_mgr), result in zip(deploys, results):
+        if isinstance(domain_mgr, AbstractRemoteDomainManager):
+          result = result.get()
+        if aborted:
+          # The part has been already sent, track its status for the rollback
+          if result is None:
+            deploy_status.set_domain_failed(domain=domain)
+          else:
+            log.debug("Domain: %s was deployed before the interruption! "
+                      "Track status for rollback..." % domain)
+            deploy_status.set_domain_ok(domain=domain)
+          continue
+        proceed = self.__process_domain_install_result(
+          mapped_nffg=mapped_nffg, domain=domain, part=part,
+          domain_mgr=domain_mgr, result=result, deploy_status=deploy_status)
+        if not proceed:
+          aborted = True
+    finally:
+      if pool is not None:
+        pool.close()
+        pool.join()
+
+  def __process_domain_install_result (self, mapped_nffg, domain, part,
+                                       domain_mgr, result, deploy_status,
+                                       delay=False):
+    """
+    Update the deploy status and the DoV based on the domain install result.
+
+    :param mapped_nffg: mapped NFFG
+    :type mapped_nffg: :class:`NFFG`
+    :param domain: domain name
+    :type domain: str
+    :param part: domain related part of the mapped NFFG
+    :type part: :class:`NFFG`
+    :param domain_mgr: domain manager
+    :type domain_mgr: :any:`AbstractDomainManager`
+    :param result: domain install result
+    :type result: bool or int or None
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :param delay: wait the configured deploy delay after an explicitly
+      updated domain (default: False)
+    :type delay: bool
+    :return: False if the deployment of remained parts need to be skipped
+    :rtype: bool
+    """
+    # Update the DoV based on the mapping result covering some corner case
+    if result is None:
+      log.error("Installation of %s in %s was unsuccessful!" % (part, domain))
+      log.debug("Update installed part with collective result: %s" %
+                NFFG.STATUS_FAIL)
+      deploy_status.set_domain_failed(domain=domain)
+      log.debug("Installation status: %s" % deploy_status)
+      if CONFIG.rollback_on_failure():
+        # Stop deploying remained nffg_parts and initiate delayed rollback
+        log.info("Rollback mode is enabled! Skip installation process...")
+        return False
+      # Update failed status info of mapped elements in NFFG part for DoV
+      # update
+      if self.DoVManager.status_updates:
+        NFFGToolBox.update_status_info(nffg=part, status=NFFG.STATUS_FAIL,
+                                       log=log)
+      else:
+        log.warning("Skip DoV update with domain: %s! Cause: "
+                    "Domain installation was unsuccessful!" % domain)
+        return True
+    if result == 0:
+      log.info("Installation of %s in %s was skipped!" % (part, domain))
+      self.__set_domain_deployed(domain=domain, domain_mgr=domain_mgr,
+                                 deploy_status=deploy_status)
+      return True
+    log.info("Installation of %s in %s was successful!" % (part, domain))
+    if self.DoVManager.status_updates:
+      log.debug("Update installed part with collective result: %s" %
+                NFFG.STATUS_DEPLOY)
+      # Update successful status info of mapped elements in NFFG part for
+      # DoV update
+      NFFGToolBox.update_status_info(nffg=part, status=NFFG.STATUS_DEPLOY,
+                                     log=log)
+    # If the domain manager does not poll the domain update here
+    # else polling takes care of domain updating
+    if isinstance(domain_mgr,
+                  AbstractRemoteDomainManager) and domain_mgr.polling:
+      log.info("Skip explicit DoV update for domain: %s. "
+               "Cause: polling enabled!" % domain)
+      if isinstance(domain_mgr,
+                    UnifyDomainManager) and domain_mgr.callback_manager:
+        log.debug("Callback is enabled for domain: %s!" % domain)
+      else:
+        log.debug("Consider deploy into a polled domain OK...")
+        deploy_status.set_domain_ok(domain=domain)
+        log.debug("Installation status: %s" % deploy_status)
+        return True
+
+    if isinstance(domain_mgr,
+                  UnifyDomainManager) and domain_mgr.callback_manager:
+      log.info("Skip explicit DoV update for domain: %s. "
+               "Cause: callback registered!" % domain)
+      deploy_status.set_domain_waiting(domain=domain)
+      log.debug("Installation status: %s" % deploy_status)
+      return True
+
+    if domain_mgr.IS_INTERNAL_MANAGER:
+      self.__perform_internal_mgr_update(mapped_nffg=mapped_nffg,
+                                         domain=domain)
+      if domain_mgr.is_deploy_pending(request_id=deploy_status.id):
+        self.__set_domain_deployed(domain=domain, domain_mgr=domain_mgr,
+                                   deploy_status=deploy_status)
+      # In case of Local manager skip the rest of the update
+      return True
+
+    if CONFIG.one_step_update():
+      log.debug("One-step-update is enabled. Skip explicit domain update!")
+    else:
+      # Explicit domain update
+      self.DoVManager.update_domain(domain=domain, nffg=part)
+    self.__set_domain_deployed(domain=domain, domain_mgr=domain_mgr,
+                               deploy_status=deploy_status)
+    if delay and CONFIG.domain_deploy_delay():
+      log.warning("Delay next deploy with %ss" % CONFIG.domain_deploy_delay())
+      time.sleep(CONFIG.domain_deploy_delay())
+    return True
+
+  def __subscribe_deploy_callbacks (self, deploy_status):
+    """
+    Register for the completion of every callback of the pending request.
+
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: any callback of the request is pending or not
+    :rtype: bool
+    """
+    for domain in deploy_status.domains:
+      domain_mgr = self.domains.get_component_by_domain(domain_name=domain)
+      if isinstance(domain_mgr,
+                    UnifyDomainManager) and domain_mgr.callback_manager:
+        # The CallbackManager is shared by the domains
+        group = domain_mgr.callback_manager.subscribe_request(
+          req_id=deploy_status.id, hook=self._deploy_callbacks_done)
+        return group is not None
+    return False
+
+  @schedule_as_coop_task
+  def _deploy_callbacks_done (self, group):
+    """
+    Finish the request if every callback of the request is done but some
+    domains are still waiting for a callback result, e.g. the callback was
+    dropped without updating the deploy status.
+
+    Scheduled after the hooks of the single callbacks so the domains have
+    already been updated by their callbacks.
+
+    :param group: callbacks of the request
+    :type group: :class:`CallbackGroup`
+    :return: None
+    """
+    deploy_status = self.status_mgr.get_status(id=group.request_id)
+    if deploy_status is None or not deploy_status.still_pending:
+      return
+    # Wait for the callbacks registered in the meantime, e.g. by a rollback
+    if self.__subscribe_deploy_callbacks(deploy_status=deploy_status):
+      return
+    for domain in deploy_status.domains:
+      if deploy_status.get_domain_status(domain) != deploy_status.WAITING:
+        continue
+      domain_mgr = self.domains.get_component_by_domain(domain_name=domain)
+      if isinstance(domain_mgr,
+                    UnifyDomainManager) and domain_mgr.callback_manager:
+        log.error("Callback result of domain: %s is lost for request: %s!" %
+                  (domain, group.request_id))
+        deploy_status.set_domain_failed(domain=domain)
+    log.debug("Installation status: %s" % deploy_status)
+    self.__finish_pending_deploy(deploy_status=deploy_status)
+
+  @staticmethod
+  def __set_domain_deployed (domain, domain_mgr, deploy_status):
+    """
+    Set the status of the installed domain OK or WAITING if the flowrules of
+    the domain are still waiting for the confirmation of the switches.
+
+    :param domain: domain name
+    :type domain: str
+    :param domain_mgr: domain manager
+    :type domain_mgr: :any:`AbstractDomainManager`
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: None
+    """
+    if domain_mgr.is_deploy_pending(request_id=deploy_status.id):
+      log.debug("Flowrules of domain: %s are waiting for confirmation!" %
+                domain)
+      deploy_status.set_domain_waiting(domain=domain)
+    else:
+      deploy_status.set_domain_ok(domain=domain)
+    log.debug("Installation status: %s" % deploy_status)
+
   def collate_deploy_request (self, request):
     """
     Collate request BiSBiS node IDs to the existent nodes in DoV and correct
@@ -989,7 +1255,8 @@ class ControllerAdapter(object):
       if isinstance(event.data, NFFG):
         log.log(VERBOSE, "Changed topology:\n%s" % event.data.dump())
       self.DoVManager.update_domain(domain=event.domain,
-                                    nffg=event.data)
+                                    nffg=event.data,
+                                    polled=True)
       # Handle install status in case the DomainManager is polling the domain
       if isinstance(event.source,
                     AbstractRemoteDomainManager) and not event.source.polling:
@@ -1066,6 +1333,47 @@ class ControllerAdapter(object):
           self.DoVManager.update_domain(domain=event.domain,
                                         nffg=event.callback.data)
     log.debug("Installation status: %s" % deploy_status)
+    self.__finish_pending_deploy(deploy_status=deploy_status)
+
+  def _handle_FlowrulesConfirmedEvent (self, event):
+    """
+    Handle event raised by the confirmation of the flowrules installed into
+    the switches of a domain.
+
+    :param event: raised event
+    :type event: :class:`FlowrulesConfirmedEvent`
+    :return: None
+    """
+    log.debug("Received %s event from domain: %s..." %
+              (event.__class__.__name__, event.domain))
+    deploy_status = self.status_mgr.get_status(id=event.request_id)
+    if deploy_status is None:
+      return
+    if deploy_status.get_domain_status(event.domain) != deploy_status.WAITING:
+      log.debug("Domain: %s is not waiting for flowrule confirmation! "
+                "Skip status update..." % event.domain)
+      return
+    if event.result:
+      log.debug("Update success status for service request: %s..." %
+                event.request_id)
+      deploy_status.set_domain_ok(domain=event.domain)
+    else:
+      log.error("Flowrule installation into domain: %s has failed!" %
+                event.domain)
+      deploy_status.set_domain_failed(domain=event.domain)
+    log.debug("Installation status: %s" % deploy_status)
+    self.__finish_pending_deploy(deploy_status=deploy_status)
+
+  def __finish_pending_deploy (self, deploy_status):
+    """
+    Finish the installation of the given request if no domain result is
+    pending anymore.
+
+    :param deploy_status: deploy status object
+    :type deploy_status: :class:`DomainRequestStatus`
+    :return: None
+    """
+    request_id = deploy_status.id
     if not deploy_status.still_pending:
       if deploy_status.success:
         log.info("All installation process has been finished for request: %s! "
@@ -1765,10 +2073,13 @@ class DomainRequestStatus(object):
     """
     if domain not in self.__statuses:
       raise RuntimeError("Updated domain: %s is not registered!" % domain)
-    self.__statuses[domain] = status
-    if status in (self.OK, self.FAILED, self.RESET):
+    # Deploy of a waiting domain is finished by the callback
+    if self.__statuses[domain] == self.WAITING and \
+       status in (self.OK, self.FAILED):
       stats.add_measurement_end_entry(type=stats.TYPE_DEPLOY_DOMAIN,
-                                      info="%s-->%s" % (domain, status))
+                                      info="%s-->%s" % (domain, status),
+                                      request_id=self.__id)
+    self.__statuses[domain] = status
     return self
 
   def set_domain_ok (self, domain):
@@ -1923,6 +2234,9 @@ class GlobalResourceManager(object):
     self.__tracked_domains = set()  # Cache for detected and stored domains
     self.status_updates = CONFIG.use_status_based_update()
     self.remerge_strategy = CONFIG.use_remerge_update_strategy()
+    self.delta_strategy = CONFIG.use_delta_update_strategy()
+    # Last merged topology of the domains as the base of delta calculation
+    self.__domain_views = {}
     self.__backup = None
 
   @property
@@ -1975,6 +2289,7 @@ class GlobalResourceManager(object):
     """
     log.debug("Update the whole Global view (DoV) with the NFFG: %s..." % nffg)
     self.__dov.update_full_global_view(nffg=nffg)
+    self.__domain_views.clear()
     self.__tracked_domains.clear()
     self.__tracked_domains.update(NFFGToolBox.detect_domains(nffg))
     notify_remote_visualizer(data=self.__dov.get_resource_info(),
@@ -2050,6 +2365,7 @@ class GlobalResourceManager(object):
         self.__dov.set_domain_as_global_view(domain=domain, nffg=nffg)
       # Add detected domain to cached domains
       self.__tracked_domains.add(domain)
+      self.__domain_views[domain] = nffg
       notify_remote_visualizer(data=self.__dov.get_resource_info(),
                                unique_id="DOV",
                                params={"event": "datastore"})
@@ -2057,7 +2373,7 @@ class GlobalResourceManager(object):
       log.error("New domain: %s has already tracked in domains: %s! "
                 "Abort adding..." % (domain, self.__tracked_domains))
 
-  def update_domain (self, domain, nffg):
+  def update_domain (self, domain, nffg, polled=False):
     """
     Update the detected domain in the global view with the given info.
 
@@ -2065,13 +2381,23 @@ class GlobalResourceManager(object):
     :type domain: str
     :param nffg: changed infrastructure info
     :type nffg: :class:`NFFG`
+    :param polled: the info is the topology polled from the domain
+    :type polled: bool
     :return: None
     """
     if domain in self.__tracked_domains:
       log.info("Update domain: %s in DoV..." % domain)
+      delta = self.__calculate_domain_delta(domain=domain, nffg=nffg,
+                                            polled=polled)
       if self.status_updates:
         log.debug("Update status info for domain: %s in DoV..." % domain)
         self.__dov.update_domain_status_in_dov(domain=domain, nffg=nffg)
+      elif delta is not None:
+        log.debug("Using DELTA strategy for DoV update...")
+        if delta.is_empty():
+          log.debug("No difference has been detected! Skip DoV update...")
+          return
+        self.__dov.apply_delta_in_dov(delta=delta)
       elif self.remerge_strategy:
         log.debug("Using REMERGE strategy for DoV update...")
         self.__dov.remerge_domain_in_dov(domain=domain, nffg=nffg)
@@ -2086,6 +2412,37 @@ class GlobalResourceManager(object):
         "Detected domain: %s is not included in tracked domains: %s! Abort "
         "updating..." % (domain, self.__tracked_domains))
 
+  def __calculate_domain_delta (self, domain, nffg, polled):
+    """
+    Calculate the difference of the given and the last merged topology of the
+    domain if the DELTA strategy is enabled and cache the given topology.
+
+    Only the topologies polled from the domain are cached as the base of the
+    next delta. Other updates (e.g. deployed parts or rollback states) drop
+    the cached topology as it does not reflect the DoV anymore.
+
+    :param domain: domain name
+    :type domain: str
+    :param nffg: changed infrastructure info
+    :type nffg: :class:`NFFG`
+    :param polled: the info is the topology polled from the domain
+    :type polled: bool
+    :return: calculated delta or None if it cannot be applied incrementally
+    :rtype: :class:`DoVDelta`
+    """
+    if self.status_updates or not polled:
+      self.__domain_views.pop(domain, None)
+      return None
+    previous = self.__domain_views.get(domain)
+    self.__domain_views[domain] = nffg
+    if not self.delta_strategy or previous is None:
+      return None
+    delta = DoVDelta.calculate(domain=domain, base=previous, updated=nffg)
+    if delta is None:
+      log.debug("Structural change has been detected in domain: %s! "
+                "Fall back to full DoV update..." % domain)
+    return delta
+
   def remove_domain (self, domain):
     """
     Remove the detected domain from the global view.
@@ -2098,6 +2455,7 @@ class GlobalResourceManager(object):
       log.info("Remove domain: %s from DoV..." % domain)
       self.__dov.remove_domain_from_dov(domain=domain)
       self.__tracked_domains.remove(domain)
+      self.__domain_views.pop(domain, None)
       notify_remote_visualizer(data=self.__dov.get_resource_info(),
                                unique_id="DOV",
                                params={"event": "datastore"})
@@ -15,9 +15,12 @@
 Contains Adapter classes which contains protocol and technology specific
 details for the connections between ESCAPEv2 and other different domains.
 """
+import hashlib
+import httplib
 import json
 import os
 import pprint
+import time
 
 from escape import __version__
 from escape.nffg_lib.nffg import NFFGToolBox
@@ -26,6 +29,7 @@ from escape.util.config import CONFIG, PROJECT_ROOT
 from escape.util.conversion import NFFGConverter, UC3MNFFGConverter
 from escape.util.domain import *
 from escape.util.misc import unicode_to_str
+from escape.util.stat import stats
 from escape.util.virtualizer_helper import is_identical, is_empty
 from pox.lib.util import dpid_to_str
 from virtualizer import Virtualizer
@@ -644,6 +648,17 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
     self.__last_virtualizer = None
     self.__last_request = None
     self.__original_virtualizer = None
+    # Cache for change detection of 'get-config' responses
+    self.__last_digest = None
+    self.__last_etag = None
+    self.__last_topology = None
+    self.__structure_digest = None
+    self.__node_digests = {}
+    # Version and validation time of the cached domain state
+    self.__state_version = 0
+    self.__state_timestamp = None
+    self.__state_hits = 0
+    self.__state_misses = 0
 
   @property
   def last_virtualizer (self):
@@ -653,6 +668,71 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
     """
     return self.__last_virtualizer
 
+  @property
+  def state_version (self):
+    """
+    :return: Return the version of the cached domain state.
+    :rtype: int
+    """
+    return self.__state_version
+
+  def get_cached_config (self, max_age=None, request_id=None):
+    """
+    Return the cached domain state if it was received or validated by the
+    polling or a previous 'get-config' in the last ``max_age`` seconds, else
+    request the most recent topology with a 'get-config' call.
+
+    :param max_age: freshness bound of the cached state in sec (default: from
+      CONFIG, 0 disables the cache)
+    :type max_age: float
+    :param request_id: id of the related service request for the statistic
+    :type request_id: str or int
+    :return: infrastructure view in the original format (a copy of the
+      cached state if it is still fresh)
+    :rtype: :class:`Virtualizer`
+    """
+    if max_age is None:
+      max_age = CONFIG.domain_state_max_age()
+    if max_age > 0 and self.__last_virtualizer is not None and \
+       self.__state_timestamp is not None:
+      age = time.time() - self.__state_timestamp
+      if age <= max_age:
+        self.__state_hits += 1
+        stats.add_measurement_value_entry(
+          type=stats.TYPE_DEPLOY_DOMAIN_STATE_CACHE, value=1,
+          info=self.domain_name, request_id=request_id)
+        log.debug("Use cached state(version: %s, age: %.3fs) of domain: %s" %
+                  (self.__state_version, age, self.domain_name))
+        # The cached state is also the base of diff calculation
+        return self.__last_virtualizer.full_copy()
+      log.debug("Cached state(version: %s, age: %.3fs) of domain: %s is "
+                "stale!" % (self.__state_version, age, self.domain_name))
+    self.__state_misses += 1
+    stats.add_measurement_value_entry(
+      type=stats.TYPE_DEPLOY_DOMAIN_STATE_CACHE, value=0,
+      info=self.domain_name, request_id=request_id)
+    return self.get_config()
+
+  def invalidate_state (self):
+    """
+    Mark the cached domain state as invalid to force a 'get-config' at the
+    next :meth:`get_cached_config` call.
+
+    The cached Virtualizer is kept as the base of diff calculation.
+
+    :return: None
+    """
+    self.__state_timestamp = None
+
+  def get_state_cache_stats (self):
+    """
+    :return: Return the usage statistics of the cached domain state.
+    :rtype: dict
+    """
+    return {'version': self.__state_version,
+            'hits': self.__state_hits,
+            'misses': self.__state_misses}
+
   @property
   def last_request (self):
     """
@@ -707,6 +787,11 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
       log.log(VERBOSE,
               "Received message to 'get-config' request:\n%s" % virt.xml())
       self.__cache_topology(virt)
+      self.__cache_response_digest()
+      # The base of the change detection is the last received topology
+      self.__cache_topology_digests(*self.__calculate_topology_digests(virt))
+      # Cached NFFG is not in sync anymore --> next change is fully converted
+      self.__last_topology = None
       return virt
     else:
       log.error("No data has been received from remote agent at %s!" %
@@ -786,10 +871,13 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
       log.warning(
         "Reached timeout(%ss) while waiting for 'edit-config' response!"
         " Ignore exception..." % self.CONNECTION_TIMEOUT)
+      self.invalidate_state()
       # Ignore exception - assume the request was successful -> return True
       return True
     if response is not None:
       log.debug("Deploy request has been sent successfully!")
+      # The domain state is changing -> the cached state is outdated
+      self.invalidate_state()
     return response
 
   def get_last_message_id (self):
@@ -878,6 +966,8 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
     # Convert from XML-based Virtualizer to NFFG
     nffg = self.converter.parse_from_Virtualizer(vdata=virt)
     self.__process_features(nffg=nffg)
+    # Store a separate copy as the base of the incremental conversion
+    self.__last_topology = nffg.copy()
     log.log(VERBOSE, "Converted NFFG of 'get-config' response:\n%s" %
             nffg.dump())
     # If first get-config
@@ -909,14 +999,30 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
     changes, ``None`` if domain was unreachable and the converted topology if
     the domain changed.
 
-    Detection of changes is based on the ``reduce()`` function of the
-    ``Virtualizer``.
+    Detection of changes is done in increasing order of cost:
+
+      * the remote agent answers ``304 Not Modified`` for the ETag of the
+        cached response,
+      * the digest of the raw response body is the same as the cached one,
+      * the digests of the Virtualizer nodes, links and metadata are the same
+        as the cached ones.
+
+    If only some nodes have changed, only these nodes are reconverted into
+    the cached topology.
 
     :return: the received topology is different from cached one
     :rtype: bool or None or :class:`NFFG`
     """
+    headers = {}
+    if self.__last_etag is not None:
+      headers['If-None-Match'] = self.__last_etag
     # Get full topology as a Virtualizer
-    data = self.send_no_error(self.POST, 'get-config')
+    data = self.send_no_error(self.POST, 'get-config', headers=headers)
+    if data is not None and \
+       self.get_last_response_status() == httplib.NOT_MODIFIED:
+      log.log(VERBOSE, "Received 'Not Modified' for get-config!")
+      self.__validate_state()
+      return False
     # Got data
     if data:
       # Check the content type or try to recognize the standard XML opening tag
@@ -924,6 +1030,12 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
          not data.startswith("<?xml version="):
         log.error("Received data is not in XML format!")
         return None
+      if self.last_virtualizer is not None and \
+         self.__get_response_digest() == self.__last_digest:
+        log.log(VERBOSE, "Received get-config is identical to the cached one!")
+        self.__cache_response_digest()
+        self.__validate_state()
+        return False
       virt = Virtualizer.parse_from_text(text=data)
     else:
       # If no data is received, exception was raised or converted return with
@@ -935,21 +1047,100 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
       log.warning("Missing last received Virtualizer!")
       return None
     # Get the changes happened since the last get-config
-    if not self.__is_changed(virt):
-      return False
+    structure_digest, node_digests = self.__calculate_topology_digests(virt)
+    if self.__structure_digest is None:
+      # No digests of the cached topology are available --> full check
+      if not self.__is_changed(virt):
+        self.__cache_topology(virt)
+        self.__cache_response_digest()
+        self.__cache_topology_digests(structure_digest, node_digests)
+        return False
+      changed_nodes = None
+    elif structure_digest != self.__structure_digest or \
+       set(node_digests) != set(self.__node_digests):
+      # Links, metadata or the set of nodes have changed --> full conversion
+      changed_nodes = None
     else:
-      log.info("Received changed topology from domain: %s" % self.domain_name)
-      log.log(VERBOSE, "Changed domain topology from: %s:\n%s" % (
-        self.domain_name, virt.xml()))
-      MessageDumper().dump_to_file(data=virt.xml(),
-                                   unique="%s-get-config-changed" %
-                                          self.domain_name)
-      # Cache new topo
-      self.__cache_topology(virt)
-      # Return with the changed topo in NFFG
-      changed_topo = self.converter.parse_from_Virtualizer(vdata=virt)
-      self.__process_features(nffg=changed_topo)
-      return changed_topo
+      changed_nodes = [n for n, d in node_digests.iteritems()
+                       if self.__node_digests[n] != d]
+      if not changed_nodes:
+        # Only the formatting has changed
+        self.__cache_topology(virt)
+        self.__cache_response_digest()
+        return False
+    log.info("Received changed topology from domain: %s" % self.domain_name)
+    log.log(VERBOSE, "Changed domain topology from: %s:\n%s" % (
+      self.domain_name, data))
+    MessageDumper().dump_to_file(data=data,
+                                 unique="%s-get-config-changed" %
+                                        self.domain_name)
+    # Cache new topo
+    self.__cache_topology(virt)
+    self.__cache_response_digest()
+    self.__cache_topology_digests(structure_digest, node_digests)
+    # Return with the changed topo in NFFG
+    if changed_nodes is not None and self.__last_topology is not None:
+      log.debug("Update cached topology with changed nodes: %s" %
+                changed_nodes)
+      self.converter.update_NFFG_from_Virtualizer(nffg=self.__last_topology,
+                                                  virtualizer=virt,
+                                                  changed_nodes=changed_nodes)
+    else:
+      log.debug("Convert the whole changed topology...")
+      self.__last_topology = self.converter.parse_from_Virtualizer(vdata=virt)
+    self.__process_features(nffg=self.__last_topology)
+    # Return a copy to keep the cached topology untouched
+    return self.__last_topology.copy()
+
+  def __get_response_digest (self):
+    """
+    :return: Return the digest of the last received response body.
+    :rtype: str
+    """
+    if self._response is None:
+      return None
+    return hashlib.md5(self._response.content).hexdigest()
+
+  def __cache_response_digest (self):
+    """
+    Cache the digest and the ETag of the last received 'get-config' response.
+
+    :return: None
+    """
+    self.__last_digest = self.__get_response_digest()
+    self.__last_etag = self.get_last_response_headers().get('ETag')
+
+  @staticmethod
+  def __calculate_topology_digests (virtualizer):
+    """
+    Calculate the digest of the node independent parts and the digests of the
+    nodes of the given Virtualizer.
+
+    :param virtualizer: Virtualizer object
+    :type virtualizer: :class:`Virtualizer`
+    :return: structure digest and digests of the nodes
+    :rtype: tuple
+    """
+    structure = hashlib.md5()
+    structure.update(virtualizer.links.xml())
+    structure.update(virtualizer.metadata.xml())
+    nodes = {}
+    for vnode in virtualizer.nodes:
+      nodes[vnode.id.get_value()] = hashlib.md5(vnode.xml()).hexdigest()
+    return structure.hexdigest(), nodes
+
+  def __cache_topology_digests (self, structure, nodes):
+    """
+    Cache the Virtualizer digests used for the structural change detection.
+
+    :param structure: digest of the links and metadata
+    :type structure: str
+    :param nodes: digests of the nodes
+    :type nodes: dict
+    :return: None
+    """
+    self.__structure_digest = structure
+    self.__node_digests = nodes
 
   def __cache_topology (self, data):
     """
@@ -963,6 +1154,16 @@ class UnifyRESTAdapter(AbstractRESTAdapter, AbstractESCAPEAdapter,
     # self.__last_virtualizer = data.full_copy()
     # Copy reference instead of full_copy to avoid overhead
     self.__last_virtualizer = data
+    self.__state_version += 1
+    self.__validate_state()
+
+  def __validate_state (self):
+    """
+    Refresh the validation time of the cached domain state.
+
+    :return: None
+    """
+    self.__state_timestamp = time.time()
 
   def get_topo_cache (self):
     return self.__last_virtualizer
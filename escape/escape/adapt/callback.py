@@ -11,14 +11,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import bisect
 import threading
+import time
 import urlparse
 from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
 from threading import Thread, Timer
 
 from escape.adapt import log as log
 from escape.util.config import CONFIG
 from escape.util.misc import Singleton
+from escape.util.stat import stats
 
 log = log.getChild('callback')
 
@@ -184,6 +188,9 @@ class Callback(object):
     self.data = data
     self.result_code = None
     self.body = None
+    self.created = time.time()
+    self.received = None
+    self.__done = threading.Event()
 
   def setup_timer (self, timeout, hook, **kwargs):
     """
@@ -219,6 +226,51 @@ class Callback(object):
       self.__timer.cancel()
       self.__timer = None
 
+  def complete (self, result, body=None):
+    """
+    Store the received result and notify the waiting threads.
+
+    :param result: result code of the callback (0 in case of timeout)
+    :type result: int
+    :param body: callback body (optional)
+    :type body: str
+    :return: None
+    """
+    self.result_code = result
+    self.body = body
+    self.received = time.time()
+    self.__done.set()
+
+  @property
+  def done (self):
+    """
+    :return: the callback result has been received or the callback has expired
+    :rtype: bool
+    """
+    return self.__done.is_set()
+
+  @property
+  def latency (self):
+    """
+    :return: elapsed time between the registration and the arrival of the
+      callback or None if the result has not been received yet
+    :rtype: float
+    """
+    if self.received is not None:
+      return self.received - self.created
+
+  def wait (self, timeout=None):
+    """
+    Block-wait until the callback result is received or the callback expires.
+
+    :param timeout: max time to wait (default: None)
+    :type timeout: float
+    :return: the callback is done or not
+    :rtype: bool
+    """
+    self.__done.wait(timeout=timeout)
+    return self.__done.is_set()
+
   def get_timer_timeout (self):
     """
     Get the valid timeout value.
@@ -237,9 +289,78 @@ class Callback(object):
            % (self.callback_id, self.request_id, self.domain, self.result_code)
 
 
-class CallbackManager(HTTPServer, Thread):
+class CallbackGroup(object):
+  """
+  Collect the callbacks registered for the same service request to signal
+  when every callback of the request is received or expired.
+  """
+
+  def __init__ (self, request_id):
+    """
+    Init.
+
+    :param request_id: original service request ID
+    :type request_id: str or int
+    """
+    self.request_id = request_id
+    self.callbacks = []
+    self.hook = None
+    self.created = time.time()
+
+  def add (self, cb):
+    """
+    Add a registered callback to the group.
+
+    :param cb: callback object
+    :type cb: :class:`Callback`
+    :return: None
+    """
+    self.callbacks.append(cb)
+
+  def remove (self, cb):
+    """
+    Remove a withdrawn callback from the group.
+
+    :param cb: callback object
+    :type cb: :class:`Callback`
+    :return: None
+    """
+    if cb in self.callbacks:
+      self.callbacks.remove(cb)
+
+  @property
+  def done (self):
+    """
+    :return: every callback of the request is received or expired
+    :rtype: bool
+    """
+    return all(cb.done for cb in self.callbacks)
+
+  @property
+  def elapsed (self):
+    """
+    :return: elapsed time since the first registered callback of the request
+    :rtype: float
+    """
+    return time.time() - self.created
+
+  def short (self):
+    """
+    :return: short description
+    :rtype: str
+    """
+    return "CallbackGroup(request_id: %s, callbacks: %s)" % (
+      self.request_id, ", ".join(str(cb.callback_id) for cb in self.callbacks))
+
+
+class CallbackManager(ThreadingMixIn, HTTPServer, Thread):
   """
   Register and manage callback in a centralized way.
+
+  Received callbacks are processed in separate threads and every registered
+  :class:`Callback` can be waited for individually like a future object. The
+  callbacks of the same service request are collected in a
+  :class:`CallbackGroup` to signal the completion of the whole request.
   """
   # Singleton
   __metaclass__ = Singleton
@@ -248,6 +369,9 @@ class CallbackManager(HTTPServer, Thread):
   DEFAULT_POSTFIX = "callback"
   DEFAULT_PORT = 9000
   DEFAULT_WAIT_TIMEOUT = 10.0
+  LATENCY_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0)
+  """Upper bounds of the callback latency histogram buckets in sec"""
+  daemon_threads = True
 
   # noinspection PyUnusedLocal
   def __init__ (self, address=DEFAULT_SERVER_ADDRESS, port=DEFAULT_PORT,
@@ -268,9 +392,11 @@ class CallbackManager(HTTPServer, Thread):
                         bind_and_activate=False)
     self.wait_timeout = float(timeout)
     self.__register = {}
+    self.__register_lock = threading.RLock()
     self.__domain_proxy = {}
+    self.__latencies = {}
+    self.__requests = {}
     self.daemon = True
-    self.__blocking_mutex = threading.Event()
     log.debug("Init %s" % self.__class__.__name__)
 
   @classmethod
@@ -376,8 +502,42 @@ class CallbackManager(HTTPServer, Thread):
     :return: None
     """
     if self.isAlive():
+      for domain in sorted(self.__latencies):
+        log.debug("Callback latency histogram of domain: %s - %s" %
+                  (domain, self.get_latency_histogram(domain=domain)))
       super(CallbackManager, self).shutdown()
 
+  def __record_latency (self, cb):
+    """
+    Record the arrival latency of a received callback.
+
+    :param cb: received callback
+    :type cb: :class:`Callback`
+    :return: None
+    """
+    stats.add_measurement_value_entry(type=stats.TYPE_DEPLOY_CALLBACK,
+                                      value=cb.latency,
+                                      info=cb.domain,
+                                      request_id=cb.request_id)
+    with self.__register_lock:
+      hist = self.__latencies.setdefault(cb.domain,
+                                         [0] * (len(self.LATENCY_BUCKETS) + 1))
+      hist[bisect.bisect_left(self.LATENCY_BUCKETS, cb.latency)] += 1
+
+  def get_latency_histogram (self, domain):
+    """
+    Return the histogram of the callback arrival latencies of a domain.
+
+    :param domain: domain name
+    :type domain: str
+    :return: list of (upper bound, count) pairs, the last bound is None
+    :rtype: list
+    """
+    with self.__register_lock:
+      hist = self.__latencies.get(domain,
+                                  [0] * (len(self.LATENCY_BUCKETS) + 1))
+      return zip(self.LATENCY_BUCKETS + (None,), hist)
+
   def subscribe_callback (self, hook, cb_id, domain, type, req_id=None,
                           data=None, timeout=None):
     """
@@ -402,16 +562,21 @@ class CallbackManager(HTTPServer, Thread):
     """
     log.debug("Register callback for response: %s on domain: %s" %
               (cb_id, domain))
-    if cb_id not in self.__register:
+    with self.__register_lock:
+      if (domain, cb_id) in self.__register:
+        log.warning("Hook is already registered for id: %s on domain: %s"
+                    % (cb_id, domain))
+        return
       cb = Callback(hook=hook, callback_id=cb_id, type=type,
                     domain=domain, request_id=req_id, data=data)
-      _timeout = timeout if timeout is not None else self.wait_timeout
-      cb.setup_timer(_timeout, self.invoke_hook, msg_id=cb_id, result=0)
       self.__register[(domain, cb_id)] = cb
-      return cb
-    else:
-      log.warning("Hook is already registered for id: %s on domain: %s"
-                  % (cb_id, domain))
+      if req_id is not None:
+        if req_id not in self.__requests:
+          self.__requests[req_id] = CallbackGroup(request_id=req_id)
+        self.__requests[req_id].add(cb)
+    _timeout = timeout if timeout is not None else self.wait_timeout
+    cb.setup_timer(_timeout, self.invoke_hook, msg_id=cb_id, result=0)
+    return cb
 
   def unsubscribe_callback (self, cb_id, domain):
     """
@@ -426,11 +591,60 @@ class CallbackManager(HTTPServer, Thread):
     """
     log.debug("Unregister callback for response: %s from domain: %s"
               % (cb_id, domain))
-    cb = self.__register.pop((domain, cb_id), None)
+    with self.__register_lock:
+      cb = self.__register.pop((domain, cb_id), None)
+      if cb and not cb.done and cb.request_id in self.__requests:
+        # The callback is withdrawn, do not wait for it in the group
+        self.__requests[cb.request_id].remove(cb)
     if cb:
       cb.stop_timer()
+      self.__check_request(request_id=cb.request_id)
     return cb
 
+  def subscribe_request (self, req_id, hook):
+    """
+    Register a hook which is called with the :class:`CallbackGroup` of the
+    given request when every callback of the request is received or expired.
+
+    The hook is called from the thread of the last callback, or immediately
+    if every callback of the request is already done.
+
+    :param req_id: original request ID
+    :type req_id: str or int
+    :param hook: hook function
+    :type hook: callable
+    :return: callback group of the request or None if no callback is pending
+    :rtype: :class:`CallbackGroup`
+    """
+    with self.__register_lock:
+      group = self.__requests.get(req_id)
+      if group is None:
+        log.debug("No pending callback for request: %s" % req_id)
+        return
+      group.hook = hook
+    log.debug("Waiting for the callbacks of request: %s" % req_id)
+    self.__check_request(request_id=req_id)
+    return group
+
+  def __check_request (self, request_id):
+    """
+    Invoke the hook of the given request if every callback of the request
+    is received or expired.
+
+    :param request_id: original request ID
+    :type request_id: str or int
+    :return: None
+    """
+    with self.__register_lock:
+      group = self.__requests.get(request_id)
+      if group is None or not group.done:
+        return
+      del self.__requests[request_id]
+    log.debug("Every callback of request: %s is done in %.3fs" %
+              (request_id, group.elapsed))
+    if group.hook is not None:
+      group.hook(group=group)
+
   def invoke_hook (self, msg_id, domain, result, body=None):
     """
     Main entry point to invoke a callback based on the extracted data from
@@ -452,28 +666,32 @@ class CallbackManager(HTTPServer, Thread):
       log.error("Received response code is not valid: %s! Abort callback..."
                 % result)
       return
-    if (domain, msg_id) not in self.__register:
-      log.warning("Received unregistered callback with id: %s from domain: %s"
-                  % (msg_id, domain))
-      return
+    with self.__register_lock:
+      cb = self.__register.get((domain, msg_id))
+      if cb is None:
+        log.warning("Received unregistered callback with id: %s from "
+                    "domain: %s" % (msg_id, domain))
+        return
+      if cb.done:
+        log.warning("Callback with id: %s from domain: %s has already been "
+                    "processed!" % (msg_id, domain))
+        return
+      cb.complete(result=result, body=body)
     log.debug("Received valid callback with id: %s, result: %s from domain: %s"
               % (msg_id, "TIMEOUT" if not result else result, domain))
-    cb = self.__register.get((domain, msg_id))
-    if cb is None:
-      log.error("Missing callback: %s from register!" % msg_id)
-      return
-    cb.result_code = result
-    cb.body = body
+    if result:
+      cb.stop_timer()
+      self.__record_latency(cb=cb)
     if cb.hook is None:
       log.debug("No hook was defined!")
-      self.__blocking_mutex.set()
-      return
     elif callable(cb.hook):
       log.debug("Schedule callback hook: %s" % cb.short())
       cb.hook(callback=cb)
     else:
       log.warning("No callable hook was defined for the received callback: %s!"
                   % msg_id)
+    # Hook of the request is invoked after the hook of its last callback
+    self.__check_request(request_id=cb.request_id)
 
   def register_and_block_wait (self, cb_id, type, req_id=None, data=None,
                                timeout=None):
@@ -496,10 +714,11 @@ class CallbackManager(HTTPServer, Thread):
     cb = self.subscribe_callback(hook=None, cb_id=cb_id, type=type,
                                  req_id=req_id, domain=None,
                                  data=data, timeout=timeout)
+    if cb is None:
+      return
     _timeout = timeout if timeout is not None else self.wait_timeout + 1
     log.debug("Waiting for callback result...")
-    self.__blocking_mutex.wait(timeout=_timeout)
-    self.__blocking_mutex.clear()
+    cb.wait(timeout=_timeout)
     return self.unsubscribe_callback(cb_id=cb.callback_id, domain=None)
 
   def wait_for_callback (self, cb):
@@ -513,7 +732,6 @@ class CallbackManager(HTTPServer, Thread):
     """
     _timeout = cb.get_timer_timeout() + 1.0
     log.debug("Waiting for callback result...")
-    self.__blocking_mutex.wait(timeout=_timeout)
-    self.__blocking_mutex.clear()
+    cb.wait(timeout=_timeout)
     return self.unsubscribe_callback(cb_id=cb.callback_id,
                                      domain=cb.domain)
@@ -215,7 +215,8 @@ class ControllerAdaptationAPI(AbstractAPI):
       else:
         log.getChild('API').debug("No request info detected.")
     stats.add_measurement_start_entry(type=stats.TYPE_DEPLOY,
-                                      info=LAYER_NAME)
+                                      info=LAYER_NAME,
+                                      request_id=mapped_nffg.id)
     try:
       deploy_status = self.controller_adapter.install_nffg(
         mapped_nffg=mapped_nffg,
@@ -342,6 +343,8 @@ class ControllerAdaptationAPI(AbstractAPI):
         log.getChild('[DOV-API]').debug("DoV has not initialized yet! "
                                         "Force to get default topology...")
       else:
+        # The revision of a changed view is updated by the acquisition
+        self.dov_api_view.get_resource_info()
         # Check if the resource is changed
         if self.dov_api.topology_revision == self.dov_api_view.revision:
           # If resource has not been changed return False
@@ -340,6 +340,7 @@ class SDNDomainManager(AbstractDomainManager):
       self.log.warning("Missing topology description from %s domain! "
                        "Skip deploying flowrules..." % self.domain_name)
       return False
+    batches = []
     # Iter through the container INFRAs in the given mapped NFFG part
     for infra in nffg_part.infras:
       if infra.infra_type not in (
@@ -370,6 +371,7 @@ class SDNDomainManager(AbstractDomainManager):
           "DPID: %s is not found!" % (infra, dpid_to_str(dpid)))
         result = False
         continue
+      rules = []
       for port in infra.ports:
         for flowrule in port.flowrules:
           try:
@@ -386,8 +388,14 @@ class SDNDomainManager(AbstractDomainManager):
             result = False
             continue
           self.log.debug("Assemble OpenFlow flowrule from: %s" % flowrule)
-          self.controlAdapter.install_flowrule(infra.id, match=match,
-                                               action=action)
+          rules.append((match, action))
+      if rules:
+        batches.append((infra.id, rules))
+    # Send the flowrules of each Infra in one batch, the confirmation of the
+    # switches is signalled asynchronously
+    if not self._install_flowrule_batches(request_id=nffg_part.id,
+                                          rules=batches):
+      result = False
     self.log.info("Flowrule deploy result: %s" %
                   ("SUCCESS" if result else "FAILURE"))
     return result
@@ -525,6 +533,8 @@ class UnifyDomainManager(AbstractRemoteDomainManager):
 
     :return: None
     """
+    log.debug("Domain state cache stats of domain: %s - %s" % (
+      self.domain_name, self.topoAdapter.get_state_cache_stats()))
     super(UnifyDomainManager, self).finit()
     self.topoAdapter.finit()
     if self.callback_manager:
@@ -627,7 +637,7 @@ class UnifyDomainManager(AbstractRemoteDomainManager):
     self.log.info(">>> Install %s domain part..." % self.domain_name)
     try:
       log.debug("Request and store the most recent domain topology....")
-      topo = self.topoAdapter.get_config()
+      topo = self.topoAdapter.get_cached_config(request_id=nffg_part.id)
       if topo:
         self.__last_success_state = topo
         log.log(VERBOSE,
@@ -671,7 +681,7 @@ class UnifyDomainManager(AbstractRemoteDomainManager):
     self.enable_reset_mode()
     try:
       log.debug("Request for the most recent domain topology....")
-      self.topoAdapter.get_config()
+      self.topoAdapter.get_cached_config(request_id=request_id)
       reset_state = self.__last_success_state
       log.log(VERBOSE,
               "Full RESET topology:\n%s" % reset_state)
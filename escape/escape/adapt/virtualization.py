@@ -14,6 +14,7 @@
 """
 Contains components relevant to virtualization of resources and views.
 """
+import hashlib
 import threading
 import weakref
 
@@ -40,17 +41,23 @@ class DoVChangedEvent(Event):
   # Constants for type of changes
   TYPE = enum("UPDATE", "EXTEND", "CHANGE", "REDUCE", "EMPTY")
   """Constants for type of changes"""
+  # The DomainVirtualizer raises the same instance for every change
+  reusable = True
+  """The same event object can be raised again"""
 
-  def __init__ (self, cause):
+  def __init__ (self, cause, delta=None):
     """
     Init.
 
     :param cause: cause of the change
     :type cause: str
+    :param delta: applied difference in case of incremental update (optional)
+    :type delta: :class:`DoVDelta`
     :return: None
     """
     super(DoVChangedEvent, self).__init__()
     self.cause = cause
+    self.delta = delta
 
 
 class MissingGlobalViewEvent(Event):
@@ -60,6 +67,190 @@ class MissingGlobalViewEvent(Event):
   pass
 
 
+class DoVDelta(object):
+  """
+  Container class for the difference of two topologies of the same domain.
+
+  Contains only the changes which can be applied incrementally: added, removed
+  and modified NFs, modified Infra nodes (ports, flowrules, resources),
+  added and removed dynamic links and modified static links.
+  """
+
+  def __init__ (self, domain):
+    """
+    Init.
+
+    :param domain: domain name
+    :type domain: str
+    :return: None
+    """
+    self.domain = domain
+    self.added_nfs = []
+    self.removed_nfs = []
+    self.modified_nfs = []
+    self.modified_infras = []
+    self.added_links = []
+    self.removed_links = []
+    self.modified_links = []
+
+  def __str__ (self):
+    """
+    Return with specific string representation.
+
+    :return: string representation
+    :rtype: str
+    """
+    return "%s(domain: %s, NFs: +%s/-%s/~%s, infras: ~%s, " \
+           "links: +%s/-%s/~%s)" % (
+             self.__class__.__name__, self.domain,
+             [n.id for n in self.added_nfs], self.removed_nfs,
+             [n.id for n in self.modified_nfs],
+             [i.id for i in self.modified_infras],
+             [l.id for l in self.added_links],
+             [k for u, v, k in self.removed_links],
+             [l.id for l in self.modified_links])
+
+  def is_empty (self):
+    """
+    :return: Return True if the delta contains no change.
+    :rtype: bool
+    """
+    return not (self.added_nfs or self.removed_nfs or self.modified_nfs or
+                self.modified_infras or self.added_links or
+                self.removed_links or self.modified_links)
+
+  @classmethod
+  def calculate (cls, domain, base, updated):
+    """
+    Calculate the difference of the given topologies of a domain.
+
+    :param domain: domain name
+    :type domain: str
+    :param base: previous topology of the domain
+    :type base: :class:`NFFG`
+    :param updated: changed topology of the domain
+    :type updated: :class:`NFFG`
+    :return: calculated delta or None if the structure of the domain changed
+    :rtype: :class:`DoVDelta`
+    """
+    delta = cls(domain=domain)
+    # Infras and SAPs define the structure of the domain
+    for nodes in (lambda n: n.infras, lambda n: n.saps):
+      base_nodes = {node.id: node for node in nodes(base)}
+      updated_nodes = {node.id: node for node in nodes(updated)}
+      if set(base_nodes) != set(updated_nodes):
+        log.debug("Detected added/removed node in domain: %s" % domain)
+        return None
+      for id, node in updated_nodes.iteritems():
+        if node.persist() == base_nodes[id].persist():
+          continue
+        if node.type != NFFG.TYPE_INFRA:
+          log.debug("Detected modified SAP: %s in domain: %s" % (id, domain))
+          return None
+        delta.modified_infras.append(node)
+    base_nfs = {nf.id: nf for nf in base.nfs}
+    for nf in updated.nfs:
+      if nf.id not in base_nfs:
+        delta.added_nfs.append(nf)
+      elif nf.persist() != base_nfs.pop(nf.id).persist():
+        delta.modified_nfs.append(nf)
+    delta.removed_nfs.extend(base_nfs.iterkeys())
+    base_links = {(u, v, k): l for u, v, k, l in
+                  base.network.edges_iter(keys=True, data=True)}
+    for u, v, k, link in updated.network.edges_iter(keys=True, data=True):
+      base_link = base_links.pop((u, v, k), None)
+      if base_link is None:
+        if link.type != NFFG.TYPE_LINK_DYNAMIC:
+          log.debug("Detected added %s link: %s in domain: %s" %
+                    (link.type, k, domain))
+          return None
+        delta.added_links.append(link)
+      elif link.persist() != base_link.persist():
+        if link.type == NFFG.TYPE_LINK_STATIC:
+          delta.modified_links.append(link)
+        elif link.type == NFFG.TYPE_LINK_DYNAMIC:
+          # Replace changed dynamic link
+          delta.removed_links.append((u, v, k))
+          delta.added_links.append(link)
+        else:
+          log.debug("Detected modified %s link: %s in domain: %s" %
+                    (link.type, k, domain))
+          return None
+    for (u, v, k), link in base_links.iteritems():
+      if link.type != NFFG.TYPE_LINK_DYNAMIC:
+        log.debug("Detected removed %s link: %s in domain: %s" %
+                  (link.type, k, domain))
+        return None
+      delta.removed_links.append((u, v, k))
+    return delta
+
+  @staticmethod
+  def __replace_node (nffg, node):
+    """
+    Replace the node with the same id in the given NFFG with the copy of the
+    given node and rebind the connected edges to the new ports.
+
+    :param nffg: NFFG object updated in place
+    :type nffg: :class:`NFFG`
+    :param node: new node
+    :type node: :any:`Node`
+    :return: None
+    """
+    edges = [e for e in nffg.network.in_edges_iter(node.id, keys=True,
+                                                   data=True)]
+    edges.extend(nffg.network.out_edges_iter(node.id, keys=True, data=True))
+    nffg.del_node(node.id)
+    nffg.add_node(node.copy())
+    for u, v, k, link in edges:
+      try:
+        link.src = nffg[u].ports[link.src.id]
+        link.dst = nffg[v].ports[link.dst.id]
+      except KeyError:
+        log.debug("Port of link: %s is removed! Skip rebinding..." % k)
+        continue
+      if not nffg.network.has_edge(u, v, key=k):
+        nffg.add_edge(u, v, link)
+
+  def apply (self, nffg):
+    """
+    Apply the changes stored in the delta in place to the given NFFG.
+
+    :param nffg: NFFG object e.g. the DoV
+    :type nffg: :class:`NFFG`
+    :return: updated NFFG
+    :rtype: :class:`NFFG`
+    """
+    for nf_id in self.removed_nfs:
+      if nf_id in nffg:
+        nffg.del_node(nf_id)
+    for u, v, k in self.removed_links:
+      if nffg.network.has_edge(u, v, key=k):
+        nffg.network.remove_edge(u, v, key=k)
+    for node in self.modified_infras:
+      self.__replace_node(nffg=nffg, node=node)
+    for nf in self.added_nfs + self.modified_nfs:
+      if nf.id in nffg:
+        self.__replace_node(nffg=nffg, node=nf)
+      else:
+        nffg.add_node(nf.copy())
+    for link in self.added_links:
+      u, v = link.src.node.id, link.dst.node.id
+      if nffg.network.has_edge(u, v, key=link.id):
+        continue
+      nffg.add_link(src_port=nffg[u].ports[link.src.id],
+                    dst_port=nffg[v].ports[link.dst.id],
+                    id=link.id, dynamic=True, delay=link.delay,
+                    bandwidth=link.bandwidth, cost=link.cost, qos=link.qos)
+    for link in self.modified_links:
+      u, v = link.src.node.id, link.dst.node.id
+      if not nffg.network.has_edge(u, v, key=link.id):
+        continue
+      base_link = nffg.network[u][v][link.id]
+      base_link.delay, base_link.bandwidth = link.delay, link.bandwidth
+      base_link.cost, base_link.qos = link.cost, link.qos
+    return nffg
+
+
 class AbstractVirtualizer(EventMixin):
   """
   Abstract class for actual Virtualizers.
@@ -129,6 +320,9 @@ class AbstractFilteringVirtualizer(AbstractVirtualizer):
   resource changes in the observed and filtered :any:`DomainVirtualizer`.
   """
   REVISION_SEED = 1
+  INCREMENTAL_UPDATE = False
+  """Derived classes implement :meth:`_update_resource` and the revision is
+  increased only if the digest of the view has changed"""
 
   # noinspection PyUnusedLocal
   def __init__ (self, id, global_view, type):
@@ -148,6 +342,7 @@ class AbstractFilteringVirtualizer(AbstractVirtualizer):
     self.__dirty = None  # Set None to signal domain has not changed yet
     self.__revision = None  # Revision number of view, changed by every update
     self.__cache = None  # Cache for computed topology
+    self.__digest = None  # Digest of the cached topology
     if global_view is not None:
       # Save the Global view (a.k.a DoV) reference and offer a filtered NFFG
       self.global_view = weakref.proxy(global_view)
@@ -190,6 +385,14 @@ class AbstractFilteringVirtualizer(AbstractVirtualizer):
     """
     Hides object's mechanism and return with a resource info.
 
+    The revision of a changed view is increased here, so the revision is up
+    to date only if :meth:`is_changed` returns False.
+
+    .. warning::
+      The returned NFFG is shared with the other callers and must not be
+      modified! The view is never changed in place, every update replaces it
+      with a new object.
+
     :return: resource info
     :rtype: :class:`NFFG`
     """
@@ -207,7 +410,17 @@ class AbstractFilteringVirtualizer(AbstractVirtualizer):
       # If Virtualizer dirty resource info is changed since last request or has
       # never queried yet -> acquire resource info with template method
       # Acquire and cache new resource
+      changed = self.__cache is not None
       self.__cache = self._acquire_resource()
+      if self.INCREMENTAL_UPDATE:
+        digest = hashlib.md5(self.__cache.dump()).hexdigest()
+        changed = changed and digest != self.__digest
+        self.__digest = digest
+      if changed:
+        self.__roll_next_revision()
+      else:
+        log.debug("Content of the view has not changed (revision: %s)!" %
+                  self.__revision)
       log.debug("Clear dirty flag...")
       # Clear dirty flag
       self.__dirty = False
@@ -237,10 +450,56 @@ class AbstractFilteringVirtualizer(AbstractVirtualizer):
     log.debug("Received DoVChanged notification for %s! Cause: %s -> "
               "Set dirty flag!" % (self,
                                    DoVChangedEvent.TYPE.reversed[event.cause]))
-    # Topology is changed, set dirty flag
-    self.__roll_next_revision()
+    if self.__revision is None:
+      self.__roll_next_revision()
+    elif self.__apply_delta(delta=event.delta):
+      return
+    # Topology is changed, set dirty flag, the revision is increased when the
+    # view is acquired again
     self.__dirty = True
 
+  def __apply_delta (self, delta):
+    """
+    Update a copy of the cached resource info from the given DoV change and
+    increase the revision only if the content of the view has changed.
+
+    :param delta: DoV change or None if it is unknown
+    :type delta: :class:`DoVDelta`
+    :return: the cached view is up to date or it has to be acquired again
+    :rtype: bool
+    """
+    if not self.INCREMENTAL_UPDATE or self.__dirty is not False or \
+       delta is None:
+      return False
+    # Previously returned views must remain intact
+    view = self.__cache.copy()
+    if not self._update_resource(view=view, deltas=[delta]):
+      return False
+    log.debug("Cached resource NFFG is updated from DoV change!")
+    self.__cache = view
+    digest = hashlib.md5(view.dump()).hexdigest()
+    if digest != self.__digest:
+      self.__digest = digest
+      self.__roll_next_revision()
+    else:
+      log.debug("Content of the view has not changed (revision: %s)!" %
+                self.__revision)
+    return True
+
+  def _update_resource (self, view, deltas):
+    """
+    Template method for updating the cached resource info in place from the
+    collected DoV changes. Used only if ``INCREMENTAL_UPDATE`` is set.
+
+    :param view: copy of the cached resource info
+    :type view: :class:`NFFG`
+    :param deltas: list of DoV changes
+    :type deltas: list
+    :return: the view is updated or it has to be acquired again
+    :rtype: bool
+    """
+    return False
+
   def _acquire_resource (self):
     """
     Template method for acquiring or filtering the resource info if the
@@ -290,6 +549,11 @@ class DomainVirtualizer(AbstractVirtualizer):
       DoV, global_res))
     # Garbage-collector safe
     self._mgr = weakref.proxy(mgr)
+    # Revision number of the global view, changed by every update
+    self.__revision = 0
+    # Reused event object of the changes and the flag of its dispatching
+    self.__changed_event = DoVChangedEvent(cause=None)
+    self.__raising = False
     # Define DoV az an empty NFFG by default
     self.__global_nffg = NFFG(id=DoV, name=DoV + "-uninitialized")
     if global_res is not None:
@@ -318,6 +582,40 @@ class DomainVirtualizer(AbstractVirtualizer):
     """
     return "DomainVirtualizer(name=%s)" % self.name
 
+  @property
+  def revision (self):
+    """
+    :return: Return the revision number of the global view.
+    :rtype: int
+    """
+    return self.__revision
+
+  def __raise_changed (self, cause, delta=None):
+    """
+    Increase the revision and notify the observing Virtualizers about the
+    change of the global view.
+
+    :param cause: cause of the change
+    :type cause: str
+    :param delta: applied difference in case of incremental update (optional)
+    :type delta: :class:`DoVDelta`
+    :return: None
+    """
+    self.__revision += 1
+    if self.__raising:
+      # Changed by a handler, the dispatched event must not be overwritten
+      self.raiseEventNoErrors(DoVChangedEvent, cause=cause, delta=delta)
+      return
+    event = self.__changed_event
+    event.cause, event.delta = cause, delta
+    self.__raising = True
+    try:
+      self.raiseEventNoErrors(event)
+    finally:
+      self.__raising = False
+      # Do not keep the applied difference alive
+      event.delta = None
+
   def __repr__ (self):
     """
     Return with specific representation.
@@ -376,7 +674,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     self.__global_nffg.name = DoV
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     # Raise event for observing Virtualizers about topology change
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.UPDATE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.UPDATE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -397,7 +695,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     self.__global_nffg.id, self.__global_nffg.name = dov_id, dov_name
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     # Raise event for observing Virtualizers about topology change
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.UPDATE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.UPDATE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -418,7 +716,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     # Raise event for observing Virtualizers about topology change
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     log.log(VERBOSE, "Merged Dov:\n%s" % self.__global_nffg.dump())
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.EXTEND)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.EXTEND)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -443,7 +741,7 @@ class DomainVirtualizer(AbstractVirtualizer):
       log.warning("No Node had been remained after updating the domain part: "
                   "%s! DoV is empty!" % domain)
     # Raise event for observing Virtualizers about topology change
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.CHANGE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -465,7 +763,26 @@ class DomainVirtualizer(AbstractVirtualizer):
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     log.log(VERBOSE, "Updated DoV:\n%s" % self.__global_nffg.dump())
     # Raise event for observing Virtualizers about topology change
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.CHANGE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE)
+    return self.__global_nffg
+
+  @synchronized(__DoV_lock)
+  def apply_delta_in_dov (self, delta):
+    """
+    Update the existing domain in the merged Global view by applying the
+    given difference in place.
+
+    :param delta: calculated difference of the changed domain
+    :type delta: :class:`DoVDelta`
+    :return: updated Dov
+    :rtype: :class:`NFFG`
+    """
+    log.debug("Apply %s..." % delta)
+    delta.apply(nffg=self.__global_nffg)
+    log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
+    log.log(VERBOSE, "Updated DoV:\n%s" % self.__global_nffg.dump())
+    # Raise event for observing Virtualizers about topology change
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE, delta=delta)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -485,7 +802,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     log.log(VERBOSE, "Reduced Dov:\n%s" % self.__global_nffg.dump())
     # Raise event for observing Virtualizers about topology change
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.REDUCE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.REDUCE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -509,7 +826,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     NFFGToolBox.clear_domain(base=self.__global_nffg, domain=domain, log=log)
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     log.log(VERBOSE, "Cleaned Dov:\n%s" % self.__global_nffg.dump())
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.CHANGE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -532,7 +849,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     NFFGToolBox.update_nffg_by_status(base=self.__global_nffg, updated=nffg,
                                       log=log)
     log.log(VERBOSE, "Updated Dov:\n%s" % self.__global_nffg.dump())
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.CHANGE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE)
     return self.__global_nffg
 
   @synchronized(__DoV_lock)
@@ -549,7 +866,7 @@ class DomainVirtualizer(AbstractVirtualizer):
     NFFGToolBox.remove_deployed_services(nffg=self.__global_nffg, log=log)
     log.debug("DoV stat:\n%s" % self.__global_nffg.get_stat())
     log.log(VERBOSE, "Cleared Dov:\n%s" % self.__global_nffg.dump())
-    self.raiseEventNoErrors(DoVChangedEvent, cause=DoVChangedEvent.TYPE.CHANGE)
+    self.__raise_changed(cause=DoVChangedEvent.TYPE.CHANGE)
     return self.__global_nffg
 
 
@@ -592,6 +909,9 @@ class SingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
   """
   TYPE = 'SINGLE'
   """Type name of the Virtualizer"""
+  INCREMENTAL_UPDATE = True
+  # Summarized resources of the SBB node which can be updated incrementally
+  SUMMED_RESOURCES = ('cpu', 'mem', 'storage')
 
   # noinspection PyUnusedLocal
   def __init__ (self, global_view, id, sbb_id=None, **kwargs):
@@ -611,6 +931,95 @@ class SingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
                                                   global_view=global_view,
                                                   type=self.TYPE)
     self.sbb_id = sbb_id
+    # Resource-independent state of the aggregated Infras: {id: persisted}
+    self.__infra_states = {}
+    # Summed resources of the aggregated Infras: {id: (cpu, mem, storage)}
+    self.__infra_resources = {}
+
+  @classmethod
+  def __split_infra_state (cls, infra):
+    """
+    Split the state of the given Infra into the summed resource values and the
+    rest of the persisted Infra.
+
+    :param infra: Infra node
+    :type infra: :any:`NodeInfra`
+    :return: summed resource values and persisted Infra without them
+    :rtype: tuple
+    """
+    state = infra.persist()
+    for res in cls.SUMMED_RESOURCES:
+      state.get('resources', {}).pop(res, None)
+    return tuple(getattr(infra.resources, res) for res in
+                 cls.SUMMED_RESOURCES), state
+
+  def __store_infra_states (self, dov, sbb):
+    """
+    Store the state of the aggregated Infras if the resources of the generated
+    SBB node are the sum of the Infra resources.
+
+    :param dov: global view
+    :type dov: :class:`NFFG`
+    :param sbb: generated Single BiSBiS view
+    :type sbb: :class:`NFFG`
+    :return: None
+    """
+    self.__infra_states.clear()
+    self.__infra_resources.clear()
+    sbb_infras = [i for i in sbb.infras]
+    if len(sbb_infras) != 1:
+      return
+    for infra in dov.infras:
+      resources, state = self.__split_infra_state(infra)
+      self.__infra_resources[infra.id] = resources
+      self.__infra_states[infra.id] = state
+    for i, res in enumerate(self.SUMMED_RESOURCES):
+      summed = sum(r[i] for r in self.__infra_resources.itervalues()
+                   if r[i] is not None)
+      if getattr(sbb_infras[0].resources, res) != summed:
+        log.debug("SBB resource: %s is not a summed value! "
+                  "Disable incremental update..." % res)
+        self.__infra_states.clear()
+        self.__infra_resources.clear()
+        return
+
+  def _update_resource (self, view, deltas):
+    """
+    Update the resources of the cached SBB node if the DoV changes affect only
+    the summed resources of the aggregated Infras.
+
+    :param view: cached Single BiSBiS view
+    :type view: :class:`NFFG`
+    :param deltas: list of DoV changes
+    :type deltas: list
+    :return: the view is updated or it has to be acquired again
+    :rtype: bool
+    """
+    if not self.__infra_states:
+      return False
+    changes = {}
+    for delta in deltas:
+      if delta.added_nfs or delta.removed_nfs or delta.modified_nfs or \
+         delta.added_links or delta.removed_links or delta.modified_links:
+        return False
+      for infra in delta.modified_infras:
+        if infra.id not in self.__infra_states:
+          return False
+        changes[infra.id] = self.__split_infra_state(infra)
+    for infra_id, (resources, state) in changes.iteritems():
+      if state != self.__infra_states[infra_id]:
+        log.debug("Detected non-resource change in %s!" % infra_id)
+        return False
+    sbb = [i for i in view.infras][0]
+    for infra_id, (resources, state) in changes.iteritems():
+      old_resources = self.__infra_resources[infra_id]
+      for i, res in enumerate(self.SUMMED_RESOURCES):
+        diff = (resources[i] or 0) - (old_resources[i] or 0)
+        if diff:
+          setattr(sbb.resources, res, getattr(sbb.resources, res) + diff)
+      self.__infra_resources[infra_id] = resources
+    log.debug("Updated SBB resources from: %s" % changes.keys())
+    return True
 
   def _acquire_resource (self):
     """
@@ -638,6 +1047,7 @@ class SingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
                                                     sbb_id=self.sbb_id,
                                                     log=log)
       log.log(VERBOSE, "Generated SBB:\n%s" % sbb.dump())
+      self.__store_infra_states(dov=dov, sbb=sbb)
       return sbb
 
 
@@ -689,18 +1099,18 @@ class LocalSingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
     """
     Filter out domains detected by external DomainManagers.
 
+    The given NFFG is modified in place.
+
     :param nffg: filtered NFFG
     :return: :class:`NFFG`
     """
     log.debug("Filtering domains detected from external DomainManagers...")
     # Get External DomainManager names
     ext_mgr = CONFIG.get_external_managers()
-    # Copy NFFG
-    filtered_nffg = nffg.copy()
+    # Get all the domains
+    domains = NFFGToolBox.detect_domains(nffg=nffg)
     # Remove the detected domains by External DomainManagers
     for ext in ext_mgr:
-      # Get all the domains
-      domains = NFFGToolBox.detect_domains(nffg=filtered_nffg)
       # Get domains detected and initiated by the External DomainManager
       ext_domains = [d for d in domains if ext in d]
       # Remove collected domains from NFFG
@@ -708,9 +1118,9 @@ class LocalSingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
         log.debug(
           "Remove domain: %s originated from external DomainManager: %s" % (
             domain, ext))
-        NFFGToolBox.remove_domain(base=filtered_nffg, domain=domain, log=log)
-    filtered_nffg.name += "-filtered"
-    return filtered_nffg
+        NFFGToolBox.remove_domain(base=nffg, domain=domain, log=log)
+    nffg.name += "-filtered"
+    return nffg
 
   def _acquire_resource (self):
     """
@@ -728,6 +1138,7 @@ class LocalSingleBiSBiSVirtualizer(AbstractFilteringVirtualizer):
         "topology!")
       return dov
     else:
+      # DoV is already a copy, filter it in place
       filtered_dov = self.__filter_external_domains(nffg=dov)
       # Generate the Single BiSBiS representation
       sbb = NFFGToolBox.generate_SBB_representation(nffg=filtered_dov, log=log)
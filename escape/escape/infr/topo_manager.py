@@ -17,6 +17,7 @@ domain management.
 """
 import pprint
 import re
+from multiprocessing.pool import ThreadPool
 
 from ncclient import NCClientError
 from ncclient.operations import OperationError
@@ -67,14 +68,39 @@ class VNFStarterAdapter(AbstractNETCONFAdapter, AbstractESCAPEAdapter,
     :type password: str
     :param timeout: connection timeout (default=30)
     :type timeout: int
+    :param persistent: keep the NETCONF session open between the high-level
+      calls (default: False)
+    :type persistent: bool
     :return: None
     """
+    self.persistent = kwargs.pop('persistent', False)
     # Call base constructors directly to avoid super() and MRO traps
     AbstractNETCONFAdapter.__init__(self, *args, **kwargs)
     AbstractESCAPEAdapter.__init__(self, *args, **kwargs)
     log.debug(
       "Init VNFStarterAdapter - type: %s, params: %s" % (self.type, kwargs))
 
+  def __exit__ (self, exc_type, exc_val, exc_tb):
+    """
+    Context manager cleanup action.
+
+    Keep the session open in persistent mode unless an error is occurred.
+
+    :return: None
+    """
+    if not self.persistent or exc_type is not None:
+      super(VNFStarterAdapter, self).__exit__(exc_type, exc_val, exc_tb)
+
+  def finit (self):
+    """
+    Close the opened NETCONF session.
+
+    :return: None
+    """
+    if self.connected:
+      self.disconnect()
+    super(VNFStarterAdapter, self).finit()
+
   def check_domain_reachable (self):
     """
     Checker function for domain polling.
@@ -490,13 +516,19 @@ class InternalDomainManager(AbstractDomainManager):
   DEFAULT_DOMAIN_NAME = "INTERNAL"
   # Set the internal manager status
   IS_INTERNAL_MANAGER = True
+  # Default number of containers initiating NFs concurrently
+  DEFAULT_DEPLOY_WORKERS = 8
 
-  def __init__ (self, domain_name=DEFAULT_DOMAIN_NAME, *args, **kwargs):
+  def __init__ (self, domain_name=DEFAULT_DOMAIN_NAME,
+                deploy_workers=DEFAULT_DEPLOY_WORKERS, *args, **kwargs):
     """
     Init.
 
     :param domain_name: the domain name
     :type domain_name: str
+    :param deploy_workers: max number of containers initiating NFs
+      concurrently (default: 8)
+    :type deploy_workers: int
     :param args: optional param list
     :type args: list
     :param kwargs: optional keywords
@@ -509,6 +541,9 @@ class InternalDomainManager(AbstractDomainManager):
     self.controlAdapter = None  # DomainAdapter for POX-InternalPOXAdapter
     self.topoAdapter = None  # DomainAdapter for Mininet-InternalMininetAdapter
     self.remoteAdapter = None  # NETCONF communication - VNFStarterAdapter
+    # Persistent NETCONF sessions to the agents of EEs, key: infra_id
+    self.vnf_sessions = {}
+    self.deploy_workers = max(int(deploy_workers), 1)
     self.portmap = {}  # Map (unique) dynamic ports to physical ports in EEs
     self.deployed_vnfs = {}  # container for replied NETCONF messages of
     # deployNF, key: (infra_id, nf_id), value: initiated_vnf part of the
@@ -565,6 +600,9 @@ class InternalDomainManager(AbstractDomainManager):
     :return: None
     """
     super(InternalDomainManager, self).finit()
+    for session in self.vnf_sessions.itervalues():
+      session.finit()
+    self.vnf_sessions.clear()
     self.remoteAdapter.finit()
     self.controlAdapter.finit()
     self.topoAdapter.finit()
@@ -579,6 +617,39 @@ class InternalDomainManager(AbstractDomainManager):
     """
     return self.controlAdapter.task_name
 
+  def _get_vnf_session (self, infra_id):
+    """
+    Return the persistent NETCONF session to the agent of the given container.
+    The session is created at the first use and is reused as long as the
+    connection params of the agent are not changed.
+
+    :param infra_id: id of the container Node
+    :type infra_id: str
+    :return: adapter of the session or None if the agent is unknown
+    :rtype: :class:`VNFStarterAdapter`
+    """
+    connection_params = self.topoAdapter.get_agent_connection_params(infra_id)
+    if not connection_params:
+      self.log.error("Missing connection params for communication with the "
+                     "agent of Node: %s" % infra_id)
+      return None
+    session = self.vnf_sessions.get(infra_id)
+    if session is not None:
+      updated = session.update_connection_params(**connection_params)
+      if not updated:
+        return session
+      self.log.debug("Connection params of agent: %s changed: %s! "
+                     "Reopen session..." % (infra_id, updated))
+      session.finit()
+    self.log.debug("Create NETCONF session to the agent of Node: %s" % infra_id)
+    session = self.remoteAdapter.__class__(domain_name=self.domain_name,
+                                           timeout=self.remoteAdapter.timeout,
+                                           debug=self.remoteAdapter.debug,
+                                           persistent=True,
+                                           **connection_params)
+    self.vnf_sessions[infra_id] = session
+    return session
+
   def _setup_sap_hostnames (self):
     """
     Setup hostnames in /etc/hosts for SAPs.
@@ -737,23 +808,15 @@ class InternalDomainManager(AbstractDomainManager):
               "deployed NF and reinitialize later...")
         else:
           self.log.debug("Found removable NF: %s" % nf_id)
-        # Create connection Adapter to EE agent
-        connection_params = self.topoAdapter.get_agent_connection_params(
-          infra_id)
-        if connection_params is None:
-          self.log.error("Missing connection params for communication with the "
-                         "agent of Node: %s" % infra_id)
+        # Get the session to EE agent
+        session = self._get_vnf_session(infra_id)
+        if session is None:
           result = False
           continue
-        updated = self.remoteAdapter.update_connection_params(
-          **connection_params)
-        if updated:
-          self.log.debug("Update connection params in %s: %s" % (
-            self.remoteAdapter.__class__.__name__, updated))
         self.log.debug("Stop deployed NF: %s" % nf_id)
         try:
           vnf_id = self.deployed_vnfs[(infra_id, nf_id)]['vnf_id']
-          reply = self.remoteAdapter.removeNF(vnf_id=vnf_id)
+          reply = session.removeNF(vnf_id=vnf_id)
           self.log.log(VERBOSE,
                        "Removed NF status:\n%s" % pprint.pformat(reply))
           # Remove NF from deployed cache
@@ -785,6 +848,9 @@ class InternalDomainManager(AbstractDomainManager):
     If an NF is already defined in the topology and it's state is up and
     running then the actual NF's initiation will be skipped!
 
+    The NFs of different containers are initiated concurrently through the
+    persistent NETCONF sessions of the container agents.
+
     :param nffg: container NF-FG part need to be deployed
     :type nffg: :class:`NFFG`
     :return: deploy was successful or not
@@ -803,8 +869,10 @@ class InternalDomainManager(AbstractDomainManager):
       self.log.warning("Missing topology description from %s domain! "
                        "Skip deploying NFs..." % self.domain_name)
       return False
-    # Iter through the container INFRAs in the given mapped NFFG part
-    # print mn_topo.dump()
+    # Collect the NFs need to be initiated grouped by the container INFRAs
+    deploys = []
+    internal_infras = set(n.id for n in self.internal_topo.infras)
+    internal_nfs = set(n.id for n in self.internal_topo.nfs)
     for infra in nffg.infras:
       if infra.infra_type not in (
          NFFG.TYPE_INFRA_EE, NFFG.TYPE_INFRA_STATIC_EE):
@@ -815,17 +883,18 @@ class InternalDomainManager(AbstractDomainManager):
       else:
         self.log.debug("Check NFs mapped on Node: %s" % infra.id)
       # If the actual INFRA isn't in the topology(NFFG) of this domain -> skip
-      if infra.id not in (n.id for n in self.internal_topo.infras):
+      if infra.id not in internal_infras:
         self.log.error("Infrastructure Node: %s is not found in the %s domain! "
                        "Skip NF initiation on this Node..." %
                        (infra.id, self.domain_name))
         result = False
         continue
+      jobs = []
       # Iter over the NFs connected the actual INFRA
       for nf in nffg.running_nfs(infra.id):
         # NF with id is already deployed --> change the dynamic port to
         # static and continue
-        if nf.id in (nf.id for nf in self.internal_topo.nfs):
+        if nf.id in internal_nfs:
           self.log.debug("NF: %s has already been initiated! "
                          "Continue to next NF..." % nf.id)
           for u, v, link in nffg.real_out_edges_iter(nf.id):
@@ -847,104 +916,36 @@ class InternalDomainManager(AbstractDomainManager):
                          "Extracted params: %s" % (nf.id, params))
           result = False
           continue
-        # Create connection Adapter to EE agent
-        connection_params = self.topoAdapter.get_agent_connection_params(
-          infra.id)
-        if connection_params is None:
-          self.log.error("Missing connection params for communication with the "
-                         "agent of Node: %s" % infra.id)
-          result = False
-          continue
-        # Save last used adapter --> and last RPC result
-        self.log.info("Initiating NF: %s ..." % nf.id)
-        self.log.debug("NF parameters: %s" % params)
-        updated = self.remoteAdapter.update_connection_params(
-          **connection_params)
-        if updated:
-          self.log.debug("Update connection params in %s: %s" % (
-            self.remoteAdapter.__class__.__name__, updated))
-        try:
-          vnf = self.remoteAdapter.deployNF(**params)
-        except NCClientError as e:
-          self.log.error("Got NETCONF RPC communication error during NF: %s "
-                         "deploy! Skip deploy..." % nf.id)
-          self.log.error(VERBOSE, "Exception: %s" % e)
-          result = False
-          continue
-        except BaseException:
-          self.log.error("Got unexpected error during NF: %s "
-                         "initiation! Skip initiation..." % nf.name)
-          result = False
-          continue
-        self.log.log(VERBOSE, "Initiated VNF:\n%s" % pprint.pformat(vnf))
-        # Check if NETCONF communication was OK
-        if vnf and 'initiated_vnfs' in vnf and vnf['initiated_vnfs']['pid'] \
-           and vnf['initiated_vnfs']['status'] == \
-              VNFStarterAPI.VNFStatus.s_UP_AND_RUNNING:
-          self.log.info("NF: %s initiation has been verified on Node: %s" % (
-            nf.id, infra.id))
-          self.log.debug("Initiated VNF id: %s, PID: %s, status: %s" % (
-            vnf['initiated_vnfs']['vnf_id'], vnf['initiated_vnfs']['pid'],
-            vnf['initiated_vnfs']['status']))
-        else:
-          self.log.error("Initiated NF: %s is not verified. Initiation was "
-                         "unsuccessful!" % nf.id)
-          result = False
-          continue
-        # Store NETCONF related info of deployed NF
-        self.deployed_vnfs[(infra.id, nf.id)] = vnf['initiated_vnfs']
-        # Add initiated NF to topo description
-        self.log.debug("Update Infrastructure layer topology description...")
-        deployed_nf = nf.copy()
-        deployed_nf.ports.clear()
-        mn_topo.add_nf(nf=deployed_nf)
-        self.log.debug("Add deployed NFs to topology...")
-        # Add Link between actual NF and INFRA
-        for nf_id, infra_id, link in nffg.real_out_edges_iter(nf.id):
-          # Get Link's src ref to new NF's port
-          nf_port = deployed_nf.ports.append(nf.ports[link.src.id].copy())
-
-          def get_sw_port (vnf):
-            """
-            Return the switch port parsed from result of getVNFInfo
-
-            :param vnf: VNF description returned by NETCONF server
-            :type vnf: dict
-            :return: port id
-            :rtype: int
-            """
-            if isinstance(vnf['initiated_vnfs']['link'], list):
-              for _link in vnf['initiated_vnfs']['link']:
-                if str(_link['vnf_port']) == str(nf_port.id):
-                  return int(_link['sw_port'])
-            else:
-              return int(vnf['initiated_vnfs']['link']['sw_port'])
-
-          # Get OVS-generated physical port number
-          infra_port_num = get_sw_port(vnf)
-          if infra_port_num is None:
-            self.log.warning("Can't get Container port from RPC result! Set "
-                             "generated port number...")
-          # Create INFRA side Port
-          infra_port = mn_topo.network.node[infra_id].add_port(
-            id=infra_port_num)
-          self.log.debug("%s - detected physical %s" %
-                         (deployed_nf, infra_port))
-          # Add Links to mn topo
-          mn_topo.add_undirected_link(port1=nf_port, port2=infra_port,
-                                      dynamic=True, delay=link.delay,
-                                      bandwidth=link.bandwidth)
-          # Port mapping
-          dynamic_port = nffg.network.node[infra_id].ports[link.dst.id].id
-          self.portmap[dynamic_port] = infra_port_num
-          # Update port in nffg_part
-          nffg.network.node[infra_id].ports[
-            link.dst.id].id = infra_port_num
-
-        self.log.debug("%s topology description is updated with NF: %s" % (
-          self.domain_name, deployed_nf.name))
-
+        jobs.append((nf, params))
+      if not jobs:
+        continue
+      # Get the session to EE agent
+      session = self._get_vnf_session(infra.id)
+      if session is None:
+        result = False
+        continue
+      deploys.append((infra, session, jobs))
+    if deploys:
+      workers = min(self.deploy_workers, len(deploys))
+      self.log.debug("Initiate NFs in %s container(s) with %s worker(s)..." %
+                     (len(deploys), workers))
+      pool = ThreadPool(processes=workers)
+      try:
+        results = [pool.apply_async(self._initiate_nfs, args=(session, jobs))
+                   for infra, session, jobs in deploys]
+        # Update the topology in the caller thread in the original order
+        for (infra, session, jobs), initiated in zip(deploys, results):
+          for nf, vnf in initiated.get():
+            if not self._add_initiated_nf(nffg=nffg, mn_topo=mn_topo,
+                                          infra=infra, nf=nf, vnf=vnf):
+              result = False
+      finally:
+        pool.close()
+        pool.join()
     self.log.debug("Rewrite dynamically generated port numbers in flowrules...")
+    portmap = dict((str(dyn), str(phy))
+                   for dyn, phy in self.portmap.iteritems())
+    mn_infras = set(n.id for n in mn_topo.infras)
     # Update port numbers in flowrules
     for infra in nffg.infras:
       if infra.infra_type not in (
@@ -952,7 +953,7 @@ class InternalDomainManager(AbstractDomainManager):
          NFFG.TYPE_INFRA_SDN_SW):
         continue
       # If the actual INFRA isn't in the topology(NFFG) of this domain -> skip
-      if infra.id not in (n.id for n in mn_topo.infras):
+      if infra.id not in mn_infras:
         continue
       for port in infra.ports:
         for flowrule in port.flowrules:
@@ -966,11 +967,14 @@ class InternalDomainManager(AbstractDomainManager):
             self.log.warning("Missing 'output' from action field: %s" %
                              flowrule.action)
             continue
-          for dyn, phy in self.portmap.iteritems():
-            _match[0] = _match[0].replace(str(dyn), str(phy))
-            _action[0] = _action[0].replace(str(dyn), str(phy))
-          flowrule.match = ";".join(_match)
-          flowrule.action = ";".join(_action)
+          in_port = _match[0].split('=', 1)[1]
+          if in_port in portmap:
+            _match[0] = "in_port=%s" % portmap[in_port]
+            flowrule.match = ";".join(_match)
+          output = _action[0].split('=', 1)[1]
+          if output in portmap:
+            _action[0] = "output=%s" % portmap[output]
+            flowrule.action = ";".join(_action)
     if result:
       self.log.info("Initiation of NFs in NFFG part: %s has been finished! "
                     "Result: SUCCESS" % nffg)
@@ -979,6 +983,124 @@ class InternalDomainManager(AbstractDomainManager):
                     "Result: FAILURE" % nffg)
     return result
 
+  def _initiate_nfs (self, session, jobs):
+    """
+    Initiate the given NFs one after another through the session of their
+    container agent.
+
+    Called by the deploy workers so it must not touch the shared topology.
+
+    :param session: session to the agent of the container
+    :type session: :class:`VNFStarterAdapter`
+    :param jobs: list of (NF, initiation params) pairs
+    :type jobs: list
+    :return: list of (NF, initiated VNF description or None) pairs
+    :rtype: list
+    """
+    initiated = []
+    for nf, params in jobs:
+      self.log.info("Initiating NF: %s ..." % nf.id)
+      self.log.debug("NF parameters: %s" % params)
+      try:
+        vnf = session.deployNF(**params)
+      except NCClientError as e:
+        self.log.error("Got NETCONF RPC communication error during NF: %s "
+                       "deploy! Skip deploy..." % nf.id)
+        self.log.log(VERBOSE, "Exception: %s" % e)
+        vnf = None
+      except BaseException:
+        self.log.error("Got unexpected error during NF: %s "
+                       "initiation! Skip initiation..." % nf.name)
+        vnf = None
+      initiated.append((nf, vnf))
+    return initiated
+
+  def _add_initiated_nf (self, nffg, mn_topo, infra, nf, vnf):
+    """
+    Verify the initiated NF and add it to the topology description and
+    register its physical ports.
+
+    :param nffg: container NF-FG part need to be deployed
+    :type nffg: :class:`NFFG`
+    :param mn_topo: topology description of the domain
+    :type mn_topo: :class:`NFFG`
+    :param infra: container Node
+    :type infra: :any:`NodeInfra`
+    :param nf: initiated NF
+    :type nf: :any:`NodeNF`
+    :param vnf: VNF description returned by NETCONF server
+    :type vnf: dict
+    :return: initiation was successful or not
+    :rtype: bool
+    """
+    self.log.log(VERBOSE, "Initiated VNF:\n%s" % pprint.pformat(vnf))
+    # Check if NETCONF communication was OK
+    if vnf and 'initiated_vnfs' in vnf and vnf['initiated_vnfs']['pid'] \
+       and vnf['initiated_vnfs']['status'] == \
+          VNFStarterAPI.VNFStatus.s_UP_AND_RUNNING:
+      self.log.info("NF: %s initiation has been verified on Node: %s" % (
+        nf.id, infra.id))
+      self.log.debug("Initiated VNF id: %s, PID: %s, status: %s" % (
+        vnf['initiated_vnfs']['vnf_id'], vnf['initiated_vnfs']['pid'],
+        vnf['initiated_vnfs']['status']))
+    else:
+      self.log.error("Initiated NF: %s is not verified. Initiation was "
+                     "unsuccessful!" % nf.id)
+      return False
+    # Store NETCONF related info of deployed NF
+    self.deployed_vnfs[(infra.id, nf.id)] = vnf['initiated_vnfs']
+    # Add initiated NF to topo description
+    self.log.debug("Update Infrastructure layer topology description...")
+    deployed_nf = nf.copy()
+    deployed_nf.ports.clear()
+    mn_topo.add_nf(nf=deployed_nf)
+    self.log.debug("Add deployed NFs to topology...")
+    # Add Link between actual NF and INFRA
+    for nf_id, infra_id, link in nffg.real_out_edges_iter(nf.id):
+      # Get Link's src ref to new NF's port
+      nf_port = deployed_nf.ports.append(nf.ports[link.src.id].copy())
+
+      def get_sw_port (vnf):
+        """
+        Return the switch port parsed from result of getVNFInfo
+
+        :param vnf: VNF description returned by NETCONF server
+        :type vnf: dict
+        :return: port id
+        :rtype: int
+        """
+        if isinstance(vnf['initiated_vnfs']['link'], list):
+          for _link in vnf['initiated_vnfs']['link']:
+            if str(_link['vnf_port']) == str(nf_port.id):
+              return int(_link['sw_port'])
+        else:
+          return int(vnf['initiated_vnfs']['link']['sw_port'])
+
+      # Get OVS-generated physical port number
+      infra_port_num = get_sw_port(vnf)
+      if infra_port_num is None:
+        self.log.warning("Can't get Container port from RPC result! Set "
+                         "generated port number...")
+      # Create INFRA side Port
+      infra_port = mn_topo.network.node[infra_id].add_port(
+        id=infra_port_num)
+      self.log.debug("%s - detected physical %s" %
+                     (deployed_nf, infra_port))
+      # Add Links to mn topo
+      mn_topo.add_undirected_link(port1=nf_port, port2=infra_port,
+                                  dynamic=True, delay=link.delay,
+                                  bandwidth=link.bandwidth)
+      # Port mapping
+      dynamic_port = nffg.network.node[infra_id].ports[link.dst.id].id
+      self.portmap[dynamic_port] = infra_port_num
+      # Update port in nffg_part
+      nffg.network.node[infra_id].ports[
+        link.dst.id].id = infra_port_num
+
+    self.log.debug("%s topology description is updated with NF: %s" % (
+      self.domain_name, deployed_nf.name))
+    return True
+
   def _delete_flowrules (self, nffg=None):
     """
     Delete all flowrules from the first (default) table of all infras.
@@ -1062,6 +1184,7 @@ class InternalDomainManager(AbstractDomainManager):
       self.log.warning("Missing topology description from %s domain! "
                        "Skip deploying flowrules..." % self.domain_name)
       return False
+    batches = []
     # Iter through the container INFRAs in the given mapped NFFG part
     for infra in nffg_part.infras:
       if infra.infra_type not in (
@@ -1092,6 +1215,7 @@ class InternalDomainManager(AbstractDomainManager):
                          (infra, dpid_to_str(dpid)))
         result = False
         continue
+      rules = []
       for port in infra.ports:
         for flowrule in port.flowrules:
           try:
@@ -1129,7 +1253,14 @@ class InternalDomainManager(AbstractDomainManager):
               self.log.error("Abort Flowrule deployment...")
               return
           self.log.debug("Assemble OpenFlow flowrule from: %s" % flowrule)
-          self.controlAdapter.install_flowrule(infra.id, match, action)
+          rules.append((match, action))
+      if rules:
+        batches.append((infra.id, rules))
+    # Send the flowrules of each Infra in one batch, the confirmation of the
+    # switches is signalled asynchronously
+    if not self._install_flowrule_batches(request_id=nffg_part.id,
+                                          rules=batches):
+      result = False
     self.log.info("Flowrule deploy result: %s" %
                   ("SUCCESS" if result else "FAILURE"))
     self.log.log(VERBOSE,
@@ -500,6 +500,7 @@ class ESCAPENetworkBuilder(object):
     'autoSetMacs': False,  # Set simple MACs
     'autoStaticArp': True,  # Set static ARP entries
     'listenPort': None,  # Add listen port to OVS switches
+    'fast': False,  # Bulk link creation and batched switch startup
     'link': TCLink}  # Add default link
   """Default initial options for Mininet"""
   # Default internal storing format for NFFG parsing/reading from file
@@ -584,7 +585,6 @@ class ESCAPENetworkBuilder(object):
     # pprint(nffg.network.__dict__)
     log.info("Start topology creation from NFFG(name: %s)..." % nffg.name)
     created_mn_nodes = {}  # created nodes as 'NFFG-id': <node>
-    created_mn_links = {}  # created links as 'NFFG-id': <link>
     # If not set then cache the given NFFG as the topology description
     self.topo_desc = nffg
     # Create a Controller which will be the default internal POX controller
@@ -628,6 +628,7 @@ class ESCAPENetworkBuilder(object):
     # TODO - implement --> currently the default Mininet topology does not
     # TODO contain NFs but it could be possible
     # Convert connections - copy link ref in a list and iter over it
+    links = []
     for edge in [l for l in nffg.links]:
       # Skip initiation of links which connected to an inter-domain SAP
       if (edge.src.node.type == NFFG.TYPE_SAP and
@@ -653,10 +654,10 @@ class ESCAPENetworkBuilder(object):
           "Destination port id of Link: %s is generated dynamically! Using "
           "automatic port assignment based on internal Mininet "
           "implementation!" % edge)
-      link = self.create_Link(src=mn_src_node, src_port=src_port,
-                              dst=mn_dst_node, dst_port=dst_port,
-                              bw=edge.bandwidth, delay=str(edge.delay) + 'ms')
-      created_mn_links[edge.id] = link
+      links.append((mn_src_node, mn_dst_node, src_port, dst_port,
+                    {'bw': edge.bandwidth, 'delay': str(edge.delay) + 'ms'}))
+    # Create the links in one step to support bulk creation in Mininet
+    self.create_Links(links=links)
 
     # Set port properties of SAP nodes.
     #  A possible excerpt from a escape-mn-topo.nffg file:
@@ -1041,6 +1042,30 @@ class ESCAPENetworkBuilder(object):
       raise TopologyBuilderException(
         "Remote Link creation is not supported yet!")
 
+  def create_Links (self, links):
+    """
+    Create the given undirected connections in one step.
+
+    In the fast mode of Mininet the interfaces of the links are created in
+    bulk.
+
+    :param links: list of (src, dst, src_port, dst_port, params) tuples
+    :type links: list
+    :return: None
+    """
+    link_params = []
+    for src, dst, src_port, dst_port, params in links:
+      log.debug("Create Link %s%s <--> %s%s" % (
+        src, ":%s" % src_port if src_port is not None else "", dst,
+        ":%s" % dst_port if dst_port is not None else ""))
+      if isinstance(src, RemoteSwitch) or isinstance(dst, RemoteSwitch):
+        raise TopologyBuilderException(
+          "Remote Link creation is not supported yet!")
+      cfg = dict(CONFIG.get_Link_params())
+      cfg.update(params)
+      link_params.append((src, dst, src_port, dst_port, cfg))
+    self.mn.addLinks(link_params)
+
   def build (self, topo=None):
     """
     Initialize network.
@@ -35,6 +35,7 @@ from escape.util.domain import BaseResultEvent
 from escape.util.mapping import ProcessorError
 from escape.util.misc import VERBOSE, schedule_as_coop_task, quit_with_error
 from escape.util.stat import stats
+from escape.util.virtualizer_helper import get_changed_nodes_from_diff
 from pox.lib.revent.revent import Event
 from virtualizer import Virtualizer
 from virtualizer_info import Info
@@ -59,7 +60,8 @@ class InstallNFFGEvent(Event):
     self.mapped_nffg = mapped_nffg
     self.original_request = original_request
     stats.add_measurement_end_entry(type=stats.TYPE_ORCHESTRATION,
-                                    info=LAYER_NAME)
+                                    info=LAYER_NAME,
+                                    request_id=mapped_nffg.id)
 
 
 class VirtResInfoEvent(Event):
@@ -165,6 +167,14 @@ class ResourceOrchestrationAPI(AbstractAPI):
     """
     log.debug("Initializing Resource Orchestration Sublayer...")
     self.orchestrator = ResourceOrchestrator(self)
+    if self.orchestrator.deployPipeline.enabled:
+      if self.orchestrator.mapper.threaded:
+        log.warning("Pipelined orchestration is not supported with threaded "
+                    "mapping! Disable pipelining...")
+        self.orchestrator.deployPipeline.depth = 1
+      else:
+        RequestScheduler().enable_pipelining(
+          layer=self._core_name, depth=self.orchestrator.deployPipeline.depth)
     if self._nffg_file:
       try:
         service_request = self._read_data_from_file(self._nffg_file)
@@ -323,6 +333,8 @@ class ResourceOrchestrationAPI(AbstractAPI):
         log.getChild('[Sl-Or]').debug("DoV has not initialized yet! "
                                       "Force to get default topology...")
       else:
+        # The revision of a changed view is updated by the acquisition
+        slor_virt.get_resource_info()
         # Check if the resource is changed
         if self.ros_api.topology_revision == slor_virt.revision:
           # If resource has not been changed return False
@@ -554,7 +566,8 @@ class ResourceOrchestrationAPI(AbstractAPI):
     log.getChild('API').info("Invoke instantiation on %s with NF-FG: %s " % (
       self.__class__.__name__, nffg.name))
     stats.add_measurement_start_entry(type=stats.TYPE_ORCHESTRATION,
-                                      info=LAYER_NAME)
+                                      info=LAYER_NAME,
+                                      request_id=nffg.id)
     # Get shown topology view
     if resource_nffg is None:
       log.error("Missing resource for difference calculation!")
@@ -688,6 +701,74 @@ class ResourceOrchestrationAPI(AbstractAPI):
                               id=nffg.id,
                               result=InstantiationFinishedEvent.MAPPING_ERROR)
 
+  @schedule_as_coop_task
+  def __proceed_remapping (self, nffg_id):
+    """
+    Remap a service request which was mapped on an invalidated speculative
+    resource view.
+
+    :param nffg_id: service request id
+    :type nffg_id: str or int
+    :return: None
+    """
+    log.getChild('API').info("Invoke remapping of request: %s" % nffg_id)
+    nffg = self.orchestrator.nffgManager.get(nffg_id=nffg_id)
+    try:
+      mapped_nffg = self.orchestrator.instantiate_nffg(nffg=nffg)
+    except ProcessorError as e:
+      self.__process_mapping_result(nffg_id=nffg_id, fail=True)
+      self.raiseEventNoErrors(InstantiationFinishedEvent,
+                              id=nffg_id,
+                              result=InstantiationFinishedEvent.REFUSED_BY_VERIFICATION,
+                              error=e)
+      return
+    if mapped_nffg is not None and not self.orchestrator.mapper.threaded:
+      self._proceed_to_install_NFFG(mapped_nffg=mapped_nffg,
+                                    original_request=nffg)
+    else:
+      log.error("Something went wrong in remapping: "
+                "mapped service request is missing!")
+      self.__process_mapping_result(nffg_id=nffg_id, fail=True)
+      self.raiseEventNoErrors(InstantiationFinishedEvent,
+                              id=nffg_id,
+                              result=InstantiationFinishedEvent.MAPPING_ERROR)
+
+  def __proceed_deploy_pipeline (self, nffg_id, fail):
+    """
+    Release the next waiting request after the deployment of the given
+    request has been finished or remap the waiting requests if the deployment
+    was unsuccessful.
+
+    :param nffg_id: deployed NFFG id
+    :type nffg_id: str or int
+    :param fail: mark the deploy step was failed
+    :type fail: bool
+    :return: None
+    """
+    pipeline = self.orchestrator.deployPipeline
+    if not pipeline.enabled:
+      return
+    if fail:
+      for mapped_nffg, original_request in pipeline.invalidate(id=nffg_id):
+        stats.add_measurement_end_entry(type=stats.TYPE_ORCHESTRATION_PIPELINE,
+                                        info=mapped_nffg.id,
+                                        request_id=mapped_nffg.id)
+        log.warning("Speculative mapping of request: %s is invalidated by the "
+                    "failed deployment of request: %s! Schedule remapping..."
+                    % (mapped_nffg.id, nffg_id))
+        self.__proceed_remapping(nffg_id=mapped_nffg.id)
+    else:
+      next_deploy = pipeline.pop_next(id=nffg_id)
+      if next_deploy is not None:
+        mapped_nffg, original_request = next_deploy
+        stats.add_measurement_end_entry(type=stats.TYPE_ORCHESTRATION_PIPELINE,
+                                        info=mapped_nffg.id,
+                                        request_id=mapped_nffg.id)
+        log.info("Proceed with the deployment of waiting request: %s" %
+                 mapped_nffg.id)
+        self.__raise_install_event(mapped_nffg=mapped_nffg,
+                                   original_request=original_request)
+
   def __process_mapping_result (self, nffg_id, fail):
     """
     Perform common tasks after the mapping alg has run and deploy is performed.
@@ -742,6 +823,29 @@ class ResourceOrchestrationAPI(AbstractAPI):
     # Log verbose mapping result in unified way (threaded/non-threaded)
     log.log(VERBOSE, "Mapping result of Orchestration Layer:\n%s" %
             mapped_nffg.dump())
+    pipeline = self.orchestrator.deployPipeline
+    if pipeline.enabled and not pipeline.push(mapped_nffg=mapped_nffg,
+                                              original_request=original_request):
+      stats.add_measurement_start_entry(type=stats.TYPE_ORCHESTRATION_PIPELINE,
+                                        info=mapped_nffg.id,
+                                        request_id=mapped_nffg.id)
+      log.getChild('API').info("Mapped NF-FG: %s is waiting for the "
+                               "deployment of previous requests: %s" %
+                               (mapped_nffg, pipeline.requests))
+      return
+    self.__raise_install_event(mapped_nffg=mapped_nffg,
+                               original_request=original_request)
+
+  def __raise_install_event (self, mapped_nffg, original_request=None):
+    """
+    Send mapped :class:`NFFG` to Controller Adaptation Sublayer.
+
+    :param mapped_nffg: mapped NF-FG
+    :type mapped_nffg: :class:`NFFG`
+    :param original_request: original request
+    :type original_request: :class:`NFFG`
+    :return: None
+    """
     # Sending NF-FG to Adaptation layer as an Event
     # Exceptions in event handlers are caught by default in a non-blocking way
     self.raiseEventNoErrors(InstallNFFGEvent,
@@ -888,19 +992,43 @@ class ResourceOrchestrationAPI(AbstractAPI):
         "NF-FG(%s) instantiation has been finished with error result: %s!" %
         (event.id, event.result))
       if InstantiationFinishedEvent.is_deploy_error(event.result):
+        # Never serve the same failed mapping result from the cache
+        self.__invalidate_cached_mapping(request_id=event.id)
         if CONFIG.get_trial_and_error(layer=LAYER_NAME):
           log.info("TRIAL_AND_ERROR is enabled! Reschedule for mapping...")
           self.__proceed_trial_and_error(original_request_id=event.id)
+          self.__proceed_deploy_pipeline(nffg_id=event.id, fail=True)
           return
         else:
           log.debug("TRIAL_AND_ERROR is disabled! Proceeding...")
     if not event.is_pending(event.result):
+      if event.is_error(event.result):
+        self.__invalidate_cached_mapping(request_id=event.id)
+      else:
+        mapper = self.orchestrator.mapper
+        if hasattr(mapper, 'release_cached_mapping'):
+          mapper.release_cached_mapping(request_id=event.id)
       self.__process_mapping_result(nffg_id=event.id,
                                     fail=event.is_error(event.result))
+      self.__proceed_deploy_pipeline(nffg_id=event.id,
+                                     fail=event.is_error(event.result))
     self.raiseEventNoErrors(InstantiationFinishedEvent,
                             id=event.id,
                             result=event.result)
 
+  def __invalidate_cached_mapping (self, request_id):
+    """
+    Evict the cached mapping result of the given request if the mapper
+    supports caching.
+
+    :param request_id: service request id
+    :type request_id: str or int
+    :return: None
+    """
+    mapper = self.orchestrator.mapper
+    if hasattr(mapper, 'invalidate_cached_mapping'):
+      mapper.invalidate_cached_mapping(request_id=request_id)
+
 
 class BasicUnifyRequestHandler(AbstractRequestHandler):
   """
@@ -1041,19 +1169,24 @@ class BasicUnifyRequestHandler(AbstractRequestHandler):
                         message="Cached info is missing from API!")
         return
       if self.virtualizer_format_enabled:
-        data = self.server.last_response.xml()
+        data = self.server.virtualizer_cache.xml(
+          virtualizer=self.server.last_response,
+          revision=self.server.topology_revision)
       else:
         data = self.server.last_response.dump()
     else:
       # Convert required NFFG if needed
       if self.virtualizer_format_enabled:
         self.log.debug("Convert internal NFFG to Virtualizer...")
-        v_topology = self.converter.dump_to_Virtualizer(nffg=resource_nffg)
+        v_topology = self.converter.dump_to_Virtualizer(
+          nffg=resource_nffg, cache=self.server.virtualizer_cache,
+          revision=self.server.topology_revision)
         # Cache converted data for edit-config patching
         self.log.debug("Cache converted topology...")
         self.server.last_response = v_topology
         # Dump to plain text format
-        data = v_topology.xml()
+        data = self.server.virtualizer_cache.xml(
+          virtualizer=v_topology, revision=self.server.topology_revision)
         # Setup HTTP response format
       else:
         self.log.debug("Cache acquired topology...")
@@ -1108,6 +1241,8 @@ class BasicUnifyRequestHandler(AbstractRequestHandler):
       # Get received Virtualizer
       received_cfg = Virtualizer.parse_from_text(text=raw_body)
       self.log.log(VERBOSE, "Received request:\n%s" % raw_body)
+      # Nodes changed by the diff, None means full conversion
+      changed_nodes = None
       # If there was not get-config request so far
       if self.DEFAULT_DIFF:
         if self.server.last_response is None:
@@ -1126,21 +1261,37 @@ class BasicUnifyRequestHandler(AbstractRequestHandler):
           # Convert required NFFG if needed
           if self.virtualizer_format_enabled:
             self.log.debug("Convert internal NFFG to Virtualizer...")
-            v_topology = self.converter.dump_to_Virtualizer(nffg=config)
+            v_topology = self.converter.dump_to_Virtualizer(
+              nffg=config, cache=self.server.virtualizer_cache,
+              revision=self.server.topology_revision)
             # Cache converted data for edit-config patching
             self.log.debug("Cache converted topology...")
             self.server.last_response = v_topology
           else:
             self.log.debug("Cache acquired topology...")
             self.server.last_response = config
+        # Scan the diff for the changed nodes before patching
+        changed_nodes = get_changed_nodes_from_diff(diff=raw_body)
         # Perform patching
         full_cfg = self.__recreate_full_request(diff=received_cfg)
       else:
         full_cfg = received_cfg
-      self.log.log(VERBOSE, "Received full request:\n%s" % full_cfg.xml())
-      # Convert response's body to NFFG
-      self.log.info("Converting full request data...")
-      nffg = self.converter.parse_from_Virtualizer(vdata=full_cfg)
+      if self.log.isEnabledFor(VERBOSE):
+        self.log.log(VERBOSE, "Received full request:\n%s" % full_cfg.xml())
+      if changed_nodes is not None:
+        # Update the NFFG of the cached topology with the changed nodes only
+        self.log.info("Converting changed nodes of request data: %s" %
+                      changed_nodes)
+        nffg = self.server.virtualizer_cache.nffg(
+          converter=self.converter, virtualizer=self.server.last_response,
+          revision=self.server.topology_revision)
+        self.converter.update_NFFG_from_Virtualizer(nffg=nffg,
+                                                    virtualizer=full_cfg,
+                                                    changed_nodes=changed_nodes)
+      else:
+        # Convert response's body to NFFG
+        self.log.info("Converting full request data...")
+        nffg = self.converter.parse_from_Virtualizer(vdata=full_cfg)
     else:
       if self.headers.get("Content-Type") != "application/json":
         self.log.error("Received data is not in JSON format despite of the "
@@ -1179,7 +1330,9 @@ class BasicUnifyRequestHandler(AbstractRequestHandler):
     """
     self.log.info("Patching cached topology with received diff...")
     # full_request = self.server.last_response.full_copy()
-    full_request = Virtualizer.parse_from_text(self.server.last_response.xml())
+    full_request = Virtualizer.parse_from_text(
+      self.server.virtualizer_cache.xml(virtualizer=self.server.last_response,
+                                        revision=self.server.topology_revision))
     full_request.patch(source=diff)
     # return full_request
     # Perform hack to resolve inconsistency
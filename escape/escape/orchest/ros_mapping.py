@@ -15,9 +15,11 @@
 Contains classes which implement :class:`NFFG` mapping functionality.
 """
 import cProfile
+import hashlib
 import pprint
 import pstats
 import time
+from collections import OrderedDict
 
 from alg1.MappingAlgorithms import MAP
 from alg1.UnifyExceptionTypes import *
@@ -72,14 +74,16 @@ class ESCAPEMappingStrategy(AbstractMappingStrategy):
     log.debug("Call mapping algorithm with parameters:\n%s" %
               pprint.pformat(params))
     stat_level = stat_level if stat_level else cls.__name__
-    stats.add_measurement_start_entry(type=stats_type, info=stat_level)
+    stats.add_measurement_start_entry(type=stats_type, info=stat_level,
+                                      request_id=request.id)
     try:
       if profiling:
         ret = cls.cprofiler_decorator(MAP, request, topology, **params)
       else:
         ret = cls.timer_decorator(MAP, request, topology, **params)
     finally:
-      stats.add_measurement_end_entry(type=stats_type, info=stat_level)
+      stats.add_measurement_end_entry(type=stats_type, info=stat_level,
+                                      request_id=request.id)
     return ret
 
   @staticmethod
@@ -278,6 +282,106 @@ class NFFGMappingFinishedEvent(Event):
     self.nffg = nffg
 
 
+class MappingCache(object):
+  """
+  LRU cache for the mapping results of identical service requests mapped on
+  the same revision of the resource view.
+
+  Changes of the global view bump its revision, which is part of the cache
+  key, so stale entries are never hit and simply age out of the LRU order.
+  """
+
+  def __init__ (self, size):
+    """
+    Init.
+
+    :param size: max number of cached mapping results
+    :type size: int
+    :return: None
+    """
+    self.size = size
+    self.__cache = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+  @staticmethod
+  def get_key (graph, revision):
+    """
+    Calculate the cache key of the given request and resource revision.
+
+    :param graph: service request
+    :type graph: :class:`NFFG`
+    :param revision: revision of the resource view
+    :type revision: int
+    :return: cache key
+    :rtype: tuple
+    """
+    # NFFG.dump() is already a key-sorted JSON so it is hashed as it is
+    return hashlib.md5(graph.dump()).hexdigest(), revision
+
+  def get (self, key):
+    """
+    Return the copy of the cached mapping result of the given key along with
+    the mapping states returned by the mapping algorithm.
+
+    :param key: cache key
+    :type key: tuple
+    :return: mapped NFFG, mapping state and persistent state or None
+    :rtype: tuple
+    """
+    entry = self.__cache.pop(key, None)
+    if entry is None:
+      self.misses += 1
+      return None
+    # Move the entry to the end as the most recently used one
+    self.__cache[key] = entry
+    self.hits += 1
+    mapped_nffg, mapping_state, persistent_state = entry
+    return mapped_nffg.copy(), mapping_state, persistent_state
+
+  def put (self, key, mapped_nffg, mapping_state=None, persistent_state=None):
+    """
+    Cache the copy of the given mapping result and evict the least recently
+    used entries over the size limit.
+
+    :param key: cache key
+    :type key: tuple
+    :param mapped_nffg: mapped NFFG
+    :type mapped_nffg: :class:`NFFG`
+    :param mapping_state: mapping state returned by the algorithm
+    :type mapping_state: object
+    :param persistent_state: persistent state returned by the algorithm
+    :type persistent_state: object
+    :return: None
+    """
+    self.__cache.pop(key, None)
+    self.__cache[key] = (mapped_nffg.copy(), mapping_state, persistent_state)
+    while len(self.__cache) > self.size:
+      self.__cache.popitem(last=False)
+
+  def remove (self, key):
+    """
+    Remove the cached mapping result of the given key.
+
+    :param key: cache key
+    :type key: tuple
+    :return: the entry was removed or not
+    :rtype: bool
+    """
+    return self.__cache.pop(key, None) is not None
+
+  def invalidate (self):
+    """
+    Remove all the cached mapping results.
+
+    :return: None
+    """
+    if self.__cache:
+      log.debug("Invalidate mapping cache (hits: %s, misses: %s)" %
+                (self.hits, self.misses))
+      self.__cache.clear()
+
+
 class ResourceOrchestrationMapper(AbstractMapper):
   """
   Helper class for mapping NF-FG on global virtual view.
@@ -301,6 +405,34 @@ class ResourceOrchestrationMapper(AbstractMapper):
       self.__class__.__name__, self.strategy.__name__))
     self.last_mapping_state = mapping_state
     self.persistent_state = persistent_state
+    cache_size = CONFIG.get_mapping_cache_size()
+    self.mapping_cache = MappingCache(cache_size) if cache_size > 0 else None
+    self.__pending_cache_key = None
+    # request id --> cache key of the mapping result under deployment
+    self.__served_keys = {}
+
+  def __get_cache_key (self, input_graph, resource_view, continued):
+    """
+    Return the mapping cache key of the given request if the mapping result
+    can be cached.
+
+    :param input_graph: Network Function Forwarding Graph
+    :type input_graph: :class:`NFFG`
+    :param resource_view: global resource view
+    :type resource_view: :any:`DomainVirtualizer`
+    :param continued: mapping is continued
+    :type continued: bool
+    :return: cache key or None
+    :rtype: tuple
+    """
+    # Continued mapping must not return with the same (failed) result
+    if self.mapping_cache is None or continued:
+      return None
+    revision = getattr(resource_view, 'revision', None)
+    if revision is None:
+      # Speculative or other unversioned views are not cached
+      return None
+    return self.mapping_cache.get_key(graph=input_graph, revision=revision)
 
   def _perform_mapping (self, input_graph, resource_view, continued=False):
     """
@@ -320,6 +452,27 @@ class ResourceOrchestrationMapper(AbstractMapper):
               "%s, continued remap: %s" % (self.__class__.__name__,
                                            input_graph, resource_view,
                                            continued))
+    cache_key = self.__get_cache_key(input_graph=input_graph,
+                                     resource_view=resource_view,
+                                     continued=continued)
+    if cache_key is not None:
+      entry = self.mapping_cache.get(cache_key)
+      stats.add_measurement_value_entry(
+        type=stats.TYPE_ORCHESTRATION_MAPPING_CACHE,
+        value=1 if entry is not None else 0, info=input_graph.id,
+        request_id=input_graph.id)
+      if entry is not None:
+        mapped_nffg, mapping_state, persistent_state = entry
+        log.info("Reuse cached mapping result of NF-FG: %s on resource "
+                 "revision: %s" % (input_graph, cache_key[1]))
+        # Restore the states as the mapping algorithm would have returned
+        self.last_mapping_state = mapping_state
+        self.persistent_state = persistent_state
+        self.__served_keys[input_graph.id] = cache_key
+        if self._threaded:
+          call_as_coop_task(self._mapping_finished, mapped_nffg=mapped_nffg)
+          return None
+        return mapped_nffg
     # Steps before mapping (optional)
     log.debug("Request global resource info...")
     virt_resource = resource_view.get_resource_info()
@@ -348,6 +501,9 @@ class ResourceOrchestrationMapper(AbstractMapper):
       # Schedule a microtask which run mapping algorithm in a Python thread
       log.info("Schedule mapping algorithm: %s in a worker thread" %
                self.strategy.__name__)
+      self.__pending_cache_key = cache_key
+      if cache_key is not None:
+        self.__served_keys[input_graph.id] = cache_key
       call_as_coop_task(self._start_mapping, graph=input_graph,
                         resource=virt_resource)
       log.info("NF-FG: %s orchestration is finished by %s" % (
@@ -386,6 +542,11 @@ class ResourceOrchestrationMapper(AbstractMapper):
         # Steps after mapping (optional)
         log.info("NF-FG: %s orchestration is finished by %s successfully!" % (
           input_graph, self.__class__.__name__))
+        if cache_key is not None:
+          self.mapping_cache.put(cache_key, mapped_nffg,
+                                 mapping_state=self.last_mapping_state,
+                                 persistent_state=self.persistent_state)
+          self.__served_keys[input_graph.id] = cache_key
       log.debug("Last mapping state: %s" % self.last_mapping_state)
       if self.last_mapping_state:
         log.debug("Mapping iteration: %s" %
@@ -403,9 +564,38 @@ class ResourceOrchestrationMapper(AbstractMapper):
     """
     # TODO - rethink threaded/non-threaded function call paths to call port
     # mapping functions in a joint way only once
+    cache_key, self.__pending_cache_key = self.__pending_cache_key, None
     if mapped_nffg is None:
       log.error("Mapping process is failed! Abort orchestration process.")
       return None
+    if cache_key is not None:
+      self.mapping_cache.put(cache_key, mapped_nffg,
+                             mapping_state=self.last_mapping_state,
+                             persistent_state=self.persistent_state)
     # Steps after mapping (optional) if the mapping was threaded
     log.debug("Inform actual layer API that NFFG mapping has been finished...")
     self.raiseEventNoErrors(NFFGMappingFinishedEvent, mapped_nffg)
+
+  def invalidate_cached_mapping (self, request_id):
+    """
+    Remove the cached mapping result of the given request, e.g. in case its
+    deployment has failed and the same result must not be served again.
+
+    :param request_id: service request id
+    :type request_id: str or int
+    :return: None
+    """
+    cache_key = self.__served_keys.pop(request_id, None)
+    if cache_key is not None and self.mapping_cache is not None:
+      if self.mapping_cache.remove(cache_key):
+        log.debug("Evict cached mapping result of request: %s" % request_id)
+
+  def release_cached_mapping (self, request_id):
+    """
+    Forget the cache key of a successfully deployed request.
+
+    :param request_id: service request id
+    :type request_id: str or int
+    :return: None
+    """
+    self.__served_keys.pop(request_id, None)
@@ -17,7 +17,8 @@ Contains classes relevant to Resource Orchestration Sublayer functionality.
 import ast
 from collections import OrderedDict
 
-from escape.adapt.virtualization import VirtualizerManager
+from escape.adapt.virtualization import VirtualizerManager, \
+  AbstractVirtualizer
 from escape.orchest import log as log, LAYER_NAME
 from escape.orchest.ros_mapping import ResourceOrchestrationMapper
 from escape.util.config import CONFIG
@@ -46,6 +47,8 @@ class ResourceOrchestrator(AbstractOrchestrator):
     super(ResourceOrchestrator, self).__init__(layer_API=layer_API)
     log.debug("Init %s" % self.__class__.__name__)
     self.nffgManager = NFFGManager()
+    # Track mapped requests under deployment for pipelined orchestration
+    self.deployPipeline = DeployPipeline(depth=CONFIG.get_ros_pipeline_depth())
     # Init virtualizer manager
     # Listeners must be weak references in order the layer API can garbage
     # collected
@@ -65,6 +68,7 @@ class ResourceOrchestrator(AbstractOrchestrator):
 
     :return: None
     """
+    super(ResourceOrchestrator, self).finalize()
     if self.nfibManager:
       self.nfibManager.finalize()
 
@@ -90,6 +94,13 @@ class ResourceOrchestrator(AbstractOrchestrator):
       log.info("Using original request for remapping: %s" % nffg)
     # Get Domain Virtualizer to acquire global domain view
     global_view = self.virtualizerManager.dov
+    # Use the speculative view if previous requests are under deployment
+    speculative_view = self.deployPipeline.get_speculative_view()
+    if speculative_view is not None:
+      log.info("Previous request(s): %s are under deployment! "
+               "Use speculative view for mapping: %s" %
+               (self.deployPipeline.requests, speculative_view))
+      global_view = speculative_view
     # Notify remote visualizer about resource view of this layer if it's needed
     # notify_remote_visualizer(data=global_view.get_resource_info(),
     #                          id=LAYER_NAME)
@@ -332,3 +343,152 @@ class NFFGManager(object):
 
   def __len__ (self):
     return len(self._nffgs)
+
+
+class SpeculativeResourceView(AbstractVirtualizer):
+  """
+  Virtualizer class offering the mapping result of the last request under
+  deployment as the resource view.
+
+  The mapping result contains the global resource view extended with the
+  resources reserved by the request itself and all the preceding requests
+  under deployment.
+  """
+  TYPE = 'SPECULATIVE'
+
+  def __init__ (self, nffg):
+    """
+    Init.
+
+    :param nffg: mapped request
+    :type nffg: :class:`NFFG`
+    :return: None
+    """
+    super(SpeculativeResourceView, self).__init__()
+    self.__nffg = nffg
+
+  def __str__ (self):
+    """
+    Return with specific string representation.
+
+    :return: string representation
+    :rtype: str
+    """
+    return "%s(based on: %s)" % (self.__class__.__name__, self.__nffg.id)
+
+  def get_resource_info (self):
+    """
+    Return the copy of the speculative resource info.
+
+    :return: speculative resource info
+    :rtype: :class:`NFFG`
+    """
+    return self.__nffg.copy()
+
+
+class DeployPipeline(object):
+  """
+  Track the mapped service requests of a pipelined orchestration.
+
+  Only one request is under deployment at a time. The subsequent requests
+  are mapped on a speculative view and wait for the deployment of the
+  preceding ones.
+  """
+
+  def __init__ (self, depth=1):
+    """
+    Init.
+
+    :param depth: max number of requests in the pipeline
+    :type depth: int
+    :return: None
+    """
+    super(DeployPipeline, self).__init__()
+    log.debug("Init %s with depth: %s" % (self.__class__.__name__, depth))
+    self.depth = depth
+    self._deploying = None
+    self._waiting = []
+
+  @property
+  def enabled (self):
+    """
+    :return: pipelining is enabled
+    :rtype: bool
+    """
+    return self.depth > 1
+
+  @property
+  def requests (self):
+    """
+    :return: ids of the tracked requests in deploy order
+    :rtype: list
+    """
+    tracked = [self._deploying] if self._deploying else []
+    tracked.extend(self._waiting)
+    return [mapped.id for mapped, original in tracked]
+
+  def get_speculative_view (self):
+    """
+    Return the speculative resource view based on the last mapped request or
+    None if no request is tracked.
+
+    :return: speculative view
+    :rtype: :any:`SpeculativeResourceView`
+    """
+    if self._waiting:
+      return SpeculativeResourceView(nffg=self._waiting[-1][0])
+    elif self._deploying:
+      return SpeculativeResourceView(nffg=self._deploying[0])
+
+  def push (self, mapped_nffg, original_request=None):
+    """
+    Add a mapped request to the pipeline.
+
+    :param mapped_nffg: mapped request
+    :type mapped_nffg: :class:`NFFG`
+    :param original_request: original request
+    :type original_request: :class:`NFFG`
+    :return: the request can be deployed immediately
+    :rtype: bool
+    """
+    if self._deploying is None:
+      self._deploying = (mapped_nffg, original_request)
+      return True
+    elif self._deploying[0].id == mapped_nffg.id:
+      # Remapped request e.g. in case of trial and error
+      self._deploying = (mapped_nffg, original_request)
+      return True
+    else:
+      self._waiting.append((mapped_nffg, original_request))
+      return False
+
+  def pop_next (self, id):
+    """
+    Remove the request given by id from deployment and return with the next
+    request which can be deployed.
+
+    :param id: deployed request id
+    :type id: str or int
+    :return: next mapped request and the original request or None
+    :rtype: tuple
+    """
+    if self._deploying is None or self._deploying[0].id != id:
+      return None
+    self._deploying = self._waiting.pop(0) if self._waiting else None
+    return self._deploying
+
+  def invalidate (self, id):
+    """
+    Remove the request given by id from deployment and drop the waiting
+    requests mapped on the invalid speculative view.
+
+    :param id: failed request id
+    :type id: str or int
+    :return: invalidated mapped and original requests in deploy order
+    :rtype: list
+    """
+    if self._deploying is None or self._deploying[0].id != id:
+      return []
+    self._deploying = None
+    invalid, self._waiting = self._waiting, []
+    return invalid
@@ -56,7 +56,8 @@ class InstantiateNFFGEvent(Event):
     super(InstantiateNFFGEvent, self).__init__()
     self.nffg = nffg
     self.resource_nffg = resource_nffg
-    stats.add_measurement_end_entry(type=stats.TYPE_SERVICE, info=LAYER_NAME)
+    stats.add_measurement_end_entry(type=stats.TYPE_SERVICE, info=LAYER_NAME,
+                                    request_id=nffg.id)
 
 
 class GetVirtResInfoEvent(Event):
@@ -309,6 +310,7 @@ class ServiceLayerAPI(AbstractAPI):
     :param event: event object
     """
     log.info("Service Layer is going down...")
+    self.service_orchestrator.finalize()
     if hasattr(self, 'rest_api') and self.rest_api:
       log.debug("REST-API: %s is shutting down..." % self.rest_api.api_id)
       # self.rest_api.stop()
@@ -404,7 +406,8 @@ class ServiceLayerAPI(AbstractAPI):
     """
     log.getChild('API').info("Invoke request_service on %s with SG: %s " %
                              (self.__class__.__name__, service_nffg))
-    stats.add_measurement_start_entry(type=stats.TYPE_SERVICE, info=LAYER_NAME)
+    stats.add_measurement_start_entry(type=stats.TYPE_SERVICE, info=LAYER_NAME,
+                                      request_id=service_nffg.id)
     # Check if mapping mode is set globally in CONFIG
     mapper_params = CONFIG.get_mapping_config(layer=LAYER_NAME)
     if 'mode' in mapper_params and mapper_params['mode'] is not None:
@@ -653,5 +656,5 @@ class ServiceLayerAPI(AbstractAPI):
                                    fail=event.is_error(event.result))
       # Quit ESCAPE if test mode is active
       if get_global_parameter(name="QUIT_AFTER_PROCESS"):
-        stats.finish_request_measurement()
+        stats.finish_request_measurement(request_id=event.id)
         quit_with_ok("Detected QUIT mode! Exiting ESCAPE...")
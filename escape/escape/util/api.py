@@ -25,12 +25,14 @@ import uuid
 from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
 from Queue import Queue
 from SocketServer import ThreadingMixIn
+from collections import OrderedDict
 
 import requests
 from requests.exceptions import Timeout, RequestException
 
 from escape import __project__
 from escape.util.config import CONFIG
+from escape.util.conversion import VirtualizerCache
 from escape.util.misc import SimpleStandaloneHelper, quit_with_error, \
   get_escape_version
 from escape.util.pox_extension import POXCoreRegisterMetaClass
@@ -462,6 +464,8 @@ class RESTServer(ThreadingMixIn, HTTPServer, object):
     # Cache for the last response to avoid topo recreation
     self.last_response = None
     self.topology_revision = None
+    # Cache for the Virtualizer conversion and serialization of the topology
+    self.virtualizer_cache = VirtualizerCache()
     self.scheduler = RequestScheduler()
     self.ping_response_code = self.PRE_UP_PING_CODE
 
@@ -1097,6 +1101,10 @@ class RequestScheduler(threading.Thread):
   """
   Manager class for registering and scheduling service requests registered from
   other thread.
+
+  By default the service requests are orchestrated one after another. Layers
+  which can handle overlapping orchestration can enable pipelining with
+  :meth:`enable_pipelining` to process multiple requests simultaneously.
   """
   __metaclass__ = POXCoreRegisterMetaClass
   _core_name = "RequestScheduler"
@@ -1110,7 +1118,10 @@ class RequestScheduler(threading.Thread):
     self.__queue = Queue()
     self.__hooks = {}
     self.__condition = threading.Condition()
-    self.__progress = None
+    # Requests in progress: request id --> layer name
+    self.__progress = OrderedDict()
+    # Pipelined layers: layer name --> max number of requests in progress
+    self.__pipelines = {}
     self.__standby = False
     self.log = core.getLogger("SCHEDULER")
     self.start()
@@ -1122,7 +1133,45 @@ class RequestScheduler(threading.Thread):
     :return: If any service request orchestration is in progress
     :rtype: bool
     """
-    return self.__progress is not None
+    return len(self.__progress) > 0
+
+  def enable_pipelining (self, layer, depth):
+    """
+    Enable to orchestrate at most ``depth`` number of service requests of the
+    given layer simultaneously.
+
+    :param layer: layer name
+    :type layer: str
+    :param depth: pipeline depth
+    :type depth: int
+    :return: None
+    """
+    with self.__condition:
+      if depth > 1:
+        self.log.info("Enable pipelined scheduling for layer: %s with depth: "
+                      "%s" % (layer, depth))
+        self.__pipelines[layer] = depth
+      else:
+        self.__pipelines.pop(layer, None)
+      self.__condition.notify_all()
+
+  def __is_schedulable (self, request):
+    """
+    Return True if the given request can be scheduled based on the requests
+    in progress.
+
+    :param request: scheduled request container object
+    :type request: APIRequest
+    :return: request can be scheduled
+    :rtype: bool
+    """
+    if not self.__progress:
+      return True
+    depth = self.__pipelines.get(request.layer)
+    if depth is None or len(self.__progress) >= depth:
+      return False
+    # Overlapping is allowed only between requests of the same layer
+    return all(l == request.layer for l in self.__progress.itervalues())
 
   def set_orchestration_finished (self, id):
     """
@@ -1132,18 +1181,20 @@ class RequestScheduler(threading.Thread):
     :type id: str or int
     :return: None
     """
-    if self.__progress is None:
-      self.log.debug("No orchestration in progress!")
-    elif self.__progress != id:
-      self.log.debug("Another request is in progress...")
-    else:
+    with self.__condition:
+      if not self.__progress:
+        self.log.debug("No orchestration in progress!")
+        return
+      elif id not in self.__progress:
+        self.log.debug("Another request is in progress...")
+        return
       self.log.info("Set orchestration status of request: %s --> FINISHED"
-                    % self.__progress)
-      stats.add_measurement_end_entry(stats.TYPE_SCHEDULED, id)
-      stats.finish_request_measurement()
-      with self.__condition:
-        self.__progress = None
-        self.__condition.notify()
+                    % id)
+      stats.add_measurement_end_entry(stats.TYPE_SCHEDULED, id,
+                                      request_id=id)
+      stats.finish_request_measurement(request_id=id)
+      del self.__progress[id]
+      self.__condition.notify_all()
 
   def schedule_request (self, id, layer, function, **kwargs):
     """
@@ -1166,17 +1217,22 @@ class RequestScheduler(threading.Thread):
                          function=function,
                          kwargs=kwargs)
     if not self.__standby:
+      stats.add_measurement_start_entry(stats.TYPE_SCHEDULER_QUEUE, id,
+                                        request_id=id)
       self.__queue.put(request)
+      stats.add_measurement_value_entry(stats.TYPE_SCHEDULER_QUEUE_LENGTH,
+                                        value=self.__queue.qsize(), info=id,
+                                        request_id=id)
       self.log.info("Schedule request: %s on %s --> %s..." % (id,
                                                               layer,
                                                               function))
     else:
-      if id == self.__progress:
+      if id in self.__progress:
         self.log.info("Continue service request in standby mode: %s..." % id)
         self._proceed_API_call(request)
       else:
-        self.log.error("Received request: %s is different from request in "
-                       "standby: %s" % (id, self.__progress))
+        self.log.error("Received request: %s is different from requests in "
+                       "standby: %s" % (id, self.__progress.keys()))
     self.log.debug("Remained requests: %s" % self.__queue.qsize())
 
   def set_orchestration_standby (self):
@@ -1187,7 +1243,7 @@ class RequestScheduler(threading.Thread):
     """
     self.__standby = True
     self.log.info("Set request in progress: %s in standby mode"
-                  % self.__progress)
+                  % self.__progress.keys())
 
   def _proceed_API_call (self, request):
     """
@@ -1200,7 +1256,8 @@ class RequestScheduler(threading.Thread):
     :return: None
     """
     self.log.info("Start request processing in coop-task: %s" % request)
-    stats.add_measurement_start_entry(stats.TYPE_SCHEDULED, request.id)
+    stats.add_measurement_start_entry(stats.TYPE_SCHEDULED, request.id,
+                                      request_id=request.id)
     if core.core.hasComponent(request.layer):
       layer = core.components[request.layer]
       if hasattr(layer, request.function):
@@ -1219,9 +1276,18 @@ class RequestScheduler(threading.Thread):
     :return: None
     """
     while True:
+      request = self.__queue.get()
       with self.__condition:
-        if self.__progress:
+        while not self.__is_schedulable(request):
           self.__condition.wait()
-        request = self.__queue.get()
-        self.__progress = request.id
+        stats.add_measurement_end_entry(stats.TYPE_SCHEDULER_QUEUE, request.id,
+                                        request_id=request.id)
+        stats.add_measurement_value_entry(stats.TYPE_SCHEDULER_QUEUE_LENGTH,
+                                          value=self.__queue.qsize(),
+                                          info=request.id,
+                                          request_id=request.id)
+        self.__progress[request.id] = request.layer
+        if len(self.__progress) > 1:
+          self.log.debug("Pipelined requests in progress: %s"
+                         % self.__progress.keys())
         self._proceed_API_call(request=request)
@@ -423,6 +423,58 @@ class ESCAPEConfig(object):
     except KeyError:
       return False
 
+  def get_mapping_processes (self, layer):
+    """
+    Return with the number of worker processes used for running the mapping
+    strategies of the given layer. If value is not defined: return 0 which
+    means the mapping runs in a worker thread.
+
+    :param layer: layer name
+    :type layer: str
+    :return: number of worker processes
+    :rtype: int
+    """
+    try:
+      return int(self.__configuration[layer]['STRATEGY']['PROCESSES'])
+    except (KeyError, ValueError, TypeError):
+      return 0
+
+  def get_mapping_timeout (self, layer):
+    """
+    Return with the timeout of a mapping process in the given layer.
+    If value is not defined: return None.
+
+    :param layer: layer name
+    :type layer: str
+    :return: timeout in sec
+    :rtype: float
+    """
+    try:
+      return float(self.__configuration[layer]['STRATEGY']['TIMEOUT'])
+    except (KeyError, ValueError, TypeError):
+      return None
+
+  def get_race_strategies (self, layer):
+    """
+    Return with the additional Strategy classes of the given layer which are
+    run in parallel with the default Strategy.
+
+    :param layer: layer name
+    :type layer: str
+    :return: list of Strategy classes
+    :rtype: list
+    """
+    strategies = []
+    try:
+      for strategy in self.__configuration[layer]['STRATEGY']['RACE']:
+        strategies.append(getattr(importlib.import_module(strategy['module']),
+                                  strategy['class']))
+    except KeyError:
+      pass
+    except (ImportError, AttributeError, TypeError) as e:
+      raise ConfigurationError("Wrong RACE strategy config: %s" % e)
+    return strategies
+
   def get_api_virtualizer (self, layer_name, api_name):
     """
     Return the type of the assigned Virtualizer.
@@ -559,6 +611,35 @@ class ESCAPEConfig(object):
     except KeyError:
       return {}
 
+  def get_mapping_cache_size (self):
+    """
+    Return the number of mapping results cached in the Resource Orchestration
+    Sublayer for identical service requests.
+
+    :return: size of the mapping cache (default: 0 - disabled)
+    :rtype: int
+    """
+    try:
+      return int(self.__configuration[ORCHEST]['MAPPING-CACHE-SIZE'])
+    except (KeyError, ValueError, TypeError):
+      return 0
+
+  def get_ros_pipeline_depth (self):
+    """
+    Return the number of service requests which can be orchestrated
+    simultaneously in the Resource Orchestration Sublayer.
+
+    Value greater than 1 enables to map the next service request against a
+    speculative resource view while the previous one is under deployment.
+
+    :return: pipeline depth (default: 1 - no pipelining)
+    :rtype: int
+    """
+    try:
+      return int(self.__configuration[ORCHEST]['PIPELINE-DEPTH'])
+    except (KeyError, ValueError, TypeError):
+      return 1
+
   ##############################################################################
   # ADAPTATION layer getters
   ##############################################################################
@@ -817,6 +898,34 @@ class ESCAPEConfig(object):
     except KeyError:
       return 0
 
+  def domain_deploy_workers (self):
+    """
+    Return the number of worker threads used for deploying the domain parts
+    of a service request concurrently.
+
+    :return: number of deploy workers (default: 1 - sequential deploy)
+    :rtype: int
+    """
+    try:
+      return int(
+        self.__configuration[ADAPT]['deployment']['DOMAIN-DEPLOY-WORKERS'])
+    except (KeyError, ValueError, TypeError):
+      return 1
+
+  def domain_state_max_age (self):
+    """
+    Return the freshness bound of the cached domain state used for deployment
+    instead of an explicit 'get-config' call.
+
+    :return: max age of the cached domain state in sec (default: 0 - disabled)
+    :rtype: float
+    """
+    try:
+      return float(
+        self.__configuration[ADAPT]['deployment']['DOMAIN-STATE-MAX-AGE'])
+    except (KeyError, ValueError, TypeError):
+      return 0
+
   def use_remerge_update_strategy (self):
     """
     Return True if the re-merge update strategy is enabled in DoV updating
@@ -830,6 +939,20 @@ class ESCAPEConfig(object):
     except KeyError:
       return True
 
+  def use_delta_update_strategy (self):
+    """
+    Return True if the delta-based update strategy is enabled in DoV updating.
+    This approach applies only the calculated differences of the domain view
+    and falls back to the configured strategy in case of structural changes.
+
+    :return: delta update strategy is enabled or not (default: False)
+    :rtype: bool
+    """
+    try:
+      return self.__configuration[ADAPT]['DOV']['USE-DELTA-UPDATE-STRATEGY']
+    except KeyError:
+      return False
+
   def use_status_based_update (self):
     """
     Return True if the status based update strategy is enabled.
@@ -19,6 +19,7 @@ import json
 import logging
 import re
 import sys
+import threading
 
 try:
   # Import for ESCAPEv2
@@ -1135,206 +1136,222 @@ class NFFGConverter(object):
     """
     # Iterate over virtualizer/nodes --> node = Infra
     for vnode in virtualizer.nodes:
-      # Node params
-      # Add domain name to the node id if unique_id is set
-      node_id = self._gen_unique_bb_id(vnode)
-      if vnode.name.is_initialized():  # Optional - node.name
-        node_name = vnode.name.get_value()
-      else:
-        node_name = None
-      node_domain = self.domain  # Set domain as the domain of the Converter
-      node_type = vnode.type.get_value()  # Mandatory - virtualizer.type
-      # Node-resources params
-      if vnode.resources.is_initialized():
-        # Remove units and store the value only
-        node_cpu = vnode.resources.cpu.get_as_text().split(' ')[0]
-        node_mem = vnode.resources.mem.get_as_text().split(' ')[0]
-        node_storage = vnode.resources.storage.get_as_text().split(' ')[0]
-        try:
-          node_cpu = float(node_cpu) if node_cpu is not None else None
-        except ValueError as e:
-          self.log.warning("Resource cpu value is not valid number: %s" % e)
-        try:
-          node_mem = float(node_mem) if node_mem is not None else None
-        except ValueError as e:
-          self.log.warning("Resource mem value is not valid number: %s" % e)
-        try:
-          node_storage = float(
-            node_storage) if node_storage is not None else None
-        except ValueError as e:
-          self.log.warning("Resource storage value is not valid number: %s" % e)
-      else:
-        # Default value for cpu,mem,storage: None
-        node_cpu = node_mem = node_storage = None
-      # Try to get bw value from metadata
-      if 'bandwidth' in vnode.metadata:
-        # Converted to float in Infra constructor
-        node_bw = vnode.metadata['bandwidth'].value.get_value()
-      else:
-        # Iterate over links to summarize bw value for infra node
-        node_bw = [
-          float(vlink.resources.bandwidth.get_value())
-          for vlink in vnode.links if vlink.resources.is_initialized() and
-                                      vlink.resources.bandwidth.is_initialized()]
-        # Default value: None
-        node_bw = min(node_bw) if node_bw else None
+      self._parse_virtualizer_node(nffg=nffg, vnode=vnode)
+
+  def _parse_virtualizer_node (self, nffg, vnode):
+    """
+    Parse one Infrastructure node with its ports, NFs and flowentries from
+    Virtualizer.
+
+    :param nffg: Container NFFG
+    :type nffg: :class:`NFFG`
+    :param vnode: Virtualizer node
+    :type vnode: Infra_node
+    :return: created Infra node
+    :rtype: :any:`NodeInfra`
+    """
+    # Node params
+    # Add domain name to the node id if unique_id is set
+    node_id = self._gen_unique_bb_id(vnode)
+    if vnode.name.is_initialized():  # Optional - node.name
+      node_name = vnode.name.get_value()
+    else:
+      node_name = None
+    node_domain = self.domain  # Set domain as the domain of the Converter
+    node_type = vnode.type.get_value()  # Mandatory - virtualizer.type
+    # Node-resources params
+    if vnode.resources.is_initialized():
+      # Remove units and store the value only
+      node_cpu = vnode.resources.cpu.get_as_text().split(' ')[0]
+      node_mem = vnode.resources.mem.get_as_text().split(' ')[0]
+      node_storage = vnode.resources.storage.get_as_text().split(' ')[0]
       try:
-        if node_bw is not None:
-          node_bw = float(node_bw)
+        node_cpu = float(node_cpu) if node_cpu is not None else None
       except ValueError as e:
-        self.log.warning(
-          "Resource bandwidth value is not valid number: %s" % e)
-      if 'delay' in vnode.metadata:
-        # Converted to float in Infra constructor
-        node_delay = vnode.metadata['delay'].value.get_value()
-      else:
-        # Iterate over links to summarize delay value for infra node
-        node_delay = [
-          float(vlink.resources.delay.get_value())
-          for vlink in vnode.links if vlink.resources.is_initialized() and
-                                      vlink.resources.delay.is_initialized()]
-        # Default value: None
-        node_delay = max(node_delay) if node_delay else None
+        self.log.warning("Resource cpu value is not valid number: %s" % e)
       try:
-        if node_delay is not None:
-          node_delay = float(node_delay)
+        node_mem = float(node_mem) if node_mem is not None else None
       except ValueError as e:
-        self.log.warning("Resource delay value is not valid number: %s" % e)
-      # Add Infra Node to NFFG
-      infra = nffg.add_infra(id=node_id, name=node_name, domain=node_domain,
-                             infra_type=node_type, cpu=node_cpu, mem=node_mem,
-                             storage=node_storage, delay=node_delay,
-                             bandwidth=node_bw)
-      self.log.debug("Created INFRA node: %s" % infra)
-      self.log.debug("Parsed resources: %s" % infra.resources)
-      for vlink in vnode.links:
-        if vlink.resources.is_initialized() and \
-           vlink.resources.delay.is_initialized():
-          dm_src = vlink.src.get_target().id.get_value()
-          dm_dst = vlink.dst.get_target().id.get_value()
-          dm_delay = float(vlink.resources.delay.get_value())
-          infra.delay_matrix.add_delay(src=dm_src, dst=dm_dst, delay=dm_delay)
-          self.log.debug("Added delay: %s to delay matrix [%s --> %s]"
-                         % (dm_delay, dm_src, dm_dst))
-
-      # Add supported types shrinked from the supported NF list
-      for sup_nf in vnode.capabilities.supported_NFs:
-        infra.add_supported_type(sup_nf.type.get_value())
-
-      # Handle operation tag
-      if vnode.get_operation() is not None:
-        self.log.debug("Found operation tag: %s for node: %s" % (
-          vnode.get_operation(), vnode.id.get_value()))
-        infra.operation = vnode.get_operation()
-
-      # Parse Ports
-      self._parse_virtualizer_node_ports(nffg=nffg, infra=infra, vnode=vnode)
-
-      # Parse NF_instances
-      self._parse_virtualizer_node_nfs(nffg=nffg, infra=infra, vnode=vnode)
-
-      # Parse Flowentries
-      self._parse_virtualizer_node_flowentries(nffg=nffg, infra=infra,
-                                               vnode=vnode)
-
-      self.log.debug("Parse INFRA node constraints...")
-      if vnode.constraints.is_initialized():
-        # Add affinity list
-        if vnode.constraints.affinity.is_initialized():
-          for aff in vnode.constraints.affinity.values():
-            aff = infra.constraints.add_affinity(
-              id=aff.id.get_value(),
-              value=aff.object.get_value())
-            self.log.debug("Add affinity: %s to %s" % (aff, infra.id))
-        # Add antiaffinity list
-        if vnode.constraints.antiaffinity.is_initialized():
-          for naff in vnode.constraints.antiaffinity.values():
-            naff = infra.constraints.add_antiaffinity(
-              id=naff.id.get_value(),
-              value=naff.object.get_value())
-            self.log.debug("Add antiaffinity: %s to %s" % (naff, infra.id))
-        # Add variables dict
-        if vnode.constraints.variable.is_initialized():
-          for var in vnode.constraints.variable.values():
-            var = infra.constraints.add_variable(
-              key=var.id.get_value(),
-              id=var.object.get_value())
-            self.log.debug("Add variable: %s to %s" % (var, infra.id))
-        # Add constraint list
-        if vnode.constraints.constraint.is_initialized():
-          for constraint in vnode.constraints.constraint.values():
-            formula = infra.constraints.add_constraint(
-              id=constraint.id.get_value(),
-              formula=constraint.formula.get_value())
-            self.log.debug("Add constraint: %s to %s" % (formula, infra.id))
-
-      # Copy metadata
-      self.log.debug("Parse Infra node metadata...")
-      for key in vnode.metadata:  # Optional - node.metadata
-        if key in ('bandwidth', 'delay'):
-          # Internally used metadata --> already processed
-          pass
-        elif str(key).startswith("constraint"):
-          self.log.debug("Constraint entry detected!")
-          raw = vnode.metadata[key].value.get_value()
-          values = json.loads(raw.replace("'", '"'))
-          self.log.log(VERBOSE, "Parsed metadata:\n%s" % values)
-          bandwidth = path = delay = None
-          if "bandwidth" in values:
-            try:
-              bandwidth = float(values['bandwidth']['value'])
-            except ValueError:
-              self.log.warning("Bandwidth in requirement metadata: %s is not a "
-                               "valid float value!" % values['bandwidth'])
-            path = values['bandwidth']['path']
+        self.log.warning("Resource mem value is not valid number: %s" % e)
+      try:
+        node_storage = float(
+          node_storage) if node_storage is not None else None
+      except ValueError as e:
+        self.log.warning("Resource storage value is not valid number: %s" % e)
+    else:
+      # Default value for cpu,mem,storage: None
+      node_cpu = node_mem = node_storage = None
+    # Try to get bw value from metadata
+    if 'bandwidth' in vnode.metadata:
+      # Converted to float in Infra constructor
+      node_bw = vnode.metadata['bandwidth'].value.get_value()
+    else:
+      # Iterate over links to summarize bw value for infra node
+      node_bw = [
+        float(vlink.resources.bandwidth.get_value())
+        for vlink in vnode.links if vlink.resources.is_initialized() and
+                                    vlink.resources.bandwidth.is_initialized()]
+      # Default value: None
+      node_bw = min(node_bw) if node_bw else None
+    try:
+      if node_bw is not None:
+        node_bw = float(node_bw)
+    except ValueError as e:
+      self.log.warning(
+        "Resource bandwidth value is not valid number: %s" % e)
+    if 'delay' in vnode.metadata:
+      # Converted to float in Infra constructor
+      node_delay = vnode.metadata['delay'].value.get_value()
+    else:
+      # Iterate over links to summarize delay value for infra node
+      node_delay = [
+        float(vlink.resources.delay.get_value())
+        for vlink in vnode.links if vlink.resources.is_initialized() and
+                                    vlink.resources.delay.is_initialized()]
+      # Default value: None
+      node_delay = max(node_delay) if node_delay else None
+    try:
+      if node_delay is not None:
+        node_delay = float(node_delay)
+    except ValueError as e:
+      self.log.warning("Resource delay value is not valid number: %s" % e)
+    # Add Infra Node to NFFG
+    infra = nffg.add_infra(id=node_id, name=node_name, domain=node_domain,
+                           infra_type=node_type, cpu=node_cpu, mem=node_mem,
+                           storage=node_storage, delay=node_delay,
+                           bandwidth=node_bw)
+    self.log.debug("Created INFRA node: %s" % infra)
+    self.log.debug("Parsed resources: %s" % infra.resources)
+    for vlink in vnode.links:
+      if vlink.resources.is_initialized() and \
+         vlink.resources.delay.is_initialized():
+        dm_src = vlink.src.get_target().id.get_value()
+        dm_dst = vlink.dst.get_target().id.get_value()
+        dm_delay = float(vlink.resources.delay.get_value())
+        infra.delay_matrix.add_delay(src=dm_src, dst=dm_dst, delay=dm_delay)
+        self.log.debug("Added delay: %s to delay matrix [%s --> %s]"
+                       % (dm_delay, dm_src, dm_dst))
+
+    # Add supported types shrinked from the supported NF list
+    for sup_nf in vnode.capabilities.supported_NFs:
+      infra.add_supported_type(sup_nf.type.get_value())
 
-          if "delay" in values:
-            try:
-              delay = float(values['delay']['value'])
-            except ValueError:
-              self.log.warning("Delay in requirement metadata: %s is not a "
-                               "valid float value!" % values['delay'])
-            if path != values['delay']['path']:
-              self.log.warning(
-                "Delay/bandwidth path entry is different in E2E requirement "
-                "metadata: %s!" % raw)
-              continue
+    # Handle operation tag
+    if vnode.get_operation() is not None:
+      self.log.debug("Found operation tag: %s for node: %s" % (
+        vnode.get_operation(), vnode.id.get_value()))
+      infra.operation = vnode.get_operation()
+
+    # Parse Ports
+    self._parse_virtualizer_node_ports(nffg=nffg, infra=infra, vnode=vnode)
+
+    # Parse NF_instances
+    self._parse_virtualizer_node_nfs(nffg=nffg, infra=infra, vnode=vnode)
+
+    # Parse Flowentries
+    self._parse_virtualizer_node_flowentries(nffg=nffg, infra=infra,
+                                             vnode=vnode)
+
+    self.log.debug("Parse INFRA node constraints...")
+    if vnode.constraints.is_initialized():
+      # Add affinity list
+      if vnode.constraints.affinity.is_initialized():
+        for aff in vnode.constraints.affinity.values():
+          aff = infra.constraints.add_affinity(
+            id=aff.id.get_value(),
+            value=aff.object.get_value())
+          self.log.debug("Add affinity: %s to %s" % (aff, infra.id))
+      # Add antiaffinity list
+      if vnode.constraints.antiaffinity.is_initialized():
+        for naff in vnode.constraints.antiaffinity.values():
+          naff = infra.constraints.add_antiaffinity(
+            id=naff.id.get_value(),
+            value=naff.object.get_value())
+          self.log.debug("Add antiaffinity: %s to %s" % (naff, infra.id))
+      # Add variables dict
+      if vnode.constraints.variable.is_initialized():
+        for var in vnode.constraints.variable.values():
+          var = infra.constraints.add_variable(
+            key=var.id.get_value(),
+            id=var.object.get_value())
+          self.log.debug("Add variable: %s to %s" % (var, infra.id))
+      # Add constraint list
+      if vnode.constraints.constraint.is_initialized():
+        for constraint in vnode.constraints.constraint.values():
+          formula = infra.constraints.add_constraint(
+            id=constraint.id.get_value(),
+            formula=constraint.formula.get_value())
+          self.log.debug("Add constraint: %s to %s" % (formula, infra.id))
+
+    # Copy metadata
+    self.log.debug("Parse Infra node metadata...")
+    for key in vnode.metadata:  # Optional - node.metadata
+      if key in ('bandwidth', 'delay'):
+        # Internally used metadata --> already processed
+        pass
+      elif str(key).startswith("constraint"):
+        self.log.debug("Constraint entry detected!")
+        raw = vnode.metadata[key].value.get_value()
+        values = json.loads(raw.replace("'", '"'))
+        self.log.log(VERBOSE, "Parsed metadata:\n%s" % values)
+        bandwidth = path = delay = None
+        if "bandwidth" in values:
+          try:
+            bandwidth = float(values['bandwidth']['value'])
+          except ValueError:
+            self.log.warning("Bandwidth in requirement metadata: %s is not a "
+                             "valid float value!" % values['bandwidth'])
+          path = values['bandwidth']['path']
 
-          src_port = dst_port = None
-          if path is None:
+        if "delay" in values:
+          try:
+            delay = float(values['delay']['value'])
+          except ValueError:
+            self.log.warning("Delay in requirement metadata: %s is not a "
+                             "valid float value!" % values['delay'])
+          if path != values['delay']['path']:
+            self.log.warning(
+              "Delay/bandwidth path entry is different in E2E requirement "
+              "metadata: %s!" % raw)
             continue
-          sg_id = int(path[0])
-          for p in infra.ports:
-            for f in p.flowrules:
-              if f.id == sg_id:
-                src_port = p
-                self.log.debug("Found src port: %s" % p.id)
-                break
-          sg_id = int(path[-1])
-          for f in infra.flowrules():
+
+        src_port = dst_port = None
+        if path is None:
+          continue
+        sg_id = int(path[0])
+        for p in infra.ports:
+          for f in p.flowrules:
             if f.id == sg_id:
-              dst_port_id = f.action.split(';')[0].split('=')[1]
-              dst_port = infra.ports[dst_port_id]
-              self.log.debug("Found dst port: %s" % dst_port_id)
+              src_port = p
+              self.log.debug("Found src port: %s" % p.id)
               break
+        sg_id = int(path[-1])
+        for f in infra.flowrules():
+          if f.id == sg_id:
+            dst_port_id = f.action.split(';')[0].split('=')[1]
+            dst_port = infra.ports[dst_port_id]
+            self.log.debug("Found dst port: %s" % dst_port_id)
+            break
+
+        if src_port is None or dst_port is None:
+          self.log.warning(
+            "Port reference is missing for Requirement link!")
+          continue
+        req_id = str(key).split(':')[1]
+        req = nffg.add_req(id=req_id,
+                           src_port=src_port,
+                           dst_port=dst_port,
+                           bandwidth=bandwidth,
+                           delay=delay,
+                           sg_path=path)
+        self.log.debug("Created Requirement link: %s" % req)
+      else:
+        infra.add_metadata(name=key,
+                           value=vnode.metadata[key].value.get_value())
+    return infra
 
-          if src_port is None or dst_port is None:
-            self.log.warning(
-              "Port reference is missing for Requirement link!")
-            continue
-          req_id = str(key).split(':')[1]
-          req = nffg.add_req(id=req_id,
-                             src_port=src_port,
-                             dst_port=dst_port,
-                             bandwidth=bandwidth,
-                             delay=delay,
-                             sg_path=path)
-          self.log.debug("Created Requirement link: %s" % req)
-        else:
-          infra.add_metadata(name=key,
-                             value=vnode.metadata[key].value.get_value())
 
-  def _parse_virtualizer_links (self, nffg, virtualizer):
+  def _parse_virtualizer_links (self, nffg, virtualizer, nodes=None):
     """
     Parse links from Virtualizer.
 
@@ -1342,6 +1359,8 @@ class NFFGConverter(object):
     :type nffg: :class:`NFFG`
     :param virtualizer: Virtualizer object
     :type virtualizer: Virtualizer
+    :param nodes: parse only the links connected to these Infra ids (optional)
+    :type nodes: set
     :return: None
     """
     # Store added link in a separate structure for simplicity and speed
@@ -1364,6 +1383,10 @@ class NFFGConverter(object):
       dst_node = dst_port.get_parent().get_parent()
       # Add domain name to the node id if unique_id is set
       dst_node_id = self._gen_unique_bb_id(dst_node)
+      if nodes is not None and src_node_id not in nodes and \
+         dst_node_id not in nodes:
+        # Link is not affected
+        continue
       try:
         src_port_id = int(src_port.id.get_value())
       except ValueError:
@@ -1621,6 +1644,77 @@ class NFFGConverter(object):
       V_VERSION, N_VERSION))
     return (nffg, virtualizer) if with_virt else nffg
 
+  def update_NFFG_from_Virtualizer (self, nffg, virtualizer, changed_nodes,
+                                    create_sg_hops=False):
+    """
+    Update the given NFFG which was converted from a previous version of the
+    given Virtualizer by reconverting only the changed Infra nodes.
+
+    The Infra nodes given in ``changed_nodes`` are removed along with their
+    NFs and SAPs then parsed again with the connected static links. Nodes
+    sharing a SAP with a changed node are reconverted as well to recreate
+    every link of the SAP. The node set and the links of the Virtualizer must
+    be the same as the ones used for the creation of the given NFFG.
+
+    :param nffg: previously converted NFFG, updated in place
+    :type nffg: :class:`NFFG`
+    :param virtualizer: changed Virtualizer object
+    :type virtualizer: Virtualizer
+    :param changed_nodes: ids of the changed Virtualizer nodes
+    :type changed_nodes: list
+    :param create_sg_hops: create the SG hops (default: False)
+    :type create_sg_hops: bool
+    :return: updated NF-FG
+    :rtype: :class:`NFFG`
+    """
+    self.log.debug("START partial conversion of nodes: %s" % changed_nodes)
+    changed_infras = {self._gen_unique_bb_id(virtualizer.nodes[node_id])
+                      for node_id in changed_nodes}
+    # Removed SAPs lose their links to the untouched nodes too
+    pending = list(changed_infras)
+    while pending:
+      infra_id = pending.pop()
+      if infra_id not in nffg:
+        continue
+      for sap in [n for n in nffg.network.neighbors(infra_id)
+                  if nffg[n].type == NFFG.TYPE_SAP]:
+        for node_id in nffg.network.neighbors(sap):
+          if node_id not in changed_infras:
+            self.log.debug("Node: %s shares SAP: %s with a changed node! "
+                           "Reconvert node..." % (node_id, sap))
+            changed_infras.add(node_id)
+            pending.append(node_id)
+    # Keep the order of the full conversion
+    vnodes = [vnode for vnode in virtualizer.nodes
+              if self._gen_unique_bb_id(vnode) in changed_infras]
+    for vnode in vnodes:
+      infra_id = self._gen_unique_bb_id(vnode)
+      if infra_id in nffg:
+        # Remove deployed NFs and connected SAPs of the changed node
+        for nf in [nf for nf in nffg.running_nfs(infra_id)]:
+          self.log.debug("Remove NF: %s" % nf.id)
+          nffg.del_node(nf.id)
+        for sap in [n for n in nffg.network.neighbors(infra_id)
+                    if nffg[n].type == NFFG.TYPE_SAP]:
+          self.log.debug("Remove SAP: %s" % sap)
+          nffg.del_node(sap)
+        # Remove Infra with its static links and flowrules
+        nffg.del_node(infra_id)
+    for vnode in vnodes:
+      self._parse_virtualizer_node(nffg=nffg, vnode=vnode)
+    # Recreate the static links of the changed nodes
+    self._parse_virtualizer_links(nffg=nffg, virtualizer=virtualizer,
+                                  nodes=changed_infras)
+    self._parse_virtualizer_metadata(nffg=nffg, virtualizer=virtualizer)
+    # Formulas of the untouched nodes have been already processed and removed.
+    # Requirement links of the changed nodes were removed along with the nodes
+    # so the per-node ids are generated the same way as in full conversion.
+    self._parse_virtualizer_requirement(nffg=nffg)
+    if create_sg_hops:
+      self._parse_sghops_from_flowrules(nffg=nffg)
+    self.log.debug("END partial conversion of nodes: %s" % changed_nodes)
+    return nffg
+
   def _convert_nffg_infras (self, nffg, virtualizer):
     """
     Convert infras in the given :class:`NFFG` into the given Virtualizer.
@@ -1666,14 +1760,8 @@ class NFFGConverter(object):
       for port in infra.ports:
         # Check if the port is a dynamic port : 23412423523445 or sap1|comp|1
         # If it is a dynamic port, skip conversion
-        try:
-          if not int(port.id) < 65536:
-            # Dynamic port connected to a VNF - skip
-            continue
-        except ValueError:
-          # port is not a number
-          if '|' in str(port.id):
-            continue
+        if self.__is_dynamic_port(port):
+          continue
         v_port = virt_lib.Port(id=str(port.id))
         # If SAP property is exist: this port connected to a SAP
         if port.sap is not None:
@@ -1841,11 +1929,9 @@ class NFFGConverter(object):
       for s, n, link in nffg.network.edges_iter([sap.id], data=True):
         if link.type != NFFG.TYPE_LINK_STATIC:
           continue
-        print s, n, link
         sap_port = link.src
         # Rewrite port-type to port-sap
         infra_id = self.recreate_bb_id(id=n)
-        print virtualizer.xml()
         v_sap_port = virtualizer.nodes[infra_id].ports[str(link.dst.id)]
         v_sap_port.port_type.set_value(self.TYPE_VIRTUALIZER_PORT_SAP)
 
@@ -2456,19 +2542,44 @@ class NFFGConverter(object):
                                          flowrule=flowrule,
                                          virtualizer=virtualizer)
 
-  def dump_to_Virtualizer (self, nffg):
+  def dump_to_Virtualizer (self, nffg, cache=None, revision=None):
     """
     Convert given :class:`NFFG` to Virtualizer format.
 
     :param nffg: topology description
     :type nffg: :class:`NFFG`
+    :param cache: reuse previous conversions of the same view (optional)
+    :type cache: :class:`VirtualizerCache`
+    :param revision: revision of the view the given NFFG is acquired from
+    :type revision: int
     :return: topology in Virtualizer format
     :rtype: Virtualizer
     """
     self.log.debug(
       "START conversion: NFFG(ver: %s) --> Virtualizer(ver: %s)" % (
         N_VERSION, V_VERSION))
+    if cache is not None:
+      virtualizer = cache.convert(converter=self, nffg=nffg,
+                                  revision=revision)
+    else:
+      virtualizer = self._dump_topology_base(nffg=nffg)
+      self._dump_deployment(nffg=nffg, virtualizer=virtualizer)
+    self.log.debug(
+      "END conversion: NFFG(ver: %s) --> Virtualizer(ver: %s)" % (
+        N_VERSION, V_VERSION))
+    # Return with created Virtualizer
+    return virtualizer
+
+  def _dump_topology_base (self, nffg):
+    """
+    Convert the metadata, infras, SAPs and static links of the given
+    :class:`NFFG` into a new Virtualizer.
 
+    :param nffg: topology description
+    :type nffg: :class:`NFFG`
+    :return: topology base in Virtualizer format
+    :rtype: Virtualizer
+    """
     self.log.debug("Converting data to XML-based Virtualizer structure...")
     # Create Virtualizer with default id,name
     v_id = str(nffg.id)
@@ -2487,6 +2598,19 @@ class NFFGConverter(object):
     self._convert_nffg_saps(nffg=nffg, virtualizer=virtualizer)
     # Convert edge links
     self._convert_nffg_edges(nffg=nffg, virtualizer=virtualizer)
+    return virtualizer
+
+  def _dump_deployment (self, nffg, virtualizer):
+    """
+    Convert the NFs, flowrules, requirements and constraints of the given
+    :class:`NFFG` into the given topology base.
+
+    :param nffg: topology description
+    :type nffg: :class:`NFFG`
+    :param virtualizer: topology base in Virtualizer format
+    :type virtualizer: Virtualizer
+    :return: None
+    """
     # Convert NFs
     self._convert_nffg_nfs(nffg=nffg, virtualizer=virtualizer)
     # Convert Flowrules
@@ -2497,11 +2621,22 @@ class NFFGConverter(object):
     self._convert_nffg_constraints(nffg=nffg, virtualizer=virtualizer)
     # explicitly call bind to resolve relative paths for safety reason
     virtualizer.bind(relative=True)
-    self.log.debug(
-      "END conversion: NFFG(ver: %s) --> Virtualizer(ver: %s)" % (
-        N_VERSION, V_VERSION))
-    # Return with created Virtualizer
-    return virtualizer
+
+  @staticmethod
+  def __is_dynamic_port (port):
+    """
+    Return True if the given Infra port is a dynamic port connected to a VNF.
+    Dynamic ports are skipped from the Infra conversion.
+
+    :param port: Infra port
+    :type port: :class:`Port`
+    :return: port is dynamic
+    :rtype: bool
+    """
+    try:
+      return not int(port.id) < 65536
+    except ValueError:
+      return '|' in str(port.id)
 
   @staticmethod
   def clear_installed_elements (virtualizer):
@@ -2724,6 +2859,137 @@ class NFFGConverter(object):
 
 
 # noinspection PyShadowingNames
+class VirtualizerCache(object):
+  """
+  Cache the NFFG --> Virtualizer conversion of a topology view between its
+  revisions.
+
+  The revision of the view is increased by every change of its content, so
+  the converted Virtualizer is reused as long as the revision of the converted
+  view has not changed. The serialized XML and the NFFG parsed back from the
+  Virtualizer (the base of the edit-config diffs) are also cached per topology
+  revision to send the same body to every client.
+
+  .. warning::
+    The returned Virtualizers are shared and must not be modified!
+  """
+
+  def __init__ (self, logger=None):
+    """
+    Init.
+
+    :param logger: optional logger
+    :type logger: str or :any:`logging.Logger`
+    :return: None
+    """
+    self.log = logger if logger is not None else logging.getLogger(__name__)
+    # Conversions can be requested from concurrent REST-API threads
+    self.__lock = threading.RLock()
+    self.__revision = None
+    self.__virtualizer = None
+    self.__xml_revision = None
+    self.__xml_source = None
+    self.__xml = None
+    self.__nffg_revision = None
+    self.__nffg_source = None
+    self.__nffg = None
+    # Metrics
+    self.hits = 0
+    self.misses = 0
+
+  def convert (self, converter, nffg, revision=None):
+    """
+    Convert the given :class:`NFFG` with the given converter reusing the
+    previous conversion if the revision of the view has not changed.
+
+    Without revision the NFFG is always converted and the result is not
+    cached.
+
+    :param converter: converter object
+    :type converter: :class:`NFFGConverter`
+    :param nffg: topology description
+    :type nffg: :class:`NFFG`
+    :param revision: revision of the view the given NFFG is acquired from
+    :type revision: int
+    :return: topology in Virtualizer format
+    :rtype: Virtualizer
+    """
+    with self.__lock:
+      if revision is not None and self.__virtualizer is not None and \
+         revision == self.__revision:
+        self.hits += 1
+        self.log.debug("Topology revision: %s has not changed! Reuse cached "
+                       "Virtualizer (hits: %s, misses: %s)"
+                       % (revision, self.hits, self.misses))
+        return self.__virtualizer
+      self.misses += 1
+      self.log.debug("Convert topology revision: %s (misses: %s)"
+                     % (revision, self.misses))
+      virtualizer = converter._dump_topology_base(nffg=nffg)
+      converter._dump_deployment(nffg=nffg, virtualizer=virtualizer)
+      if revision is not None:
+        self.__revision = revision
+        self.__virtualizer = virtualizer
+      return virtualizer
+
+  def xml (self, virtualizer, revision=None):
+    """
+    Return the serialized form of the given Virtualizer which is cached for
+    the given topology revision.
+
+    :param virtualizer: topology in Virtualizer format
+    :type virtualizer: Virtualizer
+    :param revision: revision of the topology view
+    :type revision: int
+    :return: XML representation
+    :rtype: str
+    """
+    with self.__lock:
+      if self.__xml is None or self.__xml_source is not virtualizer or \
+         self.__xml_revision != revision:
+        self.__xml = virtualizer.xml()
+        self.__xml_source = virtualizer
+        self.__xml_revision = revision
+      else:
+        self.log.debug("Use cached XML of topology revision: %s" % revision)
+      return self.__xml
+
+  def nffg (self, converter, virtualizer, revision=None):
+    """
+    Return a copy of the :class:`NFFG` parsed from the given Virtualizer which
+    is cached for the given topology revision.
+
+    :param converter: converter object
+    :type converter: :class:`NFFGConverter`
+    :param virtualizer: topology in Virtualizer format
+    :type virtualizer: Virtualizer
+    :param revision: revision of the topology view
+    :type revision: int
+    :return: parsed topology
+    :rtype: :class:`NFFG`
+    """
+    with self.__lock:
+      if self.__nffg is None or self.__nffg_source is not virtualizer or \
+         self.__nffg_revision != revision:
+        self.__nffg = converter.parse_from_Virtualizer(vdata=virtualizer)
+        self.__nffg_source = virtualizer
+        self.__nffg_revision = revision
+      else:
+        self.log.debug("Use cached NFFG of topology revision: %s" % revision)
+      return self.__nffg.copy()
+
+  def clear (self):
+    """
+    Drop the cached conversions.
+
+    :return: None
+    """
+    with self.__lock:
+      self.__revision = self.__virtualizer = None
+      self.__xml_revision = self.__xml_source = self.__xml = None
+      self.__nffg_revision = self.__nffg_source = self.__nffg = None
+
+
 class UC3MNFFGConverter(object):
   """
   Convert JSON-based UC3M format to :class:`NFFG`.
@@ -16,9 +16,11 @@ Implement the supporting classes for domain adapters.
 """
 import time
 import urlparse
+import zlib
 
 from requests import Session, ConnectionError, HTTPError, Timeout, \
   RequestException
+from requests.adapters import HTTPAdapter
 
 import pox.openflow.libopenflow_01 as of
 from escape import __version__
@@ -28,6 +30,7 @@ from escape.util.config import ConfigurationError
 from escape.util.misc import enum, VERBOSE
 from escape.util.pox_extension import OpenFlowBridge, \
   ExtendedOFConnectionArbiter
+from escape.util.stat import stats
 from pox.lib.addresses import EthAddr, IPAddr
 from pox.lib.recoco import Timer
 from pox.lib.revent import EventMixin, Event
@@ -128,6 +131,30 @@ class DomainChangedEvent(Event):
     self.data = data
 
 
+class FlowrulesConfirmedEvent(Event):
+  """
+  Event class for signaling the confirmation of the flowrules installed into
+  the OpenFlow switches of a domain.
+  """
+
+  def __init__ (self, domain, request_id, result):
+    """
+    Init event object.
+
+    :param domain: domain name
+    :type domain: str
+    :param request_id: id of the deployed service request
+    :type request_id: str or int
+    :param result: every flowrule is confirmed by the switches or not
+    :type result: bool
+    :return: None
+    """
+    super(FlowrulesConfirmedEvent, self).__init__()
+    self.domain = domain
+    self.request_id = request_id
+    self.result = result
+
+
 class DeployEvent(Event):
   """
   Event class for signaling NF-FG deployment to infrastructure layer API.
@@ -159,7 +186,7 @@ class AbstractDomainManager(EventMixin):
   Follows the Component Configurator design pattern as base component class.
   """
   # Events raised by this class
-  _eventMixin_events = {DomainChangedEvent}
+  _eventMixin_events = {DomainChangedEvent, FlowrulesConfirmedEvent}
   """Events raised by this class"""
   # DomainManager name- used more or less the type of the manager
   name = "UNDEFINED"
@@ -195,6 +222,8 @@ class AbstractDomainManager(EventMixin):
     # description, request it, and install mapped NFs from internal NFFG
     self._adapters_cfg = adapters
     self.log = log.getChild(self.domain_name)
+    # Flowrule batches waiting for confirmation per request id
+    self.__pending_flowrules = {}
 
   def __str__ (self):
     """
@@ -387,6 +416,67 @@ class AbstractDomainManager(EventMixin):
     """
     raise NotImplementedError
 
+  def is_deploy_pending (self, request_id):
+    """
+    Return True if the installed flowrules of the given request are still
+    waiting for the confirmation of the switches.
+
+    :param request_id: id of the deployed service request
+    :type request_id: str or int
+    :return: deploy result is pending or not
+    :rtype: bool
+    """
+    return request_id in self.__pending_flowrules
+
+  def _install_flowrule_batches (self, request_id, rules):
+    """
+    Send the flowrules into the OpenFlow switches of the domain in per-switch
+    batches using the ``controlAdapter`` of the manager.
+
+    The replies of the switches are processed asynchronously in the
+    cooperative context and the overall result is signalled with a
+    :class:`FlowrulesConfirmedEvent`, so the caller must not wait for it.
+
+    :param request_id: id of the deployed service request
+    :type request_id: str or int
+    :param rules: list of (infra id, list of (match, action) pairs) tuples
+    :type rules: list
+    :return: every batch has been sent or not
+    :rtype: bool
+    """
+    result = True
+    group = FlowModBatchGroup(request_id=request_id,
+                              callback=self.__flowrules_confirmed)
+    for infra_id, infra_rules in rules:
+      batch = self.controlAdapter.install_flowrules(
+        infra_id, rules=infra_rules, callback=group._handle_batch_closed)
+      if batch is None:
+        result = False
+      else:
+        group.add(batch)
+    if group.batches:
+      self.log.debug("Wait for the confirmation of %s" % group)
+      self.__pending_flowrules[request_id] = group
+      group.seal()
+    return result
+
+  def __flowrules_confirmed (self, group):
+    """
+    Signal the result of the flowrule batches of a request.
+
+    :param group: closed group of flowrule batches
+    :type group: :class:`FlowModBatchGroup`
+    :return: None
+    """
+    if self.__pending_flowrules.get(group.request_id) is group:
+      del self.__pending_flowrules[group.request_id]
+    self.log.info("Flowrule deploy result of request: %s: %s" % (
+      group.request_id, "SUCCESS" if group.result else "FAILURE"))
+    self.raiseEventNoErrors(FlowrulesConfirmedEvent,
+                            domain=self.domain_name,
+                            request_id=group.request_id,
+                            result=group.result)
+
 
 class AbstractRemoteDomainManager(AbstractDomainManager):
   """
@@ -502,6 +592,9 @@ class AbstractRemoteDomainManager(AbstractDomainManager):
     :return: None
     """
     self.stop_timer()
+    if isinstance(self.topoAdapter, AbstractRESTAdapter):
+      log.debug("Connection stats of domain: %s - %s" % (
+        self.domain_name, self.topoAdapter.get_connection_stats()))
     super(AbstractRemoteDomainManager, self).finit()
 
   ##############################################################################
@@ -804,6 +897,270 @@ class AbstractESCAPEAdapter(EventMixin):
       "Finit ESCAPEAdapter name: %s, type: %s" % (self.name, self.type))
 
 
+class FlowModBatch(object):
+  """
+  Track the confirmation of a group of flow_mods sent to an OpenFlow switch
+  in one buffered write and terminated by a barrier request.
+
+  The switch processes the flow_mods before the barrier, so the BarrierIn
+  confirms the whole batch and every ErrorIn received in the meantime can be
+  matched back to the failed rule by its xid.
+
+  The batch is closed asynchronously by the OpenFlow event handlers or by a
+  timer in the cooperative context of POX, and the given callback is invoked
+  with the closed batch.
+  """
+
+  def __init__ (self, id, connection, timeout=None, callback=None):
+    """
+    Init.
+
+    :param id: ID of the infra element stored in the NFFG
+    :type id: str
+    :param connection: OpenFlow connection of the switch
+    :type connection: :class:`pox.openflow.of_01.Connection`
+    :param timeout: time to wait for the barrier reply (default: None)
+    :type timeout: float
+    :param callback: function called with the batch when it is closed
+    :type callback: callable
+    :return: None
+    """
+    self.id = id
+    self.connection = connection
+    self.timeout = timeout
+    self.callback = callback
+    self.rules = {}
+    self.failed = []
+    self.invalid = []
+    self.barrier_xid = None
+    self.sent = None
+    self.latency = None
+    self.closed = False
+    self.__listeners = None
+    self.__timer = None
+
+  def __str__ (self):
+    return "%s(infra: %s, rules: %s, failed: %s)" % (
+      self.__class__.__name__, self.id, len(self.rules),
+      len(self.failed) + len(self.invalid))
+
+  def add (self, msg, rule):
+    """
+    Register a flow_mod of the batch.
+
+    :param msg: assembled flow_mod or None if the rule was invalid
+    :type msg: :class:`pox.openflow.libopenflow_01.ofp_flow_mod`
+    :param rule: original (match, action) pair of the flowrule
+    :type rule: tuple
+    :return: None
+    """
+    if msg is None:
+      self.invalid.append(rule)
+    else:
+      self.rules[msg.xid] = (msg, rule)
+
+  def send (self):
+    """
+    Pack the registered flow_mods and the closing barrier request into one
+    buffer, send it to the switch and start the timer of the confirmation.
+
+    :return: None
+    """
+    barrier = of.ofp_barrier_request()
+    self.barrier_xid = barrier.xid
+    data = b''.join([m.pack() for m, r in self.rules.itervalues()])
+    self.__listeners = self.connection.addListeners(self)
+    if self.timeout is not None:
+      self.__timer = Timer(self.timeout, self._handle_timeout)
+    self.sent = time.time()
+    self.connection.send(data + barrier.pack())
+    log.log(VERBOSE, "Sent %s flow_mod(s) with barrier (xid: %s) to INFRA %s "
+                     "in %sB" % (len(self.rules), self.barrier_xid, self.id,
+                                 len(data)))
+
+  def _handle_ErrorIn (self, event):
+    """
+    Match an OpenFlow error to the failed rule of the batch.
+
+    :param event: POX internal ErrorIn event
+    :type event: :class:`pox.openflow.ErrorIn`
+    :return: None
+    """
+    if event.xid in self.rules:
+      event.should_log = False
+      msg, rule = self.rules[event.xid]
+      self.failed.append(rule)
+      log.error("Flowrule installation into INFRA %s has failed: %s\n"
+                "Rule: match: %s, action: %s" % (self.id, event.asString(),
+                                                 rule[0], rule[1]))
+    elif event.xid == self.barrier_xid:
+      log.error("Barrier request to INFRA %s has failed: %s" %
+                (self.id, event.asString()))
+      self.__close()
+
+  def _handle_BarrierIn (self, event):
+    """
+    Close the batch when the barrier reply arrives.
+
+    :param event: POX internal BarrierIn event
+    :type event: :class:`pox.openflow.BarrierIn`
+    :return: None
+    """
+    if event.xid == self.barrier_xid:
+      self.latency = time.time() - self.sent
+      stats.add_measurement_value_entry(type=stats.TYPE_DEPLOY_FLOWRULES,
+                                        value=self.latency,
+                                        info=self.id)
+      log.debug("Flowrule installation into INFRA %s is confirmed in %.3fs - "
+                "installed: %s, failed: %s" % (
+                  self.id, self.latency, len(self.rules) - len(self.failed),
+                  len(self.failed) + len(self.invalid)))
+      self.__close()
+
+  def _handle_ConnectionDown (self, event):
+    """
+    Close the batch if the connection is lost before the confirmation.
+
+    :param event: POX internal ConnectionDown event
+    :type event: :class:`pox.openflow.ConnectionDown`
+    :return: None
+    """
+    log.warning("Connection of INFRA %s is lost before flowrule installation "
+                "has been confirmed!" % self.id)
+    self.__close()
+
+  def _handle_timeout (self):
+    """
+    Close the batch if the barrier reply has not arrived in time.
+
+    :return: None
+    """
+    if not self.closed:
+      log.warning("Flowrule installation into INFRA %s is not confirmed "
+                  "in %ss!" % (self.id, self.timeout))
+      self.__close()
+
+  def __close (self):
+    """
+    Remove the registered listeners and the timer and invoke the callback.
+
+    :return: None
+    """
+    if self.closed:
+      return
+    self.closed = True
+    if self.__listeners is not None:
+      self.connection.removeListeners(self.__listeners)
+      self.__listeners = None
+    if self.__timer is not None:
+      self.__timer.cancel()
+      self.__timer = None
+    if self.callback is not None:
+      self.callback(self)
+
+  @property
+  def confirmed (self):
+    """
+    :return: the switch has replied to the barrier request or not
+    :rtype: bool
+    """
+    return self.latency is not None
+
+  @property
+  def result (self):
+    """
+    Return the result of the batch.
+
+    :return: True if every rule was installed, False if any rule was invalid,
+      rejected or the batch was aborted, None if the reply is still pending
+    :rtype: bool or None
+    """
+    if self.invalid or self.failed:
+      return False
+    if self.confirmed:
+      return True
+    return False if self.closed else None
+
+
+class FlowModBatchGroup(object):
+  """
+  Collect the flowrule batches sent into the switches of a domain for one
+  deploy request and invoke the given callback with the overall result once
+  every batch is closed.
+  """
+
+  def __init__ (self, request_id, callback):
+    """
+    Init.
+
+    :param request_id: id of the deployed service request
+    :type request_id: str or int
+    :param callback: function called with the group when every batch is closed
+    :type callback: callable
+    :return: None
+    """
+    self.request_id = request_id
+    self.callback = callback
+    self.batches = []
+    self.__sealed = False
+    self.__finished = False
+
+  def __str__ (self):
+    return "%s(request: %s, batches: %s)" % (
+      self.__class__.__name__, self.request_id, len(self.batches))
+
+  def add (self, batch):
+    """
+    Register a sent batch of the group.
+
+    :param batch: sent flowrule batch
+    :type batch: :class:`FlowModBatch`
+    :return: None
+    """
+    self.batches.append(batch)
+
+  def seal (self):
+    """
+    Signal that every batch of the group has been sent.
+
+    :return: None
+    """
+    self.__sealed = True
+    self._handle_batch_closed()
+
+  def _handle_batch_closed (self, batch=None):
+    """
+    Invoke the callback if every batch of the sealed group is closed.
+
+    :param batch: closed batch (optional)
+    :type batch: :class:`FlowModBatch`
+    :return: None
+    """
+    if batch is not None and batch.result is False:
+      log.error("Flowrule installation is failed: %s" % batch)
+    if self.__finished or not self.__sealed:
+      return
+    if all(b.closed for b in self.batches):
+      self.__finished = True
+      self.callback(self)
+
+  @property
+  def pending (self):
+    """
+    :return: the result of any batch is still pending or not
+    :rtype: bool
+    """
+    return not self.__finished
+
+  @property
+  def result (self):
+    """
+    :return: every flowrule of the group is confirmed or not
+    :rtype: bool
+    """
+    return all(b.result is True for b in self.batches)
+
+
 class AbstractOFControllerAdapter(AbstractESCAPEAdapter):
   """
   Abstract class for different domain adapters which need SDN/OF controller
@@ -816,6 +1173,8 @@ class AbstractOFControllerAdapter(AbstractESCAPEAdapter):
   _interval = 20
   _switch_timeout = 5
   """Keepalive constant"""
+  FLOWMOD_CONFIRM_TIMEOUT = 5
+  """Time to wait for the barrier reply of a flowrule batch"""
   # Static mapping of infra IDs and DPIDs
   infra_to_dpid = {
     # 'EE1': 0x1,
@@ -971,6 +1330,67 @@ class AbstractOFControllerAdapter(AbstractESCAPEAdapter):
       log.warning("Missing connection for node element: %s! Skip flowrule "
                   "installation..." % id)
       return
+    msg = self._build_flow_mod(id=id, match=match, action=action)
+    if msg is None:
+      return
+    log.debug(
+      "Install flow entry into INFRA: %s on connection: %s ..." % (id, conn))
+    conn.send(msg)
+    log.log(VERBOSE, "Sent raw OpenFlow flowrule:\n%s" % msg)
+
+  def install_flowrules (self, id, rules, timeout=None, callback=None):
+    """
+    Install a group of flowrules in an OpenFlow switch.
+
+    The flow_mods are sent in one buffered write closed by a barrier request.
+    The returned batch object collects the errors of the individual rules and
+    the install latency of the switch.
+
+    :param id: ID of the infra element stored in the NFFG
+    :type id: str
+    :param rules: list of (match, action) pairs of the flowrules
+    :type rules: list
+    :param timeout: time to wait for the barrier reply
+      (default: FLOWMOD_CONFIRM_TIMEOUT)
+    :type timeout: float
+    :param callback: function called with the batch when it is closed
+    :type callback: callable
+    :return: batch object of the sent flowrules or None if the switch is not
+      connected
+    :rtype: :class:`FlowModBatch`
+    """
+    conn = self.openflow.getConnection(dpid=self.infra_to_dpid[id])
+    if not conn:
+      log.warning("Missing connection for node element: %s! Skip flowrule "
+                  "installation..." % id)
+      return
+    batch = FlowModBatch(id=id, connection=conn,
+                         timeout=timeout if timeout is not None
+                         else self.FLOWMOD_CONFIRM_TIMEOUT,
+                         callback=callback)
+    for match, action in rules:
+      msg = self._build_flow_mod(id=id, match=match, action=action)
+      batch.add(msg=msg, rule=(match, action))
+      if msg is not None:
+        log.log(VERBOSE, "Assembled raw OpenFlow flowrule:\n%s" % msg)
+    log.debug("Install %s flow entries into INFRA: %s on connection: %s ..." %
+              (len(batch.rules), id, conn))
+    batch.send()
+    return batch
+
+  def _build_flow_mod (self, id, match, action):
+    """
+    Assemble the OpenFlow flow_mod message of a flowrule.
+
+    :param id: ID of the infra element stored in the NFFG
+    :type id: str
+    :param match: match part of the rule (keys: in_port, vlan_id)
+    :type match: dict
+    :param action: action part of the rule (keys: out, vlan_push, vlan_pop)
+    :type action: dict
+    :return: assembled flow_mod or None if the rule is invalid
+    :rtype: :class:`pox.openflow.libopenflow_01.ofp_flow_mod`
+    """
     msg = of.ofp_flow_mod()
     msg.match.in_port = match['in_port']
     if 'vlan_id' in match:
@@ -1032,10 +1452,7 @@ class AbstractOFControllerAdapter(AbstractESCAPEAdapter):
                   "Skip flowrule installation..." % (action['out'], action))
       return
     msg.actions.append(of.ofp_action_output(port=out_port))
-    log.debug(
-      "Install flow entry into INFRA: %s on connection: %s ..." % (id, conn))
-    conn.send(msg)
-    log.log(VERBOSE, "Sent raw OpenFlow flowrule:\n%s" % msg)
+    return msg
 
 
 class VNFStarterAPI(object):
@@ -1286,11 +1703,18 @@ class AbstractRESTAdapter(Session):
   # Connection timeout (sec)
   CONNECTION_TIMEOUT = 5
   """Connection timeout (sec)"""
+  # Max number of kept-alive connections dedicated to the adapter
+  POOL_SIZE = 4
+  """Max number of kept-alive connections dedicated to the adapter"""
+  # Min size of request body compressed with gzip (byte)
+  COMPRESSION_THRESHOLD = 1024
+  """Min size of request body compressed with gzip (byte)"""
   # HTTP methods
   GET = "GET"
   POST = "POST"
 
-  def __init__ (self, base_url, prefix="", auth=None, **kwargs):
+  def __init__ (self, base_url, prefix="", auth=None, pool_size=None,
+                compression=False, **kwargs):
     """
     Init.
 
@@ -1300,11 +1724,25 @@ class AbstractRESTAdapter(Session):
     :type prefix: str
     :param auth: optional authentications
     :type auth: str
+    :param pool_size: max number of kept-alive connections (default: 4)
+    :type pool_size: int
+    :param compression: compress large request bodies with gzip
+    :type compression: bool
     :param kwargs: optional params:
     :type kwargs: dict
     :return: None
     """
     super(AbstractRESTAdapter, self).__init__()
+    # Use a dedicated connection pool instead of the default one
+    pool_size = pool_size if pool_size is not None else self.POOL_SIZE
+    pool = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    self.mount('http://', pool)
+    self.mount('https://', pool)
+    # Static headers are set once for the whole session
+    self.headers.update(self.custom_headers)
+    self.headers['Connection'] = "keep-alive"
+    self.compression = compression
+    self.__counters = {'requests': 0, 'sent': 0, 'received': 0}
     if not base_url:
       return
     if base_url.endswith('/'):
@@ -1318,6 +1756,8 @@ class AbstractRESTAdapter(Session):
       self.CONNECTION_TIMEOUT = kwargs['timeout']
       log.debug("Setup explicit timeout for REST responses: %ss" %
                 self.CONNECTION_TIMEOUT)
+    log.debug("Setup connection pool size: %s, compression: %s" %
+              (pool_size, self.compression))
     # Suppress low level logging
     self.__suppress_requests_logging()
 
@@ -1366,7 +1806,6 @@ class AbstractRESTAdapter(Session):
     # Setup parameters - headers
     if 'headers' not in kwargs:
       kwargs['headers'] = dict()
-    kwargs['headers'].update(self.custom_headers)
     # Setup connection timeout even if it is not defined explicitly
     if 'timeout' not in kwargs:
       kwargs['timeout'] = self.CONNECTION_TIMEOUT
@@ -1381,6 +1820,14 @@ class AbstractRESTAdapter(Session):
           kwargs['headers']['Content-Type'] = "application/json"
         elif body.startswith("<?xml"):
           kwargs['headers']['Content-Type'] = "application/xml"
+      if isinstance(body, unicode):
+        body = body.encode('utf-8')
+      if self.compression and isinstance(body, str) and \
+         len(body) >= self.COMPRESSION_THRESHOLD:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED,
+                                      16 + zlib.MAX_WBITS)
+        body = compressor.compress(body) + compressor.flush()
+        kwargs['headers']['Content-Encoding'] = "gzip"
     # Setup parameters - URL
     if url is not None:
       if not url.startswith('http'):
@@ -1389,11 +1836,51 @@ class AbstractRESTAdapter(Session):
       url = self._base_url
     # Make request
     self._response = self.request(method=method, url=url, data=body, **kwargs)
+    self.__update_counters(body=body)
     # Raise an exception in case of bad request (4xx <= status code <= 5xx)
     self._response.raise_for_status()
     # Return with body content
     return self._response.text if self._response is not None else None
 
+  def __update_counters (self, body):
+    """
+    Update the traffic counters with the last request and response.
+
+    :param body: sent request body
+    :type body: str
+    :return: None
+    """
+    self.__counters['requests'] += 1
+    if isinstance(body, basestring):
+      self.__counters['sent'] += len(body)
+    if self._response is not None:
+      # Number of body bytes sent by the server, i.e. before decompression
+      length = self._response.headers.get('Content-Length', '')
+      if length.isdigit():
+        self.__counters['received'] += int(length)
+      else:
+        # Chunked response without length, count the decoded content
+        self.__counters['received'] += len(self._response.content)
+
+  def get_connection_stats (self):
+    """
+    Return the counters of the sent requests, opened connections and the
+    transferred body bytes.
+
+    :return: connection statistics
+    :rtype: dict
+    """
+    connections = 0
+    # The same adapter can be mounted for more prefixes (http and https)
+    for adapter in set(self.adapters.itervalues()):
+      pools = adapter.poolmanager.pools
+      for key in pools.keys():
+        connections += pools[key].num_connections
+    stats = dict(self.__counters)
+    stats['connections'] = connections
+    stats['reused'] = max(stats['requests'] - connections, 0)
+    return stats
+
   def send_no_error (self, method, url=None, body=None, **kwargs):
     """
     Send REST request with handling exceptions.
@@ -14,8 +14,14 @@
 """
 Contains abstract classes for NFFG mapping.
 """
+import logging
+import multiprocessing
 import threading
+import time
+import traceback
+from Queue import Empty
 
+from escape.nffg_lib.nffg import NFFG
 from escape.util.config import CONFIG
 from escape.util.misc import call_as_coop_task
 from pox.core import core
@@ -261,6 +267,244 @@ class PostMapEvent(Event):
     self.result_graph = result_graph
 
 
+def _reinit_logging_locks ():
+  """
+  Recreate the locks of the logging module in a forked worker process.
+
+  The worker is forked from the multithreaded main process so the locks can
+  be inherited in a locked state from threads which do not exist in the
+  worker.
+
+  :return: None
+  """
+  logging._lock = threading.RLock()
+  for ref in logging._handlerList:
+    handler = ref()
+    if handler is not None:
+      handler.createLock()
+
+
+def _map_in_worker (strategy, graph, resource, results):
+  """
+  Run the mapping algorithm in a worker process and send back the serialized
+  result.
+
+  Errors are sent back along with the result and logged by the main process.
+
+  :param strategy: strategy class
+  :type strategy: :any:`AbstractMappingStrategy`
+  :param graph: Network Function Forwarding Graph
+  :type graph: :class:`NFFG`
+  :param resource: global resource
+  :type resource: :class:`NFFG`
+  :param results: queue for the serialized mapping result
+  :type results: :class:`multiprocessing.Queue`
+  :return: None
+  """
+  _reinit_logging_locks()
+  data = error = None
+  try:
+    mapping_result = strategy.map(graph=graph, resource=resource)
+    if isinstance(mapping_result, (tuple, list)):
+      mapping_result = mapping_result[0]
+    if mapping_result is not None:
+      data = mapping_result.dump()
+  except Exception:
+    error = traceback.format_exc()
+  finally:
+    results.put((strategy.__name__, data, error))
+
+
+class MappingJob(object):
+  """
+  Container class for a mapping process run by :class:`MappingExecutor`.
+  """
+
+  def __init__ (self, strategies, graph, resource, callback, timeout=None):
+    """
+    Init.
+
+    :param strategies: strategy classes run in parallel
+    :type strategies: list
+    :param graph: Network Function Forwarding Graph
+    :type graph: :class:`NFFG`
+    :param resource: global resource
+    :type resource: :class:`NFFG`
+    :param callback: function called with the mapped NFFG in the coop task
+    :type callback: callable
+    :param timeout: timeout of the mapping in sec (optional)
+    :type timeout: float
+    :return: None
+    """
+    self.strategies = strategies
+    self.graph = graph
+    self.resource = resource
+    self.callback = callback
+    self.timeout = timeout
+    self.cancelled = threading.Event()
+    self.winner = None
+    self.supervisor = None
+
+  def cancel (self):
+    """
+    Cancel the mapping and terminate the running worker processes. The
+    callback is called with a failed result.
+
+    :return: None
+    """
+    self.cancelled.set()
+
+
+class MappingExecutor(object):
+  """
+  Run mapping strategies in separate worker processes to avoid the mapping
+  algorithms competing for the GIL with the coop microtask environment.
+
+  The mapping result is serialized in the worker processes and delivered
+  back with :func:`call_as_coop_task`. Multiple strategies can be raced
+  against each other in which case the first successful result wins.
+  """
+  # Polling period of the result queue (sec)
+  POLL_PERIOD = 0.5
+
+  def __init__ (self, processes, timeout=None):
+    """
+    Init.
+
+    :param processes: max number of concurrently running worker processes
+    :type processes: int
+    :param timeout: default timeout of a mapping in sec (optional)
+    :type timeout: float
+    :return: None
+    """
+    self.processes = processes
+    self.timeout = timeout
+    self.__slots = threading.BoundedSemaphore(processes)
+    # Acquire the slots of a mapping atomically to avoid deadlock
+    self.__start_lock = threading.Lock()
+    self.__jobs = set()
+
+  def submit (self, strategies, graph, resource, callback):
+    """
+    Schedule the mapping of the given graph with the given strategies.
+
+    :param strategies: strategy classes run in parallel
+    :type strategies: list
+    :param graph: Network Function Forwarding Graph
+    :type graph: :class:`NFFG`
+    :param resource: global resource
+    :type resource: :class:`NFFG`
+    :param callback: function called with the mapped NFFG in the coop task
+    :type callback: callable
+    :return: scheduled mapping
+    :rtype: :class:`MappingJob`
+    """
+    if len(strategies) > self.processes:
+      core.getLogger("worker").warning(
+        "Number of raced strategies exceeds the process limit: %s! Skip "
+        "strategies: %s" % (self.processes, strategies[self.processes:]))
+      strategies = strategies[:self.processes]
+    job = MappingJob(strategies=strategies, graph=graph, resource=resource,
+                     callback=callback, timeout=self.timeout)
+    self.__jobs.add(job)
+    job.supervisor = threading.Thread(target=self.__run, args=(job,))
+    job.supervisor.daemon = True
+    job.supervisor.start()
+    return job
+
+  def cancel_all (self):
+    """
+    Cancel all the running mappings.
+
+    :return: None
+    """
+    for job in list(self.__jobs):
+      job.cancel()
+
+  def shutdown (self):
+    """
+    Cancel all the running mappings and wait for the termination of their
+    worker processes.
+
+    :return: None
+    """
+    jobs = list(self.__jobs)
+    for job in jobs:
+      job.cancel()
+    for job in jobs:
+      job.supervisor.join(timeout=2 * self.POLL_PERIOD)
+
+  def __run (self, job):
+    """
+    Start and supervise the worker processes of the given mapping.
+
+    :param job: scheduled mapping
+    :type job: :class:`MappingJob`
+    :return: None
+    """
+    _log = core.getLogger("worker")
+    results = multiprocessing.Queue()
+    workers = []
+    mapped_nffg = None
+    try:
+      with self.__start_lock:
+        for strategy in job.strategies:
+          self.__slots.acquire()
+          if job.cancelled.is_set():
+            self.__slots.release()
+            break
+          _log.info("Start mapping algorithm: %s in a worker process" %
+                    strategy.__name__)
+          worker = multiprocessing.Process(target=_map_in_worker,
+                                           args=(strategy, job.graph,
+                                                 job.resource, results))
+          worker.daemon = True
+          try:
+            worker.start()
+          except Exception:
+            self.__slots.release()
+            raise
+          workers.append(worker)
+      deadline = time.time() + job.timeout if job.timeout else None
+      pending = len(workers)
+      while pending and not job.cancelled.is_set():
+        if deadline is not None and time.time() >= deadline:
+          _log.error("Mapping has reached timeout limit: %ss!" % job.timeout)
+          break
+        try:
+          name, data, error = results.get(timeout=self.POLL_PERIOD)
+        except Empty:
+          if not any(w.is_alive() for w in workers) and results.empty():
+            _log.error("Mapping worker processes exited without result!")
+            break
+          continue
+        pending -= 1
+        if data is not None:
+          _log.info("Mapping algorithm: %s has finished first!" % name)
+          job.winner = name
+          mapped_nffg = NFFG.parse(data)
+          break
+        if error is not None:
+          _log.error("Got unexpected error in mapping strategy: %s\n%s"
+                     % (name, error))
+        _log.warning("Mapping algorithm: %s has failed!" % name)
+    except Exception:
+      _log.exception("Got unexpected error during supervising mapping!")
+    finally:
+      for worker in workers:
+        if worker.is_alive():
+          worker.terminate()
+        worker.join()
+        self.__slots.release()
+      self.__jobs.discard(job)
+    if job.cancelled.is_set():
+      _log.warning("Mapping has been cancelled! Report failed mapping...")
+      mapped_nffg = None
+    # Must use call_as_coop_task because we want to call a function in a
+    # coop microtask environment from a separate thread
+    call_as_coop_task(job.callback, mapped_nffg=mapped_nffg)
+
+
 class AbstractMapper(EventMixin):
   """
   Abstract class for graph mapping function.
@@ -318,6 +562,15 @@ class AbstractMapper(EventMixin):
                                                 "subclass of " \
                                                 "AbstractMappingStrategy!"
     self.processor = CONFIG.get_mapping_processor(layer_name)(layer_name)
+    # Set process-based mapping
+    processes = CONFIG.get_mapping_processes(layer_name)
+    if processes > 0:
+      self._executor = MappingExecutor(
+        processes=processes, timeout=CONFIG.get_mapping_timeout(layer_name))
+      self._race_strategies = CONFIG.get_race_strategies(layer_name)
+    else:
+      self._executor = None
+      self._race_strategies = []
     super(AbstractMapper, self).__init__()
 
   @property
@@ -412,7 +665,8 @@ class AbstractMapper(EventMixin):
 
   def _start_mapping (self, graph, resource):
     """
-    Run mapping algorithm in a separate Python thread.
+    Run mapping algorithm in a separate Python thread or in worker processes
+    if it is configured.
 
     Should be called in _perform_mapping() function to initiate mapping if
     threaded is enabled!
@@ -423,6 +677,12 @@ class AbstractMapper(EventMixin):
     :type resource: :class:`NFFG`
     :return: None
     """
+    if self._executor is not None:
+      core.getLogger("worker").debug("Schedule mapping in worker process...")
+      self._executor.submit(strategies=[self.strategy] + self._race_strategies,
+                            graph=graph, resource=resource,
+                            callback=self._mapping_finished)
+      return
 
     def run ():
       core.getLogger("worker").info(
@@ -437,6 +697,17 @@ class AbstractMapper(EventMixin):
     self._mapping_thread.daemon = True
     self._mapping_thread.start()
 
+  def cancel_mapping (self):
+    """
+    Cancel the mappings running in worker processes and wait for the
+    termination of the processes. The cancelled mappings are reported as
+    failed.
+
+    :return: None
+    """
+    if self._executor is not None:
+      self._executor.shutdown()
+
   def _mapping_finished (self, mapped_nffg):
     """
     Called from a separate thread when the mapping process is finished.
@@ -492,3 +763,11 @@ class AbstractOrchestrator(object):
     # self.mapper is set by the AbstractOrchestrator's constructor
     self.mapper.addListeners(layer_API, weak=True)
     super(AbstractOrchestrator, self).__init__()
+
+  def finalize (self):
+    """
+    Finalize func for class. Stop the running mappings.
+
+    :return: None
+    """
+    self.mapper.cancel_mapping()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+import threading
 import time
 from collections import namedtuple
 
@@ -43,6 +44,30 @@ class StatTimestamp(_StatEntry):
                      "%f" % self.timestamp))
 
 
+_StatValue = namedtuple("StatValue",
+                        ('id', 'type', 'info', 'value', 'timestamp'))
+"""Measured value class for memory efficient storing."""
+
+
+class StatValue(_StatValue):
+  """
+  Container class for storing a measured value (e.g. queue length) related to
+  a specific timestamp.
+  """
+
+  def dump (self):
+    """
+    :return: Return the value info in a merged string.
+    :rtype: str
+    """
+    return ",".join((str(self.id),
+                     OrchestrationStatCollector.get_type_name(self.type),
+                     str(self.info),
+                     OrchestrationStatCollector.CMD_VALUE,
+                     "%f" % self.timestamp,
+                     str(self.value)))
+
+
 class OrchestrationStatCollector(object):
   """
   Manager class to collect and persist timestamp values of an orchestration
@@ -53,14 +78,22 @@ class OrchestrationStatCollector(object):
   PREFIX = 'TYPE_'
   TYPE_OVERALL = 0
   TYPE_SCHEDULED = 1
+  TYPE_SCHEDULER_QUEUE = 11
+  TYPE_SCHEDULER_QUEUE_LENGTH = 12
   TYPE_SERVICE = 2
   TYPE_SERVICE_MAPPING = 21
   TYPE_ORCHESTRATION = 3
   TYPE_ORCHESTRATION_MAPPING = 31
+  TYPE_ORCHESTRATION_PIPELINE = 32
+  TYPE_ORCHESTRATION_MAPPING_CACHE = 33
   TYPE_DEPLOY = 4
   TYPE_DEPLOY_DOMAIN = 41
+  TYPE_DEPLOY_FLOWRULES = 42
+  TYPE_DEPLOY_CALLBACK = 43
+  TYPE_DEPLOY_DOMAIN_STATE_CACHE = 44
   CMD_START = "START"
   CMD_STOP = "END"
+  CMD_VALUE = "VALUE"
 
   def __init__ (self, stat_folder):
     """
@@ -73,8 +106,10 @@ class OrchestrationStatCollector(object):
     self.stat_folder = stat_folder
     log.debug("Setup stat collector with folder: %s" % stat_folder)
     self.__cntr = 0
-    self.__measured_values = []
+    # request id --> (measured timestamps, measured values)
+    self.__requests = {}
     self.__request_id = None
+    self.__lock = threading.RLock()
     if not os.path.exists(self.stat_folder):
       os.mkdir(self.stat_folder)
     self.clear_stats()
@@ -83,11 +118,23 @@ class OrchestrationStatCollector(object):
     """
     Set the request Id of the service request under orchestration.
 
+    If the measurement was initiated with a temporary id (e.g. a message id)
+    the collected entries are moved under the given request id.
+
     :param request_id: service request id
     :type request_id: str or int
     :return: None
     """
-    self.__request_id = request_id
+    with self.__lock:
+      if self.__request_id != request_id and \
+         self.__request_id in self.__requests:
+        stamps, values = self.__requests.pop(self.__request_id)
+        if request_id in self.__requests:
+          self.__requests[request_id][0].extend(stamps)
+          self.__requests[request_id][1].extend(values)
+        else:
+          self.__requests[request_id] = (stamps, values)
+      self.__request_id = request_id
 
   @classmethod
   def get_type_name (cls, number):
@@ -128,26 +175,43 @@ class OrchestrationStatCollector(object):
     """
     Initialize measurement of a service request orchestration.
 
+    Measurements of other requests in progress are kept intact, but the
+    stale entries of a previous measurement with the same id are dropped.
+
     :param request_id: service request id
     :type request_id: str or int
     :return: None
     """
-    if self.__request_id != request_id:
-      self.reset()
-    self.__request_id = request_id
+    with self.__lock:
+      self.__request_id = request_id
+      self.__requests[request_id] = ([], [])
     self.add_measurement_start_entry(type=self.TYPE_OVERALL,
-                                     info=self.__request_id)
+                                     info=request_id,
+                                     request_id=request_id)
 
-  def finish_request_measurement (self):
+  def finish_request_measurement (self, request_id=None):
     """
-    Stop measurement of the actual service request orchestration and dump
-    result into file.
+    Stop measurement of the given service request orchestration, dump
+    result into file and drop the collected entries.
 
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
     :return: None
     """
-    self.add_measurement_end_entry(type=self.TYPE_OVERALL,
-                                   info=self.__request_id)
-    self.dump_to_file()
+    with self.__lock:
+      if request_id is None:
+        request_id = self.__request_id
+      if request_id not in self.__requests:
+        log.debug("No measurement is in progress for request: %s"
+                  % request_id)
+        return
+      self.add_measurement_end_entry(type=self.TYPE_OVERALL,
+                                     info=request_id,
+                                     request_id=request_id)
+      self.dump_to_file(request_id=request_id)
+      del self.__requests[request_id]
+      if self.__request_id == request_id:
+        self.__request_id = None
 
   def reset (self):
     """
@@ -155,83 +219,164 @@ class OrchestrationStatCollector(object):
 
     :return: None
     """
-    self.__request_id = None
-    del self.__measured_values[:]
+    with self.__lock:
+      self.__request_id = None
+      self.__requests.clear()
+
+  def __get_entries (self, request_id=None):
+    """
+    Return the stored entries of the given request or None if no measurement
+    is in progress for the request.
+
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
+    :return: measured timestamps and values
+    :rtype: tuple
+    """
+    if request_id is None:
+      request_id = self.__request_id
+    return self.__requests.get(request_id)
 
-  def add_measurement_start_entry (self, type, info=None):
+  def add_measurement_start_entry (self, type, info=None, request_id=None):
     """
     Add a starting timestamp with the given parameters to the statistic.
+    The entry is dropped if no measurement is in progress for the request.
 
     :param type: timestamp type
     :type type: str
     :param info: additional info
     :type info: str
+    :param request_id: related service request (default: actual request)
+    :type request_id: str or int
     :return: None
     """
-    se = StatTimestamp(id=self.__increase_cntr(),
-                       type=type,
-                       info=info,
-                       cmd=self.CMD_START,
-                       timestamp=time.time())
-    log.debug("Measurement timestamp: %s" % str(se))
-    self.__measured_values.append(se)
-
-  def add_measurement_end_entry (self, type, info=None):
+    with self.__lock:
+      se = StatTimestamp(id=self.__increase_cntr(),
+                         type=type,
+                         info=info,
+                         cmd=self.CMD_START,
+                         timestamp=time.time())
+      log.debug("Measurement timestamp: %s" % str(se))
+      entries = self.__get_entries(request_id)
+      if entries is not None:
+        entries[0].append(se)
+
+  def add_measurement_end_entry (self, type, info=None, request_id=None):
     """
     Add a ending timestamp with the given parameters to the statistic.
+    The entry is dropped if no measurement is in progress for the request.
 
     :param type: timestamp type
     :type type: str
     :param info: additional info
     :type info: str
+    :param request_id: related service request (default: actual request)
+    :type request_id: str or int
+    :return: None
+    """
+    with self.__lock:
+      se = StatTimestamp(id=self.__increase_cntr(),
+                         type=type,
+                         info=info,
+                         cmd=self.CMD_STOP,
+                         timestamp=time.time())
+      log.debug("Measurement timestamp: %s" % str(se))
+      entries = self.__get_entries(request_id)
+      if entries is not None:
+        entries[0].append(se)
+
+  def add_measurement_value_entry (self, type, value, info=None,
+                                   request_id=None):
+    """
+    Add a measured value with the given parameters to the statistic.
+    The entry is dropped if no measurement is in progress for the request.
+
+    :param type: value type
+    :type type: str
+    :param value: measured value
+    :type value: int or float
+    :param info: additional info
+    :type info: str
+    :param request_id: related service request (default: actual request)
+    :type request_id: str or int
     :return: None
     """
-    se = StatTimestamp(id=self.__increase_cntr(),
-                       type=type,
-                       info=info,
-                       cmd=self.CMD_STOP,
-                       timestamp=time.time())
-    log.debug("Measurement timestamp: %s" % str(se))
-    self.__measured_values.append(se)
+    with self.__lock:
+      sv = StatValue(id=self.__increase_cntr(),
+                     type=type,
+                     info=info,
+                     value=value,
+                     timestamp=time.time())
+      log.debug("Measured value: %s" % str(sv))
+      entries = self.__get_entries(request_id)
+      if entries is not None:
+        entries[1].append(sv)
+
+  def raw_values (self, request_id=None):
+    """
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
+    :return: Return the list of raw measured values
+    :rtype: list
+    """
+    with self.__lock:
+      entries = self.__get_entries(request_id)
+      return list(entries[1]) if entries is not None else []
 
-  def raw_stat (self):
+  def raw_stat (self, request_id=None):
     """
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
     :return: Return the list of raw measured values
     :rtype: list
     """
-    return self.__measured_values
+    with self.__lock:
+      entries = self.__get_entries(request_id)
+      return list(entries[0]) if entries is not None else []
 
-  def _get_measured_types (self):
+  def _get_measured_types (self, request_id=None):
     """
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
     :return: Return the types of the stored timestamps.
     :rtype: set
     """
-    return {mv.type for mv in self.__measured_values}
+    return {mv.type for mv in self.raw_stat(request_id=request_id)}
 
-  def calculate_stat_values (self):
+  def calculate_stat_values (self, request_id=None):
     """
     Process the raw timestamps and conclude derived measurements.
 
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
     :return: derived measurements
     :rtype: str
     """
+    measured_values = self.raw_stat(request_id=request_id)
+    raw_values = self.raw_values(request_id=request_id)
     processed = []
-    for _type in self._get_measured_types():
+    for _type in {mv.type for mv in measured_values}:
       if _type != self.TYPE_DEPLOY_DOMAIN:
-        values = [e.timestamp for e in self.__measured_values if
+        values = [e.timestamp for e in measured_values if
                   e.type == _type]
         processed.append("%s: %s" % (self.get_type_name(_type),
                                      max(values) - min(values)))
       else:
-        for dd in self.__measured_values:
+        for i, dd in enumerate(measured_values):
           if dd.type == self.TYPE_DEPLOY_DOMAIN and dd.cmd == self.CMD_START:
-            for e in self.__measured_values[dd.id:]:
+            for e in measured_values[i + 1:]:
               if e.info.startswith(dd.info):
                 processed.append("- %s: %s" % (dd.info,
                                                e.timestamp - dd.timestamp))
+    for _type in {v.type for v in raw_values}:
+      values = [v.value for v in raw_values if v.type == _type]
+      processed.append("%s: min: %s, avg: %s, max: %s" % (
+        self.get_type_name(_type), min(values),
+        float(sum(values)) / len(values), max(values)))
     return processed
 
-  def dump_to_file (self, file_name=None, raw=True, calculated=False):
+  def dump_to_file (self, file_name=None, raw=True, calculated=False,
+                    request_id=None):
     """
     Dump the measured timestamps into a file.
 
@@ -241,20 +386,26 @@ class OrchestrationStatCollector(object):
     :type raw: bool
     :param calculated: dump derived measurements
     :type calculated: bool
+    :param request_id: service request id (default: actual request)
+    :type request_id: str or int
     :return: None
     """
+    if request_id is None:
+      request_id = self.__request_id
     if not file_name:
-      file_name = "%s/%s.stat" % (self.stat_folder, self.__request_id)
+      file_name = "%s/%s.stat" % (self.stat_folder, request_id)
     if os.path.exists(file_name):
       log.warning("Stat file for request already exists: %s! Overwriting..."
                   % file_name)
     with open(file_name, "w") as f:
       if raw:
-        for line in self.raw_stat():
+        for line in self.raw_stat(request_id=request_id):
+          f.write(line.dump() + '\n')
+        for line in self.raw_values(request_id=request_id):
           f.write(line.dump() + '\n')
       f.write('=' * 80 + '\n')
       if calculated:
-        for line in self.calculate_stat_values():
+        for line in self.calculate_stat_values(request_id=request_id):
           f.write(line + '\n')
     log.info("Stat for service request is dumped into: %s" % file_name)
 
@@ -12,10 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import logging
-
 import re
+from StringIO import StringIO
+from xml.etree import cElementTree as ElementTree
 
 log = logging.getLogger("virt_helper")
+# Root elements of a Virtualizer diff which are only used as keys
+VIRTUALIZER_KEY_TAGS = ('id', 'name', 'version')
 NF_PATH_TEMPLATE = "/virtualizer/nodes/node[id=%s]/NF_instances/node[id=%s]"
 # Use ? modifier after .* to define a non-greedy matching and skip ports
 NODE_NF_PATTERN = r'.*nodes/node\[id=(.*?)\]/NF_instances/node\[id=(.*?)\]'
@@ -156,3 +159,48 @@ def is_identical (base, new):
   :rtype: bool
   """
   return is_empty(virtualizer=base.diff(new))
+
+
+def get_changed_nodes_from_diff (diff):
+  """
+  Return the ids of the Infra nodes changed by the given Virtualizer diff in
+  XML format or None if the diff changes anything else than the content of
+  existing nodes (e.g. links, metadata or the set of nodes).
+
+  The XML is scanned incrementally and the processed elements are dropped
+  right away, so the scan needs no parsed copy of the whole diff.
+
+  :param diff: Virtualizer diff in XML format
+  :type diff: str
+  :return: ids of the changed nodes
+  :rtype: list
+  """
+  changed = []
+  path = []
+  try:
+    for event, element in ElementTree.iterparse(StringIO(diff),
+                                                events=('start', 'end')):
+      # Strip namespace
+      tag = element.tag.rsplit('}', 1)[-1]
+      if event == 'start':
+        path.append(tag)
+        depth = len(path)
+        if depth == 2 and tag not in VIRTUALIZER_KEY_TAGS + ('nodes',):
+          log.debug("Diff contains changed element: %s" % tag)
+          return None
+        elif depth == 3 and tag != 'node':
+          return None
+        elif depth == 3 and element.get('operation') is not None:
+          log.debug("Diff contains added/removed node!")
+          return None
+      else:
+        if len(path) == 4 and path[2] == 'node' and tag == 'id':
+          changed.append(element.text.strip())
+        if len(path) > 2:
+          # Only the ids of the nodes are needed
+          element.clear()
+        path.pop()
+  except ElementTree.ParseError as e:
+    log.warning("Diff could not be scanned: %s" % e)
+    return None
+  return changed
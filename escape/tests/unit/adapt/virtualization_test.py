@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+sys.path.append(os.path.dirname(__file__) + "/../../../../pox")
+
+from escape.adapt.virtualization import DoVDelta, DoVChangedEvent, \
+  DomainVirtualizer
+from escape.nffg_lib.nffg import NFFG
+
+DOMAIN = "TEST"
+
+
+def build_domain ():
+  """
+  Two connected BiSBiS nodes with a SAP connected to the first one
+  """
+  nffg = NFFG(id="TEST-DOMAIN", name="test-domain")
+  infras = []
+  for i in (1, 2):
+    infras.append(nffg.add_infra(id="infra%s" % i, name="BiSBiS-%s" % i,
+                                 domain=DOMAIN, infra_type="BiSBiS",
+                                 cpu=10, mem=1000, storage=10,
+                                 delay=0.1, bandwidth=1000))
+  infra1, infra2 = infras
+  nffg.add_undirected_link(port1=infra1.add_port(id=1),
+                           port2=infra2.add_port(id=1),
+                           p1p2id="link12", p2p1id="link21",
+                           delay=1, bandwidth=100)
+  sap = nffg.add_sap(id="sap1", name="SAP1")
+  nffg.add_undirected_link(port1=sap.add_port(id=1),
+                           port2=infra1.add_port(id=2),
+                           p1p2id="sap1-infra1", p2p1id="infra1-sap1",
+                           delay=1, bandwidth=100)
+  return nffg
+
+
+def deploy_nf (nffg, infra_id, nf_id):
+  """
+  Add an NF connected to the given Infra with dynamic links
+  """
+  nf = nffg.add_nf(id=nf_id, name=nf_id, func_type="A", cpu=1, mem=1,
+                   storage=0)
+  infra = nffg[infra_id]
+  nffg.add_undirected_link(port1=nf.add_port(id=1),
+                           port2=infra.add_port(
+                             id="%s|%s|1" % (infra_id, nf_id)),
+                           dynamic=True)
+  return nf
+
+
+def edges (nffg):
+  return set(nffg.network.edges(keys=True))
+
+
+class DoVDeltaApplyTest (unittest.TestCase):
+  def setUp (self):
+    self.base = build_domain()
+
+  def _apply (self, updated):
+    delta = DoVDelta.calculate(domain=DOMAIN, base=self.base,
+                               updated=updated)
+    self.assertIsNotNone(delta)
+    dov = self.base.copy()
+    delta.apply(nffg=dov)
+    return delta, dov
+
+  def test_unchanged (self):
+    delta = DoVDelta.calculate(domain=DOMAIN, base=self.base,
+                               updated=self.base.copy())
+    self.assertTrue(delta.is_empty())
+
+  def test_added_nf (self):
+    updated = self.base.copy()
+    deploy_nf(updated, "infra1", "nf1")
+    delta, dov = self._apply(updated)
+    self.assertEqual([nf.id for nf in delta.added_nfs], ["nf1"])
+    self.assertEqual([i.id for i in delta.modified_infras], ["infra1"])
+    self.assertEqual(len(delta.added_links), 2)
+    self.assertIn("nf1", dov)
+    self.assertEqual(edges(dov), edges(updated))
+
+  def test_removed_nf (self):
+    deploy_nf(self.base, "infra1", "nf1")
+    updated = self.base.copy()
+    updated.del_node("nf1")
+    delta, dov = self._apply(updated)
+    self.assertEqual(delta.removed_nfs, ["nf1"])
+    self.assertNotIn("nf1", dov)
+    self.assertEqual(edges(dov), edges(updated))
+
+  def test_modified_nf (self):
+    deploy_nf(self.base, "infra1", "nf1")
+    updated = self.base.copy()
+    updated["nf1"].resources.cpu = 5
+    delta, dov = self._apply(updated)
+    self.assertEqual([nf.id for nf in delta.modified_nfs], ["nf1"])
+    self.assertEqual(dov["nf1"].resources.cpu, 5)
+    # Links of the replaced NF are kept
+    self.assertEqual(edges(dov), edges(updated))
+
+  def test_added_flowrule (self):
+    updated = self.base.copy()
+    updated["infra1"].ports[2].add_flowrule(id=1, match="in_port=2",
+                                            action="output=1")
+    delta, dov = self._apply(updated)
+    self.assertEqual([i.id for i in delta.modified_infras], ["infra1"])
+    self.assertEqual([fr.id for fr in dov["infra1"].ports[2].flowrules],
+                     [1])
+    # Static links are rebound to the ports of the new Infra
+    link = dov.network["sap1"]["infra1"]["sap1-infra1"]
+    self.assertIs(link.dst, dov["infra1"].ports[2])
+
+  def test_modified_static_link (self):
+    updated = self.base.copy()
+    updated.network["infra1"]["infra2"]["link12"].bandwidth = 50
+    delta, dov = self._apply(updated)
+    self.assertEqual([l.id for l in delta.modified_links], ["link12"])
+    self.assertEqual(dov.network["infra1"]["infra2"]["link12"].bandwidth, 50)
+    self.assertEqual(dov.network["infra2"]["infra1"]["link21"].bandwidth, 100)
+
+  def test_apply_twice (self):
+    updated = self.base.copy()
+    deploy_nf(updated, "infra2", "nf1")
+    delta, dov = self._apply(updated)
+    delta.apply(nffg=dov)
+    self.assertEqual(edges(dov), edges(updated))
+
+
+class DoVDeltaFallbackTest (unittest.TestCase):
+  """
+  Structural changes of the domain can not be applied incrementally
+  """
+  def setUp (self):
+    self.base = build_domain()
+    self.updated = self.base.copy()
+
+  def _assertFallback (self):
+    self.assertIsNone(DoVDelta.calculate(domain=DOMAIN, base=self.base,
+                                         updated=self.updated))
+
+  def test_added_infra (self):
+    self.updated.add_infra(id="infra3", name="BiSBiS-3", domain=DOMAIN,
+                           infra_type="BiSBiS", cpu=10, mem=1000,
+                           storage=10, delay=0.1, bandwidth=1000)
+    self._assertFallback()
+
+  def test_removed_infra (self):
+    self.updated.del_node("infra2")
+    self._assertFallback()
+
+  def test_added_sap (self):
+    self.updated.add_sap(id="sap2", name="SAP2")
+    self._assertFallback()
+
+  def test_modified_sap (self):
+    self.updated["sap1"].name = "changed"
+    self._assertFallback()
+
+  def test_added_static_link (self):
+    self.updated.add_undirected_link(
+      port1=self.updated["infra1"].add_port(id=3),
+      port2=self.updated["infra2"].add_port(id=3),
+      p1p2id="link12-2", p2p1id="link21-2")
+    self._assertFallback()
+
+  def test_removed_static_link (self):
+    self.updated.network.remove_edge("infra1", "infra2", key="link12")
+    self._assertFallback()
+
+
+class FakeResourceManager (object):
+  pass
+
+
+class DomainVirtualizerDeltaTest (unittest.TestCase):
+  def setUp (self):
+    self.mgr = FakeResourceManager()
+    self.dov = DomainVirtualizer(mgr=self.mgr, global_res=build_domain())
+    self.seen = []
+    self.dov.addListener(DoVChangedEvent, self._handle_DoVChangedEvent)
+
+  def _handle_DoVChangedEvent (self, event):
+    self.seen.append((event.cause, event.delta))
+
+  def test_apply_delta_in_dov (self):
+    base = self.dov.get_resource_info()
+    updated = base.copy()
+    deploy_nf(updated, "infra1", "nf1")
+    delta = DoVDelta.calculate(domain=DOMAIN, base=base, updated=updated)
+    revision = self.dov.revision
+    self.dov.apply_delta_in_dov(delta=delta)
+    self.assertEqual(self.dov.revision, revision + 1)
+    self.assertIn("nf1", self.dov.get_resource_info())
+    # The event carries the applied delta only while it is dispatched
+    self.assertEqual(self.seen, [(DoVChangedEvent.TYPE.CHANGE, delta)])
+
+  def test_full_update_without_delta (self):
+    self.dov.update_full_global_view(nffg=build_domain())
+    self.assertEqual(self.seen, [(DoVChangedEvent.TYPE.UPDATE, None)])
+
+
+if __name__ == '__main__':
+  unittest.main()
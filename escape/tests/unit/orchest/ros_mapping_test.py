@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+sys.path.append(os.path.dirname(__file__) + "/../../../../pox")
+sys.path.append(os.path.dirname(__file__) + "/../../../../mapping")
+
+from escape.orchest.ros_mapping import MappingCache
+
+
+class FakeNFFG (object):
+  """
+  Request which is serialized to the given data
+  """
+  def __init__ (self, id, data=None):
+    self.id = id
+    self.data = data if data is not None else '{"id": "%s"}' % id
+
+  def dump (self):
+    return self.data
+
+  def copy (self):
+    return FakeNFFG(id=self.id, data=self.data)
+
+
+class MappingCacheTest (unittest.TestCase):
+  def setUp (self):
+    self.cache = MappingCache(size=2)
+
+  def _key (self, id, revision=1):
+    return MappingCache.get_key(graph=FakeNFFG(id=id), revision=revision)
+
+  def test_miss (self):
+    self.assertIsNone(self.cache.get(self._key("req1")))
+    self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+  def test_hit (self):
+    mapped = FakeNFFG(id="mapped1")
+    self.cache.put(self._key("req1"), mapped_nffg=mapped,
+                   mapping_state="state", persistent_state="persistent")
+    result, state, persistent = self.cache.get(self._key("req1"))
+    self.assertEqual(result.id, "mapped1")
+    # Cached results are copied in both directions
+    self.assertIsNot(result, mapped)
+    self.assertIsNot(result, self.cache.get(self._key("req1"))[0])
+    self.assertEqual((state, persistent), ("state", "persistent"))
+    self.assertEqual((self.cache.hits, self.cache.misses), (2, 0))
+
+  def test_identical_requests (self):
+    self.cache.put(self._key("req1"), mapped_nffg=FakeNFFG(id="mapped1"))
+    same = MappingCache.get_key(graph=FakeNFFG(id="other",
+                                               data='{"id": "req1"}'),
+                                revision=1)
+    self.assertIsNotNone(self.cache.get(same))
+
+  def test_revision_change (self):
+    self.cache.put(self._key("req1", revision=1),
+                   mapped_nffg=FakeNFFG(id="mapped1"))
+    # Mapping results of a previous view revision are never hit
+    self.assertIsNone(self.cache.get(self._key("req1", revision=2)))
+    self.assertEqual(self.cache.misses, 1)
+
+  def test_lru_eviction (self):
+    self.cache.put(self._key("req1"), mapped_nffg=FakeNFFG(id="mapped1"))
+    self.cache.put(self._key("req2"), mapped_nffg=FakeNFFG(id="mapped2"))
+    # Refresh req1 so req2 becomes the least recently used one
+    self.assertIsNotNone(self.cache.get(self._key("req1")))
+    self.cache.put(self._key("req3"), mapped_nffg=FakeNFFG(id="mapped3"))
+    self.assertIsNone(self.cache.get(self._key("req2")))
+    self.assertIsNotNone(self.cache.get(self._key("req1")))
+    self.assertIsNotNone(self.cache.get(self._key("req3")))
+
+  def test_remove (self):
+    self.cache.put(self._key("req1"), mapped_nffg=FakeNFFG(id="mapped1"))
+    self.assertTrue(self.cache.remove(self._key("req1")))
+    self.assertFalse(self.cache.remove(self._key("req1")))
+    self.assertIsNone(self.cache.get(self._key("req1")))
+
+  def test_invalidate (self):
+    self.cache.put(self._key("req1"), mapped_nffg=FakeNFFG(id="mapped1"))
+    self.cache.put(self._key("req2"), mapped_nffg=FakeNFFG(id="mapped2"))
+    self.cache.invalidate()
+    self.assertIsNone(self.cache.get(self._key("req1")))
+    self.assertIsNone(self.cache.get(self._key("req2")))
+
+
+if __name__ == '__main__':
+  unittest.main()
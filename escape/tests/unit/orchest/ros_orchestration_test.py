@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+sys.path.append(os.path.dirname(__file__) + "/../../../../pox")
+sys.path.append(os.path.dirname(__file__) + "/../../../../mapping")
+
+from escape.orchest.ros_orchestration import DeployPipeline, \
+  SpeculativeResourceView
+
+
+class FakeNFFG (object):
+  """
+  Mapped request which is identified only by its id
+  """
+  def __init__ (self, id, version=0):
+    self.id = id
+    self.version = version
+
+  def copy (self):
+    return FakeNFFG(id=self.id, version=self.version)
+
+
+class DeployPipelineTest (unittest.TestCase):
+  def setUp (self):
+    self.pipeline = DeployPipeline(depth=3)
+
+  def _push (self, id, version=0):
+    mapped = FakeNFFG(id=id, version=version)
+    return self.pipeline.push(mapped_nffg=mapped,
+                              original_request="original-%s" % id)
+
+  def test_enabled (self):
+    self.assertTrue(self.pipeline.enabled)
+    self.assertFalse(DeployPipeline(depth=1).enabled)
+
+  def test_deploy_order (self):
+    self.assertTrue(self._push("req1"))
+    self.assertFalse(self._push("req2"))
+    self.assertFalse(self._push("req3"))
+    self.assertEqual(self.pipeline.requests, ["req1", "req2", "req3"])
+    mapped, original = self.pipeline.pop_next(id="req1")
+    self.assertEqual((mapped.id, original), ("req2", "original-req2"))
+    mapped, original = self.pipeline.pop_next(id="req2")
+    self.assertEqual((mapped.id, original), ("req3", "original-req3"))
+    self.assertIsNone(self.pipeline.pop_next(id="req3"))
+    self.assertEqual(self.pipeline.requests, [])
+
+  def test_pop_not_deployed (self):
+    self._push("req1")
+    self._push("req2")
+    # Only the request under deployment can be finished
+    self.assertIsNone(self.pipeline.pop_next(id="req2"))
+    self.assertEqual(self.pipeline.requests, ["req1", "req2"])
+
+  def test_remapped_request_replaces_deployed (self):
+    self._push("req1")
+    self.assertTrue(self._push("req1", version=1))
+    self.assertEqual(self.pipeline.requests, ["req1"])
+    self.assertEqual(self.pipeline.get_speculative_view()
+                     .get_resource_info().version, 1)
+
+  def test_speculative_view (self):
+    self.assertIsNone(self.pipeline.get_speculative_view())
+    self._push("req1")
+    view = self.pipeline.get_speculative_view()
+    self.assertIsInstance(view, SpeculativeResourceView)
+    self.assertEqual(view.get_resource_info().id, "req1")
+    self._push("req2")
+    # Subsequent requests are mapped on the last mapped request
+    self.assertEqual(
+      self.pipeline.get_speculative_view().get_resource_info().id, "req2")
+
+  def test_invalidate_on_failure (self):
+    self._push("req1")
+    self._push("req2")
+    self._push("req3")
+    invalid = self.pipeline.invalidate(id="req1")
+    # Waiting requests are returned for remapping in their original order
+    self.assertEqual([(m.id, o) for m, o in invalid],
+                     [("req2", "original-req2"), ("req3", "original-req3")])
+    self.assertEqual(self.pipeline.requests, [])
+    self.assertIsNone(self.pipeline.get_speculative_view())
+
+  def test_remap_after_failure (self):
+    self._push("req1")
+    self._push("req2")
+    self._push("req3")
+    for mapped, original in self.pipeline.invalidate(id="req1"):
+      self._push(mapped.id, version=mapped.version + 1)
+    # The first remapped request is deployed right away on the real view
+    self.assertEqual(self.pipeline.requests, ["req2", "req3"])
+    mapped, original = self.pipeline.pop_next(id="req2")
+    self.assertEqual((mapped.id, mapped.version), ("req3", 1))
+
+  def test_invalidate_not_deployed (self):
+    self._push("req1")
+    self._push("req2")
+    self.assertEqual(self.pipeline.invalidate(id="req2"), [])
+    self.assertEqual(self.pipeline.requests, ["req1", "req2"])
+
+
+if __name__ == '__main__':
+  unittest.main()
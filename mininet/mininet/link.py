@@ -42,7 +42,11 @@ def __init__( self, name, node=None, port=None, link=None, **params ):
         self.link = link
         self.mac, self.ip, self.prefixLen = None, None, None
         # Add to node (and move ourselves if necessary )
-        node.addIntf( self, port=port )
+        moveIntfFn = params.pop( 'moveIntfFn', None )
+        if moveIntfFn:
+            node.addIntf( self, port=port, moveIntfFn=moveIntfFn )
+        else:
+            node.addIntf( self, port=port )
         # Save params for future reference
         self.params = params
         self.config( **params )
@@ -323,7 +327,7 @@ class Link( object ):
     def __init__( self, node1, node2, port1=None, port2=None,
                   intfName1=None, intfName2=None,
                   intf=Intf, cls1=None, cls2=None, params1=None,
-                  params2=None ):
+                  params2=None, fast=False ):
         """Create veth link to another node, making two new interfaces.
            node1: first node
            node2: second node
@@ -334,7 +338,9 @@ def __init__( self, node1, node2, port1=None, port2=None,
            intfName1: node1 interface name (optional)
            intfName2: node2  interface name (optional)
            params1: parameters for interface 1
-           params2: parameters for interface 2"""
+           params2: parameters for interface 2
+           fast: the veth pair has already been created in the
+                 namespaces of the nodes (see makeIntfPairs)"""
         # This is a bit awkward; it seems that having everything in
         # params would be more orthogonal, but being able to specify
         # in-line arguments is more convenient!
@@ -347,7 +353,8 @@ def __init__( self, node1, node2, port1=None, port2=None,
         if not intfName2:
             intfName2 = self.intfName( node2, port2 )
 
-        self.makeIntfPair( intfName1, intfName2 )
+        if not fast:
+            self.makeIntfPair( intfName1, intfName2 )
 
         if not cls1:
             cls1 = intf
@@ -357,6 +364,10 @@ def __init__( self, node1, node2, port1=None, port2=None,
             params1 = {}
         if not params2:
             params2 = {}
+        if fast:
+            # Interfaces are already in place: don't move them
+            params1 = dict( params1, moveIntfFn=self._ignore )
+            params2 = dict( params2, moveIntfFn=self._ignore )
 
         intf1 = cls1( name=intfName1, node=node1, port=port1,
                       link=self, **params1  )
@@ -366,6 +377,11 @@ def __init__( self, node1, node2, port1=None, port2=None,
         # All we are is dust in the wind, and our two interfaces
         self.intf1, self.intf2 = intf1, intf2
 
+    @staticmethod
+    def _ignore( *args, **kwargs ):
+        "Ignore any arguments"
+        pass
+
     @classmethod
     def intfName( cls, node, n ):
         "Construct a canonical interface name node-ethN for interface n."
@@ -391,10 +407,11 @@ def __str__( self ):
 class TCLink( Link ):
     "Link with symmetric TC interfaces configured via opts"
     def __init__( self, node1, node2, port1=None, port2=None,
-                  intfName1=None, intfName2=None, **params ):
+                  intfName1=None, intfName2=None, fast=False, **params ):
         Link.__init__( self, node1, node2, port1=port1, port2=port2,
                        intfName1=intfName1, intfName2=intfName2,
                        cls1=TCIntf,
                        cls2=TCIntf,
                        params1=params,
-                       params2=params)
+                       params2=params,
+                       fast=fast )
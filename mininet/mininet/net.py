@@ -90,16 +90,18 @@
 import re
 import select
 import signal
-from time import sleep
+from time import sleep, time
 from itertools import chain
+from collections import OrderedDict
 
 from cli import CLI
 from log import info, error, debug, output
-from node import Host, OVSKernelSwitch, Controller
+from node import Host, OVSKernelSwitch, OVSSwitch, Controller
 from node import EE, NetconfAgent, RemoteSwitch, Node
 from link import Link, Intf
 from util import quietRun, fixLimits, numCores, ensureRoot
 from util import macColonHex, ipStr, ipParse, netParse, ipAdd
+from util import makeIntfPairs
 from term import cleanUpScreens, makeTerms
 from clickgui import makeClickys
 
@@ -115,7 +117,7 @@ def __init__( self, topo=None, switch=OVSKernelSwitch, host=Host,
                   build=True, xterms=False, cleanup=False, ipBase='10.0.0.0/8',
                   inNamespace=False,
                   autoSetMacs=False, autoStaticArp=False, autoPinCpus=False,
-                  listenPort=None ):
+                  listenPort=None, fast=False ):
         """Create Mininet object.
            topo: Topo (topology) object or None
            switch: default Switch class
@@ -135,7 +137,9 @@ def __init__( self, topo=None, switch=OVSKernelSwitch, host=Host,
            autoStaticArp: set all-pairs static MAC addrs?
            autoPinCpus: pin hosts to (real) cores (requires CPULimitedHost)?
            listenPort: base listening port to open; will be incremented for
-               each additional switch in the net if inNamespace=False"""
+               each additional switch in the net if inNamespace=False
+           fast: create links in bulk, start OVS switches in a few
+               transactions and poll agents instead of fixed waits?"""
         self.topo = topo
         self.switch = switch
         self.agent = agent
@@ -157,6 +161,8 @@ def __init__( self, topo=None, switch=OVSKernelSwitch, host=Host,
         self.numCores = numCores()
         self.nextCore = 0  # next core for pinning hosts to CPUs
         self.listenPort = listenPort
+        self.fast = fast
+        self.timings = OrderedDict()  # elapsed time of build/start phases
 
         self.hosts = []
         self.ees = []
@@ -359,6 +365,57 @@ def addLink( self, node1, node2, port1=None, port2=None,
             cls = self.link
         return cls( node1, node2, **defaults )
 
+    def addLinks( self, links ):
+        """Add links in bulk.
+           links: list of ( node1, node2, port1, port2, params ) tuples
+           returns: list of link objects
+           In fast mode the veth pairs of all links are created with a
+           single 'ip -batch' run before creating the link objects."""
+        start = time()
+        if not self.fast:
+            result = [ self.addLink( node1, node2, port1, port2, **params )
+                       for node1, node2, port1, port2, params in links ]
+            self.addTiming( 'links', start )
+            return result
+        # Allocate ports and interface names up front
+        nextPorts = {}
+        def allocPort( node, port ):
+            "Return the given or the next free port of node"
+            if port is None:
+                port = nextPorts.get( node, node.newPort() )
+            nextPorts[ node ] = max( nextPorts.get( node, node.newPort() ),
+                                     port + 1 )
+            return port
+        prepared, pairs = [], []
+        for node1, node2, port1, port2, params in links:
+            params = dict( params )
+            cls = params.get( 'cls' ) or self.link
+            port1, port2 = allocPort( node1, port1 ), allocPort( node2, port2 )
+            params.setdefault( 'intfName1', cls.intfName( node1, port1 ) )
+            params.setdefault( 'intfName2', cls.intfName( node2, port2 ) )
+            pairs.append( ( params[ 'intfName1' ], params[ 'intfName2' ],
+                            node1, node2 ) )
+            prepared.append( ( node1, node2, port1, port2, params ) )
+        makeIntfPairs( pairs )
+        result = [ self.addLink( node1, node2, port1, port2, fast=True,
+                                 **params )
+                   for node1, node2, port1, port2, params in prepared ]
+        self.addTiming( 'links', start )
+        return result
+
+    def addTiming( self, phase, start ):
+        """Account the time elapsed since start to a build/start phase.
+           phase: name of the phase
+           start: start timestamp of the measurement"""
+        self.timings[ phase ] = self.timings.get( phase, 0 ) + time() - start
+
+    def reportTimings( self ):
+        "Print the elapsed time of the build/start phases."
+        if self.timings:
+            info( '*** Elapsed time of phases: %s\n' % ', '.join(
+                '%s %.3fs' % ( phase, elapsed )
+                for phase, elapsed in self.timings.iteritems() ) )
+
     def configHosts( self ):
         "Configure a set of hosts."
         for host in self.hosts:
@@ -459,6 +516,7 @@ def buildFromTopo( self, topo=None ):
             for i, cls in enumerate( classes ):
                 self.addController( 'c%d' % i, cls )
 
+        start = time()
         info( '*** Adding hosts:\n' )
         for hostName in topo.hosts():
             self.addHost( hostName, **topo.nodeInfo( hostName ) )
@@ -481,13 +539,17 @@ def buildFromTopo( self, topo=None ):
         #     self.addAgent( agtName, **topo.nodeInfo( agtName) )
         #     info( agtName + ' ' )
 
+        self.addTiming( 'nodes', start )
+
         info( '\n*** Adding links:\n' )
+        links = []
         for srcName, dstName in topo.links(sort=True):
             src, dst = self.nameToNode[ srcName ], self.nameToNode[ dstName ]
             params = topo.linkInfo( srcName, dstName )
             srcPort, dstPort = topo.port( srcName, dstName )
-            self.addLink( src, dst, srcPort, dstPort, **params )
+            links.append( ( src, dst, srcPort, dstPort, params ) )
             info( '(%s, %s) ' % ( src.name, dst.name ) )
+        self.addLinks( links )
 
         info( '\n' )
 
@@ -502,6 +564,7 @@ def build( self ):
             self.buildFromTopo( self.topo )
         if ( self.inNamespace ):
             self.configureControlNetwork()
+        start = time()
         info( '*** Configuring hosts\n' )
         self.configHosts()
         if self.ees:
@@ -510,6 +573,7 @@ def build( self ):
         if self.agents:
             info( '*** Configuring agents\n' )
             self.configAgents()
+        self.addTiming( 'config', start )
         if self.xterms:
             self.startTerms()
         if self.autoStaticArp:
@@ -566,29 +630,69 @@ def start( self ):
         "Start controller and switches and agents."
         if not self.built:
             self.build()
+        start = time()
         info( '*** Starting controller\n' )
         for controller in self.controllers:
             controller.start()
+        self.addTiming( 'controllers', start )
+        start = time()
         info( '*** Starting %s switches\n' % len( self.switches ) )
-        for switch in self.switches:
+        switches = self.switches
+        if self.fast:
+            # OVS switches in the root namespace are started in batches
+            batch = [ switch for switch in self.switches
+                      if not switch.inNamespace and
+                      getattr( switch.start, 'im_func', None ) is
+                      OVSSwitch.start.im_func ]
+            info( ' '.join( switch.name for switch in batch ) + ' ' )
+            OVSSwitch.batchStartup( batch, self.controllers )
+            batch = set( batch )
+            switches = [ switch for switch in self.switches
+                         if switch not in batch ]
+        for switch in switches:
             info( switch.name + ' ')
             switch.start( self.controllers )
+        self.addTiming( 'switches', start )
+        start = time()
         if self.agents:
             info( '\n' )
             info( '*** Starting %s agents\n' % len( self.agents ) )
         for agt in self.agents:
             info( agt.name + ' ')
             agt.start()
-            import time
-            time.sleep(1)
+            if not self.fast:
+                sleep(1)
+        if self.fast:
+            self.waitAgents()
+        self.addTiming( 'agents', start )
         info( '\n' )
 
         if self.ees:
+            start = time()
             info( '*** Setting up control network for EEs\n' )
             self.configureSwitchedControlNetwork( )
 
             info( '*** Starting VNFs\n')
             self.startVNFs()
+            self.addTiming( 'vnfs', start )
+        self.reportTimings()
+
+    def waitAgents( self, timeout=10, delay=.05 ):
+        """Wait for the started agents to become ready.
+           timeout: max time to wait in seconds
+           delay: time between polls in seconds
+           returns: True if all agents are ready"""
+        pending = list( self.agents )
+        deadline = time() + timeout
+        while True:
+            pending = [ agt for agt in pending if not agt.ready() ]
+            if not pending or time() > deadline:
+                break
+            sleep( delay )
+        if pending:
+            error( '*** Agents are not ready after %ss: %s\n' %
+                   ( timeout, ' '.join( agt.name for agt in pending ) ) )
+        return not pending
 
     def stop( self ):
         "Stop the controller(s), switches and hosts"
@@ -54,7 +54,7 @@
 
 from mininet.log import info, error, warn, debug
 from mininet.util import ( quietRun, run, errRun, errFail, moveIntf, isShellBuiltin,
-                           numCores, retry, mountCgroups )
+                           numCores, retry, mountCgroups, ipBatch )
 from mininet.moduledeps import moduleDeps, pathCheck, OVS_KMOD, OF_KMOD, TUN
 from mininet.link import Link, Intf, TCIntf
 from mininet.vnfcatalog import Catalog
@@ -348,10 +348,11 @@ def newPort( self ):
             return max( self.ports.values() ) + 1
         return self.portBase
 
-    def addIntf( self, intf, port=None ):
+    def addIntf( self, intf, port=None, moveIntfFn=moveIntf ):
         """Add an interface.
            intf: interface
-           port: port number (optional, typically OpenFlow port number)"""
+           port: port number (optional, typically OpenFlow port number)
+           moveIntfFn: function to move interface (optional)"""
         if port is None:
             port = self.newPort()
         self.intfs[ port ] = intf
@@ -361,7 +362,7 @@ def addIntf( self, intf, port=None ):
         debug( 'added intf %s:%d to node %s\n' % ( intf, port, self.name ) )
         if self.inNamespace:
             debug( 'moving', intf, 'into namespace for', self.name, '\n' )
-            moveIntf( intf.name, self )
+            moveIntfFn( intf.name, self )
 
     def defaultIntf( self ):
         "Return interface for lowest port"
@@ -1122,6 +1123,64 @@ def start( self, controllers ):
             self.cmd( 'ovs-vsctl set Controller', uuid,
                       'max_backoff=1000' )
 
+    def batchArgs( self, controllers, ref='c' ):
+        """Return the ovs-vsctl transaction arguments which start up
+           the switch in the same way as start() does
+           controllers: controllers to connect to
+           ref: unique prefix of controller record names"""
+        int( self.dpid, 16 ) # DPID must be a hex string
+        args = [ '--', '--if-exists', 'del-br', self.name,
+                 '--', 'add-br', self.name,
+                 '--', 'set', 'Bridge', self.name,
+                 'other_config:datapath-id=' + self.dpid,
+                 'fail_mode=' + self.failMode ]
+        if self.datapath == 'user':
+            args.append( 'datapath_type=netdev' )
+        # Request the port numbers explicitly, ports may be added in any
+        # order within a transaction
+        for intf in self.intfList():
+            if not intf.IP():
+                args += [ '--', 'add-port', self.name, intf.name,
+                          '--', 'set', 'Interface', intf.name,
+                          'ofport_request=%s' % self.ports[ intf ] ]
+        targets = [ 'tcp:%s:%d' % ( c.IP(), c.port ) for c in controllers ]
+        if self.listenPort:
+            targets.append( 'ptcp:%s' % self.listenPort )
+        refs = []
+        for i, target in enumerate( targets ):
+            # Reconnect quickly to controllers (1s vs. 15s max_backoff)
+            refs.append( '@%s%d' % ( ref, i ) )
+            args += [ '--', '--id=' + refs[ -1 ], 'create', 'Controller',
+                      'target="%s"' % target, 'max_backoff=1000' ]
+        if refs:
+            args += [ '--', 'set', 'Bridge', self.name,
+                      'controller=[%s]' % ','.join( refs ) ]
+        return args
+
+    @classmethod
+    def batchStartup( cls, switches, controllers, batchSize=64 ):
+        """Start up OVS switches with a few ovs-vsctl transactions
+           instead of several ovs-vsctl calls per switch
+           switches: OVS switches in the root namespace
+           controllers: controllers to connect to
+           batchSize: max number of switches in a transaction"""
+        if not switches:
+            return
+        quietRun( 'ifconfig lo up' )
+        for i in range( 0, len( switches ), batchSize ):
+            args = [ 'ovs-vsctl' ]
+            for j, switch in enumerate( switches[ i : i + batchSize ] ):
+                args += switch.batchArgs( controllers, ref='c%d_' % j )
+            out, err, exitcode = errRun( args )
+            if exitcode:
+                raise Exception( 'Error starting switches: %s' % err )
+        intfs = [ intf for switch in switches
+                  for intf in switch.intfList() if not intf.IP() ]
+        if intfs:
+            ipBatch( [ 'link set dev %s up' % intf for intf in intfs ] )
+        for intf in intfs:
+            cls.TCReapply( intf )
+
     def stop( self ):
         "Terminate OVS switch."
         self.cmd( 'ovs-vsctl del-br', self )
@@ -1237,6 +1296,10 @@ def connected( self ):
         "Is the agent connected to a management system?"
         return False and self  # satisfy pylint
 
+    def ready( self ):
+        "Is the started agent ready to accept requests? (override this method)"
+        return True
+
     def stop( self ):
         Node.stop( self )
 
@@ -1328,6 +1391,10 @@ def connected( self ):
         ## TODO
         pass
 
+    def ready( self ):
+        "Has netconfd opened its server socket?"
+        return os.path.exists( '/tmp/ncxserver_%s.sock' % self.agentPort )
+
     def _setAgentInSwitch( self ):
         for sw in self.switches:
             sw.setAgent( self )
@@ -20,17 +20,19 @@ class testSingleSwitchCommon( object ):
     "Test ping with single switch topology (common code)."
 
     switchClass = None # overridden in subclasses
+    fast = False # fast build mode
 
     def testMinimal( self ):
         "Ping test on minimal topology"
-        mn = Mininet( SingleSwitchTopo(), self.switchClass, Host, Controller )
+        mn = Mininet( SingleSwitchTopo(), self.switchClass, Host, Controller,
+                      fast=self.fast )
         dropped = mn.run( mn.ping )
         self.assertEqual( dropped, 0 )
 
     def testSingle5( self ):
         "Ping test on 5-host single-switch topology"
         mn = Mininet( SingleSwitchTopo( k=5 ), self.switchClass, Host,
-                      Controller )
+                      Controller, fast=self.fast )
         dropped = mn.run( mn.ping )
         self.assertEqual( dropped, 0 )
 
@@ -44,6 +46,12 @@ class testSingleSwitchOVSUser( testSingleSwitchCommon, unittest.TestCase ):
     "Test ping with single switch topology (OVS user switch)."
     switchClass = partial( OVSSwitch, datapath='user' )
 
+class testSingleSwitchOVSKernelFast( testSingleSwitchCommon,
+                                     unittest.TestCase ):
+    "Test ping with single switch topology (OVS kernel switch, fast build)."
+    switchClass = OVSSwitch
+    fast = True
+
 @unittest.skipUnless( quietRun( 'which ivs-ctl' ), 'IVS is not installed' )
 class testSingleSwitchIVS( testSingleSwitchCommon, unittest.TestCase ):
     "Test ping with single switch topology (IVS switch)."
@@ -63,10 +71,12 @@ class testLinearCommon( object ):
     "Test all-pairs ping with LinearNet (common code)."
 
     switchClass = None # overridden in subclasses
+    fast = False # fast build mode
 
     def testLinear5( self ):
         "Ping test on a 5-switch topology"
-        mn = Mininet( LinearTopo( k=5 ), self.switchClass, Host, Controller )
+        mn = Mininet( LinearTopo( k=5 ), self.switchClass, Host, Controller,
+                      fast=self.fast )
         dropped = mn.run( mn.ping )
         self.assertEqual( dropped, 0 )
 
@@ -81,6 +91,11 @@ class testLinearOVSUser( testLinearCommon, unittest.TestCase ):
     "Test all-pairs ping with LinearNet (OVS user switch)."
     switchClass = partial( OVSSwitch, datapath='user' )
 
+class testLinearOVSKernelFast( testLinearCommon, unittest.TestCase ):
+    "Test all-pairs ping with LinearNet (OVS kernel switch, fast build)."
+    switchClass = OVSSwitch
+    fast = True
+
 @unittest.skipUnless( quietRun( 'which ivs-ctl' ), 'IVS is not installed' )
 class testLinearIVS( testLinearCommon, unittest.TestCase ):
     "Test all-pairs ping with LinearNet (IVS switch)."
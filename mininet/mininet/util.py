@@ -11,6 +11,7 @@
 from os import O_NONBLOCK
 import os
 from functools import partial
+from tempfile import NamedTemporaryFile
 
 # Command execution support
 
@@ -194,6 +195,44 @@ def makeIntfPair( intf1, intf2, addr1=None, addr2=None, node1=None, node2=None,
         raise Exception( "Error creating interface pair (%s,%s): %s " %
                          ( intf1, intf2, cmdOutput ) )
 
+def ipBatch( cmds, force=False ):
+    """Run ip commands with a single 'ip -batch' process
+       cmds: list of ip commands without the leading 'ip'
+       force: don't stop at the first failed command
+       returns: merged stdout and stderr"""
+    with NamedTemporaryFile( prefix='mn-ip-batch-' ) as batch:
+        batch.write( '\n'.join( cmds ) + '\n' )
+        batch.flush()
+        args = [ 'ip', '-force', '-batch' ] if force else [ 'ip', '-batch' ]
+        return quietRun( args + [ batch.name ] )
+
+def makeIntfPairs( pairs, deleteIntfs=True ):
+    """Make veth pairs in bulk with a few 'ip -batch' runs
+       pairs: list of ( intf1, intf2, node1, node2 ) tuples; interfaces
+              of nodes in a namespace are created directly in there
+       deleteIntfs: delete intfs before creating them
+       raises Exception on failure"""
+    if not pairs:
+        return
+    dels, adds = [], []
+    for intf1, intf2, node1, node2 in pairs:
+        if deleteIntfs:
+            # Delete any old interfaces with the same names
+            dels += [ 'link del ' + intf1, 'link del ' + intf2 ]
+        netns1 = ( ' netns %s' % node1.pid
+                   if node1 and node1.inNamespace else '' )
+        netns2 = ( ' netns %s' % node2.pid
+                   if node2 and node2.inNamespace else '' )
+        adds.append( 'link add name %s%s type veth peer name %s%s' %
+                     ( intf1, netns1, intf2, netns2 ) )
+    if dels:
+        # Most of the interfaces do not exist: ignore the errors
+        ipBatch( dels, force=True )
+    cmdOutput = ipBatch( adds )
+    if cmdOutput:
+        raise Exception( "Error creating %d interface pairs: %s " %
+                         ( len( adds ), cmdOutput ) )
+
 def retry( retries, delaySecs, fn, *args, **keywords ):
     """Try something several times before giving up.
        n: number of times to retry
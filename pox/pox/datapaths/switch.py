@@ -37,7 +37,7 @@ from pox.lib.recoco import Timer
 from pox.openflow.libopenflow_01 import *
 import pox.openflow.libopenflow_01 as of
 from pox.openflow.util import make_type_to_unpacker_table
-from pox.openflow.flow_table import FlowTable, TableEntry
+from pox.openflow.flow_table import FlowTable, TableEntry, flow_key
 from pox.lib.packet import *
 
 import logging
@@ -91,6 +91,12 @@ class SoftwareSwitchBase (object):
     self._lookup_count = 0
     self._matched_count = 0
 
+    # Entries found for the flow keys of the burst being received by
+    # rx_packets().  Cleared after each burst and whenever the table changes.
+    self._rx_entries = {}
+    # entry -> (actions, compiled actions), see _compile_actions()
+    self._compiled_actions = {}
+
     self.log = logging.getLogger(self.name)
     self._connection = None
 
@@ -215,7 +221,11 @@ class SoftwareSwitchBase (object):
     """
     Handle flow table modification events
     """
-    # Currently, we only use this for sending flow_removed messages
+    self._rx_entries.clear()
+    for entry in event.removed:
+      self._compiled_actions.pop(entry, None)
+
+    # Otherwise, we only use this for sending flow_removed messages
     if not event.removed: return
 
     if event.reason in (OFPRR_IDLE_TIMEOUT,OFPRR_HARD_TIMEOUT,OFPRR_DELETE):
@@ -472,21 +482,97 @@ class SoftwareSwitchBase (object):
     in_port: the integer port number
     packet_data: packed version of packet if available
     """
+    port = self._rx_port(packet, in_port)
+    if port is None: return
+
+    size = self._rx_count(packet, in_port, packet_data)
+
+    self._lookup_count += 1
+    entry = self.table.entry_for_packet(packet, in_port)
+    if entry is not None:
+      self._matched_count += 1
+      entry.touch_packet(size)
+      self._process_actions_for_packet(entry.actions, packet, in_port)
+    else:
+      self._rx_table_miss(packet, in_port, port, packet_data)
+
+  def rx_packets (self, batch):
+    """
+    process a burst of dataplane packets
+
+    batch: a sequence of (packet, in_port) or (packet, in_port, packet_data)
+           with the same meaning as the arguments of rx_packet()
+
+    Packets are processed in order, just like by rx_packet(), but the flow
+    table is only searched once per distinct flow of the burst, the actions
+    of entries are compiled, and entry counters are updated once per entry.
+    """
+    hits = {} # entry -> [packet count, byte count]
+    for item in batch:
+      packet,in_port = item[0],item[1]
+      packet_data = item[2] if len(item) > 2 else None
+
+      port = self._rx_port(packet, in_port)
+      if port is None: continue
+
+      size = self._rx_count(packet, in_port, packet_data)
+
+      self._lookup_count += 1
+      key = flow_key(packet, in_port, spec_frags=True)
+      entries = self._rx_entries
+      if key in entries:
+        entry = entries[key]
+      else:
+        entry = entries[key] = self.table.entry_for_key(key)
+      if entry is None:
+        self._rx_table_miss(packet, in_port, port, packet_data)
+        continue
+
+      self._matched_count += 1
+      counters = hits.get(entry)
+      if counters is None:
+        hits[entry] = [1, size]
+      else:
+        counters[0] += 1
+        counters[1] += size
+
+      compiled = self._compiled_actions.get(entry)
+      if compiled is None or compiled[0] is not entry.actions:
+        compiled = (entry.actions, self._compile_actions(entry.actions))
+        self._compiled_actions[entry] = compiled
+      if compiled[1] is None:
+        # Let the regular path deal with (and report) bad actions
+        self._process_actions_for_packet(entry.actions, packet, in_port)
+      else:
+        compiled[1](packet, in_port, size)
+
+    self._rx_entries.clear()
+
+    now = time.time()
+    for entry,(packet_count,byte_count) in hits.iteritems():
+      entry.touch_packets(packet_count, byte_count, now)
+
+  def _rx_port (self, packet, in_port):
+    """
+    Returns the port a dataplane packet is received on
+
+    Returns None if the packet is to be dropped.
+    """
     assert assert_type("packet", packet, ethernet, none_ok=False)
     assert assert_type("in_port", in_port, int, none_ok=False)
     port = self.ports.get(in_port)
     if port is None:
       self.log.warn("Got packet on missing port %i", in_port)
-      return
+      return None
 
     is_stp = packet.dst == _STP_MAC
 
     if (port.config & OFPPC_NO_RECV) and not is_stp:
       # Drop all except STP
-      return
+      return None
     if (port.config & OFPPC_NO_RECV_STP) and is_stp:
       # Drop STP
-      return
+      return None
 
     if self.config_flags & OFPC_FRAG_MASK:
       ipp = packet.find(ipv4)
@@ -495,7 +581,7 @@ class SoftwareSwitchBase (object):
           frag_mode = self.config_flags & OFPC_FRAG_MASK
           if frag_mode == OFPC_FRAG_DROP:
             # Drop fragment
-            return
+            return None
           elif frag_mode == OFPC_FRAG_REASM:
             if self.features.cap_ip_reasm:
               #TODO: Implement fragment reassembly
@@ -503,27 +589,32 @@ class SoftwareSwitchBase (object):
           else:
             self.log.warn("Illegal fragment processing mode: %i", frag_mode)
 
-    self.port_stats[in_port].rx_packets += 1
+    return port
+
+  def _rx_count (self, packet, in_port, packet_data):
+    """
+    Counts a received packet in the port stats and returns its size
+    """
     if packet_data is not None:
-      self.port_stats[in_port].rx_bytes += len(packet_data)
+      size = len(packet_data)
     else:
-      self.port_stats[in_port].rx_bytes += len(packet.pack()) # Expensive
+      size = len(packet.pack()) # Expensive
+    stats = self.port_stats[in_port]
+    stats.rx_packets += 1
+    stats.rx_bytes += size
+    return size
 
-    self._lookup_count += 1
-    entry = self.table.entry_for_packet(packet, in_port)
-    if entry is not None:
-      self._matched_count += 1
-      entry.touch_packet(len(packet))
-      self._process_actions_for_packet(entry.actions, packet, in_port)
-    else:
-      # no matching entry
-      if port.config & OFPPC_NO_PACKET_IN:
-        return
-      buffer_id = self._buffer_packet(packet, in_port)
-      if packet_data is None:
-        packet_data = packet.pack()
-      self.send_packet_in(in_port, buffer_id, packet_data,
-                          reason=OFPR_NO_MATCH, data_length=self.miss_send_len)
+  def _rx_table_miss (self, packet, in_port, port, packet_data):
+    """
+    Handles a received packet which didn't match any entry
+    """
+    if port.config & OFPPC_NO_PACKET_IN:
+      return
+    buffer_id = self._buffer_packet(packet, in_port)
+    if packet_data is None:
+      packet_data = packet.pack()
+    self.send_packet_in(in_port, buffer_id, packet_data,
+                        reason=OFPR_NO_MATCH, data_length=self.miss_send_len)
 
   def delete_port (self, port):
     """
@@ -620,7 +711,8 @@ class SoftwareSwitchBase (object):
     """
     self.log.info("Sending packet %s out port %s", str(packet), port_no)
 
-  def _output_packet (self, packet, out_port, in_port, max_len=None):
+  def _output_packet (self, packet, out_port, in_port, max_len=None,
+                      size=None):
     """
     send a packet out some port
 
@@ -629,6 +721,7 @@ class SoftwareSwitchBase (object):
     packet: instance of ethernet
     out_port, in_port: the integer port number
     max_len: maximum packet payload length to send to controller
+    size: length of the packed packet if already known
     """
     assert assert_type("packet", packet, ethernet, none_ok=False)
 
@@ -652,7 +745,11 @@ class SoftwareSwitchBase (object):
         self.log.debug("Dropping packet sent on port %i: Link down", port_no)
         return
       self.port_stats[port_no].tx_packets += 1
-      self.port_stats[port_no].tx_bytes += len(packet.pack()) #FIXME: Expensive
+      if size is None:
+        #FIXME: Expensive
+        self.port_stats[port_no].tx_bytes += len(packet.pack())
+      else:
+        self.port_stats[port_no].tx_bytes += size
       self._output_packet_physical(packet, port_no)
 
     if out_port < OFPP_MAX:
@@ -741,6 +838,40 @@ class SoftwareSwitchBase (object):
         return
       packet = h(action, packet, in_port)
 
+  def _compile_actions (self, actions):
+    """
+    compile actions into a function of (packet, in_port, size)
+
+    The handlers of the actions are looked up once rather than per packet.
+    If the actions only output the packet, it is not modified, so the size
+    it was received with is used for the port stats instead of repacking it.
+    Returns None if there is an unsupported action.
+    """
+    if all(action.type == OFPAT_OUTPUT for action in actions):
+      outputs = tuple((action.port, action.max_len) for action in actions)
+      output = self._output_packet
+      def process (packet, in_port, size):
+        for out_port,max_len in outputs:
+          output(packet, out_port, in_port, max_len, size)
+      return process
+
+    steps = []
+    for action in actions:
+      h = self.action_handlers.get(action.type)
+      if h is None: return None
+      steps.append((h, action))
+    steps = tuple(steps)
+
+    if len(steps) == 1:
+      h,action = steps[0]
+      def process (packet, in_port, size):
+        h(action, packet, in_port)
+    else:
+      def process (packet, in_port, size):
+        for h,action in steps:
+          packet = h(action, packet, in_port)
+    return process
+
   def _flow_mod_add (self, flow_mod, connection, table):
     """
     Process an OFPFC_ADD flow mod sent to the switch.
@@ -47,8 +47,15 @@ switches = {}
 # ethaddr -> (switch, port)
 mac_map = {}
 
-# [sw1][sw2] -> (distance, intermediate)
-path_map = defaultdict(lambda:defaultdict(lambda:(None,None)))
+# Shortest path trees, calculated on demand for each source switch.
+# [src][dst] -> (distance, previous switch on the path from src)
+path_map = {}
+
+# Sources whose shortest path tree uses a link.  [frozenset((sw1,sw2))] -> set
+path_users = defaultdict(set)
+
+# Path calculation statistics (time is in seconds)
+path_stats = {'calculations':0, 'time':0.0, 'invalidations':0}
 
 # Waiting path.  (dpid,xid)->WaitingPath
 waiting_paths = {}
@@ -64,61 +71,92 @@ FLOW_HARD_TIMEOUT = 30
 PATH_SETUP_TIME = 4
 
 
-def _calc_paths ():
+def _calc_paths (src):
+  """
+  Calculates the shortest path tree of src
+
+  Essentially breadth-first search, since all links have the same cost.
+  """
+  start = time.time()
+  tree = {src:(0,None)} # distance, previous
+  frontier = [src]
+  distance = 0
+  while frontier:
+    distance += 1
+    next_frontier = []
+    for sw in frontier:
+      for neighbor,port in adjacency[sw].iteritems():
+        if port is None or neighbor in tree: continue
+        tree[neighbor] = (distance,sw)
+        path_users[frozenset((sw,neighbor))].add(src)
+        next_frontier.append(neighbor)
+    frontier = next_frontier
+  path_map[src] = tree
+
+  elapsed = time.time() - start
+  path_stats['calculations'] += 1
+  path_stats['time'] += elapsed
+  log.debug("Calculated paths from %s to %i switches in %.3f ms",
+            src, len(tree) - 1, elapsed * 1000)
+  return tree
+
+
+def _invalidate_paths (src):
+  """
+  Forgets the shortest path tree of src
+  """
+  tree = path_map.pop(src, None)
+  if tree is None: return
+  path_stats['invalidations'] += 1
+  for dst,(distance,previous) in tree.iteritems():
+    if previous is None: continue
+    link = frozenset((previous,dst))
+    users = path_users.get(link)
+    if users is None: continue
+    users.discard(src)
+    if not users: del path_users[link]
+
+
+def _link_removed (sw1, sw2):
   """
-  Essentially Floyd-Warshall algorithm
+  Invalidates the paths which used a link between sw1 and sw2
   """
+  for src in list(path_users.get(frozenset((sw1,sw2)), ())):
+    _invalidate_paths(src)
 
-  def dump ():
-    for i in sws:
-      for j in sws:
-        a = path_map[i][j][0]
-        #a = adjacency[i][j]
-        if a is None: a = "*"
-        print a,
-      print
-
-  sws = switches.values()
-  path_map.clear()
-  for k in sws:
-    for j,port in adjacency[k].iteritems():
-      if port is None: continue
-      path_map[k][j] = (1,None)
-    path_map[k][k] = (0,None) # distance, intermediate
-
-  #dump()
-
-  for k in sws:
-    for i in sws:
-      for j in sws:
-        if path_map[i][k][0] is not None:
-          if path_map[k][j][0] is not None:
-            # i -> k -> j exists
-            ikj_dist = path_map[i][k][0]+path_map[k][j][0]
-            if path_map[i][j][0] is None or ikj_dist < path_map[i][j][0]:
-              # i -> k -> j is better than existing
-              path_map[i][j] = (ikj_dist, k)
-
-  #print "--------------------"
-  #dump()
+
+def _link_added (sw1, sw2):
+  """
+  Invalidates the paths which a new link between sw1 and sw2 may shorten
+  """
+  for src,tree in path_map.items():
+    d1 = tree.get(sw1)
+    d2 = tree.get(sw2)
+    if d1 is None and d2 is None:
+      # Neither is reachable from src, so the link doesn't matter
+      continue
+    if d1 is None or d2 is None or abs(d1[0] - d2[0]) > 1:
+      _invalidate_paths(src)
 
 
 def _get_raw_path (src, dst):
   """
   Get a raw path (just a list of nodes to traverse)
   """
-  if len(path_map) == 0: _calc_paths()
+  tree = path_map.get(src)
+  if tree is None: tree = _calc_paths(src)
   if src is dst:
     # We're here!
     return []
-  if path_map[src][dst][0] is None:
+  if dst not in tree:
     return None
-  intermediate = path_map[src][dst][1]
-  if intermediate is None:
-    # Directly connected
-    return []
-  return _get_raw_path(src, intermediate) + [intermediate] + \
-         _get_raw_path(intermediate, dst)
+  path = []
+  sw = tree[dst][1]
+  while sw is not src:
+    path.append(sw)
+    sw = tree[sw][1]
+  path.reverse()
+  return path
 
 
 def _check_path (p):
@@ -431,7 +469,8 @@ class l2_multi (EventMixin):
     sw1 = switches[l.dpid1]
     sw2 = switches[l.dpid2]
 
-    # Invalidate all flows and path info.
+    # Invalidate all flows.  Path info is invalidated below, only for the
+    # sources whose paths the link changes.
     # For link adds, this makes sure that if a new link leads to an
     # improved path, we use it.
     # For link removals, this makes sure that we don't use a
@@ -441,7 +480,6 @@ class l2_multi (EventMixin):
     for sw in switches.itervalues():
       if sw.connection is None: continue
       sw.connection.send(clear)
-    path_map.clear()
 
     if event.removed:
       # This link no longer okay
@@ -457,6 +495,10 @@ class l2_multi (EventMixin):
             adjacency[sw2][sw1] = ll.port2
             # Fixed -- new link chosen to connect these
             break
+
+      if adjacency[sw1][sw2] is None:
+        # Only paths which used this link are broken
+        _link_removed(sw1, sw2)
     else:
       # If we already consider these nodes connected, we can
       # ignore this link up.
@@ -468,6 +510,8 @@ class l2_multi (EventMixin):
           # Yup, link goes both ways -- connected!
           adjacency[sw1][sw2] = l.port1
           adjacency[sw2][sw1] = l.port2
+          # Only paths which this link may improve need recalculating
+          _link_added(sw1, sw2)
 
       # If we have learned a MAC on this port which we now know to
       # be connected to a switch, unlearn it.
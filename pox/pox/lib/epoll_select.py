@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import select
 
 class EpollSelect(object):
@@ -83,16 +84,31 @@ class EpollSelect(object):
     for (fd, mask) in modify.iteritems():
       if fd in self.registered:
         if mask == 0:
-          self.epoll.unregister(fd)
+          try:
+            self.epoll.unregister(fd)
+          except (IOError, OSError):
+            # fd has been closed (and so removed from epoll) in the meantime
+            pass
           del self.registered[fd]
+          if fd not in self.lastrl_set and fd not in self.lastwl_set:
+            self.fd_to_obj.pop(fd, None)
         else:
-          self.epoll.modify(fd, mask)
+          try:
+            self.epoll.modify(fd, mask)
+          except (IOError, OSError) as e:
+            # fd number has been closed and reused by a new file
+            if e.errno != errno.ENOENT: raise
+            self.epoll.register(fd, mask)
           self.registered[fd] = mask
       else:
         if mask == 0:
           raise AssertionError("This should never happen - a new fd was scheduled for modification but neither for read nor write_")
         else:
-          self.epoll.register(fd, mask)
+          try:
+            self.epoll.register(fd, mask)
+          except (IOError, OSError) as e:
+            if e.errno != errno.EEXIST: raise
+            self.epoll.modify(fd, mask)
           self.registered[fd] = mask
 
     # now for the real beef
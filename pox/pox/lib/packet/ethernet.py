@@ -37,11 +37,18 @@ PAE_MULTICAST        = EthAddr(b'\x01\x80\xc2\x00\x00\x03') # 802.1x Port
 NDP_MULTICAST        = EthAddr(b'\x01\x23\x20\x00\x00\x01') # Nicira discovery
                                                             #  multicast
 
+# Payload of a lazily parsed packet which hasn't been parsed yet
+_UNPARSED = object()
+
 class ethernet(packet_base):
   "Ethernet packet struct"
 
   resolve_names = False
 
+  # If True, the payload is only parsed when it is first accessed.  Can be
+  # set per packet with the "lazy" keyword argument.
+  lazy = False
+
   MIN_LEN = 14
 
   IP_TYPE    = 0x0800
@@ -102,6 +109,9 @@ class ethernet(packet_base):
     self.type = 0
     self.next = b''
 
+    if 'lazy' in kw:
+      self.lazy = kw.pop('lazy')
+
     if raw is not None:
       self.parse(raw)
 
@@ -124,9 +134,24 @@ class ethernet(packet_base):
     self.hdr_len = ethernet.MIN_LEN
     self.payload_len = alen - self.hdr_len
 
-    self.next = ethernet.parse_next(self, self.type, raw, ethernet.MIN_LEN)
+    if self.lazy:
+      self._next = _UNPARSED
+    else:
+      self.next = ethernet.parse_next(self, self.type, raw, ethernet.MIN_LEN)
     self.parsed = True
 
+  @property
+  def next (self):
+    n = self._next
+    if n is _UNPARSED:
+      n = self._next = ethernet.parse_next(self, self.type, self.raw,
+                                           self.hdr_len)
+    return n
+
+  @next.setter
+  def next (self, value):
+    self._next = value
+
   @staticmethod
   def parse_next (prev, typelen, raw, offset=0, allow_llc=True):
     parser = ethernet.type_parsers.get(typelen)
@@ -177,3 +202,9 @@ class ethernet(packet_base):
     if type(src) is EthAddr:
       src = src.toRaw()
     return struct.pack('!6s6sH', dst, src, self.type)
+
+  def pack (self):
+    if self._next is _UNPARSED:
+      # Payload is untouched, so no need to parse and repack it
+      return self.hdr(None) + self.raw[self.hdr_len:]
+    return packet_base.pack(self)
@@ -92,14 +92,10 @@ def checksum (data, start = 0, skip_word = None):
   else:
     arr = array.array('H', data)
 
-  if skip_word is not None:
-    for i in range(0, len(arr)):
-      if i == skip_word:
-        continue
-      start +=  arr[i]
-  else:
-    for i in range(0, len(arr)):
-      start +=  arr[i]
+  # Sum all the words at once rather than word by word
+  start += sum(arr)
+  if skip_word is not None and 0 <= skip_word < len(arr):
+    start -= arr[skip_word]
 
   if len(data) % 2 != 0:
     start += struct.unpack('H', data[-1]+'\0')[0] # Specify order?
@@ -14,6 +14,8 @@
 
 from __future__ import print_function
 from collections import deque
+import heapq
+import itertools
 from Queue import PriorityQueue
 from Queue import Queue
 import time
@@ -140,7 +142,7 @@ class Scheduler (object):
   """ Scheduler for Tasks """
 
   def __init__ (self, isDefaultScheduler = None, startInThread = True,
-                daemon = False, use_epoll=False, threaded_selecthub = True):
+                daemon = False, use_epoll=None, threaded_selecthub = True):
 
     self._ready = deque()
     self._hasQuit = False
@@ -597,19 +599,36 @@ class SelectHub (object):
   """
   This class is a single select() loop that handles all Select() requests for
   a scheduler as well as timed wakes (i.e., Sleep()).
+
+  The file descriptors of the waiting tasks are kept in a registry which
+  only changes when a task is registered or woken, and the timeouts are kept
+  in a min-heap, so a cycle doesn't need to walk all the waiting tasks.
   """
-  def __init__ (self, scheduler, use_epoll=False, threaded=True):
+  def __init__ (self, scheduler, use_epoll=None, threaded=True):
     # We store tuples of (elapse-time, task)
     self._incoming = Queue() # Threadsafe queue for new items
 
     self._scheduler = scheduler
     self._pinger = pox.lib.util.makePinger()
+    if use_epoll is None:
+      # Use epoll where it is available (i.e., Linux)
+      use_epoll = hasattr(select, 'epoll')
     if use_epoll:
       self._select_func = EpollSelect().select
     else:
       self._select_func = select.select
 
+    # task -> (task, rlist, wlist, xlist, timeout)
     self._tasks = {}
+    # fd -> waiting task
+    self._rl = {}
+    self._wl = {}
+    self._xl = {}
+    # Lists passed to select (None if the registry has changed since)
+    self._select_lists = None
+    # Heap of (timeout, seq, task, registration)
+    self._timers = []
+    self._timer_seq = itertools.count()
 
     self._thread = None
     if threaded:
@@ -652,6 +671,39 @@ class SelectHub (object):
     while not _scheduler._hasQuit:
       _select(tasks, rets)
 
+  def _add_task (self, stuff):
+    """
+    Add a registration of a task to the registry
+    """
+    task,trl,twl,txl,tto = stuff
+    assert task not in self._tasks
+    self._tasks[task] = stuff
+    if trl or twl or txl:
+      if trl:
+        for i in trl: self._rl[i] = task
+      if twl:
+        for i in twl: self._wl[i] = task
+      if txl:
+        for i in txl: self._xl[i] = task
+      self._select_lists = None
+    if tto is not None:
+      heapq.heappush(self._timers, (tto, next(self._timer_seq), task, stuff))
+
+  def _remove_task (self, task):
+    """
+    Remove the registration of a task from the registry
+
+    The timer of the task is left in the heap, it is dropped when it gets
+    to the top of the heap.
+    """
+    _,trl,twl,txl,_ = self._tasks.pop(task)
+    if trl or twl or txl:
+      for fds,reg in ((trl,self._rl), (twl,self._wl), (txl,self._xl)):
+        if fds:
+          for i in fds:
+            if reg.get(i) is task: del reg[i]
+      self._select_lists = None
+
   def _select (self, tasks, rets):
     #print("SelectHub cycle")
 
@@ -659,87 +711,72 @@ class SelectHub (object):
     #      which are unique, obviously.  It might be possible to leverage this
     #      to reduce hashing cost (i.e. by picking a really good hashing
     #      function), though this is complicated by wrappers, etc...
-    rl = {}
-    wl = {}
-    xl = {}
-
-    timeout = None
-    timeoutTask = None
-
     now = time.time()
 
+    # Release the expired timeouts
+    timers = self._timers
     expired = None
-
-    #TODO: Fix this.  It's pretty expensive.  There had been some code which
-    #      priority heaped this, but I don't think a fully working version
-    #      ever quite made it.
-    for t,trl,twl,txl,tto in tasks.itervalues():
-      if tto != None:
-        if tto <= now:
-          # Already expired
-          if expired is None: expired = []
-          expired.append(t)
-          if tto-now > 0.1: print("preexpired",tto,now,tto-now)
-          continue
-        tt = tto - now
-        if tt < timeout or timeout is None:
-          timeout = tt
-          timeoutTask = t
-
-      if trl:
-        for i in trl: rl[i] = t
-      if twl:
-        for i in twl: wl[i] = t
-      if txl:
-        for i in txl: xl[i] = t
+    while timers:
+      tto,_,t,stuff = timers[0]
+      if tasks.get(t) is not stuff:
+        # Task has been woken or re-registered in the meantime
+        heapq.heappop(timers)
+        continue
+      if tto > now: break
+      heapq.heappop(timers)
+      if expired is None: expired = []
+      expired.append(t)
 
     if expired:
       for t in expired:
-        del tasks[t]
+        self._remove_task(t)
         self._return(t, ([],[],[]))
 
-    if timeout is None: timeout = CYCLE_MAXIMUM
-    ro, wo, xo = self._select_func( rl.keys() + [self._pinger],
-                                    wl.keys(),
-                                    xl.keys(), timeout )
+    if len(timers) > 2 * len(tasks) + 64:
+      # Too many stale timers (e.g. of tasks woken by IO), drop them
+      timers[:] = [e for e in timers if tasks.get(e[2]) is e[3]]
+      heapq.heapify(timers)
 
-    if len(ro) == 0 and len(wo) == 0 and len(xo) == 0 and timeoutTask != None:
-      # IO is idle - dispatch timers / release timeouts
-      del tasks[timeoutTask]
-      self._return(timeoutTask, ([],[],[]))
+    if timers:
+      timeout = timers[0][0] - now
     else:
-      # We have IO events
-      if self._pinger in ro:
-        self._pinger.pongAll()
-        while not self._incoming.empty():
-          stuff = self._incoming.get(True)
-          task = stuff[0]
-          assert task not in tasks
-          tasks[task] = stuff
-          self._incoming.task_done()
-        if len(ro) == 1 and len(wo) == 0 and len(xo) == 0:
-          # Just recycle
-          return
-        ro.remove(self._pinger)
-
-      # At least one thread is going to be resumed
-      for i in ro:
-        task = rl[i]
-        if task not in rets: rets[task] = ([],[],[])
-        rets[task][0].append(i)
-      for i in wo:
-        task = wl[i]
-        if task not in rets: rets[task] = ([],[],[])
-        rets[task][1].append(i)
-      for i in xo:
-        task = xl[i]
+      timeout = CYCLE_MAXIMUM
+
+    if self._select_lists is None:
+      self._select_lists = (self._rl.keys() + [self._pinger],
+                            self._wl.keys(),
+                            self._xl.keys())
+    rl,wl,xl = self._select_lists
+    ro, wo, xo = self._select_func(rl, wl, xl, timeout)
+
+    if len(ro) == 0 and len(wo) == 0 and len(xo) == 0:
+      # IO is idle - timers are dispatched in the next cycle
+      return
+
+    # We have IO events
+    if self._pinger in ro:
+      self._pinger.pongAll()
+      while not self._incoming.empty():
+        stuff = self._incoming.get(True)
+        self._add_task(stuff)
+        self._incoming.task_done()
+      if len(ro) == 1 and len(wo) == 0 and len(xo) == 0:
+        # Just recycle
+        return
+      ro.remove(self._pinger)
+
+    # At least one thread is going to be resumed
+    for fds,reg,idx in ((ro,self._rl,0), (wo,self._wl,1), (xo,self._xl,2)):
+      for i in fds:
+        task = reg.get(i)
+        if task is None: continue
         if task not in rets: rets[task] = ([],[],[])
-        rets[task][2].append(i)
+        rets[task][idx].append(i)
 
-      for t,v in rets.iteritems():
-        del tasks[t]
-        self._return(t, v)
-      rets.clear()
+    for t,v in rets.iteritems():
+      self._remove_task(t)
+      self._return(t, v)
+    rets.clear()
 
   def registerSelect (self, task, rlist = None, wlist = None, xlist = None,
                       timeout = None, timeIsAbsolute = False):
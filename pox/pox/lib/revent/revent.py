@@ -95,6 +95,8 @@ class Source (EventMixin):
 from __future__ import print_function
 
 import operator
+import time
+from bisect import bisect_left
 
 # weakrefs are used for some event handlers so that just having an event
 # handler set will not keep the source (publisher) alive.
@@ -159,6 +161,12 @@ class Event (object):
   # created on each instance without having to call the base constructor.
   halt = False
   source = None
+
+  # If True, the same instance may be raised again: halt and source are
+  # reset each time it's raised.  Hot event types can set this and keep
+  # one instance around instead of creating one per raise.
+  reusable = False
+
   def __init__ (self):
     pass
 
@@ -194,9 +202,85 @@ def handleEventException (source, event, args, kw, exc_info):
   traceback.print_exception(*exc_info)
 
 
+class EventStats (object):
+  """
+  Dispatch statistics of an event type
+
+  Counts the raises of the event type and the calls of each of its handlers
+  with their total time and a latency histogram.  See enableEventStats().
+  """
+  # Upper bounds (in seconds) of the histogram buckets.  Handler calls
+  # which take longer fall in an extra, last bucket.
+  buckets = (0.0001, 0.001, 0.01, 0.1, 1)
+
+  def __init__ (self, eventType):
+    self.eventType = eventType
+    self.count = 0
+    # handler name -> [calls, total time, histogram]
+    self.handlers = {}
+
+  def add (self, handler, elapsed):
+    name = _handlerName(handler)
+    h = self.handlers.get(name)
+    if h is None:
+      h = self.handlers[name] = [0, 0.0, [0] * (len(self.buckets) + 1)]
+    h[0] += 1
+    h[1] += elapsed
+    h[2][bisect_left(self.buckets, elapsed)] += 1
+
+  def __str__ (self):
+    name = getattr(self.eventType, '__name__', self.eventType)
+    lines = ["%s: raised %i times" % (name, self.count)]
+    # Most expensive handlers first
+    for handler,(calls,total,histogram) in sorted(self.handlers.iteritems(),
+                                                  key=lambda h: -h[1][1]):
+      lines.append("  %s: %i calls, %.3f ms total, histogram %s" % (handler,
+                   calls, total * 1000, histogram))
+    return "\n".join(lines)
+
+
+# eventType -> EventStats of the event types with statistics enabled
+_eventStats = {}
+
+def enableEventStats (eventType, enable = True):
+  """
+  Turns dispatch statistics of an event type on or off
+
+  Statistics are collected for every source of the event type.  Returns the
+  EventStats of the event type (None when turning them off).
+  """
+  if not enable:
+    _eventStats.pop(eventType, None)
+    return None
+  stats = _eventStats.get(eventType)
+  if stats is None:
+    stats = _eventStats[eventType] = EventStats(eventType)
+  return stats
+
+def getEventStats (eventType = None):
+  """
+  Returns the EventStats of an event type, or a list of all of them
+  """
+  if eventType is not None:
+    return _eventStats.get(eventType)
+  return _eventStats.values()
+
+def _handlerName (handler):
+  if isinstance(handler, CallProxy): return handler.name
+  name = getattr(handler, '__name__', None)
+  if name is None: return str(handler)
+  obj = getattr(handler, 'im_self', None)
+  if obj is not None: name = type(obj).__name__ + "." + name
+  return name
+
+
 class EventMixin (object):
   """
   Mixin for classes that want to source events
+
+  Handlers are kept in a tuple per event type, sorted by priority.  The
+  tuples are replaced (rather than modified) when listeners are added or
+  removed, so raising an event just iterates over the current tuple.
   """
   # _eventMixin_events contains the set of events that the subclassing
   # object will raise.
@@ -256,18 +340,23 @@ class EventMixin (object):
     Returns the event object, unless it was never created (because there
     were no listeners) in which case returns None.
     """
-    self._eventMixin_init()
+    try:
+      allHandlers = self._eventMixin_handlers
+    except AttributeError:
+      self._eventMixin_init()
+      allHandlers = self._eventMixin_handlers
 
     classCall = False
     if isinstance(event, Event):
       eventType = event.__class__
       classCall = True
-      if event.source is None: event.source = self
+      if event.reusable:
+        event.halt = False
+        event.source = self
+      elif event.source is None: event.source = self
     elif issubclass(event, Event):
       # Check for early-out
-      if event not in self._eventMixin_handlers:
-        return None
-      if len(self._eventMixin_handlers[event]) == 0:
+      if not allHandlers.get(event):
         return None
 
       classCall = True
@@ -283,24 +372,28 @@ class EventMixin (object):
       raise ReventError("Event %s not defined on object of type %s"
                         % (eventType, type(self)))
 
-    # Create a copy so that it can be modified freely during event
-    # processing.  It might make sense to change this.
-    handlers = self._eventMixin_handlers.get(eventType, [])
+    # The handler tuple is replaced rather than modified when listeners
+    # change, so it can be iterated as is.
+    handlers = allHandlers.get(eventType, ())
+    stats = _eventStats.get(eventType) if _eventStats else None
+    if stats is not None: stats.count += 1
     for (priority, handler, once, eid) in handlers:
+      if stats is not None: start = time.time()
       if classCall:
         rv = event._invoke(handler, *args, **kw)
       else:
         rv = handler(event, *args, **kw)
-      if once: self.removeListener(eid)
+      if stats is not None: stats.add(handler, time.time() - start)
+      if once: self.removeListener((eventType, eid))
       if rv is None: continue
       if rv is False:
-        self.removeListener(eid)
+        self.removeListener((eventType, eid))
       if rv is True:
         if classCall: event.halt = True
         break
       if type(rv) == tuple:
         if len(rv) >= 2 and rv[1] == True:
-          self.removeListener(eid)
+          self.removeListener((eventType, eid))
         if len(rv) >= 1 and rv[0]:
           if classCall: event.halt = True
           break
@@ -340,43 +433,42 @@ class EventMixin (object):
     if type(handler) == tuple:
       # It's a type/eid pair
       if eventType == None: eventType = handler[0]
-      handlers = self._eventMixin_handlers[eventType]
-      l = len(handlers)
-      self._eventMixin_handlers[eventType] = [x for x in handlers
-                                              if x[3] != handler[1]]
-      altered = altered or l != len(self._eventMixin_handlers[eventType])
+      altered = self._eventMixin_removeEntries(eventType,
+                                               lambda x: x[3] != handler[1])
     elif type(handler) == int:
       # It's an EID
       if eventType == None:
-        for event in self._eventMixin_handlers:
-          handlers = self._eventMixin_handlers[event]
-          l = len(handlers)
-          self._eventMixin_handlers[event] = [x for x in handlers
-                                              if x[3] != handler]
-          altered = altered or l != len(self._eventMixin_handlers[event])
+        for event in self._eventMixin_handlers.keys():
+          if self._eventMixin_removeEntries(event,
+                                            lambda x: x[3] != handler):
+            altered = True
       else:
-        l = len(handlers)
-        handlers = self._eventMixin_handlers[eventType]
-        self._eventMixin_handlers[eventType] = [x for x in handlers
-                                                if x[3] != handler]
-        altered = altered or l != len(self._eventMixin_handlers[event])
+        altered = self._eventMixin_removeEntries(eventType,
+                                                 lambda x: x[3] != handler)
     else:
       if eventType == None:
-        for event in self._eventMixin_handlers:
-          handlers = self._eventMixin_handlers[event]
-          l = len(handlers)
-          self._eventMixin_handlers[event] = [x for x in handlers
-                                              if x[1] != handler]
-          altered = altered or l != len(self._eventMixin_handlers[event])
+        for event in self._eventMixin_handlers.keys():
+          if self._eventMixin_removeEntries(event,
+                                            lambda x: x[1] != handler):
+            altered = True
       else:
-        handlers = self._eventMixin_handlers[eventType]
-        l = len(handlers)
-        self._eventMixin_handlers[eventType] = [x for x in handlers
-                                                if x[1] != handler]
-        altered = altered or l != len(self._eventMixin_handlers[eventType])
+        altered = self._eventMixin_removeEntries(eventType,
+                                                 lambda x: x[1] != handler)
 
     return altered
 
+  def _eventMixin_removeEntries (self, eventType, keep):
+    """
+    Replaces the handlers of eventType with the ones for which keep is True
+
+    Returns True if any handlers were removed.
+    """
+    handlers = self._eventMixin_handlers[eventType]
+    kept = tuple(x for x in handlers if keep(x))
+    if len(kept) == len(handlers): return False
+    self._eventMixin_handlers[eventType] = kept
+    return True
+
   def addListenerByName (self, *args, **kw):
     """
     Add a listener by name. An eventType argument must be present, which is
@@ -431,12 +523,7 @@ class EventMixin (object):
       if fail:
         raise ReventError("Event %s not defined on object of type %s"
                           % (eventType, type(self)))
-    if eventType not in self._eventMixin_handlers:
-      # if no handlers are already registered, initialize
-      handlers = self._eventMixin_handlers[eventType] = []
-      self._eventMixin_handlers[eventType] = handlers
-    else:
-      handlers = self._eventMixin_handlers[eventType]
+    handlers = self._eventMixin_handlers.get(eventType, ())
 
     eid = _generateEventID()
 
@@ -444,10 +531,12 @@ class EventMixin (object):
 
     entry = (priority, handler, once, eid)
 
-    handlers.append(entry)
+    handlers = handlers + (entry,)
     if priority is not None:
       # If priority is specified, sort the event handlers
-      handlers.sort(reverse = True, key = operator.itemgetter(0))
+      handlers = tuple(sorted(handlers, reverse = True,
+                              key = operator.itemgetter(0)))
+    self._eventMixin_handlers[eventType] = handlers
 
     return (eventType,eid)
 
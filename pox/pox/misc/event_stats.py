@@ -0,0 +1,65 @@
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Component to collect dispatch statistics of event types
+
+Turns on revent's enableEventStats() for the given event types and logs the
+statistics periodically and when POX goes down.  Events are given either by
+their name in pox.openflow or by their full dotted name, e.g.:
+
+  ./pox.py misc.event_stats --events=PacketIn,ConnectionUp --interval=60
+"""
+
+from pox.core import core
+from pox.lib.revent.revent import enableEventStats, getEventStats
+from pox.lib.recoco import Timer
+import pox.openflow
+
+log = core.getLogger()
+
+
+def _resolve (name):
+  """
+  Returns the event type of the given name
+  """
+  if '.' not in name:
+    return getattr(pox.openflow, name)
+  module, cls = name.rsplit('.', 1)
+  return getattr(__import__(module, fromlist=[cls]), cls)
+
+
+def _dump ():
+  for stats in getEventStats():
+    log.info(str(stats))
+
+
+def _handle_GoingDownEvent (event):
+  _dump()
+
+
+def launch (events = "PacketIn,ConnectionUp", interval = None):
+  for name in events.split(','):
+    name = name.strip()
+    if not name: continue
+    try:
+      enableEventStats(_resolve(name))
+    except (ImportError, AttributeError):
+      log.error("Unknown event type '%s'", name)
+      return False
+    log.debug("Event statistics enabled for %s", name)
+
+  core.addListenerByName("GoingDownEvent", _handle_GoingDownEvent)
+  if interval:
+    Timer(float(interval), _dump, recurring = True)
@@ -53,6 +53,9 @@ class ConnectionUp (Event):
   """
   Raised when a connection to a switch has been established.
   """
+  # Raised by the nexus and then by the connection as the same instance
+  reusable = True
+
   def __init__ (self, connection, ofp):
     self.connection = connection
     self.dpid = connection.dpid
@@ -172,6 +175,10 @@ class PacketIn (Event):
   data (bytes) - raw packet data
   parsed (packet subclasses) - pox.lib.packet's parsed version
   """
+  # Raised by the nexus and then by the connection as the same instance, so
+  # the packet is parsed only once
+  reusable = True
+
   def __init__ (self, connection, ofp):
     self.connection = connection
     self.ofp = ofp
@@ -29,10 +29,12 @@ from pox.lib.util import dpid_to_str, str_to_bool
 from pox.core import core
 import pox.openflow.libopenflow_01 as of
 import pox.lib.packet as pkt
+from pox.lib.addresses import EthAddr
 
 import struct
 import time
-from collections import namedtuple
+import heapq
+from collections import namedtuple, deque
 from random import shuffle, random
 
 
@@ -46,9 +48,9 @@ class LLDPSender (object):
 
   SendItem = namedtuple("LLDPSenderItem", ('dpid','port_num','packet'))
 
-  #NOTE: This class keeps the packets to send in a flat list, which makes
+  #NOTE: This class keeps the packets to send in flat queues, which makes
   #      adding/removing them on switch join/leave or (especially) port
-  #      status changes relatively expensive. Could easily be improved.
+  #      status changes relatively expensive.  See AdaptiveLLDPSender.
 
   # Maximum times to run the timer per second
   _sends_per_sec = 15
@@ -66,16 +68,18 @@ class LLDPSender (object):
       other LLDP agents might.  Can't be 0 (this means revoke).
     """
     # Packets remaining to be sent in this cycle
-    self._this_cycle = []
+    self._this_cycle = deque()
 
     # Packets we've already sent in this cycle
-    self._next_cycle = []
+    self._next_cycle = deque()
 
     # Packets to send in a batch
     self._send_chunk_size = 1
 
     self._timer = None
     self._ttl = ttl
+    # Discovery packet_out templates.  (dpid,len(str(port_num))) -> template
+    self._templates = {}
     self._send_cycle_time = send_cycle_time
     core.listen_to_dependencies(self)
 
@@ -102,16 +106,18 @@ class LLDPSender (object):
     self.del_switch(event.dpid)
 
   def del_switch (self, dpid, set_timer = True):
-    self._this_cycle = [p for p in self._this_cycle if p.dpid != dpid]
-    self._next_cycle = [p for p in self._next_cycle if p.dpid != dpid]
+    for key in [k for k in self._templates if k[0] == dpid]:
+      del self._templates[key]
+    self._this_cycle = deque(p for p in self._this_cycle if p.dpid != dpid)
+    self._next_cycle = deque(p for p in self._next_cycle if p.dpid != dpid)
     if set_timer: self._set_timer()
 
   def del_port (self, dpid, port_num, set_timer = True):
     if port_num > of.OFPP_MAX: return
-    self._this_cycle = [p for p in self._this_cycle
-                        if p.dpid != dpid or p.port_num != port_num]
-    self._next_cycle = [p for p in self._next_cycle
-                        if p.dpid != dpid or p.port_num != port_num]
+    self._this_cycle = deque(p for p in self._this_cycle
+                             if p.dpid != dpid or p.port_num != port_num)
+    self._next_cycle = deque(p for p in self._next_cycle
+                             if p.dpid != dpid or p.port_num != port_num)
     if set_timer: self._set_timer()
 
   def add_port (self, dpid, port_num, port_addr, set_timer = True):
@@ -121,6 +127,17 @@ class LLDPSender (object):
           self.create_packet_out(dpid, port_num, port_addr)))
     if set_timer: self._set_timer()
 
+  def reprobe (self, dpid, port_num):
+    """
+    Called when a link on the given port went away
+
+    This sender probes every port at the same rate, so there's nothing to do.
+    """
+    pass
+
+  def _send (self, dpid, packet):
+    core.openflow.sendToDPID(dpid, packet)
+
   def _set_timer (self):
     if self._timer: self._timer.cancel()
     self._timer = None
@@ -154,20 +171,35 @@ class LLDPSender (object):
     for _ in range(num):
       if len(self._this_cycle) == 0:
         self._this_cycle = self._next_cycle
-        self._next_cycle = []
+        self._next_cycle = deque()
         #shuffle(self._this_cycle)
-      item = self._this_cycle.pop(0)
+      item = self._this_cycle.popleft()
       self._next_cycle.append(item)
-      core.openflow.sendToDPID(item.dpid, item.packet)
+      self._send(item.dpid, item.packet)
 
   def create_packet_out (self, dpid, port_num, port_addr):
     """
     Create an ofp_packet_out containing a discovery packet
+
+    The discovery packets of a switch only differ in the port, so they are
+    patched into a template of the switch.
     """
-    eth = self._create_discovery_packet(dpid, port_num, port_addr, self._ttl)
-    po = of.ofp_packet_out(action = of.ofp_action_output(port=port_num))
-    po.data = eth.pack()
-    return po.pack()
+    port_id = str(port_num)
+    key = (dpid, len(port_id))
+    template = self._templates.get(key)
+    if template is None:
+      eth = self._create_discovery_packet(dpid, port_num, port_addr,
+                                          self._ttl)
+      po = of.ofp_packet_out(action = of.ofp_action_output(port=port_num))
+      po.data = eth.pack()
+      # Port ID follows the packet_out header and action, the ethernet
+      # header, the chassis ID TLV and the port ID TLV header
+      port_id_offset = 24 + 14 + len(eth.payload.tlvs[0].pack()) + 3
+      template = of.MessageTemplate(po, port=(20, "!H"), dl_src=(30, "6s"),
+          port_id=(port_id_offset, "%ss" % (len(port_id),)))
+      self._templates[key] = template
+    return template.pack(port=port_num, dl_src=EthAddr(port_addr).toRaw(),
+                         port_id=port_id)
 
   @staticmethod
   def _create_discovery_packet (dpid, port_num, port_addr, ttl):
@@ -201,6 +233,108 @@ class LLDPSender (object):
     return eth
 
 
+class AdaptiveLLDPSender (LLDPSender):
+  """
+  Sends out discovery packets on an adaptive schedule
+
+  New and changed ports (on connection and PortStatus) are probed right away.
+  Every probe of a port doubles its probe interval, up to max_interval, so
+  stable ports are probed only as often as needed to keep their links from
+  timing out while new ones are found quickly.  Ports are kept in a heap by
+  due time, so a timer tick only looks at the ports which are due.
+  """
+
+  # Probe interval of a new or changed port (in seconds)
+  _min_interval = 0.5
+
+  def __init__ (self, send_cycle_time, ttl = 120, max_interval = None):
+    """
+    max_interval is the longest time (in seconds) between two probes of a
+    stable port.  It should be somewhat less than the link timeout.  If it
+    is not given, the send cycle time is used.
+    """
+    # (dpid,port_num) -> [packet, interval, due time, sequence number]
+    self._ports = {}
+    # (due time, sequence number, (dpid,port_num))
+    self._schedule = []
+    self._seq = 0
+    if max_interval is None: max_interval = send_cycle_time
+    self._max_interval = max_interval
+    super(AdaptiveLLDPSender,self).__init__(send_cycle_time, ttl)
+
+  def _handle_openflow_PortStatus (self, event):
+    """
+    Track changes to switch ports
+
+    Unlike the plain sender, modified ports (e.g., a link coming up) are
+    probed again right away.
+    """
+    if event.added or event.modified:
+      self.add_port(event.dpid, event.port, event.ofp.desc.hw_addr)
+    elif event.deleted:
+      self.del_port(event.dpid, event.port)
+
+  def del_switch (self, dpid, set_timer = True):
+    super(AdaptiveLLDPSender,self).del_switch(dpid, set_timer = False)
+    for key in [k for k in self._ports if k[0] == dpid]:
+      del self._ports[key]
+    if set_timer: self._set_timer()
+
+  def del_port (self, dpid, port_num, set_timer = True):
+    if port_num > of.OFPP_MAX: return
+    self._ports.pop((dpid, port_num), None)
+    if set_timer: self._set_timer()
+
+  def add_port (self, dpid, port_num, port_addr, set_timer = True):
+    if port_num > of.OFPP_MAX: return
+    packet = self.create_packet_out(dpid, port_num, port_addr)
+    self._ports[(dpid, port_num)] = [packet, self._min_interval, 0, 0]
+    self._schedule_port((dpid, port_num), time.time())
+    if set_timer: self._set_timer()
+
+  def reprobe (self, dpid, port_num):
+    """
+    Probe the given port right away and start over its backoff
+    """
+    entry = self._ports.get((dpid, port_num))
+    if entry is None: return
+    entry[1] = self._min_interval
+    self._schedule_port((dpid, port_num), time.time())
+
+  def _schedule_port (self, key, due):
+    entry = self._ports[key]
+    self._seq += 1
+    entry[2] = due
+    entry[3] = self._seq
+    heapq.heappush(self._schedule, (due, self._seq, key))
+
+  def _set_timer (self):
+    if not self._ports:
+      if self._timer: self._timer.cancel()
+      self._timer = None
+      return
+    if self._timer: return
+    self._timer = Timer(1.0 / self._sends_per_sec, self._timer_handler,
+                        recurring=True)
+
+  def _timer_handler (self, now = None):
+    """
+    Called by a timer to send the packets of the ports which are due
+    """
+    if now is None: now = time.time()
+    schedule = self._schedule
+    max_interval = self._max_interval
+    while schedule and schedule[0][0] <= now:
+      due,seq,key = heapq.heappop(schedule)
+      entry = self._ports.get(key)
+      if entry is None or entry[3] != seq:
+        # Port removed or rescheduled
+        continue
+      self._send(key[0], entry[0])
+      entry[1] = min(entry[1] * 2, max_interval)
+      self._schedule_port(key, now + entry[1])
+
+
 class LinkEvent (Event):
   """
   Link up/down event
@@ -254,6 +388,7 @@ class Discovery (EventMixin):
   _flow_priority = 65000     # Priority of LLDP-catching flow (if any)
   _link_timeout = 10         # How long until we consider a link dead
   _timeout_check_period = 5  # How often to check for timeouts
+  _probe_margin = 2          # Min slack of adaptive probes to link timeout
 
   _eventMixin_events = set([
     LinkEvent,
@@ -264,14 +399,34 @@ class Discovery (EventMixin):
   Link = Link
 
   def __init__ (self, install_flow = True, explicit_drop = True,
-                link_timeout = None, eat_early_packets = False):
+                link_timeout = None, eat_early_packets = False,
+                adaptive = False):
     self._eat_early_packets = eat_early_packets
     self._explicit_drop = explicit_drop
     self._install_flow = install_flow
     if link_timeout: self._link_timeout = link_timeout
 
     self.adjacency = {} # From Link to time.time() stamp
-    self._sender = LLDPSender(self.send_cycle_time)
+    # Heap of (deadline, link).  Deadlines are only pushed back when they
+    # are reached, so there is a single item for each link.
+    self._expiry = []
+    self._expiry_scheduled = set()
+
+    # Metrics
+    self.verified_links = 0 # Total number of LLDP packets matched to links
+    self.verified_per_sec = 0.0 # ... in the last timeout check period
+    self.convergence_time = None # Last change of switches/ports to new link
+    self._verified_checked = (time.time(), 0)
+    self._changed_time = None
+
+    if adaptive:
+      # Stable links are probed just often enough not to time out
+      max_interval = max(self.send_cycle_time,
+                         self._link_timeout - self._probe_margin)
+      self._sender = AdaptiveLLDPSender(self.send_cycle_time,
+                                        max_interval = max_interval)
+    else:
+      self._sender = LLDPSender(self.send_cycle_time)
 
     # Listen with a high priority (mostly so we get PacketIns early)
     core.listen_to_dependencies(self,
@@ -304,6 +459,7 @@ class Discovery (EventMixin):
     return True
 
   def _handle_openflow_ConnectionUp (self, event):
+    self._changed_time = time.time()
     if self._install_flow:
       # Make sure we get appropriate traffic
       log.debug("Installing flow for %s", dpid_to_str(event.dpid))
@@ -315,14 +471,43 @@ class Discovery (EventMixin):
                         if link.dpid1 == event.dpid
                         or link.dpid2 == event.dpid])
 
-  def _expire_links (self):
+  def _handle_openflow_PortStatus (self, event):
+    if event.added or event.modified:
+      self._changed_time = time.time()
+
+  def stats (self):
     """
-    Remove apparently dead links
+    Returns a dict of discovery metrics
     """
-    now = time.time()
+    return dict(links = len(self.adjacency),
+                verified_links = self.verified_links,
+                verified_per_sec = self.verified_per_sec,
+                convergence_time = self.convergence_time)
 
-    expired = [link for link,timestamp in self.adjacency.iteritems()
-               if timestamp + self._link_timeout < now]
+  def _expire_links (self, now = None):
+    """
+    Remove apparently dead links
+    """
+    if now is None: now = time.time()
+
+    last_time, last_verified = self._verified_checked
+    if now > last_time:
+      self.verified_per_sec = ((self.verified_links - last_verified)
+                               / (now - last_time))
+    self._verified_checked = (now, self.verified_links)
+
+    expired = []
+    expiry = self._expiry
+    while expiry and expiry[0][0] < now:
+      deadline,link = heapq.heappop(expiry)
+      timestamp = self.adjacency.get(link)
+      if timestamp is None:
+        self._expiry_scheduled.discard(link)
+      elif timestamp + self._link_timeout < now:
+        self._expiry_scheduled.discard(link)
+        expired.append(link)
+      else:
+        heapq.heappush(expiry, (timestamp + self._link_timeout, link))
     if expired:
       for link in expired:
         log.info('link timeout: %s', link)
@@ -446,21 +631,36 @@ class Discovery (EventMixin):
     link = Discovery.Link(originatorDPID, originatorPort, event.dpid,
                           event.port)
 
+    self._link_seen(link, event)
+
+    return EventHalt # Probably nobody else needs this event
+
+  def _link_seen (self, link, event = None, now = None):
+    """
+    Add a newly detected link or refresh a known one
+    """
+    if now is None: now = time.time()
+    self.verified_links += 1
     if link not in self.adjacency:
-      self.adjacency[link] = time.time()
+      self.adjacency[link] = now
+      if link not in self._expiry_scheduled:
+        self._expiry_scheduled.add(link)
+        heapq.heappush(self._expiry, (now + self._link_timeout, link))
+      if self._changed_time is not None:
+        self.convergence_time = now - self._changed_time
       log.info('link detected: %s', link)
       self.raiseEventNoErrors(LinkEvent, True, link, event)
     else:
       # Just update timestamp
-      self.adjacency[link] = time.time()
-
-    return EventHalt # Probably nobody else needs this event
+      self.adjacency[link] = now
 
   def _delete_links (self, links):
     for link in links:
       self.raiseEventNoErrors(LinkEvent, False, link)
     for link in links:
       self.adjacency.pop(link, None)
+      # Make the sender look for a replacement quickly
+      self._sender.reprobe(link.dpid1, link.port1)
 
   def is_edge_port (self, dpid, port):
     """
@@ -475,12 +675,19 @@ class Discovery (EventMixin):
 
 
 def launch (no_flow = False, explicit_drop = True, link_timeout = None,
-            eat_early_packets = False):
+            eat_early_packets = False, adaptive = False):
+  """
+  Start link discovery
+
+  With --adaptive, new and changed ports are probed right away and stable
+  ports less and less often (see AdaptiveLLDPSender).
+  """
   explicit_drop = str_to_bool(explicit_drop)
   eat_early_packets = str_to_bool(eat_early_packets)
   install_flow = not str_to_bool(no_flow)
+  adaptive = str_to_bool(adaptive)
   if link_timeout: link_timeout = int(link_timeout)
 
   core.registerNew(Discovery, explicit_drop=explicit_drop,
                    install_flow=install_flow, link_timeout=link_timeout,
-                   eat_early_packets=eat_early_packets)
+                   eat_early_packets=eat_early_packets, adaptive=adaptive)
@@ -19,6 +19,8 @@ Implementation of an OpenFlow flow table
 from libopenflow_01 import *
 from pox.lib.revent import *
 
+import heapq
+import itertools
 import time
 import math
 
@@ -111,6 +113,17 @@ class TableEntry (object):
     self.packet_count += 1
     self.last_touched = now
 
+  def touch_packets (self, packet_count, byte_count, now=None):
+    """
+    Updates information of this entry based on encountering packets.
+
+    Same as touch_packet() for a number of packets with a total byte count.
+    """
+    if now is None: now = time.time()
+    self.byte_count += byte_count
+    self.packet_count += packet_count
+    self.last_touched = now
+
   def is_idle_timed_out (self, now=None):
     if now is None: now = time.time()
     if self.idle_timeout > 0:
@@ -192,12 +205,187 @@ class FlowTableModification (Event):
     self.reason = reason
 
 
+# Fields of ofp_match which are compared by simple equality.  nw_src and
+# nw_dst are handled separately since they can be wildcarded by prefix.
+_MATCH_FIELDS = ('in_port', 'dl_src', 'dl_dst', 'dl_vlan', 'dl_vlan_pcp',
+                 'dl_type', 'nw_tos', 'nw_proto', 'tp_src', 'tp_dst')
+_ETH_FIELDS = (1, 2) # Indices of dl_src and dl_dst
+
+
+def _match_fields (match):
+  """
+  Returns the normalized field values of a match
+
+  Returns a tuple of the values of _MATCH_FIELDS (None if wildcarded) and
+  the (address, bits) pairs of nw_src and nw_dst with addresses as unsigned
+  ints (None if wildcarded).
+  """
+  values = [getattr(match, f) for f in _MATCH_FIELDS]
+  for i in _ETH_FIELDS:
+    v = values[i]
+    if v is not None and type(v) is not EthAddr:
+      values[i] = EthAddr(v)
+  def nw (addr_bits):
+    addr,bits = addr_bits
+    if addr is None: return (None, 0)
+    if type(addr) is not IPAddr: addr = IPAddr(addr)
+    return (addr.toUnsigned(), bits)
+  return values, nw(match.get_nw_src()), nw(match.get_nw_dst())
+
+
+def flow_key (packet, in_port = None, spec_frags = False):
+  """
+  Returns the flow table lookup key of a packet
+
+  The key has the same field values as ofp_match.from_packet() of the packet
+  (normalized as by _match_fields()), but without building the match.
+  """
+  if isinstance(packet, ofp_packet_in):
+    in_port = packet.in_port
+    packet = ethernet(packet.data)
+
+  dl_type = packet.type
+  p = packet.next
+
+  if dl_type < 1536:
+    dl_type = OFP_DL_TYPE_NOT_ETH_TYPE
+  if isinstance(p, llc):
+    if p.has_snap and p.oui == '\0\0\0':
+      dl_type = p.eth_type
+      p = p.next
+  if isinstance(p, vlan):
+    dl_type = p.eth_type
+    dl_vlan = p.id
+    dl_vlan_pcp = p.pcp
+    p = p.next
+  else:
+    dl_vlan = OFP_VLAN_NONE
+    dl_vlan_pcp = 0
+
+  nw_tos = nw_proto = nw_src = nw_dst = tp_src = tp_dst = None
+  if isinstance(p, ipv4):
+    nw_src = p.srcip
+    nw_dst = p.dstip
+    nw_proto = p.protocol
+    nw_tos = p.tos
+    if spec_frags and ((p.flags & p.MF_FLAG) or p.frag != 0):
+      tp_src = 0
+      tp_dst = 0
+    else:
+      p = p.next
+      if isinstance(p, udp) or isinstance(p, tcp):
+        tp_src = p.srcport
+        tp_dst = p.dstport
+      elif isinstance(p, icmp):
+        tp_src = p.type
+        tp_dst = p.code
+  elif isinstance(p, arp):
+    if p.opcode <= 255:
+      nw_proto = p.opcode
+      nw_src = p.protosrc
+      nw_dst = p.protodst
+
+  dl_src = packet.src
+  if type(dl_src) is not EthAddr: dl_src = EthAddr(dl_src)
+  dl_dst = packet.dst
+  if type(dl_dst) is not EthAddr: dl_dst = EthAddr(dl_dst)
+  if nw_src is not None:
+    if type(nw_src) is not IPAddr: nw_src = IPAddr(nw_src)
+    nw_src = nw_src.toUnsigned()
+  if nw_dst is not None:
+    if type(nw_dst) is not IPAddr: nw_dst = IPAddr(nw_dst)
+    nw_dst = nw_dst.toUnsigned()
+
+  return ((in_port, dl_src, dl_dst, dl_vlan, dl_vlan_pcp, dl_type, nw_tos,
+           nw_proto, tp_src, tp_dst), nw_src, nw_dst)
+
+
+def _signature_and_key (match):
+  """
+  Returns the wildcard signature and the hash key of a match
+
+  Matches with the same signature have the same fields wildcarded, so they
+  can be looked up by the values of the rest of the fields.
+  """
+  values,nw_src,nw_dst = _match_fields(match)
+  fields = tuple(i for i,v in enumerate(values) if v is not None)
+  signature = (fields, nw_src[1], nw_dst[1])
+  key = (tuple(values[i] for i in fields), nw_src[0], nw_dst[0])
+  return signature, key
+
+
+class _WildcardGroup (object):
+  """
+  Entries of a flow table with the same wildcard signature
+
+  A group is one "tuple" of the tuple space search: entries are hashed by
+  the values of their non-wildcarded fields.
+  """
+  def __init__ (self, signature):
+    self.signature = signature
+    self.fields,src_bits,dst_bits = signature
+    self.src_mask = ~((1 << (32-src_bits))-1) & 0xffFFffFF if src_bits else 0
+    self.dst_mask = ~((1 << (32-dst_bits))-1) & 0xffFFffFF if dst_bits else 0
+    self.buckets = {}
+    # effective_priority -> number of entries (to maintain max_priority)
+    self.priorities = {}
+    self.max_priority = -1
+
+  def __len__ (self):
+    return sum(self.priorities.itervalues())
+
+  def add (self, key, entry, priority):
+    self.buckets.setdefault(key, []).append(entry)
+    self.priorities[priority] = self.priorities.get(priority, 0) + 1
+    if priority > self.max_priority:
+      self.max_priority = priority
+
+  def remove (self, key, entry, priority):
+    bucket = self.buckets[key]
+    bucket.remove(entry)
+    if not bucket: del self.buckets[key]
+    c = self.priorities[priority] - 1
+    if c:
+      self.priorities[priority] = c
+    else:
+      del self.priorities[priority]
+      if priority == self.max_priority:
+        self.max_priority = max(self.priorities) if self.priorities else -1
+
+  def lookup (self, values, nw_src, nw_dst):
+    """
+    Returns the entries matching a packet with the given field values
+    """
+    if self.src_mask:
+      if nw_src is None: return None
+      nw_src &= self.src_mask
+    else:
+      nw_src = None
+    if self.dst_mask:
+      if nw_dst is None: return None
+      nw_dst &= self.dst_mask
+    else:
+      nw_dst = None
+    key = (tuple(values[i] for i in self.fields), nw_src, nw_dst)
+    return self.buckets.get(key)
+
+  def entries (self):
+    for bucket in self.buckets.itervalues():
+      for entry in bucket:
+        yield entry
+
+
 class FlowTable (EventMixin):
   """
   General model of a flow table.
 
   Maintains an ordered list of flow entries, and finds matching entries for
   packets and other entries. Supports expiration of flows.
+
+  Besides the ordered list, entries are indexed for lookups: exact match
+  entries are hashed by all their fields, wildcarded entries are hashed by
+  their non-wildcarded fields in groups of the same wildcards (tuple space
+  search), and entries with timeouts are kept in a heap by expiration time.
   """
   _eventMixin_events = set([FlowTableModification])
 
@@ -207,6 +395,21 @@ class FlowTable (EventMixin):
     # Table is a list of TableEntry sorted by descending effective_priority.
     self._table = []
 
+    # entry -> (effective_priority, seq, signature, key)
+    # Entries with the same effective_priority are ordered by descending seq.
+    self._index = {}
+    self._seq = itertools.count()
+    # Exact match entries by key
+    self._exact = {}
+    # Wildcarded entries by signature, and the groups in descending order of
+    # their highest priority (None if it has to be recalculated)
+    self._groups = {}
+    self._group_order = None
+    # effective_priority -> set of entries
+    self._by_priority = {}
+    # Heap of (expiration time, seq, entry)
+    self._expiry = []
+
   def _dirty (self):
     """
     Call when table changes
@@ -220,6 +423,66 @@ class FlowTable (EventMixin):
   def __len__ (self):
     return len(self._table)
 
+  def _order_key (self, entry):
+    """
+    Sort key of the ordered table (descending order)
+    """
+    return self._index[entry][:2]
+
+  def _add_index (self, entry):
+    priority = entry.effective_priority
+    seq = next(self._seq)
+    signature,key = _signature_and_key(entry.match)
+    self._index[entry] = (priority, seq, signature, key)
+    if entry.match.is_wildcarded:
+      group = self._groups.get(signature)
+      if group is None:
+        group = self._groups[signature] = _WildcardGroup(signature)
+      max_priority = group.max_priority
+      group.add(key, entry, priority)
+      if group.max_priority != max_priority: self._group_order = None
+    else:
+      self._exact.setdefault(key, []).append(entry)
+    self._by_priority.setdefault(priority, set()).add(entry)
+    self._push_expiry(entry, seq)
+
+  def _remove_index (self, entry):
+    priority,seq,signature,key = self._index.pop(entry)
+    if entry.match.is_wildcarded:
+      group = self._groups[signature]
+      max_priority = group.max_priority
+      group.remove(key, entry, priority)
+      if not group.priorities:
+        del self._groups[signature]
+        self._group_order = None
+      elif group.max_priority != max_priority:
+        self._group_order = None
+    else:
+      bucket = self._exact[key]
+      bucket.remove(entry)
+      if not bucket: del self._exact[key]
+    entries = self._by_priority[priority]
+    entries.discard(entry)
+    if not entries: del self._by_priority[priority]
+
+  def _push_expiry (self, entry, seq):
+    """
+    Schedule the next expiration check of an entry
+    """
+    deadlines = []
+    if entry.idle_timeout > 0:
+      deadlines.append(entry.last_touched + entry.idle_timeout)
+    if entry.hard_timeout > 0:
+      deadlines.append(entry.created + entry.hard_timeout)
+    if deadlines:
+      heapq.heappush(self._expiry, (min(deadlines), seq, entry))
+
+  def _sorted (self, entries):
+    """
+    Sorts entries into table order
+    """
+    return sorted(entries, key=self._order_key, reverse=True)
+
   def add_entry (self, entry):
     assert isinstance(entry, TableEntry)
 
@@ -240,6 +503,7 @@ class FlowTable (EventMixin):
           continue
         low = middle + 1
     table.insert(low, entry)
+    self._add_index(entry)
 
     self._dirty()
 
@@ -248,12 +512,33 @@ class FlowTable (EventMixin):
   def remove_entry (self, entry, reason=None):
     assert isinstance(entry, TableEntry)
     self._table.remove(entry)
+    self._remove_index(entry)
     self._dirty()
     self.raiseEvent(FlowTableModification(removed=[entry], reason=reason))
 
   def matching_entries (self, match, priority=0, strict=False, out_port=None):
     entry_match = lambda e: e.is_matched_by(match, priority, strict, out_port)
-    return [ entry for entry in self._table if entry_match(entry) ]
+    signature,key = _signature_and_key(match)
+    if strict:
+      # Strictly matching entries have the very same match
+      if match.is_wildcarded:
+        group = self._groups.get(signature)
+        candidates = group.buckets.get(key, ()) if group else ()
+      else:
+        candidates = self._exact.get(key, ())
+    else:
+      # The match has to encompass the entries, so the entries can only be
+      # in groups which have (at least) the same fields matched
+      fields,src_bits,dst_bits = signature
+      fields = set(fields)
+      candidates = []
+      for (g_fields,g_src_bits,g_dst_bits),group in self._groups.iteritems():
+        if src_bits > g_src_bits or dst_bits > g_dst_bits: continue
+        if not fields.issubset(g_fields): continue
+        candidates.extend(group.entries())
+      for bucket in self._exact.itervalues():
+        candidates.extend(bucket)
+    return self._sorted(e for e in candidates if entry_match(e))
 
   def flow_stats (self, match, out_port=None, now=None):
     mc_es = self.matching_entries(match=match, strict=False, out_port=out_port)
@@ -273,35 +558,39 @@ class FlowTable (EventMixin):
                                flow_count=flow_count)
 
   def _remove_specific_entries (self, flows, reason=None):
-    #for entry in flows:
-    #  self._table.remove(entry)
-    #self._table = [entry for entry in self._table if entry not in flows]
     if not flows: return
     self._dirty()
     remove_flows = set(flows)
-    i = 0
-    while i < len(self._table):
-      entry = self._table[i]
-      if entry in remove_flows:
-        del self._table[i]
-        remove_flows.remove(entry)
-        if not remove_flows: break
-      else:
-        i += 1
-    assert len(remove_flows) == 0
+    for entry in remove_flows:
+      self._remove_index(entry)
+    table_len = len(self._table)
+    self._table[:] = [e for e in self._table if e not in remove_flows]
+    assert table_len - len(self._table) == len(remove_flows)
     self.raiseEvent(FlowTableModification(removed=flows, reason=reason))
 
   def remove_expired_entries (self, now=None):
     idle = []
     hard = []
     if now is None: now = time.time()
-    for entry in self._table:
+    expiry = self._expiry
+    index = self._index
+    recheck = []
+    while expiry and expiry[0][0] < now:
+      _,seq,entry = heapq.heappop(expiry)
+      if entry not in index or index[entry][1] != seq:
+        # Entry has been removed
+        continue
       if entry.is_idle_timed_out(now):
         idle.append(entry)
       elif entry.is_hard_timed_out(now):
         hard.append(entry)
-    self._remove_specific_entries(idle, OFPRR_IDLE_TIMEOUT)
-    self._remove_specific_entries(hard, OFPRR_HARD_TIMEOUT)
+      else:
+        # Entry has been touched since
+        recheck.append((entry, seq))
+    for entry,seq in recheck:
+      self._push_expiry(entry, seq)
+    self._remove_specific_entries(self._sorted(idle), OFPRR_IDLE_TIMEOUT)
+    self._remove_specific_entries(self._sorted(hard), OFPRR_HARD_TIMEOUT)
 
   def remove_matching_entries (self, match, priority=0, strict=False,
                                out_port=None, reason=None):
@@ -316,38 +605,60 @@ class FlowTable (EventMixin):
     Returns the highest priority flow table entry that matches the given packet
     on the given in_port, or None if no matching entry is found.
     """
-    packet_match = ofp_match.from_packet(packet, in_port, spec_frags = True)
+    return self.entry_for_key(flow_key(packet, in_port, spec_frags = True))
 
-    for entry in self._table:
-      if entry.match.matches_with_wildcards(packet_match,
-                                            consider_other_wildcards=False):
-        return entry
+  def entry_for_key (self, key):
+    """
+    Finds the flow table entry that matches the given flow key.
 
-    return None
+    Returns the highest priority flow table entry that matches the packet
+    the key was made for (see flow_key()), or None if no matching entry is
+    found.
+    """
+    values,nw_src,nw_dst = key
+    index = self._index
+
+    # Exact matches have the highest priority
+    if self._exact:
+      entries = self._exact.get((values, nw_src, nw_dst))
+      if entries:
+        return max(entries, key=lambda e: index[e][1])
+
+    if self._group_order is None:
+      self._group_order = sorted(self._groups.itervalues(),
+                                 key=lambda g: g.max_priority, reverse=True)
+
+    best = None
+    best_key = None
+    for group in self._group_order:
+      if best_key is not None and group.max_priority < best_key[0]:
+        # No better entry in the rest of the groups
+        break
+      entries = group.lookup(values, nw_src, nw_dst)
+      if not entries: continue
+      for entry in entries:
+        key = index[entry][:2]
+        if best_key is None or key > best_key:
+          best = entry
+          best_key = key
+
+    return best
 
   def check_for_overlapping_entry (self, in_entry):
     """
     Tests if the input entry overlaps with another entry in this table.
 
-    Returns true if there is an overlap, false otherwise. Since the table is
-    sorted, there is only a need to check a certain portion of it.
+    Returns true if there is an overlap, false otherwise. Only the entries
+    with the same priority need to be checked.
     """
-    #NOTE: Assumes that entries are sorted by decreasing effective_priority
     #NOTE: Ambiguous whether matching should be based on effective_priority
     #      or the regular priority.  Doing it based on effective_priority
     #      since that's what actually affects packet matching.
-    #NOTE: We could improve performance by doing a binary search to find the
-    #      right priority entries.
 
     priority = in_entry.effective_priority
 
-    for e in self._table:
-      if e.effective_priority < priority:
-        break
-      elif e.effective_priority > priority:
-        continue
-      else:
-        if e.is_matched_by(in_entry.match) or in_entry.is_matched_by(e.match):
-          return True
+    for e in self._by_priority.get(priority, ()):
+      if e.is_matched_by(in_entry.match) or in_entry.is_matched_by(e.match):
+        return True
 
     return False
@@ -91,6 +91,14 @@ _PAD3 = _PAD*3
 _PAD4 = _PAD*4
 _PAD6 = _PAD*6
 
+# Precompiled encoders of the most frequently packed structures
+_header_struct = struct.Struct("!BBHL")
+_xid_struct = struct.Struct("!L")
+_match_struct = struct.Struct("!LH6s6sHBxHBBxxLLHH")
+_flow_mod_struct = struct.Struct("!QHHHHLHH")
+_packet_out_struct = struct.Struct("!LHH")
+_action_output_struct = struct.Struct("!HHHH")
+
 class UnderrunError (RuntimeError):
   """
   Raised when one tries to unpack more data than is available
@@ -569,10 +577,8 @@ class ofp_header (ofp_base):
   def pack (self):
     assert self._assert()
 
-    packed = b""
-    packed += struct.pack("!BBHL", self.version, self.header_type,
-        len(self), self.xid)
-    return packed
+    return _header_struct.pack(self.version, self.header_type, len(self),
+                               self.xid)
 
   def unpack (self, raw, offset=0):
     offset,length = self._unpack_header(raw, offset)
@@ -1165,51 +1171,46 @@ class ofp_match (ofp_base):
   def pack (self, flow_mod=False):
     assert self._assert()
 
-    packed = b""
     if self.adjust_wildcards and flow_mod:
       wc = self._wire_wildcards(self.wildcards)
       assert self._prereq_warning()
     else:
       wc = self.wildcards
-    packed += struct.pack("!LH", wc, self.in_port or 0)
-    if self.dl_src is None:
-      packed += EMPTY_ETH.toRaw()
-    elif type(self.dl_src) is bytes:
-      packed += self.dl_src
-    else:
-      packed += self.dl_src.toRaw()
-    if self.dl_dst is None:
-      packed += EMPTY_ETH.toRaw()
-    elif type(self.dl_dst) is bytes:
-      packed += self.dl_dst
-    else:
-      packed += self.dl_dst.toRaw()
-
-    def check_ip(val):
-      return (val or 0) if self.dl_type == 0x0800 else 0
-    def check_ip_or_arp(val):
-      return (val or 0) if self.dl_type == 0x0800 \
-                           or self.dl_type == 0x0806 else 0
-    def check_tp(val):
-      return (val or 0) if self.dl_type == 0x0800 \
-                           and self.nw_proto in (1,6,17) else 0
-
-    packed += struct.pack("!HB", self.dl_vlan or 0, self.dl_vlan_pcp or 0)
-    packed += _PAD # Hardcode padding
-    packed += struct.pack("!HBB", self.dl_type or 0,
-        check_ip(self.nw_tos), check_ip_or_arp(self.nw_proto))
-    packed += _PAD2 # Hardcode padding
+
+    # Read the fields directly rather than through __getattr__
+    d = self.__dict__
+    wildcards = d['wildcards']
+    (in_port, dl_src, dl_dst, dl_vlan, dl_vlan_pcp, dl_type, nw_tos, nw_proto,
+     nw_src, nw_dst, tp_src, tp_dst) = [None if (wildcards & w) == w else d[f]
+                                        for f,w in _match_pack_fields]
+
+    if dl_src is None:
+      dl_src = EMPTY_ETH.toRaw()
+    elif type(dl_src) is not bytes:
+      dl_src = dl_src.toRaw()
+    if dl_dst is None:
+      dl_dst = EMPTY_ETH.toRaw()
+    elif type(dl_dst) is not bytes:
+      dl_dst = dl_dst.toRaw()
+
     def fix (addr):
       if addr is None: return 0
       if type(addr) is int: return addr & 0xffFFffFF
       if type(addr) is long: return addr & 0xffFFffFF
       return addr.toUnsigned()
 
-    packed += struct.pack("!LLHH", check_ip_or_arp(fix(self.nw_src)),
-        check_ip_or_arp(fix(self.nw_dst)),
-        check_tp(self.tp_src), check_tp(self.tp_dst))
+    is_ip = dl_type == 0x0800
+    is_ip_or_arp = is_ip or dl_type == 0x0806
+    is_tp = is_ip and nw_proto in (1,6,17)
 
-    return packed
+    return _match_struct.pack(wc, in_port or 0, dl_src, dl_dst,
+        dl_vlan or 0, dl_vlan_pcp or 0, dl_type or 0,
+        (nw_tos or 0) if is_ip else 0,
+        (nw_proto or 0) if is_ip_or_arp else 0,
+        fix(nw_src) if is_ip_or_arp else 0,
+        fix(nw_dst) if is_ip_or_arp else 0,
+        (tp_src or 0) if is_tp else 0,
+        (tp_dst or 0) if is_tp else 0)
 
   def _normalize_wildcards (self, wildcards):
     """
@@ -1558,10 +1559,7 @@ class ofp_action_output (ofp_action_base):
 
     assert self._assert()
 
-    packed = b""
-    packed += struct.pack("!HHHH", self.type, len(self), self.port,
-                          self.max_len)
-    return packed
+    return _action_output_struct.pack(self.type, 8, self.port, self.max_len)
 
   def unpack (self, raw, offset=0):
     _offset = offset
@@ -2314,20 +2312,17 @@ class ofp_flow_mod (ofp_header):
       buffer_id = NO_BUFFER
 
     assert self._assert()
-    packed = b""
-    packed += ofp_header.pack(self)
-    packed += self.match.pack(flow_mod=True)
-    packed += struct.pack("!QHHHHLHH", self.cookie, self.command,
-                          self.idle_timeout, self.hard_timeout,
-                          self.priority, buffer_id, self.out_port,
-                          self.flags)
-    for i in self.actions:
-      packed += i.pack()
+    packed = [ofp_header.pack(self), self.match.pack(flow_mod=True),
+              _flow_mod_struct.pack(self.cookie, self.command,
+                                    self.idle_timeout, self.hard_timeout,
+                                    self.priority, buffer_id, self.out_port,
+                                    self.flags)]
+    packed.extend([i.pack() for i in self.actions])
 
     if po:
-      packed += ofp_barrier_request().pack()
-      packed += po.pack()
-    return packed
+      packed.append(ofp_barrier_request().pack())
+      packed.append(po.pack())
+    return b''.join(packed)
 
   def unpack (self, raw, offset=0):
     offset,length = self._unpack_header(raw, offset)
@@ -3595,11 +3590,11 @@ class ofp_packet_out (ofp_header):
 
     if self.data is not None:
       return b''.join((ofp_header.pack(self),
-        struct.pack("!LHH", self._buffer_id, self.in_port, actions_len),
+        _packet_out_struct.pack(self._buffer_id, self.in_port, actions_len),
         actions, self.data))
     else:
       return b''.join((ofp_header.pack(self),
-      struct.pack("!LHH", self._buffer_id, self.in_port, actions_len),
+      _packet_out_struct.pack(self._buffer_id, self.in_port, actions_len),
       actions))
 
   def unpack (self, raw, offset=0):
@@ -3646,6 +3641,63 @@ class ofp_packet_out (ofp_header):
     return outstr
 
 
+class MessageTemplate (object):
+  """
+  A message which is sent repeatedly with only a few fields changing
+
+  The message is packed once into a buffer.  pack() patches the xid and the
+  given fields into the buffer, so the rest of the message (match, actions,
+  data) isn't encoded again.  Fields which aren't given keep their last
+  value.
+
+  The fixed size fields of flow_mods and packet_outs can be patched by name
+  (see template_fields).  Other fields can be added as keyword arguments of
+  name=(offset, struct format).  Patched values are not validated, e.g., a
+  flow_mod's in_port is only matched if it's not wildcarded in the message.
+  """
+  template_fields = {
+    ofp_flow_mod : {
+      'in_port' : (12, "!H"),
+      'cookie' : (48, "!Q"),
+      'command' : (56, "!H"),
+      'idle_timeout' : (58, "!H"),
+      'hard_timeout' : (60, "!H"),
+      'priority' : (62, "!H"),
+      'buffer_id' : (64, "!L"),
+      'out_port' : (68, "!H"),
+      'flags' : (70, "!H"),
+    },
+    ofp_packet_out : {
+      'buffer_id' : (8, "!L"),
+      'in_port' : (12, "!H"),
+    },
+  }
+
+  def __init__ (self, msg, **fields):
+    self._buf = bytearray(msg.pack())
+    f = dict(self.template_fields.get(type(msg), {}))
+    f.update(fields)
+    self._fields = dict((name, (offset, struct.Struct(fmt)))
+                        for name,(offset,fmt) in f.iteritems())
+
+  def __len__ (self):
+    return len(self._buf)
+
+  def pack (self, xid=None, **fields):
+    """
+    Patches the given fields and returns the packed message
+
+    If xid is None, a new one is generated.
+    """
+    buf = self._buf
+    if xid is None: xid = generate_xid()
+    _xid_struct.pack_into(buf, 4, xid)
+    for name,value in fields.iteritems():
+      offset,encoder = self._fields[name]
+      encoder.pack_into(buf, offset, value)
+    return bytes(buf)
+
+
 ##3.7 Barrier Message
 @openflow_s_message("OFPT_BARRIER_REPLY", 19,
     reply_to="ofp_barrier_request")
@@ -4455,3 +4507,8 @@ ofp_match_data = {
   'tp_src' : (0, OFPFW_TP_SRC),
   'tp_dst' : (0, OFPFW_TP_DST),
 }
+
+# Fields of ofp_match in wire order, as (attribute, wildcard bits)
+_match_pack_fields = tuple(('_' + f, ofp_match_data[f][1]) for f in (
+  'in_port', 'dl_src', 'dl_dst', 'dl_vlan', 'dl_vlan_pcp', 'dl_type',
+  'nw_tos', 'nw_proto', 'nw_src', 'nw_dst', 'tp_src', 'tp_dst'))
@@ -2628,8 +2628,10 @@ class NiciraOpenFlowHandlers (DefaultOpenFlowHandlers):
   def handle_VENDOR (con, msg):
       if isinstance(msg, nxt_packet_in) and core.NX.convert_packet_in:
         e = con.ofnexus.raiseEventNoErrors(PacketIn, con, msg)
-        if e is None or e.halt != True:
+        if e is None:
           con.raiseEventNoErrors(PacketIn, con, msg)
+        elif e.halt != True:
+          con.raiseEventNoErrors(e)
       elif isinstance(msg, nx_role_reply):
         e = con.ofnexus.raiseEventNoErrors(RoleReply, con, msg)
         if e is None or e.halt != True:
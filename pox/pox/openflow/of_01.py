@@ -35,13 +35,24 @@ from pox.openflow import *
 log = core.getLogger()
 
 import socket
+import struct
 import select
 
+try:
+  from fcntl import ioctl
+  from termios import FIONREAD
+except ImportError:
+  # Not available on Windows; read_size is used to size the buffer instead
+  ioctl = None
+
 # List where the index is an OpenFlow message type (OFPT_xxx), and
 # the values are unpack functions that unpack the wire format of that
 # type into a message object.
 unpackers = make_type_to_unpacker_table()
 
+# Unpacks version, type and length of an OpenFlow header
+_unpack_header = struct.Struct("!BBH").unpack_from
+
 try:
   PIPE_BUF = select.PIPE_BUF
 except:
@@ -58,6 +69,7 @@ import pox.openflow.libopenflow_01 as of
 import threading
 import os
 import sys
+from collections import deque
 from errno import EAGAIN, ECONNRESET, EADDRINUSE, EADDRNOTAVAIL, EMFILE
 
 
@@ -192,8 +204,10 @@ class DefaultOpenFlowHandlers (OpenFlowHandlers):
   @staticmethod
   def handle_PACKET_IN (con, msg): #A
     e = con.ofnexus.raiseEventNoErrors(PacketIn, con, msg)
-    if e is None or e.halt != True:
+    if e is None:
       con.raiseEventNoErrors(PacketIn, con, msg)
+    elif e.halt != True:
+      con.raiseEventNoErrors(e)
 
   @staticmethod
   def handle_ERROR (con, msg): #A
@@ -362,8 +376,10 @@ class HandshakeOpenFlowHandlers (OpenFlowHandlers):
     con.ofnexus.raiseEventNoErrors(ConnectionHandshakeComplete, con)
 
     e = con.ofnexus.raiseEventNoErrors(ConnectionUp, con, con.features)
-    if e is None or e.halt != True:
+    if e is None:
       con.raiseEventNoErrors(ConnectionUp, con, con.features)
+    elif e.halt != True:
+      con.raiseEventNoErrors(e)
 
     if con.features:
       e = con.ofnexus.raiseEventNoErrors(FeaturesReceived, con, con.features)
@@ -387,8 +403,9 @@ class DeferredSender (threading.Thread):
   """
   Class that handles sending when a socket write didn't complete
   """
-  def __init__ (self):
+  def __init__ (self, daemon=False):
     threading.Thread.__init__(self)
+    self.daemon = daemon
     core.addListeners(self)
     self._dataForConnection = {}
     self._lock = threading.RLock()
@@ -716,6 +733,9 @@ class Connection (EventMixin):
   # Globally unique identifier for the Connection instance
   ID = 0
 
+  # Max number of bytes read from the socket at once
+  read_size = 65536
+
   _aborted_connections = 0
 
   def msg (self, m):
@@ -734,7 +754,13 @@ class Connection (EventMixin):
 
     self.ofnexus = _dummyOFNexus
     self.sock = sock
-    self.buf = b''
+    # Receive buffer.  Unprocessed data is between _buf_start and _buf_end.
+    # It's allocated on the first read and sized from the socket's backlog.
+    self.buf = None
+    self._buf_start = 0
+    self._buf_end = 0
+    # Not every wrapped socket (e.g., capture sockets) supports recv_into
+    self._recv_into = getattr(sock, 'recv_into', None)
     Connection.ID += 1
     self.ID = Connection.ID
 
@@ -753,6 +779,10 @@ class Connection (EventMixin):
     self.connect_time = None
     self.idle_time = time.time()
 
+    # Sender for backlogged data.  Connections read by a ConnectionShard
+    # use the sender of their shard.
+    self.deferred_sender = deferredSender
+
     self.send(of.ofp_hello())
 
     self.original_ports = PortCollection()
@@ -847,21 +877,22 @@ class Connection (EventMixin):
       assert isinstance(data, of.ofp_header)
       data = data.pack()
 
-    if deferredSender.sending:
+    sender = self.deferred_sender
+    if sender.sending:
       log.debug("deferred sender is sending!")
-      deferredSender.send(self, data)
+      sender.send(self, data)
       return
     try:
       l = self.sock.send(data)
       if l != len(data):
         self.msg("Didn't send complete buffer.")
         data = data[l:]
-        deferredSender.send(self, data)
+        sender.send(self, data)
     except socket.error as (errno, strerror):
       if errno == EAGAIN:
         self.msg("Out of send buffer space.  " +
                  "Consider increasing SO_SNDBUF.")
-        deferredSender.send(self, data)
+        sender.send(self, data)
       else:
         self.msg("Socket error: " + strerror)
         self.disconnect(defer_event=True)
@@ -873,41 +904,134 @@ class Connection (EventMixin):
 
     Note: This function will block if data is not available.
     """
+    if not self._recv():
+      return False
+    good, msgs = self._unpack()
+    self._handle(msgs)
+    return good
+
+  def _recv (self):
+    """
+    Receive data from the socket into the buffer
+
+    Returns False if the connection is closed.
+    """
+    buf = self.buf
+    if buf is None or self._buf_end + self.read_size > len(buf):
+      # Make room for the data waiting on the socket (at most read_size)
+      want = self._backlog()
+      if buf is None:
+        buf = self.buf = bytearray(want)
+      elif self._buf_end + want > len(buf):
+        pending = self._buf_end - self._buf_start
+        if pending + want > len(buf):
+          # Grow the buffer
+          new_buf = bytearray(max(2 * len(buf), pending + want))
+          new_buf[:pending] = buf[self._buf_start:self._buf_end]
+          buf = self.buf = new_buf
+        else:
+          # Move the unprocessed data to the front
+          buf[:pending] = buf[self._buf_start:self._buf_end]
+        self._buf_start = 0
+        self._buf_end = pending
+    size = min(self.read_size, len(buf) - self._buf_end)
+
     try:
-      d = self.sock.recv(2048)
+      if self._recv_into is not None:
+        l = self._recv_into(memoryview(buf)[self._buf_end:], size)
+      else:
+        d = self.sock.recv(size)
+        l = len(d)
+        buf[self._buf_end:self._buf_end + l] = d
     except:
       return False
-    if len(d) == 0:
+    if l == 0:
       return False
-    self.buf += d
-    buf_len = len(self.buf)
+    self._buf_end += l
+    return True
 
+  def _backlog (self):
+    """
+    Returns the number of bytes to make room for in the buffer
 
-    offset = 0
-    while buf_len - offset >= 8: # 8 bytes is minimum OF message size
-      # We pull the first four bytes of the OpenFlow header off by hand
-      # (using ord) to find the version/length/type so that we can
-      # correctly call libopenflow to unpack it.
+    This is the amount of data waiting on the socket, capped at read_size.
+    read_size is used if the socket can't tell.
+    """
+    if ioctl is not None:
+      try:
+        n = struct.unpack("i", ioctl(self.sock, FIONREAD, "\0\0\0\0"))[0]
+        return max(1, min(n, self.read_size))
+      except Exception:
+        pass
+    return self.read_size
 
-      ofp_type = ord(self.buf[offset+1])
+  def _unpack (self):
+    """
+    Unpack the complete messages in the buffer
 
-      if ord(self.buf[offset]) != of.OFP_VERSION:
+    Returns (good, messages), where messages is a list of (type, message)
+    pairs and good is False if the connection should be thrown away.  This
+    doesn't touch anything but the buffer, so it is safe to call from an I/O
+    thread (see ConnectionShard).
+    """
+    buf = self.buf
+    # The first four bytes of the OpenFlow header are unpacked by hand
+    # straight from the buffer to find the version/length/type of the
+    # complete messages.
+    start = self._buf_start
+    end = self._buf_end
+    offset = start
+    good = True
+    types = []
+    while end - offset >= 8: # 8 bytes is minimum OF message size
+      version, ofp_type, msg_length = _unpack_header(buf, offset)
+
+      if version != of.OFP_VERSION:
         if ofp_type == of.OFPT_HELLO:
           # We let this through and hope the other side switches down.
           pass
         else:
           log.warning("Bad OpenFlow version (0x%02x) on connection %s"
-                      % (ord(self.buf[offset]), self))
-          return False # Throw connection away
-
-      msg_length = ord(self.buf[offset+2]) << 8 | ord(self.buf[offset+3])
+                      % (version, self))
+          good = False # Throw connection away
+          break
+      if msg_length < 8:
+        log.warning("Bad OpenFlow message length (%i) on connection %s"
+                    % (msg_length, self))
+        good = False
+        break
 
-      if buf_len - offset < msg_length: break
+      if end - offset < msg_length: break
+
+      offset += msg_length
+      types.append(ofp_type)
+
+    # libopenflow unpacks from strings, so only the complete messages are
+    # copied out of the buffer (at once) and decoded from there, so that we
+    # can correctly call libopenflow to unpack the message.
+    msgs = []
+    if types:
+      raw = memoryview(buf)[start:offset].tobytes()
+      pos = 0
+      for ofp_type in types:
+        new_pos,msg = self.unpackers[ofp_type](raw, pos)
+        assert new_pos - pos == _unpack_header(raw, pos)[2]
+        pos = new_pos
+        msgs.append((ofp_type, msg))
+
+    if offset == end:
+      # Buffer is empty, start over at the front
+      self._buf_start = self._buf_end = 0
+    else:
+      self._buf_start = offset
 
-      new_offset,msg = self.unpackers[ofp_type](self.buf, offset)
-      assert new_offset - offset == msg_length
-      offset = new_offset
+    return good, msgs
 
+  def _handle (self, msgs):
+    """
+    Dispatch unpacked messages to the handlers
+    """
+    for ofp_type,msg in msgs:
       try:
         h = self.handlers[ofp_type]
         h(self, msg)
@@ -915,12 +1039,6 @@ class Connection (EventMixin):
         log.exception("%s: Exception while handling OpenFlow message:\n" +
                       "%s %s", self,self,
                       ("\n" + str(self) + " ").join(str(msg).split('\n')))
-        continue
-
-    if offset != 0:
-      self.buf = self.buf[offset:]
-
-    return True
 
   def _incoming_stats_reply (self, ofp):
     # This assumes that you don't receive multiple stats replies
@@ -981,6 +1099,160 @@ def wrap_socket (new_sock):
   return new_sock
 
 
+class ConnectionShard (threading.Thread):
+  """
+  Reads a subset of the switch connections in its own thread
+
+  The shard receives and unpacks messages of its connections and hands them
+  to the co-operative thread through a deque (whose append() and popleft()
+  are atomic, so no lock is needed), where they are dispatched to the
+  handlers just like with the single OpenFlow loop.  Backlogged sends of the
+  connections go through a DeferredSender of the shard.
+  """
+  # Max number of handed off reads dispatched before yielding to other tasks
+  drain_size = 100
+
+  def __init__ (self, index):
+    threading.Thread.__init__(self)
+    self.daemon = True
+    self.name = "OpenFlow shard %i" % (index,)
+    self.index = index
+    self.connections = set()
+    self.sender = DeferredSender(daemon=True)
+    self._added = deque()
+    self._waker = pox.lib.util.makePinger()
+
+    # (connection, messages) pairs.  messages is None if the connection
+    # should be closed.
+    self._handoff = deque()
+    self._drain_pending = False
+
+    # Metrics
+    self.reads = 0
+    self.messages = 0
+    self.max_backlog = 0
+
+    core.addListeners(self)
+    self.start()
+
+  def _handle_GoingDownEvent (self, event):
+    self._waker.ping()
+
+  def add (self, con):
+    """
+    Start reading the given connection
+
+    Can be called from any thread.
+    """
+    con.deferred_sender = self.sender
+    self._added.append(con)
+    self._waker.ping()
+
+  @property
+  def backlog (self):
+    """
+    The number of reads not yet dispatched by the co-operative thread
+    """
+    return len(self._handoff)
+
+  def stats (self):
+    """
+    Returns a dict of the metrics of the shard
+    """
+    return dict(connections = len(self.connections),
+                reads = self.reads,
+                messages = self.messages,
+                backlog = self.backlog,
+                max_backlog = self.max_backlog,
+                deferred = len(self.sender._dataForConnection))
+
+  def _hand_off (self, con, msgs):
+    self._handoff.append((con, msgs))
+    backlog = len(self._handoff)
+    if backlog > self.max_backlog:
+      self.max_backlog = backlog
+    if not self._drain_pending:
+      self._drain_pending = True
+      core.callLater(self._drain)
+
+  def _drain (self):
+    """
+    Dispatch handed off messages (runs in the co-operative thread)
+    """
+    self._drain_pending = False
+    handoff = self._handoff
+    for _ in xrange(self.drain_size):
+      try:
+        con,msgs = handoff.popleft()
+      except IndexError:
+        return
+      if msgs is None:
+        try:
+          con.close()
+        except:
+          pass
+      elif not con.disconnected:
+        con._handle(msgs)
+    if not self._drain_pending:
+      # There's more, but let others run first
+      self._drain_pending = True
+      core.callLater(self._drain)
+
+  def _remove (self, con):
+    self.connections.discard(con)
+    self._hand_off(con, None)
+
+  def run (self):
+    cons = self.connections
+    while core.running:
+      while self._added:
+        cons.add(self._added.popleft())
+      socks = list(cons)
+      try:
+        rlist, wlist, elist = select.select([self._waker] + socks, [],
+                                            socks, 5)
+      except (select.error, socket.error, ValueError):
+        # Probably a connection closed by the co-operative thread
+        for con in socks:
+          if con.disconnected:
+            cons.discard(con)
+        continue
+      if not core.running: break
+
+      for con in elist:
+        self._remove(con)
+
+      timestamp = time.time()
+      for con in rlist:
+        if con is self._waker:
+          self._waker.pongAll()
+          continue
+        if con not in cons: continue
+        con.idle_time = timestamp
+        try:
+          if not con._recv():
+            self._remove(con)
+            continue
+          good,msgs = con._unpack()
+        except socket.error as e:
+          if e.args and e.args[0] == ECONNRESET:
+            con.info("Connection reset")
+          else:
+            log.exception("Exception reading connection " + str(con))
+          self._remove(con)
+          continue
+        except:
+          log.exception("Exception reading connection " + str(con))
+          self._remove(con)
+          continue
+        self.reads += 1
+        if msgs:
+          self.messages += len(msgs)
+          self._hand_off(con, msgs)
+        if not good:
+          self._remove(con)
+
+
 from pox.lib.recoco.recoco import *
 
 class OpenFlow_01_Task (Task):
@@ -988,16 +1260,21 @@ class OpenFlow_01_Task (Task):
   The main recoco thread for listening to openflow messages
   """
   def __init__ (self, port = 6633, address = '0.0.0.0',
-                ssl_key = None, ssl_cert = None, ssl_ca_cert = None):
+                ssl_key = None, ssl_cert = None, ssl_ca_cert = None,
+                shards = 0):
     """
     Initialize
 
-    This listener will be for SSL connections if the SSL params are specified
+    This listener will be for SSL connections if the SSL params are specified.
+    If shards is nonzero, connections are read by that many ConnectionShard
+    threads instead of by this task.
     """
     Task.__init__(self)
     self.port = int(port)
     self.address = address
     self.started = False
+    self.shard_count = int(shards)
+    self.shards = []
     self.ssl_key = ssl_key
     self.ssl_cert = ssl_cert
     self.ssl_ca_cert = ssl_ca_cert
@@ -1022,6 +1299,12 @@ class OpenFlow_01_Task (Task):
     self.started = True
     return super(OpenFlow_01_Task,self).start()
 
+  def shard_stats (self):
+    """
+    Returns a list of the metrics of the shards (see ConnectionShard.stats())
+    """
+    return [shard.stats() for shard in self.shards]
+
   def run (self):
     # List of open sockets/connections to select on
     sockets = []
@@ -1046,6 +1329,8 @@ class OpenFlow_01_Task (Task):
     listener.setblocking(0)
     sockets.append(listener)
 
+    self.shards = [ConnectionShard(i) for i in range(self.shard_count)]
+
     log.debug("Listening on %s:%s" %
               (self.address, self.port))
 
@@ -1106,7 +1391,11 @@ class OpenFlow_01_Task (Task):
               # Note that instantiating a Connection object fires a
               # ConnectionUp event (after negotation has completed)
               newcon = Connection(new_sock)
-              sockets.append( newcon )
+              if self.shards:
+                shard = min(self.shards, key=lambda s: len(s.connections))
+                shard.add(newcon)
+              else:
+                sockets.append( newcon )
               #print str(newcon) + " connected"
             else:
               con.idle_time = timestamp
@@ -1169,7 +1458,7 @@ deferredSender = None
 
 def launch (port=6633, address="0.0.0.0", name=None,
             private_key=None, certificate=None, ca_cert=None,
-            __INSTANCE__=None):
+            read_size=None, shards=None, __INSTANCE__=None):
   """
   Start a listener for OpenFlow connections
 
@@ -1177,7 +1466,18 @@ def launch (port=6633, address="0.0.0.0", name=None,
   combinations and pointing to reasonable key/cert files.  These have the same
   meanings as with Open vSwitch's old test controller, but they are more
   flexible (e.g., ca-cert can be skipped).
+
+  read_size sets the max number of bytes read from a switch connection at
+  once (default 65536).
+
+  shards sets the number of threads reading switch connections.  Each owns
+  a subset of the connections and hands the messages to the co-operative
+  thread, so a busy switch doesn't hold up reading the others (default: all
+  connections are read by the OpenFlow task itself).
   """
+  if read_size is not None:
+    Connection.read_size = int(read_size)
+
   if name is None:
     basename = "of_01"
     counter = 1
@@ -1199,6 +1499,7 @@ def launch (port=6633, address="0.0.0.0", name=None,
 
   l = OpenFlow_01_Task(port = int(port), address = address,
                        ssl_key = private_key, ssl_cert = certificate,
-                       ssl_ca_cert = ca_cert)
+                       ssl_ca_cert = ca_cert,
+                       shards = int(shards) if shards else 0)
   core.register(name, l)
   return l
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the encode rate of flow_mods: packing each message, and patching a
+MessageTemplate
+
+Usage: flow_mod_pack_benchmark.py [flow_mod count]
+"""
+
+import sys
+import os.path
+import struct
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../..")
+
+import pox.openflow.libopenflow_01 as of
+from pox.lib.addresses import EthAddr, IPAddr
+
+def legacy_match_pack (self, flow_mod=False):
+  """
+  The former field by field ofp_match.pack()
+  """
+  packed = b""
+  if self.adjust_wildcards and flow_mod:
+    wc = self._wire_wildcards(self.wildcards)
+  else:
+    wc = self.wildcards
+  packed += struct.pack("!LH", wc, self.in_port or 0)
+  for addr in (self.dl_src, self.dl_dst):
+    if addr is None:
+      packed += of.EMPTY_ETH.toRaw()
+    elif type(addr) is bytes:
+      packed += addr
+    else:
+      packed += addr.toRaw()
+
+  def check_ip(val):
+    return (val or 0) if self.dl_type == 0x0800 else 0
+  def check_ip_or_arp(val):
+    return (val or 0) if self.dl_type == 0x0800 \
+                         or self.dl_type == 0x0806 else 0
+  def check_tp(val):
+    return (val or 0) if self.dl_type == 0x0800 \
+                         and self.nw_proto in (1,6,17) else 0
+
+  packed += struct.pack("!HB", self.dl_vlan or 0, self.dl_vlan_pcp or 0)
+  packed += b'\x00'
+  packed += struct.pack("!HBB", self.dl_type or 0,
+      check_ip(self.nw_tos), check_ip_or_arp(self.nw_proto))
+  packed += b'\x00\x00'
+  def fix (addr):
+    if addr is None: return 0
+    if type(addr) is int: return addr & 0xffFFffFF
+    if type(addr) is long: return addr & 0xffFFffFF
+    return addr.toUnsigned()
+
+  packed += struct.pack("!LLHH", check_ip_or_arp(fix(self.nw_src)),
+      check_ip_or_arp(fix(self.nw_dst)),
+      check_tp(self.tp_src), check_tp(self.tp_dst))
+  return packed
+
+def legacy_flow_mod_pack (self):
+  """
+  The former ofp_flow_mod.pack() (without the data handling)
+  """
+  packed = b""
+  packed += struct.pack("!BBHL", self.version, self.header_type,
+      len(self), self.xid)
+  packed += legacy_match_pack(self.match, flow_mod=True)
+  packed += struct.pack("!QHHHHLHH", self.cookie, self.command,
+                        self.idle_timeout, self.hard_timeout,
+                        self.priority, of.NO_BUFFER, self.out_port,
+                        self.flags)
+  for i in self.actions:
+    if i.port != of.OFPP_CONTROLLER:
+      i.max_len = 0
+    packed += struct.pack("!HHHH", i.type, len(i), i.port, i.max_len)
+  return packed
+
+def flow_mods (count):
+  r = []
+  for i in xrange(count):
+    match = of.ofp_match(in_port=i % 48 + 1, dl_type=0x0800,
+                         dl_src=EthAddr("00:00:00:00:%02x:%02x"
+                                        % (i >> 8 & 0xff, i & 0xff)),
+                         nw_proto=6, nw_dst=IPAddr(0x0a000000 + i),
+                         tp_dst=80)
+    r.append(of.ofp_flow_mod(match=match, idle_timeout=10, priority=100,
+                             action=of.ofp_action_output(port=i % 48 + 1)))
+  return r
+
+def run (pack, msgs):
+  start = time.time()
+  for m in msgs:
+    pack(m)
+  return len(msgs) / (time.time() - start)
+
+def main (count=100000):
+  msgs = flow_mods(count)
+  for m in msgs: m.xid # Generate xids up front
+  assert legacy_flow_mod_pack(msgs[0]) == msgs[0].pack()
+  print "Encoding %s flow_mods:" % (count,)
+  legacy = run(legacy_flow_mod_pack, msgs)
+  print "  former pack():         %9.0f msg/s" % (legacy,)
+  current = run(of.ofp_flow_mod.pack, msgs)
+  print "  pack():                %9.0f msg/s (%.2fx)" % (current,
+                                                          current / legacy)
+
+  # Drop rules which only differ in their in_port
+  t = of.MessageTemplate(of.ofp_flow_mod(match=of.ofp_match(in_port=1),
+                                         priority=1, hard_timeout=30))
+  start = time.time()
+  for i in xrange(count):
+    t.pack(in_port=i % 48 + 1)
+  templated = count / (time.time() - start)
+  print "  MessageTemplate.pack(): %9.0f msg/s (%.2fx)" % (templated,
+                                                          templated / legacy)
+
+if __name__ == '__main__':
+  main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the messages/sec of the buffered of_01.Connection.read() against the
+former string based receive path
+
+Usage: of_01_read_benchmark.py [message count] [payload size]
+"""
+
+import sys
+import os.path
+import socket
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../..")
+
+import pox.core
+if pox.core.core is None:
+  pox.core.initialize(handle_signals=False)
+import pox.openflow.of_01 as of_01
+import pox.openflow.libopenflow_01 as of
+
+def stream_socket (data):
+  """
+  Return the reading end of a socket pair which receives the given stream
+
+  The stream is written by a child process so that the writer doesn't
+  compete with the measured reader for the interpreter.
+  """
+  reader, writer = socket.socketpair()
+  if os.fork() == 0:
+    reader.close()
+    writer.sendall(data)
+    writer.close()
+    os._exit(0)
+  writer.close()
+  return reader
+
+class FakeDeferredSender (object):
+  sending = False
+
+def legacy_read (self):
+  """
+  The former receive path of Connection.read()
+  """
+  try:
+    d = self.sock.recv(2048)
+  except:
+    return False
+  if len(d) == 0:
+    return False
+  self.buf += d
+  buf_len = len(self.buf)
+
+  offset = 0
+  while buf_len - offset >= 8:
+    ofp_type = ord(self.buf[offset+1])
+    if ord(self.buf[offset]) != of.OFP_VERSION:
+      if ofp_type != of.OFPT_HELLO:
+        return False
+    msg_length = ord(self.buf[offset+2]) << 8 | ord(self.buf[offset+3])
+    if buf_len - offset < msg_length: break
+    new_offset,msg = self.unpackers[ofp_type](self.buf, offset)
+    assert new_offset - offset == msg_length
+    offset = new_offset
+    h = self.handlers[ofp_type]
+    h(self, msg)
+
+  if offset != 0:
+    self.buf = self.buf[offset:]
+  return True
+
+def run (read, stream, count, repeat=3):
+  best = 0
+  for i in range(repeat):
+    con = of_01.Connection(stream_socket(stream))
+    received = [0]
+    def handler (con, msg):
+      received[0] += 1
+    con.handlers = [handler] * (max(of.ofp_type_map) + 1)
+    if read is legacy_read:
+      con.buf = b''
+    start = time.time()
+    while read(con):
+      pass
+    elapsed = time.time() - start
+    con.sock.close()
+    os.wait()
+    assert received[0] == count, "%s != %s" % (received[0], count)
+    best = max(best, count / elapsed)
+  return best
+
+def main (count=50000, payload=128):
+  of_01.deferredSender = FakeDeferredSender()
+  data = b'z' * payload
+  stream = b''.join(of.ofp_packet_in(xid=i, in_port=1, data=data).pack()
+                    for i in xrange(count))
+  print "%s PACKET_INs with %sB payload (%s KB stream)" % (count, payload,
+                                                          len(stream) / 1024)
+  legacy = run(legacy_read, stream, count)
+  print "  string buffer:    %10.0f msg/s" % legacy
+  for read_size in (2048, 16384, 65536):
+    of_01.Connection.read_size = read_size
+    current = run(of_01.Connection.read, stream, count)
+    print "  bytearray (%5s): %10.0f msg/s (%.2fx)" % (read_size, current,
+                                                     current / legacy)
+
+if __name__ == '__main__':
+  main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the per-packet parse cost of LLDP, ARP and TCP frames with eager and
+lazy ethernet parsing, and the cost of the internet checksum
+
+Usage: packet_parse_benchmark.py [packet count]
+"""
+
+import sys
+import os.path
+import array
+import struct
+import time
+from socket import ntohs
+
+sys.path.append(os.path.dirname(__file__) + "/../..")
+
+import pox.lib.packet as pkt
+from pox.lib.packet.packet_utils import checksum
+from pox.lib.addresses import EthAddr, IPAddr
+
+def legacy_checksum (data, start = 0, skip_word = None):
+  """
+  The former word by word packet_utils.checksum()
+  """
+  if len(data) % 2 != 0:
+    arr = array.array('H', data[:-1])
+  else:
+    arr = array.array('H', data)
+
+  if skip_word is not None:
+    for i in range(0, len(arr)):
+      if i == skip_word:
+        continue
+      start +=  arr[i]
+  else:
+    for i in range(0, len(arr)):
+      start +=  arr[i]
+
+  if len(data) % 2 != 0:
+    start += struct.unpack('H', data[-1]+'\0')[0]
+
+  start  = (start >> 16) + (start & 0xffff)
+  start += (start >> 16)
+  return ntohs(~start & 0xffff)
+
+def frames ():
+  src = EthAddr("00:00:00:00:00:01")
+  dst = EthAddr("00:00:00:00:00:02")
+
+  lldp = pkt.lldp()
+  lldp.tlvs.append(pkt.chassis_id(subtype=pkt.chassis_id.SUB_LOCAL,
+                                  id=b"dpid:0000000000000001"))
+  lldp.tlvs.append(pkt.port_id(subtype=pkt.port_id.SUB_PORT, id=b"1"))
+  lldp.tlvs.append(pkt.ttl(ttl=120))
+  lldp.tlvs.append(pkt.end_tlv())
+  e_lldp = pkt.ethernet(src=src, dst=pkt.ETHERNET.LLDP_MULTICAST,
+                        type=pkt.ethernet.LLDP_TYPE, payload=lldp)
+
+  arp = pkt.arp(opcode=pkt.arp.REQUEST, hwsrc=src,
+                protosrc=IPAddr("10.0.0.1"), protodst=IPAddr("10.0.0.2"))
+  e_arp = pkt.ethernet(src=src, dst=pkt.ETHERNET.ETHER_BROADCAST,
+                       type=pkt.ethernet.ARP_TYPE, payload=arp)
+
+  tcp = pkt.tcp(srcport=1234, dstport=80, seq=1, off=5, win=1024,
+                payload=b'x' * 512)
+  tcp.ACK = True
+  ip = pkt.ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"),
+                protocol=pkt.ipv4.TCP_PROTOCOL, payload=tcp)
+  e_tcp = pkt.ethernet(src=src, dst=dst, type=pkt.ethernet.IP_TYPE,
+                       payload=ip)
+
+  return [("LLDP", e_lldp.pack()), ("ARP", e_arp.pack()),
+          ("TCP", e_tcp.pack())]
+
+def run (f, count, repeat=3):
+  """
+  Returns the best time per call of f in microseconds
+  """
+  best = None
+  for i in range(repeat):
+    start = time.time()
+    for j in xrange(count):
+      f()
+    elapsed = (time.time() - start) / count * 1e6
+    if best is None or elapsed < best: best = elapsed
+  return best
+
+def main (count=20000):
+  print "Parse cost per packet (%s packets):" % (count,)
+  for name,raw in frames():
+    eager = run(lambda: pkt.ethernet(raw), count)
+    l2 = run(lambda: pkt.ethernet(raw, lazy=True).src, count)
+    full = run(lambda: pkt.ethernet(raw, lazy=True).next, count)
+    print "  %-4s %4sB  eager: %6.2f us  lazy L2 only: %6.2f us (%.1fx)" \
+          "  lazy all: %6.2f us" % (name, len(raw), eager, l2, eager / l2,
+                                    full)
+
+  print "Checksum cost:"
+  for size in (20, 64, 512, 1480):
+    data = b'\x12\x34' * (size // 2)
+    assert checksum(data, 0, 5) == legacy_checksum(data, 0, 5)
+    legacy = run(lambda: legacy_checksum(data, 0, 5), count)
+    current = run(lambda: checksum(data, 0, 5), count)
+    print "  %4sB  word loop: %6.2f us  sum: %6.2f us (%.1fx)" % (size,
+          legacy, current, legacy / current)
+
+if __name__ == '__main__':
+  main(*[int(a) for a in sys.argv[1:]])
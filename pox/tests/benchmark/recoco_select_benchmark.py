@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the timer wakeups/sec of recoco's SelectHub while many timers and
+sockets are waiting, against the former implementation which walked all the
+waiting tasks in every cycle
+
+Usage: recoco_select_benchmark.py [timer count] [socket count] [duration]
+"""
+
+import sys
+import os.path
+import socket
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../..")
+
+from pox.lib.recoco.recoco import SelectHub, CYCLE_MAXIMUM
+
+class LegacySelectHub (SelectHub):
+  """
+  SelectHub with the former select loop
+  """
+  def _select (self, tasks, rets):
+    rl = {}
+    wl = {}
+    xl = {}
+
+    timeout = None
+    timeoutTask = None
+
+    now = time.time()
+
+    expired = None
+
+    for t,trl,twl,txl,tto in tasks.itervalues():
+      if tto != None:
+        if tto <= now:
+          # Already expired
+          if expired is None: expired = []
+          expired.append(t)
+          continue
+        tt = tto - now
+        if tt < timeout or timeout is None:
+          timeout = tt
+          timeoutTask = t
+
+      if trl:
+        for i in trl: rl[i] = t
+      if twl:
+        for i in twl: wl[i] = t
+      if txl:
+        for i in txl: xl[i] = t
+
+    if expired:
+      for t in expired:
+        del tasks[t]
+        self._return(t, ([],[],[]))
+
+    if timeout is None: timeout = CYCLE_MAXIMUM
+    ro, wo, xo = self._select_func( rl.keys() + [self._pinger],
+                                    wl.keys(),
+                                    xl.keys(), timeout )
+
+    if len(ro) == 0 and len(wo) == 0 and len(xo) == 0 and timeoutTask != None:
+      del tasks[timeoutTask]
+      self._return(timeoutTask, ([],[],[]))
+    else:
+      if self._pinger in ro:
+        self._pinger.pongAll()
+        while not self._incoming.empty():
+          stuff = self._incoming.get(True)
+          task = stuff[0]
+          assert task not in tasks
+          tasks[task] = stuff
+          self._incoming.task_done()
+        if len(ro) == 1 and len(wo) == 0 and len(xo) == 0:
+          return
+        ro.remove(self._pinger)
+
+      for i in ro:
+        task = rl[i]
+        if task not in rets: rets[task] = ([],[],[])
+        rets[task][0].append(i)
+      for i in wo:
+        task = wl[i]
+        if task not in rets: rets[task] = ([],[],[])
+        rets[task][1].append(i)
+      for i in xo:
+        task = xl[i]
+        if task not in rets: rets[task] = ([],[],[])
+        rets[task][2].append(i)
+
+      for t,v in rets.iteritems():
+        del tasks[t]
+        self._return(t, v)
+      rets.clear()
+
+class FakeScheduler (object):
+  """
+  Collects the woken tasks instead of running them
+  """
+  _hasQuit = False
+  def __init__ (self):
+    self.woken = []
+  def fast_schedule (self, task):
+    self.woken.append(task)
+
+class DummyTask (object):
+  pass
+
+def run (hub_class, timers, sockets, duration, use_epoll):
+  scheduler = FakeScheduler()
+  hub = hub_class(scheduler, use_epoll=use_epoll, threaded=False)
+  # Poll instead of blocking, only the cost of a cycle is measured
+  select_func = hub._select_func
+  hub._select_func = lambda rl, wl, xl, timeout: select_func(rl, wl, xl, 0)
+  now = time.time()
+  for i in xrange(timers):
+    # Far away timeouts, like keepalives and polling
+    hub.registerTimer(DummyTask(), now + 1000 + i % 100, True)
+  for s in sockets:
+    hub.registerSelect(DummyTask(), [s], None, [s])
+  rets = {}
+  hub._select(hub._tasks, rets) # Pick up the registrations
+
+  ticker = DummyTask()
+  ticks = 0
+  start = time.time()
+  while time.time() - start < duration:
+    hub.registerTimer(ticker, 0)
+    while not scheduler.woken:
+      hub._select(hub._tasks, rets)
+    del scheduler.woken[:]
+    ticks += 1
+  return ticks / (time.time() - start)
+
+def main (timers=10000, socket_count=1000, duration=3):
+  pairs = [socket.socketpair() for i in xrange(socket_count // 2)]
+  sockets = [s for p in pairs for s in p]
+  print "%s waiting timers, %s idle sockets" % (timers, len(sockets))
+  legacy = run(LegacySelectHub, timers, sockets, duration, True)
+  print "  former loop (epoll):   %10.0f wakeups/s" % legacy
+  for use_epoll in (True, False):
+    if not use_epoll and max(s.fileno() for s in sockets) >= 1024:
+      print "  registry (select):     skipped, fds over FD_SETSIZE"
+      continue
+    current = run(SelectHub, timers, sockets, duration, use_epoll)
+    print "  registry (%s):%s%10.0f wakeups/s (%.1fx)" % (
+        "epoll" if use_epoll else "select", " " * (6 if use_epoll else 5),
+        current, current / legacy)
+
+if __name__ == '__main__':
+  main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the packets/sec of SoftwareSwitch.rx_packet() per packet against
+rx_packets() in bursts
+
+Usage: switch_rx_benchmark.py [packet count] [flow count] [burst size]
+"""
+
+import sys
+import os.path
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../..")
+
+import pox.core
+if pox.core.core is None:
+  pox.core.initialize(handle_signals=False)
+from pox.datapaths.switch import SoftwareSwitch
+from pox.openflow.flow_table import TableEntry
+import pox.openflow.libopenflow_01 as of
+import pox.lib.packet as pkt
+from pox.lib.addresses import EthAddr, IPAddr
+
+def make_switch (flows):
+  s = SoftwareSwitch(1, ports=4)
+  for i in range(flows):
+    fm = of.ofp_flow_mod(priority=10,
+                         match=of.ofp_match(dl_type=0x0800,
+                                            nw_dst=IPAddr(0x0a000000 + i)),
+                         action=of.ofp_action_output(port=i % 4 + 1))
+    s.table.add_entry(TableEntry.from_flow_mod(fm))
+  return s
+
+def make_packets (count, flows):
+  packets = []
+  for i in xrange(count):
+    ip = pkt.ipv4(srcip=IPAddr("192.168.0.1"),
+                  dstip=IPAddr(0x0a000000 + i % flows),
+                  protocol=pkt.ipv4.UDP_PROTOCOL,
+                  payload=pkt.udp(srcport=1000, dstport=2000,
+                                  payload=b'x' * 64))
+    e = pkt.ethernet(src=EthAddr("00:00:00:00:00:01"),
+                     dst=EthAddr("00:00:00:00:00:02"),
+                     type=pkt.ethernet.IP_TYPE, payload=ip)
+    raw = e.pack()
+    packets.append((pkt.ethernet(raw), (i + 1) % 4 + 1, raw))
+  return packets
+
+def main (count=20000, flows=1000, burst=256):
+  packets = make_packets(count, flows)
+  print "%s packets of %s flows through a table of %s entries" % (count,
+        min(count, flows), flows)
+
+  s = make_switch(flows)
+  start = time.time()
+  for packet,in_port,raw in packets:
+    s.rx_packet(packet, in_port, raw)
+  single = count / (time.time() - start)
+  assert s._matched_count == count
+  print "  rx_packet():              %8.0f pps" % (single,)
+
+  for size in (16, burst):
+    s = make_switch(flows)
+    start = time.time()
+    for i in xrange(0, count, size):
+      s.rx_packets(packets[i:i+size])
+    batched = count / (time.time() - start)
+    assert s._matched_count == count
+    print "  rx_packets() (burst %4s): %8.0f pps (%.2fx)" % (size, batched,
+                                                             batched / single)
+
+if __name__ == '__main__':
+  main(*[int(a) for a in sys.argv[1:]])
@@ -159,6 +159,46 @@ class SwitchImplTest (unittest.TestCase):
     self.assertEqual(event.port.port_no,3)
     self.assertEqual(event.packet, self.packet)
 
+  def test_rx_packets(self):
+    c = self.conn
+    s = self.switch
+    received = []
+    s.addListener(DpPacketOut, lambda(event): received.append(event))
+    other = ethernet(
+        src=EthAddr("00:00:00:00:00:01"),
+        dst=EthAddr("00:00:00:00:00:02"),
+        payload=ipv4(srcip=IPAddr("1.2.3.6"),
+        dstip=IPAddr("1.2.3.5"),
+        payload=udp(srcport=1234, dstport=53, payload="haha")))
+    c.to_switch(ofp_flow_mod(xid=124, priority=1,
+                             match=ofp_match(in_port=1, nw_src="1.2.3.4"),
+                             actions = [ ofp_action_tp_port.set_dst(54),
+                                         ofp_action_output(port=3) ]))
+    batch = [(self.packet, 1), (other, 1), (self.packet, 2),
+             (self.packet, 1, self.packet.pack())]
+    s.rx_packets(batch)
+
+    # the unmatched packets went to the controller, in order
+    self.assertEqual([m.in_port for m in c.received], [1, 2])
+    self.assertEqual(c.received[0].data, other.pack())
+    self.assertEqual(len(received), 2)
+    for event in received:
+      self.assertEqual(event.port.port_no, 3)
+      self.assertEqual(event.packet.payload.payload.dstport, 54)
+
+    e = s.table.entries[0]
+    self.assertEqual(e.packet_count, 2)
+    self.assertEqual(e.byte_count, 2 * len(self.packet.pack()))
+    self.assertEqual(s.port_stats[1].rx_packets, 3)
+    self.assertEqual(s._lookup_count, 4)
+    self.assertEqual(s._matched_count, 2)
+
+    # table changes take effect for the next lookups
+    c.to_switch(ofp_flow_mod(xid=125, command=OFPFC_DELETE))
+    s.rx_packets([(self.packet, 1)])
+    self.assertEqual(len(received), 2)
+    self.assertEqual(len(c.received), 3)
+
   def test_delete_port(self):
     c = self.conn
     s = self.switch
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+import random
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+import pox.forwarding.l2_multi as l2m
+
+
+class FakeSwitch (object):
+  def __init__ (self, dpid):
+    self.dpid = dpid
+
+  def __repr__ (self):
+    return "s%i" % (self.dpid,)
+
+
+class PathTest (unittest.TestCase):
+  def setUp (self):
+    l2m.adjacency.clear()
+    l2m.path_map.clear()
+    l2m.path_users.clear()
+    self.sws = [FakeSwitch(i) for i in range(30)]
+    self.rand = random.Random(14)
+    self.links = set()
+
+  def connect (self, sw1, sw2):
+    l2m.adjacency[sw1][sw2] = sw2.dpid + 1
+    l2m.adjacency[sw2][sw1] = sw1.dpid + 1
+    self.links.add(frozenset((sw1,sw2)))
+
+  def disconnect (self, sw1, sw2):
+    del l2m.adjacency[sw1][sw2]
+    del l2m.adjacency[sw2][sw1]
+    self.links.discard(frozenset((sw1,sw2)))
+
+  def distance (self, src, dst):
+    """ Reference distance by breadth-first search over self.links """
+    seen = set([src])
+    frontier = [src]
+    distance = 0
+    while frontier:
+      if dst in frontier: return distance
+      distance += 1
+      frontier = [b for a in frontier for b in self.sws
+                  if b not in seen and frozenset((a,b)) in self.links]
+      seen.update(frontier)
+    return None
+
+  def check_paths (self):
+    for src in self.sws:
+      for dst in self.sws:
+        distance = self.distance(src, dst)
+        path = l2m._get_path(src, dst, 1, 1)
+        if distance is None:
+          self.assertIs(path, None)
+        else:
+          self.assertEqual(len(path), distance + 1)
+
+  def test_paths (self):
+    for i in range(40):
+      self.connect(*self.rand.sample(self.sws, 2))
+    self.check_paths()
+
+  def test_link_changes (self):
+    for i in range(40):
+      self.connect(*self.rand.sample(self.sws, 2))
+    self.check_paths()
+    for i in range(20):
+      if self.rand.random() < 0.5:
+        sw1,sw2 = self.rand.sample(self.sws, 2)
+        if sw2 in l2m.adjacency[sw1]: continue
+        self.connect(sw1, sw2)
+        l2m._link_added(sw1, sw2)
+      else:
+        sw1,sw2 = self.rand.sample(sorted(self.links), 1)[0]
+        self.disconnect(sw1, sw2)
+        l2m._link_removed(sw1, sw2)
+      self.check_paths()
+
+  def test_unaffected_paths_kept (self):
+    a,b,c,d = self.sws[:4]
+    self.connect(a, b)
+    self.connect(c, d)
+    self.assertEqual(l2m._get_raw_path(a, b), [])
+    self.assertEqual(l2m._get_raw_path(c, d), [])
+    self.disconnect(c, d)
+    l2m._link_removed(c, d)
+    self.assertIn(a, l2m.path_map)
+    self.assertNotIn(c, l2m.path_map)
+    self.connect(b, c)
+    l2m._link_added(b, c)
+    self.assertNotIn(a, l2m.path_map)
+    self.assertEqual(l2m._get_raw_path(a, c), [b])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,76 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+import array
+import random
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+import pox.lib.packet as pkt
+from pox.lib.packet.packet_utils import checksum
+from pox.lib.addresses import EthAddr, IPAddr
+
+class ChecksumTest (unittest.TestCase):
+  def test_skip_word (self):
+    rand = random.Random(15)
+    for size in (0, 1, 2, 19, 20, 64, 1481):
+      data = b''.join(chr(rand.randint(0, 255)) for i in range(size))
+      for skip in (None, 0, 5, size // 2 - 1, size, -1):
+        words = array.array('H', data[:size - size % 2])
+        zeroed = data
+        if skip is not None and 0 <= skip < len(words):
+          words[skip] = 0
+          zeroed = words.tostring() + data[len(words) * 2:]
+        self.assertEqual(checksum(data, 7, skip), checksum(zeroed, 7))
+
+  def test_valid_ipv4 (self):
+    ip = pkt.ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"),
+                  protocol=pkt.ipv4.UDP_PROTOCOL)
+    ip.payload = pkt.udp(srcport=1, dstport=2, payload=b'abc')
+    raw = ip.pack()
+    self.assertEqual(checksum(raw[:20]), 0)
+    self.assertEqual(pkt.ipv4(raw).csum, ip.csum)
+
+class LazyEthernetTest (unittest.TestCase):
+  def setUp (self):
+    ip = pkt.ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"),
+                  protocol=pkt.ipv4.TCP_PROTOCOL)
+    ip.payload = pkt.tcp(srcport=1234, dstport=80, off=5, payload=b'x' * 10)
+    e = pkt.ethernet(src=EthAddr("00:00:00:00:00:01"),
+                     dst=EthAddr("00:00:00:00:00:02"),
+                     type=pkt.ethernet.IP_TYPE, payload=ip)
+    self.raw = e.pack()
+
+  def test_parse_on_access (self):
+    e = pkt.ethernet(self.raw, lazy=True)
+    self.assertEqual(e.src, EthAddr("00:00:00:00:00:01"))
+    self.assertIs(e._next, pkt.ETHERNET._UNPARSED)
+    self.assertEqual(e.find('tcp').dstport, 80)
+    self.assertEqual(e.payload.dstip, IPAddr("10.0.0.2"))
+    self.assertEqual(str(e.next), str(pkt.ethernet(self.raw).next))
+
+  def test_pack (self):
+    e = pkt.ethernet(self.raw, lazy=True)
+    e.dst = EthAddr("00:00:00:00:00:03")
+    raw = e.pack()
+    self.assertIs(e._next, pkt.ETHERNET._UNPARSED)
+    self.assertEqual(raw[:6], e.dst.toRaw())
+    self.assertEqual(raw[6:], self.raw[6:])
+    e = pkt.ethernet(self.raw, lazy=True)
+    e.find('tcp').dstport = 81
+    self.assertEqual(pkt.ethernet(e.pack()).find('tcp').dstport, 81)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+import socket
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+from pox.lib.recoco.recoco import SelectHub
+
+class FakeScheduler (object):
+  _hasQuit = False
+  def __init__ (self):
+    self.woken = []
+  def fast_schedule (self, task):
+    self.woken.append((task, task.rv))
+
+class DummyTask (object):
+  def __init__ (self, name):
+    self.name = name
+    self.rv = None
+  def __repr__ (self):
+    return self.name
+
+class SelectHubTest (unittest.TestCase):
+  def setUp (self):
+    self.scheduler = FakeScheduler()
+    self.hub = SelectHub(self.scheduler, threaded=False)
+    # Don't block for long when there is nothing to wait for
+    select_func = self.hub._select_func
+    self.hub._select_func = lambda rl, wl, xl, timeout: select_func(
+        rl, wl, xl, min(timeout, 0.05))
+    self.sockets = socket.socketpair()
+
+  def tearDown (self):
+    for s in self.sockets: s.close()
+
+  def _cycle (self):
+    self.hub._select(self.hub._tasks, {})
+    woken = [t for t,rv in self.scheduler.woken]
+    del self.scheduler.woken[:]
+    return woken
+
+  def _wait (self, count, timeout=1):
+    woken = []
+    end = time.time() + timeout
+    while len(woken) < count and time.time() < end:
+      woken.extend(self._cycle())
+    return woken
+
+  def test_timers_in_order (self):
+    now = time.time()
+    tasks = [DummyTask("t%s" % i) for i in range(5)]
+    for i,t in enumerate(reversed(tasks)):
+      self.hub.registerTimer(t, now + 0.01 * (5 - i), True)
+    self.assertEqual(self._wait(5), tasks)
+    self.assertEqual(self.hub._tasks, {})
+
+  def test_io_wake (self):
+    a,b = self.sockets
+    t = DummyTask("io")
+    self.hub.registerSelect(t, [a], None, [a], timeout=10)
+    self._cycle() # Pick up the registration
+    b.send(b"x")
+    self.assertEqual(self._cycle(), [t])
+    self.assertEqual(t.rv, ([a],[],[]))
+    self.assertEqual(self.hub._rl, {})
+    # The timer of the woken task must not fire again
+    self.hub.registerTimer(t, 0.01)
+    self.assertEqual(self._wait(1), [t])
+    self.assertEqual(t.rv, ([],[],[]))
+    self.assertEqual(self.hub._tasks, {})
+
+  def test_stale_timers_dropped (self):
+    a,b = self.sockets
+    b.send(b"x")
+    for i in range(200):
+      t = DummyTask("io%s" % i)
+      self.hub.registerSelect(t, [a], None, None, timeout=100)
+      self.assertEqual(self._wait(1), [t])
+    self.assertTrue(len(self.hub._timers) < 100)
+
+if __name__ == '__main__':
+  unittest.main()
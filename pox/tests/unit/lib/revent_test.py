@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+from pox.lib.revent import *
+
+class Ping (Event):
+  def __init__ (self, n = 0):
+    Event.__init__(self)
+    self.n = n
+
+class Source (EventMixin):
+  _eventMixin_events = set([Ping])
+
+class Sink (object):
+  def __init__ (self):
+    self.calls = []
+
+  def _handle_Ping (self, event):
+    self.calls.append(event.n)
+
+class EventMixinTest (unittest.TestCase):
+  def test_priority_order (self):
+    s = Source()
+    calls = []
+    s.addListener(Ping, lambda e: calls.append(1))
+    s.addListener(Ping, lambda e: calls.append(2), priority=5)
+    s.addListener(Ping, lambda e: calls.append(3), priority=10)
+    s.addListener(Ping, lambda e: calls.append(4), priority=5)
+    s.raiseEvent(Ping)
+    self.assertEqual(calls, [3, 2, 4, 1])
+
+  def test_listeners_changed_while_raising (self):
+    s = Source()
+    calls = []
+    def first (event):
+      calls.append('first')
+      s.addListener(Ping, lambda e: calls.append('added'))
+      s.removeListener(second)
+    def second (event):
+      calls.append('second')
+    s.addListener(Ping, first, once=True)
+    s.addListener(Ping, second)
+    s.raiseEvent(Ping)
+    # Changes take effect with the next raise
+    self.assertEqual(calls, ['first', 'second'])
+    s.raiseEvent(Ping)
+    self.assertEqual(calls, ['first', 'second', 'added'])
+    self.assertEqual(s._eventMixin_get_listener_count(), 1)
+
+  def test_halt_and_remove (self):
+    s = Source()
+    sink = Sink()
+    s.addListener(Ping, lambda e: EventHaltAndRemove, priority=1)
+    eid = s.addListeners(sink)[0]
+    e = s.raiseEvent(Ping, 1)
+    self.assertTrue(e.halt)
+    s.raiseEvent(Ping, 2)
+    self.assertEqual(sink.calls, [2])
+    self.assertTrue(s.removeListener(eid[1]))
+    self.assertFalse(s.removeListener(eid))
+    self.assertIs(s.raiseEvent(Ping, 3), None)
+
+  def test_reusable_event (self):
+    s = Source()
+    sink = Sink()
+    s.addListener(Ping, lambda e: EventHalt, priority=1)
+    s.addListeners(sink)
+    e = Ping(1)
+    self.assertTrue(s.raiseEvent(e).halt)
+    self.assertTrue(s.raiseEvent(e).halt)
+    e.reusable = True
+    s.removeListener(s._eventMixin_handlers[Ping][0][3])
+    self.assertFalse(s.raiseEvent(e).halt)
+    self.assertEqual(sink.calls, [1])
+
+  def test_event_stats (self):
+    s = Source()
+    sink = Sink()
+    s.addListeners(sink)
+    s.raiseEvent(Ping)
+    stats = enableEventStats(Ping)
+    try:
+      s.raiseEvent(Ping)
+      s.raiseEvent(Ping)
+      self.assertEqual(stats.count, 2)
+      calls,total,histogram = stats.handlers['Sink._handle_Ping']
+      self.assertEqual(calls, 2)
+      self.assertEqual(sum(histogram), 2)
+      self.assertIs(getEventStats(Ping), stats)
+      self.assertIn("Sink._handle_Ping: 2 calls", str(stats))
+    finally:
+      enableEventStats(Ping, False)
+    s.raiseEvent(Ping)
+    self.assertEqual(stats.count, 2)
+    self.assertIs(getEventStats(Ping), None)
+
+if __name__ == '__main__':
+  unittest.main()
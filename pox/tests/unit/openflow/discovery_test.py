@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+from pox.openflow.discovery import *
+
+class MockSender (AdaptiveLLDPSender):
+  """
+  Adaptive sender which records packets instead of sending them
+  """
+  def __init__ (self, *args, **kw):
+    self.sent = []
+    super(MockSender,self).__init__(*args, **kw)
+
+  def _send (self, dpid, packet):
+    self.sent.append((dpid, packet))
+
+  def _set_timer (self):
+    pass
+
+class AdaptiveLLDPSenderTest (unittest.TestCase):
+  def test_backoff (self):
+    sender = MockSender(5, max_interval = 8)
+    sender.add_port(1, 1, "00:00:00:00:00:01")
+    sender.add_port(1, 2, "00:00:00:00:00:02")
+    now = time.time()
+
+    # New ports are probed right away
+    sender._timer_handler(now)
+    self.assertEqual(len(sender.sent), 2)
+    sender._timer_handler(now)
+    self.assertEqual(len(sender.sent), 2)
+
+    # ...and then less and less often, up to the max interval
+    times = []
+    t = now
+    while t < now + 300:
+      t += 0.1
+      count = len(sender.sent)
+      sender._timer_handler(t)
+      if len(sender.sent) > count:
+        times.append(t)
+    gaps = [b - a for a,b in zip(times, times[1:])]
+    self.assertTrue(gaps[0] < gaps[-1])
+    self.assertTrue(all(gap < 8.2 for gap in gaps))
+    self.assertTrue(gaps[-1] > 7.8)
+
+    # Stable ports are probed much less than once per send cycle
+    plain = 2 * (300 / 5 + 1)
+    self.assertTrue(len(sender.sent) < 0.75 * plain)
+
+    # Changed ports start over
+    sender.sent = []
+    sender.reprobe(1, 2)
+    sender._timer_handler(t)
+    self.assertEqual([d for d,p in sender.sent], [1])
+
+  def test_max_interval (self):
+    discovery = Discovery(install_flow = False, link_timeout = 10,
+                          adaptive = True)
+    max_interval = discovery._sender._max_interval
+    self.assertTrue(max_interval > discovery.send_cycle_time)
+    self.assertTrue(max_interval < discovery._link_timeout)
+
+  def test_removal (self):
+    sender = MockSender(5)
+    now = time.time()
+    for dpid in (1, 2):
+      for port in (1, 2, 3):
+        sender.add_port(dpid, port, "00:00:00:00:00:0%i" % (port,))
+    sender.del_port(1, 2)
+    sender.del_switch(2)
+    sender._timer_handler(now + 1)
+    self.assertEqual(len(sender.sent), 2)
+    self.assertEqual(sorted(sender._ports), [(1, 1), (1, 3)])
+
+class DiscoveryExpiryTest (unittest.TestCase):
+  def test_expire_links (self):
+    discovery = Discovery(install_flow = False, link_timeout = 10)
+    discovery._sender = MockSender(5)
+    removed = []
+    discovery.addListenerByName("LinkEvent",
+        lambda event: removed.append(event.link) if event.removed else None)
+    now = time.time()
+    links = [Link(1, i, 2, i) for i in range(1, 5)]
+    for link in links:
+      discovery._link_seen(link, now = now)
+    # Keep the first two alive
+    for link in links[:2]:
+      discovery._link_seen(link, now = now + 8)
+
+    discovery._expire_links(now + 5)
+    self.assertEqual(removed, [])
+    discovery._expire_links(now + 12)
+    self.assertEqual(sorted(removed), links[2:])
+    discovery._expire_links(now + 17)
+    self.assertEqual(sorted(removed), links[2:])
+    discovery._expire_links(now + 19)
+    self.assertEqual(sorted(removed), sorted(links))
+    self.assertEqual(discovery.adjacency, {})
+    self.assertEqual(discovery._expiry, [])
+
+    # A link seen again is tracked again
+    discovery._link_seen(links[0], now = now + 30)
+    self.assertEqual(len(discovery._expiry), 1)
+    self.assertEqual(discovery.stats()['verified_links'], 7)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -111,6 +111,141 @@ class FlowTableTest(unittest.TestCase):
       t.remove_expired_entries(now=time)
       self.assertEqual(sorted([e.cookie for e in t.entries]), remaining)
 
+  def test_remove_expired_entries_touched(self):
+    """ test that touched flows are expired later and removed ones never """
+    t = FlowTable()
+    e1 = TableEntry(now=0, cookie=1, idle_timeout=5)
+    e2 = TableEntry(now=0, cookie=2, idle_timeout=5, hard_timeout=12)
+    t.add_entry(e1)
+    t.add_entry(e2)
+    for now in (4, 8):
+      e1.touch_packet(1, now=now)
+      e2.touch_packet(1, now=now)
+      t.remove_expired_entries(now=now+1)
+      self.assertEqual(len(t), 2)
+    t.remove_entry(e1)
+    removed = []
+    t.addListener(FlowTableModification,
+                  lambda ev: removed.append((ev.reason, ev.removed)))
+    t.remove_expired_entries(now=13)
+    self.assertEqual(removed, [(OFPRR_HARD_TIMEOUT, [e2])])
+    self.assertEqual(len(t), 0)
+
+  def test_indexed_lookup(self):
+    """ test that indexed lookups give the same results as linear scans """
+    import random
+    from pox.lib.packet import ethernet, ipv4, tcp, udp
+    rand = random.Random(4)
+    macs = [EthAddr("00:00:00:00:00:%02x" % i) for i in range(1, 4)]
+    ips = [IPAddr("10.0.%d.%d" % (i, j)) for i in range(2) for j in (1, 2)]
+    nets = ["10.0.0.0/16", "10.0.0.0/24", "10.0.1.0/24"] + ips
+
+    def random_match():
+      m = ofp_match()
+      if rand.random() < 0.5: m.in_port = rand.randint(1, 3)
+      if rand.random() < 0.5: m.dl_src = rand.choice(macs)
+      if rand.random() < 0.5: m.dl_dst = rand.choice(macs)
+      if rand.random() < 0.7:
+        m.dl_type = ethernet.IP_TYPE
+        if rand.random() < 0.6:
+          m.nw_src = rand.choice(nets)
+        if rand.random() < 0.6:
+          m.nw_dst = rand.choice(nets)
+        if rand.random() < 0.5:
+          m.nw_proto = rand.choice((ipv4.TCP_PROTOCOL, ipv4.UDP_PROTOCOL))
+          if rand.random() < 0.5: m.tp_dst = rand.choice((80, 81))
+      return m
+
+    def random_packet():
+      p = ethernet(src=rand.choice(macs), dst=rand.choice(macs),
+                   type=ethernet.IP_TYPE)
+      ip = ipv4(srcip=rand.choice(ips), dstip=rand.choice(ips))
+      if rand.random() < 0.5:
+        ip.protocol = ipv4.TCP_PROTOCOL
+        l4 = tcp()
+      else:
+        ip.protocol = ipv4.UDP_PROTOCOL
+        l4 = udp()
+      l4.srcport = 1234
+      l4.dstport = rand.choice((80, 81))
+      ip.payload = l4
+      p.payload = ip
+      return ethernet(p.pack())
+
+    t = FlowTable()
+    entries = []
+    for i in range(300):
+      m = random_match()
+      if i % 10 == 0:
+        m = ofp_match.from_packet(random_packet(), rand.randint(1, 3))
+      e = TableEntry(priority=rand.randint(0, 5), cookie=i, match=m)
+      t.add_entry(e)
+      entries.append(e)
+    for e in rand.sample(entries, 100):
+      t.remove_entry(e)
+
+    def linear_lookup(packet, in_port):
+      pm = ofp_match.from_packet(packet, in_port, spec_frags=True)
+      for e in t._table:
+        if e.match.matches_with_wildcards(pm, consider_other_wildcards=False):
+          return e
+      return None
+
+    for i in range(300):
+      packet = random_packet()
+      in_port = rand.randint(1, 3)
+      self.assertIs(t.entry_for_packet(packet, in_port),
+                    linear_lookup(packet, in_port))
+
+    for i in range(100):
+      m = random_match()
+      for strict in (False, True):
+        priority = rand.randint(0, 5)
+        expected = [e for e in t._table
+                    if e.is_matched_by(m, priority, strict)]
+        self.assertEqual(t.matching_entries(m, priority, strict), expected)
+      e = TableEntry(priority=rand.randint(0, 5), match=m)
+      expected = any(o.is_matched_by(m) or e.is_matched_by(o.match)
+                     for o in t._table
+                     if o.effective_priority == e.effective_priority)
+      self.assertEqual(t.check_for_overlapping_entry(e), expected)
+
+  def test_flow_key(self):
+    """ test that flow keys have the fields of exact matches """
+    from pox.openflow.flow_table import flow_key, _match_fields
+    from pox.lib.packet import ethernet, vlan, ipv4, icmp, udp, arp
+    src = EthAddr("00:00:00:00:00:01")
+    dst = EthAddr("00:00:00:00:00:02")
+    ip = ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"), tos=4,
+              protocol=ipv4.UDP_PROTOCOL,
+              payload=udp(srcport=1, dstport=2, payload=b'x'))
+    frag = ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"),
+                protocol=ipv4.UDP_PROTOCOL, flags=ipv4.MF_FLAG,
+                payload=udp(srcport=1, dstport=2, payload=b'x'))
+    ping = ipv4(srcip=IPAddr("10.0.0.1"), dstip=IPAddr("10.0.0.2"),
+                protocol=ipv4.ICMP_PROTOCOL, payload=icmp())
+    packets = [
+      ethernet(src=src, dst=dst, type=ethernet.IP_TYPE, payload=ip),
+      ethernet(src=src, dst=dst, type=ethernet.IP_TYPE, payload=frag),
+      ethernet(src=src, dst=dst, type=ethernet.IP_TYPE, payload=ping),
+      ethernet(src=src, dst=dst, type=ethernet.VLAN_TYPE,
+               payload=vlan(id=5, pcp=2, eth_type=ethernet.IP_TYPE,
+                            payload=ip)),
+      ethernet(src=src, dst=dst, type=ethernet.ARP_TYPE,
+               payload=arp(opcode=arp.REQUEST, hwsrc=src,
+                           protosrc=IPAddr("10.0.0.1"),
+                           protodst=IPAddr("10.0.0.2"))),
+      ethernet(src=src, dst=dst, type=0x1234, payload=b'data'),
+    ]
+    for p in packets:
+      p = ethernet(p.pack())
+      for in_port in (None, 3):
+        for spec_frags in (False, True):
+          values,nw_src,nw_dst = _match_fields(
+              ofp_match.from_packet(p, in_port, spec_frags))
+          self.assertEqual(flow_key(p, in_port, spec_frags),
+                           (tuple(values), nw_src[0], nw_dst[0]))
+
   # def test_check_for_overlap_entries(self):
 
 
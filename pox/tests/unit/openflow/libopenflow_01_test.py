@@ -312,6 +312,37 @@ class ofp_command_test(unittest.TestCase):
             for (check_attr,val) in attrs.iteritems():
               self.assertEqual(getattr(unpacked, check_attr), val)
 
+  def test_message_template(self):
+    match = ofp_match(in_port=1, dl_type=0x0800, nw_src="10.0.0.1")
+    fm = ofp_flow_mod(xid=1, match=match, priority=5, idle_timeout=10,
+                      actions=[ofp_action_output(port=2)])
+    t = MessageTemplate(fm)
+    self.assertEqual(t.pack(xid=1), fm.pack())
+
+    packed = t.pack(xid=7, in_port=3, priority=9, buffer_id=42)
+    fm2 = ofp_flow_mod()
+    fm2.unpack(packed)
+    self.assertEqual(fm2.xid, 7)
+    self.assertEqual(fm2.match.in_port, 3)
+    self.assertEqual(fm2.match.nw_src, IPAddr("10.0.0.1"))
+    self.assertEqual(fm2.priority, 9)
+    self.assertEqual(fm2.buffer_id, 42)
+    self.assertEqual(fm2.idle_timeout, 10)
+    self.assertEqual(fm2.actions, fm.actions)
+
+    # Patched fields persist, the xid doesn't
+    fm2.unpack(t.pack())
+    self.assertEqual(fm2.priority, 9)
+    self.assertNotEqual(fm2.xid, 7)
+
+    po = ofp_packet_out(data=b'\x00' * 20, action=ofp_action_output(port=1))
+    t = MessageTemplate(po, port=(20, "!H"))
+    po2 = ofp_packet_out()
+    po2.unpack(t.pack(in_port=4, port=5))
+    self.assertEqual(po2.in_port, 4)
+    self.assertEqual(po2.actions[0].port, 5)
+    self.assertEqual(po2.data, po.data)
+
 class ofp_action_test(unittest.TestCase):
   def assert_packed_action(self, cls, packed, a_type, length):
     self.assertEqual(extract_num(packed, 0,2), a_type, "Action %s: expected type %d (but is %d)" % (cls, a_type, extract_num(packed, 0,2)))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+#
+# Copyright 2017 Janos Czentye
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import sys
+import os.path
+import socket
+import time
+
+sys.path.append(os.path.dirname(__file__) + "/../../..")
+
+import pox.openflow.of_01 as of_01
+from pox.openflow.libopenflow_01 import *
+from pox.openflow import PacketIn
+from pox.lib.revent import EventMixin
+
+class ChunkSocket (object):
+  """
+  Socket which returns the given chunks of data on subsequent reads
+  """
+  def __init__ (self, chunks, recv_into=True):
+    self.chunks = list(chunks)
+    self.sent = []
+    if not recv_into:
+      self.recv_into = None
+
+  def send (self, data):
+    self.sent.append(data)
+    return len(data)
+
+  def recv (self, size):
+    if not self.chunks: return b''
+    d = self.chunks[0][:size]
+    self.chunks[0] = self.chunks[0][size:]
+    if not self.chunks[0]: del self.chunks[0]
+    return d
+
+  def recv_into (self, buf, size):
+    d = self.recv(size)
+    buf[:len(d)] = d
+    return len(d)
+
+class FakeDeferredSender (object):
+  sending = False
+
+class ConnectionReadTest (unittest.TestCase):
+  def setUp (self):
+    self._deferredSender = of_01.deferredSender
+    of_01.deferredSender = FakeDeferredSender()
+    self.received = []
+
+  def tearDown (self):
+    of_01.deferredSender = self._deferredSender
+
+  def _connection (self, chunks, recv_into=True, read_size=None):
+    con = of_01.Connection(ChunkSocket(chunks, recv_into))
+    if read_size is not None:
+      con.read_size = read_size
+    handler = lambda con, msg: self.received.append(msg)
+    con.handlers = [handler] * (max(ofp_type_map) + 1)
+    return con
+
+  def _read_all (self, con):
+    while con.sock.chunks:
+      self.assertTrue(con.read())
+
+  def _messages (self, count):
+    return [ofp_packet_in(xid=i, in_port=i % 4 + 1, data=b'x' * (i % 300))
+            for i in range(count)]
+
+  def test_single_read (self):
+    msgs = self._messages(20)
+    con = self._connection([b''.join(m.pack() for m in msgs)])
+    self._read_all(con)
+    self.assertEqual(self.received, msgs)
+
+  def test_split_messages (self):
+    msgs = self._messages(50)
+    raw = b''.join(m.pack() for m in msgs)
+    # Split in odd sizes so headers and bodies are cut in half
+    chunks = [raw[i:i+37] for i in range(0, len(raw), 37)]
+    for recv_into in (True, False):
+      self.received = []
+      con = self._connection(chunks, recv_into=recv_into)
+      self._read_all(con)
+      self.assertEqual(self.received, msgs)
+
+  def test_buffer_growth (self):
+    # Messages bigger than the buffer must be reassembled as well
+    msgs = [ofp_packet_in(xid=i, data=b'y' * 5000) for i in range(5)]
+    raw = b''.join(m.pack() for m in msgs)
+    chunks = [raw[i:i+1000] for i in range(0, len(raw), 1000)]
+    con = self._connection(chunks, read_size=1024)
+    self._read_all(con)
+    self.assertEqual(self.received, msgs)
+
+  def test_buffer_compaction (self):
+    # A steady stream of split messages doesn't grow the buffer for ever
+    msgs = self._messages(200)
+    raw = b''.join(m.pack() for m in msgs)
+    chunks = [raw[i:i+700] for i in range(0, len(raw), 700)]
+    con = self._connection(chunks, read_size=1024)
+    self._read_all(con)
+    self.assertEqual(self.received, msgs)
+    self.assertTrue(len(con.buf) <= 4 * 1024)
+
+  def test_lazy_buffer (self):
+    con = self._connection([])
+    self.assertIsNone(con.buf)
+
+  def test_buffer_sized_from_backlog (self):
+    switch_sock, controller_sock = socket.socketpair()
+    con = of_01.Connection(controller_sock)
+    handler = lambda con, msg: self.received.append(msg)
+    con.handlers = [handler] * (max(ofp_type_map) + 1)
+    msgs = self._messages(3)
+    raw = b''.join(m.pack() for m in msgs)
+    switch_sock.sendall(raw)
+    self.assertTrue(con.read())
+    self.assertEqual(self.received, msgs)
+    if of_01.ioctl is not None:
+      self.assertEqual(len(con.buf), len(raw))
+    switch_sock.close()
+    controller_sock.close()
+
+  def test_bad_length (self):
+    msgs = self._messages(3)
+    bad = ofp_echo_request(xid=99).pack()
+    bad = bad[:2] + b'\x00\x04' + bad[4:]
+    con = self._connection([b''.join(m.pack() for m in msgs) + bad])
+    self.assertFalse(con.read())
+    self.assertEqual(self.received, msgs)
+
+  def test_bad_version (self):
+    msgs = self._messages(3)
+    bad = ofp_echo_request(xid=99).pack()
+    bad = b'\x04' + bad[1:]
+    con = self._connection([b''.join(m.pack() for m in msgs) + bad])
+    self.assertFalse(con.read())
+    # Messages before the bad one are still handled
+    self.assertEqual(self.received, msgs)
+
+  def test_closed (self):
+    con = self._connection([])
+    self.assertFalse(con.read())
+
+  def test_packet_in_reused (self):
+    # The nexus and the connection get the same PacketIn instance
+    con = self._connection([])
+    con.ofnexus = EventMixin()
+    con.ofnexus._eventMixin_events = True
+    events = []
+    con.ofnexus.addListener(PacketIn, events.append)
+    con.addListener(PacketIn, events.append)
+    msg = ofp_packet_in(in_port=1, data=b'x' * 60)
+    of_01.DefaultOpenFlowHandlers.handle_PACKET_IN(con, msg)
+    self.assertEqual(len(events), 2)
+    self.assertIs(events[0], events[1])
+    self.assertIs(events[1].source, con)
+
+class ConnectionShardTest (unittest.TestCase):
+  def setUp (self):
+    self._deferredSender = of_01.deferredSender
+    of_01.deferredSender = FakeDeferredSender()
+    self.received = []
+
+  def tearDown (self):
+    of_01.deferredSender = self._deferredSender
+
+  def _wait (self, condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+      time.sleep(0.01)
+    return condition()
+
+  def test_handoff (self):
+    shard = of_01.ConnectionShard(0)
+    switch_sock, controller_sock = socket.socketpair()
+    controller_sock.setblocking(0)
+    con = of_01.Connection(controller_sock)
+    handler = lambda con, msg: self.received.append(msg)
+    con.handlers = [handler] * (max(ofp_type_map) + 1)
+    shard.add(con)
+    self.assertIs(con.deferred_sender, shard.sender)
+
+    msgs = [ofp_packet_in(xid=i, data=b'x' * i) for i in range(30)]
+    raw = b''.join(m.pack() for m in msgs)
+    switch_sock.sendall(raw[:100])
+    switch_sock.sendall(raw[100:])
+    self.assertTrue(self._wait(lambda: len(self.received) == len(msgs)))
+    self.assertEqual(self.received, msgs)
+
+    stats = shard.stats()
+    self.assertEqual(stats['connections'], 1)
+    self.assertEqual(stats['messages'], len(msgs))
+    self.assertEqual(stats['backlog'], 0)
+    self.assertTrue(stats['max_backlog'] >= 1)
+
+    # Closing the switch side closes the connection in the core thread
+    switch_sock.close()
+    self.assertTrue(self._wait(lambda: con.disconnected))
+    self.assertEqual(shard.stats()['connections'], 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
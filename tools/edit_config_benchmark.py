@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# Copyright 2017 Janos Czentye <czentye@tmit.bme.hu>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compare the latency and memory usage of the edit-config processing of the
+UNIFY REST-API with full conversion and with partial conversion of the nodes
+changed by the received diff on generated Virtualizers.
+"""
+import argparse
+import logging
+import multiprocessing
+import resource
+import sys
+import time
+from os.path import abspath as abspath
+from os.path import dirname as dirname
+
+sys.path.append(abspath(dirname(__file__) + "/../unify_virtualizer"))
+sys.path.append(abspath(dirname(__file__) + "/../escape/escape/util"))
+from virtualizer import Virtualizer
+from conversion import NFFG, NFFGConverter, VirtualizerCache
+from virtualizer_helper import get_changed_nodes_from_diff
+
+log = logging.getLogger("edit-config-benchmark")
+
+
+def generate_topology (nodes):
+  """
+  Generate a ring of BiSBiS nodes with a SAP connected to every node.
+  """
+  nffg = NFFG(id="BENCHMARK", name="edit-config-benchmark")
+  infras = []
+  for i in xrange(nodes):
+    infra = nffg.add_infra(id="infra%s" % i, name="BiSBiS-%s" % i,
+                           domain="BENCHMARK", infra_type="BiSBiS",
+                           cpu=100, mem=100000, storage=100,
+                           delay=0.1, bandwidth=100000)
+    infra.add_supported_type(["A", "B", "C"])
+    infras.append(infra)
+  for i, infra in enumerate(infras):
+    next_infra = infras[(i + 1) % len(infras)]
+    nffg.add_undirected_link(port1=infra.add_port(id="%s-east" % i),
+                             port2=next_infra.add_port(id="%s-west" % i),
+                             p1p2id="link%s-east" % i,
+                             p2p1id="link%s-west" % i,
+                             delay=1, bandwidth=1000)
+    sap = nffg.add_sap(id="sap%s" % i, name="SAP%s" % i)
+    nffg.add_undirected_link(port1=sap.add_port(id=1),
+                             port2=infra.add_port(id="%s-sap" % i),
+                             p1p2id="sap%s-in" % i,
+                             p2p1id="sap%s-out" % i,
+                             delay=1, bandwidth=1000)
+  return nffg
+
+
+def generate_request (topo, changed):
+  """
+  Deploy an NF on the first ``changed`` nodes of the given topology.
+  """
+  request = topo.copy()
+  for infra in list(request.infras)[:changed]:
+    nf = request.add_nf(id="nf-%s" % infra.id, name="NF", func_type="A",
+                        cpu=1, mem=1, storage=0)
+    request.add_undirected_link(port1=nf.add_port(id=1),
+                                port2=infra.add_port(
+                                  id="%s|%s|1" % (infra.id, nf.id)),
+                                dynamic=True)
+  return request
+
+
+def full_conversion (converter, topology, diff, cache):
+  """
+  Original edit-config processing: patch the reparsed cached topology and
+  convert the whole result.
+  """
+  received = Virtualizer.parse_from_text(text=diff)
+  full = Virtualizer.parse_from_text(topology.xml())
+  full.patch(source=received)
+  full = Virtualizer.parse_from_text(full.xml())
+  return converter.parse_from_Virtualizer(vdata=full)
+
+
+def partial_conversion (converter, topology, diff, cache):
+  """
+  Current edit-config processing: scan the changed nodes of the diff and
+  update the cached NFFG of the topology with them.
+  """
+  received = Virtualizer.parse_from_text(text=diff)
+  changed_nodes = get_changed_nodes_from_diff(diff=diff)
+  full = Virtualizer.parse_from_text(cache.xml(virtualizer=topology,
+                                               revision=1))
+  full.patch(source=received)
+  full = Virtualizer.parse_from_text(full.xml())
+  if changed_nodes is None:
+    return converter.parse_from_Virtualizer(vdata=full)
+  nffg = cache.nffg(converter=converter, virtualizer=topology, revision=1)
+  return converter.update_NFFG_from_Virtualizer(nffg=nffg, virtualizer=full,
+                                                changed_nodes=changed_nodes)
+
+
+def measure (func, converter, topology, diff, rounds, queue):
+  """
+  Run the given processing ``rounds`` times and put the average latency and
+  the peak memory growth into the queue.
+  """
+  cache = VirtualizerCache(logger=log)
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  start = time.time()
+  for _ in xrange(rounds):
+    func(converter, topology, diff, cache)
+  elapsed = (time.time() - start) / rounds
+  growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - peak
+  queue.put((elapsed, growth))
+
+
+def run (func, *args):
+  """
+  Measure in a separate process to get comparable memory peaks.
+  """
+  queue = multiprocessing.Queue()
+  p = multiprocessing.Process(target=measure, args=(func,) + args + (queue,))
+  p.start()
+  result = queue.get()
+  p.join()
+  return result
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Benchmark edit-config processing on generated Virtualizers.",
+    add_help=True)
+  parser.add_argument("-n", "--nodes", type=int, default=500,
+                      help="number of BiSBiS nodes (default: 500)")
+  parser.add_argument("-c", "--changed", type=int, default=5,
+                      help="number of nodes changed by the request "
+                           "(default: 5)")
+  parser.add_argument("-r", "--rounds", type=int, default=5,
+                      help="number of measured rounds (default: 5)")
+  args = parser.parse_args()
+  logging.basicConfig(level=logging.WARNING)
+
+  converter = NFFGConverter(domain="BENCHMARK", logger=log)
+  topo = generate_topology(nodes=args.nodes)
+  topology = converter.dump_to_Virtualizer(nffg=topo)
+  request = converter.dump_to_Virtualizer(
+    nffg=generate_request(topo=topo, changed=args.changed))
+  diff = topology.diff(target=request).xml()
+  print "Topology: %s nodes, %s bytes; diff: %s changed nodes, %s bytes" % (
+    args.nodes, len(topology.xml()), args.changed, len(diff))
+  for name, func in (("full conversion", full_conversion),
+                     ("partial conversion", partial_conversion)):
+    elapsed, growth = run(func, converter, topology, diff, args.rounds)
+    print "  %-20s %8.1f ms/request, peak memory growth: %s kB" % (
+      name + ":", elapsed * 1000, growth)